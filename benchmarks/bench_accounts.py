@@ -0,0 +1,115 @@
+"""
+Multi-account portfolio commands: !bal, !pos and the fill monitor across four
+Kalshi accounts queried concurrently, with and without one slow account.
+"""
+from benchmarks.conftest import FakeChannel, FakeContext, run
+
+ACCOUNTS = 4
+SLOW_DELAY = 1.0 # seconds the slow account takes
+TIMEOUT = 0.25 # KALSHI_ACCOUNT_TIMEOUT for the bench
+
+
+def _use_accounts(monkeypatch, kalshi_key_path):
+    from managers import accounts
+    monkeypatch.setattr(accounts, "KALSHI_ACCOUNT_TIMEOUT", TIMEOUT)
+    monkeypatch.setattr(accounts, "_accounts", [
+        accounts.KalshiAccount(f"desk{i}", f"acct-{i}", kalshi_key_path) for i in range(ACCOUNTS)
+    ])
+
+
+def _kalshi_field(ctx):
+    embed = ctx.sent[-1][1]["embed"]
+    return next(f.value for f in embed.fields if f.name == "Kalshi")
+
+
+def bench_balance_accounts(upstreams, bench, monkeypatch, kalshi_key_path):
+    import bot
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            _use_accounts(monkeypatch, kalshi_key_path)
+            b = bench(kalshi=kalshi)
+
+            async def once():
+                ctx = FakeContext()
+                await bot.balance(ctx)
+                value = _kalshi_field(ctx)
+                assert value.count("desk") == ACCOUNTS and "stale" not in value
+
+            return await b.run(once, accounts=ACCOUNTS)
+
+    result = run(main())
+    # Concurrent: one round trip per account, all in flight together
+    assert result["upstream_requests_per_iter"]["kalshi"] == ACCOUNTS
+
+
+def bench_balance_slow_account(upstreams, bench, monkeypatch, kalshi_key_path):
+    """One account takes SLOW_DELAY; the command returns after TIMEOUT with it marked stale."""
+    import bot
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            _use_accounts(monkeypatch, kalshi_key_path)
+            kalshi.key_delays[f"acct-{ACCOUNTS - 1}"] = SLOW_DELAY
+            b = bench(kalshi=kalshi)
+
+            async def once():
+                ctx = FakeContext()
+                await bot.balance(ctx)
+                value = _kalshi_field(ctx)
+                assert f"desk{ACCOUNTS - 1}: ⚠️" in value and value.count("desk") == ACCOUNTS
+
+            return await b.run(once, iterations=5, accounts=ACCOUNTS, slow_delay_s=SLOW_DELAY, timeout_s=TIMEOUT)
+
+    result = run(main())
+    assert result["p99_ms"] < SLOW_DELAY * 1000
+
+
+def bench_positions_accounts(upstreams, bench, monkeypatch, kalshi_key_path):
+    import bot
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            _use_accounts(monkeypatch, kalshi_key_path)
+            b = bench(kalshi=kalshi)
+
+            async def once():
+                ctx = FakeContext()
+                await bot.positions(ctx)
+                embed = ctx.sent[-1][1].get("embed")
+                assert embed is not None and len(embed.fields) == 10
+                assert "(desk0)" in embed.fields[0].value
+
+            return await b.run(once, accounts=ACCOUNTS)
+
+    run(main())
+
+
+def bench_order_monitor_accounts(upstreams, bench, monkeypatch, kalshi_key_path, tmp_path):
+    import json
+
+    import bot
+
+    monkeypatch.chdir(tmp_path)
+    channel = FakeChannel("order-logs")
+    monkeypatch.setattr(bot.bot, "get_all_channels", lambda: iter([channel]))
+    monkeypatch.setattr(bot.bot, "get_channel", lambda channel_id: channel if channel_id == channel.id else None)
+
+    async def seed_state():
+        # Every account's cursor sits 5 fills back, so each logs 5 fills
+        with open("bot_state.json", "w") as f:
+            json.dump({"accounts": {f"desk{i}": "trade-5" for i in range(ACCOUNTS)}}, f)
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            _use_accounts(monkeypatch, kalshi_key_path)
+            b = bench(kalshi=kalshi)
+
+            async def once():
+                before = len(channel.sent)
+                await bot.order_monitor()
+                assert len(channel.sent) - before == 5 * ACCOUNTS
+
+            return await b.run(once, setup=seed_state, accounts=ACCOUNTS)
+
+    run(main())
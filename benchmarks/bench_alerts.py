@@ -0,0 +1,97 @@
+"""
+Price-move alerts: per-quote evaluation cost, subscription churn when positions
+change, and one batched quote poll for the held tickers against the stub.
+"""
+import random
+import time
+
+from benchmarks.conftest import ITERATIONS, record, run
+from managers import market_manager
+from managers.alert_manager import AlertEngine
+from managers.quote_bus import QuoteBus
+
+HELD = 1000
+UPDATES = 200_000
+
+
+def _engine(sent):
+    async def send(alert):
+        sent.append(alert)
+
+    async def no_fetch(tickers):
+        return {}
+
+    return AlertEngine(bus=QuoteBus(fetch=no_fetch), send=send, move_cents=5, levels=[25, 50, 75], cooldown=60)
+
+
+def bench_alert_evaluate():
+    sent = []
+
+    async def main():
+        engine = _engine(sent)
+        rng = random.Random(3)
+        tickers = [f"KXBENCH-{i}" for i in range(HELD)]
+        engine.set_positions({t: (10 if i % 2 else -10) for i, t in enumerate(tickers)})
+        mids = {t: rng.uniform(20, 80) for t in tickers}
+
+        durations = []
+        batch = 1000
+        for _ in range(UPDATES // batch):
+            t0 = time.perf_counter()
+            for _ in range(batch):
+                t = tickers[rng.randrange(HELD)]
+                mids[t] = min(99.0, max(1.0, mids[t] + rng.uniform(-1.0, 1.0)))
+                m = round(mids[t])
+                engine.bus.publish(t, m - 1, m + 1)
+            durations.append((time.perf_counter() - t0) / batch)
+        return engine, durations
+
+    engine, durations = run(main())
+    assert engine.alerts > 0 and engine.suppressed > 0 and len(sent) == engine.alerts
+    record("alert_evaluate_per_update", durations, held=HELD, updates=engine.updates,
+           alerts=engine.alerts, suppressed=engine.suppressed)
+
+
+def bench_alert_subscription_churn():
+    """Positions resync with 1% of HELD tickers opened/closed: only the difference is (un)subscribed."""
+    async def main():
+        engine = _engine([])
+        held = {f"KXBENCH-{i}": 5 for i in range(HELD)}
+        engine.set_positions(held)
+        durations = []
+        for k in range(ITERATIONS):
+            churn = HELD // 100
+            nxt = dict(held)
+            for i in range(churn):
+                nxt.pop(f"KXBENCH-{k * churn + i}", None)
+                nxt[f"KXNEW-{k}-{i}"] = 3
+            t0 = time.perf_counter()
+            added, removed = engine.set_positions(nxt)
+            durations.append(time.perf_counter() - t0)
+            assert len(added) == churn and len(removed) == churn
+            assert len(engine.bus.tickers()) == len(nxt)
+            held = nxt
+        return durations
+
+    record("alert_subscription_churn", run(main()), held=HELD, churn=HELD // 100)
+
+
+def bench_alert_poll(upstreams, bench):
+    """Held set from !pos data, then one batched /markets poll per iteration."""
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            engine = _engine([])
+            engine.bus.fetch = market_manager.get_market_quotes
+            added, _ = await engine.refresh_positions()
+            assert added
+
+            b = bench(kalshi=kalshi)
+
+            async def once():
+                engine.bus._last.clear() # every quote counts as changed
+                assert await engine.bus.poll_once() == len(added)
+
+            return await b.run(once, held=len(added))
+
+    result = run(main())
+    assert result["upstream_requests_per_iter"]["kalshi"] == 1
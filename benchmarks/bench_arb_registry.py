@@ -0,0 +1,106 @@
+"""
+Mapping registry: O(1) pair lookups, the cost of the per-pass change check and
+of a reload, and the !search results screen for mapped games (no Gamma search).
+"""
+import json
+import os
+import time
+
+from benchmarks.conftest import ITERATIONS, FakeInteraction, record, run
+from benchmarks.bench_views import _assert_rendered, _clear_caches
+from benchmarks.stubs import build_catalog
+from managers import arb_registry, batch_mapper
+
+SERIES = "KXNBAGAME"
+EVENTS = 500 # registry size for the lookup / reload numbers
+
+
+def _entries(catalog):
+    """Registry entries for every catalog game, built the way /setup_arb builds them."""
+    markets = catalog["kalshi_markets"]
+    entries = {}
+    for gamma_event, k_event in zip(catalog["gamma_events"], catalog["kalshi_events"][SERIES]):
+        k_event = dict(k_event, markets=markets[k_event["event_ticker"]])
+        poly = batch_mapper.poly_side(_projected(gamma_event))
+        entry = batch_mapper.complete_entry(batch_mapper.kalshi_side(k_event, "NBA"), poly)
+        assert entry is not None, k_event["event_ticker"]
+        entries[k_event["event_ticker"]] = entry
+    return entries
+
+
+def _projected(gamma_event):
+    # The stubs serve Gamma's JSON-in-a-string fields; ingest parses them
+    markets = [dict(m, outcomes=json.loads(m["outcomes"]), clobTokenIds=json.loads(m["clobTokenIds"]))
+               for m in gamma_event["markets"]]
+    return dict(gamma_event, markets=markets)
+
+
+def bench_registry_lookups(tmp_path):
+    catalog = build_catalog(n_games=EVENTS, n_filler=0)
+    registry = arb_registry.MappingRegistry(str(tmp_path / "arb_mappings.json"))
+    t0 = time.perf_counter()
+    registry.put_many(_entries(catalog))
+    write_time = time.perf_counter() - t0
+    pairs = registry.pairs()
+    assert len(registry) == EVENTS and len(pairs) == 4 * EVENTS
+
+    durations = []
+    for _ in range(ITERATIONS):
+        t0 = time.perf_counter()
+        for ticker, side, token in pairs:
+            assert registry.token_for(ticker, side) == token
+            assert (ticker, side) in registry.sides_for(token)
+        durations.append(time.perf_counter() - t0)
+
+    check = []
+    for _ in range(ITERATIONS):
+        t0 = time.perf_counter()
+        assert not registry.reload_if_changed()
+        check.append(time.perf_counter() - t0)
+
+    # Another writer (a second bot, a hand edit) replaces the file: picked up on the next check
+    other = arb_registry.MappingRegistry(registry.path)
+    first = next(iter(other.index.events))
+    data = dict(other.index.events)
+    del data[first]
+    tmp = f"{registry.path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, registry.path)
+    t0 = time.perf_counter()
+    assert registry.reload_if_changed()
+    reload_time = time.perf_counter() - t0
+    assert len(registry) == EVENTS - 1 and registry.event(first) is None
+
+    # Durations are one pass over every pair (both lookups each)
+    per_lookup_ns = sorted(durations)[len(durations) // 2] / (2 * len(pairs)) * 1e9
+    record("registry_lookup_pass", durations, events=EVENTS, pairs=len(pairs),
+           lookup_ns=round(per_lookup_ns, 1),
+           change_check_us=round(sorted(check)[len(check) // 2] * 1e6, 2),
+           reload_ms=round(reload_time * 1000, 2), write_ms=round(write_time * 1000, 2))
+
+
+def bench_show_results_mapped(upstreams, bench, tmp_path, monkeypatch, catalog):
+    """Cold !search results when every game is in the registry: Gamma is never asked."""
+    import views
+
+    registry = arb_registry.MappingRegistry(str(tmp_path / "arb_mappings.json"))
+    registry.put_many(_entries(catalog))
+    monkeypatch.setattr(arb_registry, "_registry", registry)
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            b = bench(kalshi=kalshi, gamma=gamma, clob=clob)
+
+            async def setup():
+                _clear_caches()
+
+            async def once():
+                interaction = FakeInteraction()
+                await views.show_results(interaction, SERIES, "NBA", "moneyline")
+                _assert_rendered(interaction)
+
+            return await b.run(once, setup=setup)
+
+    result = run(main())
+    assert result["upstream_requests_per_iter"]["gamma"] == 0
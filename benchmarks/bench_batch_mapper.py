@@ -0,0 +1,81 @@
+"""
+Batch /setup_arb: mapping a whole series in one pass (nested Kalshi events, one
+Gamma tag scan, pooled matching, one file write) vs matching each event on its
+own the way the single-ticker path does.
+"""
+import json
+import time
+
+from benchmarks.conftest import FakeInteraction, record, run
+from benchmarks.stubs import build_catalog
+from managers import arb_registry, batch_mapper
+from managers.mapping_logic import mapping_pairs
+
+SERIES = "KXNBAGAME"
+BATCH_ITERATIONS = 5 # each run starts a process pool
+
+
+def bench_batch_setup_arb(upstreams, bench, tmp_path, monkeypatch, catalog):
+    from cogs.mapper import MarketMapper
+
+    path = tmp_path / "arb_mappings.json"
+    monkeypatch.setattr(arb_registry, "_registry", arb_registry.MappingRegistry(str(path)))
+    cog = MarketMapper(bot=None)
+    events = len(catalog["kalshi_events"][SERIES])
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            b = bench(kalshi=kalshi, gamma=gamma)
+
+            async def once():
+                interaction = FakeInteraction()
+                await cog.setup_series(interaction, SERIES)
+                embed = interaction.followups[1][1]["embed"]
+                assert embed.fields[0].name == f"✅ Accepted ({events})", embed.fields[1].value
+
+            return await b.run(once, iterations=BATCH_ITERATIONS, events=events)
+
+    result = run(main())
+    mappings = json.loads(path.read_text())
+    assert len(mappings) == events and all(len(mapping_pairs(m)) == 4 for m in mappings.values())
+    assert result["upstream_requests_per_iter"]["kalshi"] == 1
+
+
+def bench_batch_map_two_slates(upstreams, catalog):
+    """30 events where every matchup appears on two days: all accepted, none crossed."""
+    # The stubs serve this dict, so swap the slate in before they start
+    catalog.update(build_catalog(n_games=30, n_filler=200))
+    slugs = {e["slug"] for e in catalog["gamma_events"]}
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            t0 = time.perf_counter()
+            result = await batch_mapper.map_series(SERIES, "NBA")
+            return time.perf_counter() - t0, result, kalshi.total_requests, gamma.total_requests
+
+    elapsed, result, k_requests, g_requests = run(main())
+    assert not result["review"], [(r["event_ticker"], r["reason"]) for r in result["review"]]
+    for a in result["accepted"]:
+        slug = a["candidates"][0]["slug"]
+        assert slug.endswith(batch_mapper._ticker_day(a["event_ticker"]).isoformat()), (a["event_ticker"], slug)
+        assert slug in slugs
+    record("batch_map_two_slates", [elapsed], events=result["events"], accepted=len(result["accepted"]),
+           kalshi_requests=k_requests, gamma_requests=g_requests)
+
+
+def bench_single_match_per_event(upstreams, catalog):
+    """Baseline: one find_polymarket_match per event (what mapping them one by one costs upstream)."""
+    from managers.polymarket_manager import find_polymarket_match
+
+    titles = [e["title"] for e in catalog["kalshi_events"][SERIES]]
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            t0 = time.perf_counter()
+            matches = [await find_polymarket_match(t, sport="NBA") for t in titles]
+            return time.perf_counter() - t0, matches, gamma.total_requests
+
+    elapsed, matches, g_requests = run(main())
+    assert all(matches)
+    record("single_match_per_event", [elapsed], events=len(titles), gamma_requests=g_requests,
+           gamma_requests_per_event=round(g_requests / len(titles), 2))
@@ -0,0 +1,154 @@
+"""
+Live boards: many channels sharing one feed, edits debounced/coalesced per
+message, fields re-rendered only when their game changed, and a board on a
+quiet market expiring (and its feed stopping) on time.
+"""
+import asyncio
+import random
+import time
+
+import views
+from benchmarks.conftest import FakeContext, record, run
+from managers import board_manager
+
+CHANNELS = 50
+GAMES = 4
+REFRESHES = 200
+REFRESH_EVERY = 0.005 # seconds between snapshots (far faster than real quotes)
+MIN_INTERVAL = 0.1
+DEBOUNCE = 0.02
+
+
+def _snapshot_source():
+    """fetch() returning snapshots where one random game's price moves each time."""
+    rng = random.Random(5)
+    prices = [[50, 48] for _ in range(GAMES)]
+
+    async def fetch(series_ticker, sport, market_type):
+        g = rng.randrange(GAMES)
+        prices[g][0] = min(99, max(1, prices[g][0] + rng.choice((-1, 1))))
+        prices[g][1] = 100 - prices[g][0] - 2
+        games = []
+        for i in range(GAMES):
+            ticker = f"KXNFLGAME-25DEC{10 + i}AAABBB"
+            games.append({
+                "game": {"event_title": f"Game {i}", "series_ticker": series_ticker, "event_ticker": ticker},
+                "markets": [{"ticker": f"{ticker}-AAA", "title": f"Game {i}", "subtitle": "AAA",
+                             "yes_bid": prices[i][0], "no_bid": prices[i][1]}],
+                "date_display": f"Dec {10 + i}",
+                "poly_data": None,
+            })
+        return {"error": None, "games": games, "generated_at": time.time()}
+
+    return fetch
+
+
+def bench_board_fanout():
+    async def main():
+        feed = board_manager.BoardFeed("KXNFLGAME", "NFL", "moneyline", views.render_game_field,
+                                       views.game_fingerprint, refresh=3600, fetch=_snapshot_source())
+        await feed.refresh()
+
+        def assemble(fields, feed, note):
+            return views.board_embed(feed.sport, feed.market_type, fields, feed.snapshot["generated_at"], note)
+
+        boards, messages = [], []
+        for c in range(CHANNELS):
+            ctx = FakeContext(channel_id=1000 + c)
+            message = await ctx.send(embed=assemble(feed.fields(), feed, None))
+            messages.append(message)
+            boards.append(await board_manager.open_board(
+                ctx.channel.id, feed, lambda embed, m=message: m.edit(embed=embed), assemble,
+                min_interval=MIN_INTERVAL, debounce=DEBOUNCE, ttl=3600,
+            ))
+
+        refresh_times = []
+        t_start = time.perf_counter()
+        for _ in range(REFRESHES):
+            t0 = time.perf_counter()
+            await feed.refresh()
+            refresh_times.append(time.perf_counter() - t0)
+            await asyncio.sleep(REFRESH_EVERY)
+        elapsed = time.perf_counter() - t_start
+        await asyncio.sleep(MIN_INTERVAL + DEBOUNCE) # let the last coalesced edit land
+
+        edits = [len(m.edits) for m in messages]
+        stats = {
+            "channels": CHANNELS,
+            "snapshots": REFRESHES,
+            "upstream_fetches": feed.fetches,
+            "field_renders": feed.renders,
+            "field_reused": feed.reused,
+            "edits_per_board": round(sum(edits) / CHANNELS, 1),
+            "max_edits_per_board": max(edits),
+            "edit_budget_per_board": int(elapsed / MIN_INTERVAL) + 2,
+            "coalesced_per_board": round(sum(b.coalesced for b in boards) / CHANNELS, 1),
+        }
+        await board_manager.close_channel(1000)
+        for c in range(1, CHANNELS):
+            await board_manager.close_channel(1000 + c)
+        return refresh_times, stats
+
+    refresh_times, stats = run(main())
+    # One fetch per snapshot for every channel, edits paced per message, unchanged games reused
+    assert stats["upstream_fetches"] == REFRESHES + 1
+    assert stats["max_edits_per_board"] <= stats["edit_budget_per_board"]
+    assert stats["field_reused"] > stats["field_renders"]
+    record("board_refresh_fanout", refresh_times, **stats)
+
+
+def bench_board_quiet_expiry():
+    """A market whose snapshot never changes: the board still closes at its TTL and the feed stops fetching."""
+    ttl, refresh = 0.2, 0.05
+
+    async def main():
+        snapshot = await _snapshot_source()("KXNFLGAME", "NFL", "moneyline")
+
+        async def fetch(*args):
+            return snapshot
+
+        feed = board_manager.BoardFeed("KXNFLGAME", "NFL", "moneyline", views.render_game_field,
+                                       views.game_fingerprint, refresh=refresh, fetch=fetch)
+        await feed.refresh()
+
+        def assemble(fields, feed, note):
+            return views.board_embed(feed.sport, feed.market_type, fields, None, note)
+
+        ctx = FakeContext(channel_id=2000)
+        message = await ctx.send(embed=assemble(feed.fields(), feed, None))
+        t0 = time.perf_counter()
+        board = await board_manager.open_board(ctx.channel.id, feed, lambda embed: message.edit(embed=embed),
+                                               assemble, ttl=ttl)
+        while not board.closed and time.perf_counter() - t0 < 1.0:
+            await asyncio.sleep(0.01)
+        closed_after = time.perf_counter() - t0
+        fetches = feed.fetches
+        await asyncio.sleep(5 * refresh)
+        return board, feed, closed_after, fetches, message
+
+    board, feed, closed_after, fetches, message = run(main())
+    assert board.closed and not feed.boards
+    assert closed_after < 0.2 + 2 * 0.05, closed_after
+    assert feed.fetches == fetches # nothing fetched once the board is gone
+    assert "expired" in (message.edits[-1]["embed"].description or "")
+    record("board_quiet_expiry", [closed_after], ttl=ttl, refresh=refresh, fetches=fetches)
+
+
+def bench_board_command(upstreams, bench):
+    import bot
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            b = bench(kalshi=kalshi, gamma=gamma, clob=clob)
+
+            async def once():
+                ctx = FakeContext(channel_id=77)
+                await bot.board(ctx, "NBA", "moneyline")
+                embed = ctx.sent[-1][1].get("embed")
+                assert embed is not None and embed.fields
+                await bot.board(ctx, "stop")
+                assert ctx.sent[-1][0][0] == "Stopped 1 board(s)."
+
+            return await b.run(once)
+
+    run(main())
@@ -0,0 +1,159 @@
+"""
+End-to-end benchmarks for bot.py: the fill monitor loop (busy, burst and idle
+ticks, channel lookup, adaptive interval) and !positions.
+"""
+import json
+import random
+import time
+
+from benchmarks.conftest import FakeChannel, FakeContext, ITERATIONS, record, run
+
+
+def _order_monitor(upstreams, bench, monkeypatch, tmp_path, new_fills):
+    """Ticks that each find `new_fills` fills past the cursor (the stub's fills are trade-0, newest, onward)."""
+    import bot
+
+    # order_monitor keeps its cursor in ./bot_state.json
+    monkeypatch.chdir(tmp_path)
+    channel = FakeChannel("order-logs")
+    monkeypatch.setattr(bot.bot, "get_all_channels", lambda: iter([channel]))
+    monkeypatch.setattr(bot.bot, "get_channel", lambda channel_id: channel if channel_id == channel.id else None)
+
+    async def seed_state():
+        with open("bot_state.json", "w") as f:
+            json.dump({"last_fill_trade_id": f"trade-{new_fills}"}, f)
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            b = bench(kalshi=kalshi)
+
+            async def once():
+                before = len(channel.sent)
+                await bot.order_monitor()
+                assert len(channel.sent) - before == new_fills
+
+            return await b.run(once, setup=seed_state, new_fills=new_fills)
+
+    run(main())
+
+
+def bench_order_monitor(upstreams, bench, monkeypatch, tmp_path):
+    """5 new fills per tick: the limit=5 window holds them."""
+    _order_monitor(upstreams, bench, monkeypatch, tmp_path, 5)
+
+
+def bench_order_monitor_burst(upstreams, bench, monkeypatch, tmp_path):
+    """12 new fills since the last tick (a burst during a 15s idle interval): one catch-up page, none lost."""
+    _order_monitor(upstreams, bench, monkeypatch, tmp_path, 12)
+
+
+def bench_positions(upstreams, bench):
+    import bot
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            b = bench(kalshi=kalshi)
+
+            async def once():
+                ctx = FakeContext()
+                await bot.positions(ctx)
+                embed = ctx.sent[-1][1].get("embed")
+                assert embed is not None and len(embed.fields) == 10
+
+            return await b.run(once)
+
+    run(main())
+
+
+def bench_order_monitor_idle(upstreams, bench, monkeypatch, tmp_path):
+    """A tick with no new fills (the common case), #order-logs among 5000 channels."""
+    import bot
+    from managers.channels import ChannelResolver
+
+    monkeypatch.chdir(tmp_path)
+    channel = FakeChannel("order-logs", channel_id=4999)
+    others = [FakeChannel(f"chan-{i}", channel_id=i) for i in range(4999)]
+    monkeypatch.setattr(bot.bot, "get_all_channels", lambda: iter(others + [channel]))
+    monkeypatch.setattr(bot.bot, "get_channel", lambda channel_id: channel if channel_id == channel.id else None)
+    monkeypatch.setattr(bot, "channels", ChannelResolver(bot.bot))
+
+    async def seed_state():
+        # Cursor at the newest fill: nothing to log
+        with open("bot_state.json", "w") as f:
+            json.dump({"last_fill_trade_id": "trade-0"}, f)
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            b = bench(kalshi=kalshi)
+
+            async def once():
+                await bot.order_monitor()
+                assert not channel.sent
+
+            result = await b.run(once, setup=seed_state)
+            # Idle ticks back the interval off to its ceiling
+            assert bot.monitor_interval.current == bot.monitor_interval.maximum or ITERATIONS < 10
+            return result
+
+    run(main())
+
+
+def bench_channel_lookup(monkeypatch):
+    """#order-logs among 5000 channels: full scan (every tick before) vs the cached ID."""
+    import bot
+    from managers.channels import ChannelResolver
+
+    channel = FakeChannel("order-logs", channel_id=4999)
+    all_channels = [FakeChannel(f"chan-{i}", channel_id=i) for i in range(4999)] + [channel]
+    monkeypatch.setattr(bot.bot, "get_all_channels", lambda: iter(all_channels))
+    monkeypatch.setattr(bot.bot, "get_channel", lambda channel_id: channel if channel_id == channel.id else None)
+    resolver = ChannelResolver(bot.bot)
+    n = 1000
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        assert next(c for c in bot.bot.get_all_channels() if c.name == "order-logs") is channel
+    scan = time.perf_counter() - t0
+
+    resolver.get("order-logs")
+    t0 = time.perf_counter()
+    for _ in range(n):
+        assert resolver.get("order-logs") is channel
+    cached = time.perf_counter() - t0
+
+    record("channel_lookup", [cached], lookups=n, channels=len(all_channels),
+           cached_ns=round(cached / n * 1e9), scan_ns=round(scan / n * 1e9))
+
+
+def _simulate(fills, hours, next_interval):
+    """Polls over `hours` given fill times: (polls per hour, [detection delay per fill])."""
+    end = hours * 3600
+    t, polls, delays, pending = 0.0, 0, [], sorted(fills)
+    while t < end:
+        polls += 1
+        seen = [f for f in pending if f <= t]
+        delays.extend(t - f for f in seen)
+        pending = pending[len(seen):]
+        t += next_interval(bool(seen))
+    return polls / hours, delays
+
+
+def bench_order_monitor_schedule():
+    """Six hours with a burst of 5 fills (3s apart) every ~45 min: fixed 5s polling vs adaptive."""
+    from managers import config
+    from managers.poll_interval import AdaptiveInterval
+
+    rng = random.Random(7)
+    fills = []
+    t = 0.0
+    while t < 6 * 3600:
+        t += rng.uniform(30, 60) * 60
+        fills.extend(t + i * 3 for i in range(5))
+
+    fixed_rate, fixed_delays = _simulate(fills, 6, lambda active: 5.0)
+    adaptive = AdaptiveInterval(config.MONITOR_MIN_INTERVAL, config.MONITOR_MAX_INTERVAL, config.MONITOR_BACKOFF)
+    adaptive_rate, adaptive_delays = _simulate(fills, 6, adaptive.update)
+
+    record("order_monitor_schedule_fixed", fixed_delays, polls_per_hour=round(fixed_rate, 1), fills=len(fills))
+    record("order_monitor_schedule_adaptive", adaptive_delays, polls_per_hour=round(adaptive_rate, 1), fills=len(fills))
+    assert adaptive_rate < fixed_rate
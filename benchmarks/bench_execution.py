@@ -0,0 +1,226 @@
+"""
+Two-leg execution against the stub exchanges: a warm execution (prepared keys,
+signers and connections) vs a cold one, per-step timings, the unwind policy when
+only one leg fills, a leg timing out, gateway errors vs rejections on an order
+POST, legs sent while the Kalshi request
+scheduler is backed up, and dry runs.
+"""
+import asyncio
+import base64
+import json
+import os
+import statistics
+import time
+
+from benchmarks.conftest import ITERATIONS, record, run
+from managers import execution, scheduler
+from managers.http_client import client_session, upstream_name
+
+TICKER = "KXNBAGAME-BENCH-BOS"
+
+
+def _executor(kalshi, clob, kalshi_key_path, **kwargs):
+    kwargs.setdefault("dry_run", False)
+    kwargs.setdefault("keepalive", 0)
+    return execution.TwoLegExecutor(
+        kalshi=execution.KalshiVenue("bench-key", kalshi_key_path, base_url=f"{kalshi.url}/trade-api/v2"),
+        poly=execution.PolyVenue(
+            api_key="bench-api-key",
+            secret=base64.urlsafe_b64encode(os.urandom(32)).decode(),
+            passphrase="bench-passphrase",
+            wallet_key="0x" + os.urandom(32).hex(),
+            base_url=clob.url,
+        ),
+        **kwargs,
+    )
+
+
+def _token(catalog):
+    return json.loads(catalog["gamma_events"][0]["markets"][0]["clobTokenIds"])[0]
+
+
+async def _execute(ex, token, count=10):
+    return await ex.execute(TICKER, "yes", 47, token, 50, count)
+
+
+def _medians(results, steps):
+    return {f"{s}_ms": round(statistics.median(r["timings"][s] for r in results), 3) for s in steps}
+
+
+def bench_execute_warm_vs_cold(upstreams, kalshi_key_path, catalog):
+    token = _token(catalog)
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            warm = _executor(kalshi, clob, kalshi_key_path)
+            await warm.start([token])
+            warm_results, warm_durations = [], []
+            for _ in range(ITERATIONS):
+                t0 = time.perf_counter()
+                warm_results.append(await _execute(warm, token))
+                warm_durations.append(time.perf_counter() - t0)
+            await warm.close()
+
+            # Cold: every execution parses keys, builds signers, connects and looks the token up
+            cold_results, cold_durations = [], []
+            for _ in range(ITERATIONS):
+                cold = _executor(kalshi, clob, kalshi_key_path)
+                t0 = time.perf_counter()
+                cold_results.append(await _execute(cold, token))
+                cold_durations.append(time.perf_counter() - t0)
+                await cold.close()
+            return warm_results, warm_durations, cold_results, cold_durations, len(kalshi.orders), len(clob.orders)
+
+    warm_results, warm_durations, cold_results, cold_durations, k_orders, p_orders = run(main())
+    assert all(r["status"] == "filled" and r["hedged"] == 10 for r in warm_results + cold_results)
+    assert k_orders == p_orders == 2 * ITERATIONS
+    warm = record("execute_pair_warm", warm_durations,
+                  **_medians(warm_results, ("sign_kalshi", "sign_poly", "kalshi", "poly", "legs", "total")))
+    cold = record("execute_pair_cold", cold_durations, **_medians(cold_results, ("prepare", "legs", "total")))
+    assert warm["p50_ms"] < cold["p50_ms"]
+
+
+def bench_execute_under_backlog(upstreams, kalshi_key_path, catalog):
+    """
+    Orders skip the request scheduler: with Kalshi's budget spent (1 req/s) and
+    100 background requests queued, both legs still go out at once and fill.
+    """
+    from yarl import URL
+    token = _token(catalog)
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            ex = _executor(kalshi, clob, kalshi_key_path)
+            await ex.start([token])
+            name = upstream_name(URL(kalshi.url))
+            scheduler._schedulers[name] = scheduler.UpstreamScheduler(name, rate=1, concurrency=2, reserved=0)
+            async with client_session() as session:
+                async def one():
+                    with scheduler.priority(scheduler.REFRESH):
+                        async with session.get(f"{kalshi.url}/trade-api/v2/exchange/status") as resp:
+                            await resp.read()
+
+                backlog = asyncio.gather(*(one() for _ in range(100)))
+                await asyncio.sleep(0.05) # the backlog is queued
+                results, durations = [], []
+                for _ in range(ITERATIONS):
+                    t0 = time.perf_counter()
+                    results.append(await _execute(ex, token))
+                    durations.append(time.perf_counter() - t0)
+                queued = sum(scheduler._schedulers[name].queued().values())
+                backlog.cancel()
+                try:
+                    await backlog
+                except asyncio.CancelledError:
+                    pass
+            await ex.close()
+            return results, durations, queued
+
+    results, durations, queued = run(main())
+    assert queued > 0
+    assert all(r["status"] == "filled" for r in results), [r["status"] for r in results]
+    record("execute_pair_under_backlog", durations, backlog_queued=queued, **_medians(results, ("legs", "total")))
+
+
+def bench_execute_unwind(upstreams, kalshi_key_path, catalog):
+    """One leg short: the excess is sold back (flatten) or reported (hold)."""
+    token = _token(catalog)
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            ex = _executor(kalshi, clob, kalshi_key_path)
+            await ex.prepare([token])
+            out = {}
+
+            clob.fill = False # Poly killed: all 10 Kalshi contracts are sold back
+            out["poly_missed"] = await _execute(ex, token)
+            out["poly_missed_orders"] = kalshi.orders[-1]
+
+            clob.fill, kalshi.fill_ratio = True, 0.5 # Kalshi half filled: 5 Poly shares sold back
+            out["kalshi_partial"] = await _execute(ex, token)
+            out["kalshi_partial_orders"] = clob.orders[-1]
+
+            ex.unwind = "hold"
+            n = len(clob.orders)
+            out["hold"] = await _execute(ex, token)
+            out["hold_new_orders"] = len(clob.orders) - n
+            await ex.close()
+            return out
+
+    out = run(main())
+    r = out["poly_missed"]
+    assert r["status"] == "unwound" and r["hedged"] == 0 and r["unwind"]["filled"] == 10
+    assert out["poly_missed_orders"]["action"] == "sell" and out["poly_missed_orders"]["count"] == 10
+    r = out["kalshi_partial"]
+    assert r["status"] == "unwound" and r["hedged"] == 5 and r["unwind"]["filled"] == 5
+    assert out["kalshi_partial_orders"]["order"]["side"] == "SELL"
+    assert out["hold"]["status"] == "exposed" and out["hold_new_orders"] == 1 # the buy only
+    record("execute_unwind", [out["poly_missed"]["timings"]["total"] / 1000, out["kalshi_partial"]["timings"]["total"] / 1000],
+           unwind_ms=out["poly_missed"]["timings"]["unwind"])
+
+
+def bench_execute_gateway_error(upstreams, kalshi_key_path, catalog):
+    """
+    A 5xx on an order POST may still have placed the order: the result is unknown
+    and nothing is unwound. A 4xx is a refusal: the other leg is flattened.
+    """
+    token = _token(catalog)
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            ex = _executor(kalshi, clob, kalshi_key_path)
+            await ex.prepare([token])
+            out = {}
+            for venue, stub in (("poly", clob), ("kalshi", kalshi)):
+                for status in (502, 400):
+                    sells = len([o for o in kalshi.orders if o["action"] == "sell"]) + \
+                        len([o for o in clob.orders if o["order"]["side"] == "SELL"])
+                    stub.fail_status = status
+                    result = await _execute(ex, token)
+                    stub.fail_status = None
+                    after = len([o for o in kalshi.orders if o["action"] == "sell"]) + \
+                        len([o for o in clob.orders if o["order"]["side"] == "SELL"])
+                    out[(venue, status)] = (result, after - sells)
+            await ex.close()
+            return out
+
+    out = run(main())
+    for venue in ("poly", "kalshi"):
+        result, unwinds = out[(venue, 502)]
+        assert result[venue]["status"] == "error" and result["status"] == "unknown" and unwinds == 0, result
+        result, unwinds = out[(venue, 400)]
+        assert result[venue]["status"] == "rejected" and result["status"] == "unwound" and unwinds == 1, result
+    record("execute_gateway_error", [out[("poly", 502)][0]["timings"]["total"] / 1000],
+           **{f"{v}_{s}": out[(v, s)][0]["status"] for v, s in out})
+
+
+def bench_execute_timeout_and_dry_run(upstreams, kalshi_key_path, catalog):
+    """A leg slower than the timeout is reported unknown (never unwound); a dry run sends nothing."""
+    token = _token(catalog)
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            ex = _executor(kalshi, clob, kalshi_key_path, timeout=0.05)
+            await ex.prepare([token])
+            clob.order_delay = 0.2
+            timed_out = await _execute(ex, token)
+            unwinds = [o for o in kalshi.orders if o["action"] == "sell"]
+            clob.order_delay = 0
+
+            dry = _executor(kalshi, clob, kalshi_key_path, dry_run=True)
+            before = (len(kalshi.orders), len(clob.orders))
+            dry_result = await _execute(dry, token)
+            after = (len(kalshi.orders), len(clob.orders))
+            await ex.close()
+            await dry.close()
+            return timed_out, unwinds, dry_result, before, after
+
+    timed_out, unwinds, dry, before, after = run(main())
+    assert timed_out["status"] == "unknown" and timed_out["poly"]["status"] == "timeout"
+    assert timed_out["kalshi"]["status"] == "filled" and not unwinds
+    assert timed_out["timings"]["legs"] < 150 # gave up at the timeout, didn't wait for the stub
+    assert dry["status"] == "dry_run" and before == after
+    assert dry["kalshi"]["request"]["yes_price"] == 47 and dry["poly"]["request"]["orderType"] == "FOK"
+    record("execute_dry_run", [dry["timings"]["total"] / 1000],
+           sign_kalshi_ms=dry["timings"]["sign_kalshi"], sign_poly_ms=dry["timings"]["sign_poly"],
+           timeout_legs_ms=timed_out["timings"]["legs"])
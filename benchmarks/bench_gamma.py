@@ -0,0 +1,149 @@
+"""
+Gamma /events fetching: paged with early termination vs the old single
+limit=1000 request, on a tag large enough to need more than one page, how
+many pages a match that isn't on Polymarket costs, and peak memory of streaming/projected ingest vs resp.json().
+"""
+import os
+import time
+import tracemalloc
+
+import pytest
+
+from benchmarks.conftest import record, run
+from benchmarks.stubs import NBA_TAG_ID
+from benchmarks.stubs import build_catalog
+from managers import polymarket_manager
+from managers.http_client import client_session
+
+GAMMA_FILLER = int(os.getenv("BENCH_GAMMA_FILLER", "2400"))
+LATE_GAMES = 3 # games moved past the first 1000 tagged events
+ITERATIONS = int(os.getenv("BENCH_GAMMA_ITERATIONS", "5"))
+
+
+@pytest.fixture
+def catalog():
+    """Big NBA tag: ~1200 tagged events, with the last few games at the very end."""
+    cat = build_catalog(n_games=15, n_filler=GAMMA_FILLER)
+    events = cat["gamma_events"]
+    late = events[15 - LATE_GAMES:15]
+    del events[15 - LATE_GAMES:15]
+    events.extend(late)
+    return cat
+
+
+def _single_shot(monkeypatch):
+    """Reproduces the previous behaviour: one limit=1000 page, no early stop."""
+    monkeypatch.setattr(polymarket_manager, "GAMMA_PAGE_SIZE", 1000)
+    monkeypatch.setattr(polymarket_manager, "GAMMA_MAX_EVENTS", 1000)
+    monkeypatch.setattr(polymarket_manager, "EARLY_STOP_SCORE", 1.01)
+
+
+def _match_titles(upstreams, bench, titles):
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            b = bench(gamma=gamma)
+            found = {}
+
+            async def once():
+                for t in titles:
+                    found[t] = await polymarket_manager.find_polymarket_match(t, sport="NBA")
+
+            result = await b.run(once, iterations=ITERATIONS, matches_per_iter=len(titles))
+            return result, found
+
+    return run(main())
+
+
+def _early_titles(catalog):
+    return [e["title"] for e in catalog["kalshi_events"]["KXNBAGAME"][:5]]
+
+
+def _late_titles(catalog):
+    return [e["title"] for e in catalog["kalshi_events"]["KXNBAGAME"][15 - LATE_GAMES:15]]
+
+
+def bench_gamma_single_shot(upstreams, bench, catalog, monkeypatch):
+    _single_shot(monkeypatch)
+    _, found = _match_titles(upstreams, bench, _early_titles(catalog))
+    assert all(found.values())
+
+
+def bench_gamma_paged(upstreams, bench, catalog):
+    _, found = _match_titles(upstreams, bench, _early_titles(catalog))
+    assert all(found.values())
+
+
+def bench_gamma_single_shot_late(upstreams, bench, catalog, monkeypatch):
+    """Games past the first 1000 events are invisible to the single request."""
+    _single_shot(monkeypatch)
+    _, found = _match_titles(upstreams, bench, _late_titles(catalog))
+    assert not any(found.values())
+
+
+def bench_gamma_paged_late(upstreams, bench, catalog):
+    _, found = _match_titles(upstreams, bench, _late_titles(catalog))
+    assert all(found.values())
+
+
+def bench_gamma_miss(upstreams, bench, catalog):
+    """
+    A game Polymarket doesn't list: both teams and their stripped names (8
+    queries, tagged and global) read one shared tagged scan and one global scan
+    capped at GAMMA_GLOBAL_MAX_EVENTS.
+    """
+    tagged = sum(1 for e in catalog["gamma_events"] if any(t["id"] == NBA_TAG_ID for t in e.get("tags", [])))
+    result, found = _match_titles(upstreams, bench, ["Nowhere Q at Atlantis Z"])
+    assert not any(found.values())
+    pages = result["upstream_requests_per_iter"]["gamma"]
+    page = polymarket_manager.GAMMA_PAGE_SIZE
+    assert pages <= tagged // page + 1 + polymarket_manager.GAMMA_GLOBAL_MAX_EVENTS // page, pages
+
+
+# --- Ingest memory (one 1000-event page) ---
+
+async def _ingest_json(url):
+    """The previous path: whole body through resp.json()."""
+    params = {"limit": 1000, "offset": 0, "active": "true", "closed": "false", "tag_id": NBA_TAG_ID}
+    async with client_session() as session:
+        async with session.get(url, params=params) as resp:
+            return await resp.json()
+
+
+async def _ingest_stream(url):
+    pages = []
+    async for page in polymarket_manager.iter_event_pages(tag_id=NBA_TAG_ID, page_size=1000, max_events=1000):
+        pages.append(page)
+    return pages[0]
+
+
+def _measure_ingest(upstreams, name, ingest):
+    """Latency without tracemalloc (it slows small allocations a lot), then peak memory."""
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            url = f"{gamma.url}/events"
+            await ingest(url) # warm-up
+            durations = []
+            for _ in range(ITERATIONS):
+                t0 = time.perf_counter()
+                events = await ingest(url)
+                durations.append(time.perf_counter() - t0)
+                assert len(events) == 1000
+
+            tracemalloc.start()
+            try:
+                events = await ingest(url)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            return record(name, durations, events=len(events), peak_kb=round(peak / 1024))
+
+    return run(main())
+
+
+def bench_gamma_ingest_json(upstreams):
+    _measure_ingest(upstreams, "gamma_ingest_json", _ingest_json)
+
+
+def bench_gamma_ingest_stream(upstreams):
+    result = _measure_ingest(upstreams, "gamma_ingest_stream", _ingest_stream)
+    assert result["peak_kb"] > 0
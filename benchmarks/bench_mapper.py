@@ -0,0 +1,80 @@
+"""
+Single-event /setup_arb: the pick (PolySelect) fetching both events exactly, vs
+the old search_events(slug) lookup that scanned every Gamma page.
+"""
+from benchmarks.conftest import FakeInteraction, run
+from managers import arb_registry, polymarket_manager
+from managers.mapping_logic import mapping_pairs
+
+SERIES = "KXNBAGAME"
+
+
+def _select(cog_module, catalog, k_ticker, event_index=0):
+    gamma_event = catalog["gamma_events"][event_index]
+    view = cog_module.PolySelectionView([gamma_event], k_ticker, cog_module.parse_kalshi_ticker(k_ticker))
+    select = view.children[0]
+    select._values = [gamma_event["slug"]] # what discord sets from the interaction
+    return select
+
+
+def _assert_mapped(registry, catalog, event_index=0):
+    k_event = catalog["kalshi_events"][SERIES][event_index]
+    block = registry.event(k_event["event_ticker"])
+    assert block is not None, k_event["event_ticker"]
+    tickers = {m["ticker"] for m in catalog["kalshi_markets"][k_event["event_ticker"]]}
+    pairs = mapping_pairs(block)
+    assert len(pairs) == 4 and {t for t, _, _ in pairs} == tickers
+
+
+def bench_setup_arb_select(upstreams, bench, tmp_path, monkeypatch, catalog):
+    """The select callback end to end: one Kalshi and one Gamma request, real tickers and outcomes."""
+    from cogs import mapper
+
+    registry = arb_registry.MappingRegistry(str(tmp_path / "arb_mappings.json"))
+    monkeypatch.setattr(arb_registry, "_registry", registry)
+    event_ticker = catalog["kalshi_events"][SERIES][0]["event_ticker"]
+    market_ticker = catalog["kalshi_markets"][event_ticker][0]["ticker"]
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            b = bench(kalshi=kalshi, gamma=gamma)
+
+            async def once():
+                interaction = FakeInteraction()
+                await _select(mapper, catalog, event_ticker).callback(interaction)
+                assert interaction.followups[-1][0][0].startswith("✅"), interaction.followups
+
+            result = await b.run(once)
+
+            # A market ticker resolves to its event (one extra Kalshi request)
+            kalshi.reset_counters()
+            interaction = FakeInteraction()
+            await _select(mapper, catalog, market_ticker).callback(interaction)
+            assert interaction.followups[-1][0][0].startswith("✅"), interaction.followups
+            return result, kalshi.total_requests
+
+    result, market_ticker_requests = run(main())
+    assert result["upstream_requests_per_iter"] == {"kalshi": 1.0, "gamma": 1.0}
+    assert market_ticker_requests == 2
+    _assert_mapped(registry, catalog)
+
+
+def bench_search_by_slug(upstreams, bench, catalog):
+    """Baseline: the old search_events(slug) re-fetch (every page of the scan, matched on titles)."""
+    slug = catalog["gamma_events"][0]["slug"]
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            b = bench(gamma=gamma)
+            found = []
+
+            async def once():
+                found.append(len(await polymarket_manager.search_events(slug)))
+
+            result = await b.run(once)
+            return result, found
+
+    result, found = run(main())
+    # Slugs never appear in titles: the old path fetched everything and found nothing
+    assert set(found) == {0}
+    assert result["upstream_requests_per_iter"]["gamma"] > 1
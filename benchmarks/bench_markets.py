@@ -0,0 +1,74 @@
+"""
+Manager-level benchmarks: Kalshi slate fetch, Polymarket matching, and Kalshi
+book refreshes applied to the cached books as deltas.
+"""
+import time
+
+from benchmarks.conftest import record, run
+from managers import market_manager, metrics, orderbook_manager, polymarket_manager
+
+
+def bench_get_games_with_odds(upstreams, bench, catalog):
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            b = bench(kalshi=kalshi, gamma=gamma)
+
+            async def once():
+                games = await market_manager.get_games_with_odds("KXNBAGAME")
+                assert isinstance(games, list) and len(games) == len(catalog["kalshi_events"]["KXNBAGAME"])
+
+            return await b.run(once)
+
+    result = run(main())
+    # One /events call plus one /markets call per event
+    assert result["upstream_requests_per_iter"]["kalshi"] == 1 + len(catalog["kalshi_events"]["KXNBAGAME"])
+
+
+def bench_find_polymarket_match(upstreams, bench, catalog):
+    titles = [e["title"] for e in catalog["kalshi_events"]["KXNBAGAME"][:5]]
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            b = bench(kalshi=kalshi, gamma=gamma)
+
+            async def once():
+                for t in titles:
+                    match = await polymarket_manager.find_polymarket_match(t, sport="NBA")
+                    assert match is not None, t
+
+            return await b.run(once, matches_per_iter=len(titles))
+
+    run(main())
+
+
+def bench_kalshi_book_deltas(upstreams, catalog):
+    """Re-polling expired books: the cached DepthBook objects are updated in place, only moved levels change."""
+    tickers = [m["ticker"] for ms in list(catalog["kalshi_markets"].values())[:5] for m in ms]
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            orderbook_manager.KALSHI_BOOKS.invalidate()
+            metrics.reset()
+            first = await orderbook_manager.get_kalshi_books(tickers)
+            # Expire the cache and move one market's YES bid up a cent
+            for key in list(orderbook_manager.KALSHI_BOOKS._data):
+                stamp, book = orderbook_manager.KALSHI_BOOKS._data[key]
+                orderbook_manager.KALSHI_BOOKS._data[key] = (stamp - orderbook_manager.BOOK_TTL - 1, book)
+            moved = kalshi._markets_by_ticker[tickers[0]]
+            moved["yes_bid"] += 1
+            try:
+                t0 = time.perf_counter()
+                second = await orderbook_manager.get_kalshi_books(tickers)
+                elapsed = time.perf_counter() - t0
+            finally:
+                moved["yes_bid"] -= 1
+            return first, second, elapsed
+
+    first, second, elapsed = run(main())
+    assert all(second[t] is first[t] for t in tickers)
+    outcomes = {l["outcome"]: v for l, v in metrics.counters("kalshi_book_refreshes_total")}
+    changed = sum(v for _, v in metrics.counters("kalshi_book_levels_changed_total"))
+    assert outcomes == {"new": len(tickers), "changed": 1, "unchanged": len(tickers) - 1}, outcomes
+    # The 5 bid levels shift up a cent: a new top level, a dropped bottom one and 4 resized
+    assert changed == 6, changed
+    record("kalshi_book_deltas", [elapsed], books=len(tickers), levels_changed=changed, **outcomes)
@@ -0,0 +1,64 @@
+"""Slate-matching throughput: in-loop scoring vs MatchExecutor at several worker counts."""
+import os
+import time
+
+from benchmarks.conftest import record, run
+from benchmarks.stubs import build_catalog
+
+SLATE_GAMES = int(os.getenv("BENCH_SLATE_GAMES", "100"))
+SLATE_CATALOG = int(os.getenv("BENCH_SLATE_CATALOG", "1000"))
+SLATE_RUNS = int(os.getenv("BENCH_SLATE_RUNS", "2"))
+
+
+def _slate():
+    catalog = build_catalog(n_games=SLATE_GAMES, n_filler=SLATE_CATALOG - SLATE_GAMES)
+    targets = [(e["title"], "NBA") for e in catalog["kalshi_events"]["KXNBAGAME"]]
+    return targets, catalog["gamma_events"]
+
+
+def bench_match_slate_in_loop():
+    """Baseline: what running utils.find_best_match per target on the event loop costs."""
+    from managers.polymarket_manager import normalize_kalshi_title
+    from managers.utils import find_best_match
+
+    targets, catalog = _slate()
+    durations = []
+    for _ in range(SLATE_RUNS):
+        t0 = time.perf_counter()
+        for title, sport in targets:
+            _, _, match_title = normalize_kalshi_title(title, sport)
+            find_best_match(match_title, catalog, threshold=0.4)
+        durations.append(time.perf_counter() - t0)
+    record("match_slate_in_loop", durations, targets=len(targets), catalog=len(catalog))
+
+
+def bench_match_slate_pool():
+    from managers.match_pool import MatchExecutor
+
+    targets, catalog = _slate()
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cpus})
+
+    async def main(workers):
+        executor = await MatchExecutor(catalog, workers=workers).start()
+        try:
+            durations = []
+            for _ in range(SLATE_RUNS):
+                t0 = time.perf_counter()
+                ranked = await executor.rank(targets)
+                durations.append(time.perf_counter() - t0)
+            # Every synthetic game has its exact Gamma counterpart
+            assert all(r and r[0][1] > 0.9 for r in ranked)
+            return durations
+        finally:
+            executor.close()
+
+    for workers in worker_counts:
+        record(
+            f"match_slate_pool_{workers}w",
+            run(main(workers)),
+            workers=workers,
+            cpus=cpus,
+            targets=len(targets),
+            catalog=len(catalog),
+        )
@@ -0,0 +1,162 @@
+"""
+P&L engine: incremental fill ingest (order_monitor's 5-fill window), !pnl
+latency over a large history, the cost of a catch-up sync once current,
+recovering a gap larger than the window, and a backfill longer than one
+sync() call resuming where it stopped.
+"""
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.conftest import ITERATIONS, FakeContext, record, run
+from managers import pnl_manager, quote_store
+
+FILLS = int(os.getenv("BENCH_PNL_FILLS", "20000"))
+TICKERS = 300
+DAYS = 60
+WINDOW = 5
+
+
+def _history():
+    """FILLS fills spread over DAYS days, oldest first, mixing sides and actions."""
+    rng = random.Random(11)
+    start = datetime.now(timezone.utc) - timedelta(days=DAYS)
+    step = timedelta(days=DAYS) / FILLS
+    return [
+        {
+            "trade_id": f"t{i}",
+            "ticker": f"KXBENCH-{i % TICKERS}",
+            "side": rng.choice(("yes", "no")),
+            "action": rng.choice(("buy", "buy", "sell")),
+            "count": rng.randrange(1, 50),
+            "yes_price": rng.randrange(5, 95),
+            "created_time": (start + i * step).isoformat(),
+        }
+        for i in range(FILLS)
+    ]
+
+
+def bench_pnl_ingest(tmp_path, monkeypatch):
+    import bot
+
+    engine = pnl_manager.PnLEngine(state_file=str(tmp_path / "pnl_state.json"))
+    monkeypatch.setattr(pnl_manager, "_engine", engine)
+    fills = _history()
+
+    # order_monitor hands over the newest few fills each tick (newest first, overlapping)
+    per_fill = []
+    for end in range(WINDOW, FILLS + 1, WINDOW):
+        window = fills[max(0, end - 2 * WINDOW):end][::-1]
+        t0 = time.perf_counter()
+        applied = engine.ingest(window)
+        per_fill.append((time.perf_counter() - t0) / max(applied, 1))
+        assert applied == WINDOW
+    assert engine.fills_total == FILLS
+
+    # Replaying history must not double count
+    assert engine.ingest(fills) == 0
+
+    record("pnl_ingest_per_fill", per_fill, fills=FILLS, tickers=TICKERS,
+           state_kb=round(os.path.getsize(engine.state_file) / 1024, 1))
+
+    for ticker in engine.open_positions():
+        quote_store.record_quote("kalshi", ticker, bid=48, ask=52)
+    engine.synced_once = True
+
+    async def main():
+        results = {}
+        for period in pnl_manager.PERIODS:
+            durations = []
+            for _ in range(ITERATIONS):
+                ctx = FakeContext()
+                t0 = time.perf_counter()
+                await bot.pnl(ctx, period)
+                durations.append(time.perf_counter() - t0)
+                embed = ctx.sent[-1][1].get("embed")
+                assert embed is not None and len(embed.fields) == 2
+            results[period] = record(f"pnl_command_{period}", durations, fills=FILLS,
+                                     open_positions=len(engine.open_positions()))
+        return results
+
+    run(main())
+
+
+def bench_pnl_sync(upstreams, bench, tmp_path, monkeypatch):
+    """Backfill once from the stub, then a catch-up sync per iteration (nothing new)."""
+    engine = pnl_manager.PnLEngine(state_file=str(tmp_path / "pnl_state.json"))
+    monkeypatch.setattr(pnl_manager, "_engine", engine)
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            assert await engine.sync() == 50
+            b = bench(kalshi=kalshi)
+
+            async def once():
+                assert await engine.sync() == 0
+
+            return await b.run(once)
+
+    result = run(main())
+    assert result["upstream_requests_per_iter"]["kalshi"] == 1
+
+
+def bench_pnl_gap(upstreams, catalog, tmp_path, monkeypatch):
+    """8 fills land between two monitor ticks (window of 5): the catch-up sync recovers all of them."""
+    engine = pnl_manager.PnLEngine(state_file=str(tmp_path / "pnl_state.json"))
+    monkeypatch.setattr(pnl_manager, "_engine", engine)
+    history = catalog["fills"] # newest first
+    gap = 8
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            catalog["fills"] = history[gap:]
+            assert await engine.sync() == len(history) - gap
+            cursor = engine.cursor_ts
+
+            # A failed catch-up changes nothing and leaves the window for the next tick
+            catalog["fills"] = history
+            kalshi.fail_status = 503
+            assert await engine.ingest_recent(history[:WINDOW]) == 0
+            assert engine.cursor_ts == cursor
+            # ...and the next tick backs off instead of fetching again
+            kalshi.reset_counters()
+            assert await engine.ingest_recent(history[:WINDOW]) == 0
+            assert kalshi.total_requests == 0
+
+            kalshi.fail_status = None
+            engine.retry_at = 0.0 # backoff elapsed
+            t0 = time.perf_counter()
+            applied = await engine.ingest_recent(history[:WINDOW])
+            elapsed = time.perf_counter() - t0
+            assert applied == gap, applied
+            assert engine.fills_total == len(history)
+            record("pnl_gap_catch_up", [elapsed], gap=gap, window=WINDOW)
+
+    run(main())
+
+
+def bench_pnl_backfill_resume(upstreams, catalog, tmp_path, monkeypatch):
+    """
+    A history longer than one sync() may fetch (here 50 fills, 10 per page, 2
+    pages per call): each call continues from the saved paging cursor, even
+    across a restart, and no page is fetched twice.
+    """
+    monkeypatch.setattr(pnl_manager, "SYNC_PAGE_SIZE", 10)
+    state_file = str(tmp_path / "pnl_state.json")
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            results, durations = [], []
+            for _ in range(3):
+                engine = pnl_manager.PnLEngine(state_file=state_file) # reloaded from disk each call
+                t0 = time.perf_counter()
+                results.append(await engine.sync(max_pages=2))
+                durations.append(time.perf_counter() - t0)
+            return results, durations, kalshi.total_requests, engine
+
+    results, durations, requests, engine = run(main())
+    assert results == [None, None, len(catalog["fills"])], results
+    assert requests == 5, requests
+    assert engine.synced_once and engine.pending is None
+    record("pnl_backfill_resume", durations, fills=len(catalog["fills"]), requests=requests, calls=len(results))
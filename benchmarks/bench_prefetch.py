@@ -0,0 +1,111 @@
+"""
+Menu prefetch: latency of the final !search click (market type) after walking
+the menu with realistic pauses, with and without prefetch, plus the budget and
+cancellation behaviour of a large category.
+"""
+import asyncio
+import time
+
+import views
+from benchmarks.conftest import ITERATIONS, FakeInteraction, record, run
+from benchmarks.bench_views import _assert_rendered, _clear_caches
+from managers import metrics, prefetch
+
+THINK = 0.15 # seconds between clicks (real users take longer)
+SUB_MAP = {
+    "NBA": {"moneyline": "KXNBAGAME", "spread": "KXNBASPREAD", "total": "KXNBATOTAL"},
+    "WNBA": {"moneyline": "KXWNBAGAME", "spread": "KXWNBASPREAD", "total": "KXWNBATOTAL"},
+}
+
+
+async def _walk(league="NBA", market_type="moneyline"):
+    """Clicks category -> league -> market type. Returns the final click's duration."""
+    category = views.SportsCategoryView({"Basketball": SUB_MAP}).children[0]
+    await category.callback(FakeInteraction())
+    await asyncio.sleep(THINK)
+
+    series = views.SeriesSelectionView("Basketball", SUB_MAP, owner=FakeInteraction().user.id)
+    button = next(b for b in series.children if b.label == league)
+    await button.callback(FakeInteraction())
+    await asyncio.sleep(THINK)
+
+    market_view = views.MarketTypeView(SUB_MAP[league], league, owner=FakeInteraction().user.id)
+    final = next(b for b in market_view.children if b.market_type == market_type)
+    interaction = FakeInteraction()
+    t0 = time.perf_counter()
+    await final.callback(interaction)
+    elapsed = time.perf_counter() - t0
+    _assert_rendered(interaction)
+    return elapsed
+
+
+def _menu_bench(upstreams, monkeypatch, name, prefetcher):
+    monkeypatch.setattr(prefetch, "_prefetcher", prefetcher)
+    metrics.reset()
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            _clear_caches()
+            await _walk() # warm-up (connections, keys)
+            for s in (kalshi, gamma, clob):
+                s.reset_counters()
+            durations = []
+            for _ in range(ITERATIONS):
+                _clear_caches()
+                durations.append(await _walk())
+            return durations, {k: round(s.total_requests / ITERATIONS, 2)
+                               for k, s in (("kalshi", kalshi), ("gamma", gamma), ("clob", clob))}
+
+    durations, requests = run(main())
+    rates = prefetch.rates()
+    return record(name, durations, upstream_requests_per_iter=requests,
+                  prefetch_hits=rates["hit"], prefetch_misses=rates["miss"],
+                  prefetch_wasted=rates["wasted"], prefetch_cancelled=rates["cancelled"])
+
+
+def bench_menu_final_click(upstreams, monkeypatch):
+    off = _menu_bench(upstreams, monkeypatch, "menu_final_click_no_prefetch", prefetch.Prefetcher(max_series=0))
+    on = _menu_bench(upstreams, monkeypatch, "menu_final_click_prefetch", prefetch.Prefetcher())
+    assert off["prefetch_hits"] == 0
+    # Every final click found its snapshot warm and the click itself got faster
+    assert on["prefetch_hits"] == ITERATIONS + 1
+    assert on["p50_ms"] < off["p50_ms"]
+
+
+def bench_prefetch_budget():
+    """A category with 6 leagues: the plan is capped, warms are throttled, narrowing cancels."""
+    sub_map = {f"L{i}": {"moneyline": f"KXL{i}GAME", "spread": f"KXL{i}SPREAD", "total": f"KXL{i}TOTAL"}
+               for i in range(6)}
+    warm_time = 0.02
+
+    async def main():
+        state = {"now": 0, "peak": 0, "done": 0}
+
+        async def warm(series_ticker, sport, market_type):
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+            try:
+                await asyncio.sleep(warm_time)
+            finally:
+                state["now"] -= 1
+            state["done"] += 1
+            return True
+
+        metrics.reset()
+        p = prefetch.Prefetcher(warm=warm, max_series=6, concurrency=2, ttl=60)
+        t0 = time.perf_counter()
+        started = p.plan(1, prefetch.category_targets(sub_map))
+        plan_time = time.perf_counter() - t0
+        await asyncio.sleep(warm_time * 1.5) # the first two are warming
+        p.plan(1, prefetch.series_targets(sub_map["L0"], "L0"))
+        await asyncio.sleep(warm_time * 4)
+        hit = p.consume(1, ("KXL0SPREAD", "L0", "spread"))
+        return started, plan_time, state, hit
+
+    started, plan_time, state, hit = run(main())
+    rates = prefetch.rates()
+    assert started == 6 and state["peak"] <= 2
+    assert hit and rates["cancelled"] >= 3
+    record("prefetch_plan", [plan_time], targets_offered=18, warms_started=started,
+           peak_concurrent_warms=state["peak"], warms_completed=state["done"],
+           cancelled=rates["cancelled"])
@@ -0,0 +1,86 @@
+"""
+Quote history store: cost of recording on the event loop, and mmapped
+time-range reads over a multi-day history.
+"""
+import os
+import time
+
+from benchmarks.conftest import ITERATIONS, record, run
+from managers.quote_store import QuoteRecorder, QuoteStore
+
+ROWS = int(os.getenv("BENCH_QUOTE_ROWS", "500000"))
+INSTRUMENTS = 200
+BASE_TS = 1_760_000_000_000_000 # microseconds
+STEP_US = 400_000 # ~2.3 days of history at the default row count
+
+
+def _fill(recorder, rows):
+    for i in range(rows):
+        venue = "kalshi" if i % 2 else "poly"
+        recorder.record(venue, f"I{i % INSTRUMENTS}", bid=40 + i % 20, ask=42 + i % 20,
+                        bid_size=10 + i % 50, ask_size=5 + i % 30, ts_us=BASE_TS + i * STEP_US)
+
+
+def bench_quote_record(tmp_path):
+    """Per-record cost on the loop, and how long flush() holds the loop (the write is off-loop)."""
+    async def main():
+        recorder = QuoteRecorder(str(tmp_path), flush_rows=10**9)
+        per_batch = []
+        flushes = []
+        batch = 1000
+        for b in range(ROWS // batch):
+            t0 = time.perf_counter()
+            for i in range(b * batch, (b + 1) * batch):
+                recorder.record("kalshi", f"I{i % INSTRUMENTS}", bid=45, ask=47, bid_size=10, ask_size=10,
+                                ts_us=BASE_TS + i * STEP_US)
+            per_batch.append((time.perf_counter() - t0) / batch)
+            if b % 50 == 49:
+                t0 = time.perf_counter()
+                recorder.flush()
+                flushes.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        await recorder.stop()
+        drain = time.perf_counter() - t0
+
+        record("quote_flush_on_loop", flushes)
+        return record(
+            "quote_record", per_batch,
+            rows=ROWS, rows_written=recorder.rows_written,
+            records_per_sec=round(1 / (sum(per_batch) / len(per_batch))),
+            final_drain_ms=round(drain * 1000, 3),
+        )
+
+    result = run(main())
+    assert result["rows_written"] == ROWS
+
+
+def bench_quote_query(tmp_path):
+    """One-hour windows (count + per-instrument scan) across day partitions."""
+    async def main():
+        recorder = QuoteRecorder(str(tmp_path))
+        _fill(recorder, ROWS)
+        await recorder.stop()
+
+    run(main())
+
+    hour = 3_600_000_000
+    span = ROWS * STEP_US
+    durations_count, durations_scan = [], []
+    with QuoteStore(str(tmp_path)) as store:
+        days = store.days()
+        for k in range(ITERATIONS):
+            start = BASE_TS + (k * span // ITERATIONS)
+
+            t0 = time.perf_counter()
+            n = sum(len(s) for s in store.query(start, start + hour))
+            durations_count.append(time.perf_counter() - t0)
+            assert n == hour // STEP_US or start + hour > BASE_TS + span
+
+            t0 = time.perf_counter()
+            rows = list(store.iter_rows(start, start + hour, instruments=["kalshi:I1"]))
+            durations_scan.append(time.perf_counter() - t0)
+            assert rows
+
+    record("quote_query_hour_count", durations_count, rows=ROWS, partitions=len(days))
+    record("quote_query_hour_scan_one", durations_scan, rows=ROWS, partitions=len(days))
+    assert len(days) >= 2
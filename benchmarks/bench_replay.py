@@ -0,0 +1,84 @@
+"""Replay engine throughput (rows/second) over a synthetic quote history."""
+import asyncio
+import json
+import os
+import random
+import time
+
+from benchmarks.conftest import record
+from managers import replay
+from managers.mapping_logic import mapping_pairs
+from managers.quote_store import QuoteRecorder, QuoteStore
+
+ROWS = int(os.getenv("BENCH_REPLAY_ROWS", "500000"))
+GAMES = 40
+NOISE_INSTRUMENTS = 400 # recorded but not part of any pair
+BASE_TS = 1_760_000_000_000_000
+STEP_US = 250_000
+
+
+def _write_history(root):
+    """
+    Quotes for GAMES games (Kalshi YES books for both teams, both Poly tokens) plus unrelated
+    instruments. Venues quote a shared random walk with independent noise, so pair costs
+    hover around 100¢ and arb windows open and close.
+    Returns the mapping dict (NEW_PAIR style).
+    """
+    rng = random.Random(7)
+    mapping = {}
+    instruments = [] # (venue, name, game, flips) - flips: quotes 100 - p instead of p
+    for g in range(GAMES):
+        a, b = f"KXNBAGAME-G{g}-A", f"KXNBAGAME-G{g}-B"
+        ta, tb = str(10_000 + 2 * g), str(10_001 + 2 * g)
+        mapping.update({f"{a}-yes": tb, f"{a}-no": ta, f"{b}-yes": ta, f"{b}-no": tb})
+        instruments += [("kalshi", a, g, False), ("kalshi", b, g, True), ("poly", ta, g, False), ("poly", tb, g, True)]
+    # One latent win probability per game; each venue quotes around it with its own noise
+    latent = [rng.uniform(30, 70) for _ in range(GAMES)]
+
+    async def main():
+        recorder = QuoteRecorder(root)
+        for i in range(ROWS):
+            if i % 4 == 0:
+                recorder.record("kalshi", f"NOISE-{i % NOISE_INSTRUMENTS}", bid=50, ask=52, bid_size=10, ask_size=10,
+                                ts_us=BASE_TS + i * STEP_US)
+                continue
+            venue, name, g, flips = instruments[rng.randrange(len(instruments))]
+            latent[g] = min(95.0, max(5.0, latent[g] + rng.uniform(-0.5, 0.5)))
+            mid = (100 - latent[g] if flips else latent[g]) + rng.uniform(-2.0, 2.0)
+            half = rng.choice((0.5, 1.0, 1.5))
+            recorder.record(venue, name, bid=round(mid - half, 1), ask=round(mid + half, 1),
+                            bid_size=rng.randrange(1, 500), ask_size=rng.randrange(1, 500),
+                            ts_us=BASE_TS + i * STEP_US)
+        await recorder.stop()
+
+    asyncio.run(main())
+    return mapping
+
+
+def bench_replay_throughput(tmp_path):
+    root = str(tmp_path / "history")
+    mapping = _write_history(root)
+    pairs = mapping_pairs(mapping)
+
+    durations = []
+    report = None
+    with QuoteStore(root) as store:
+        for _ in range(3):
+            engine = replay.ReplayEngine(store, pairs, min_edge=0.5, min_size=10)
+            t0 = time.perf_counter()
+            report = engine.run()
+            durations.append(time.perf_counter() - t0)
+
+    summary = replay.summarize(report)
+    assert report["rows"] == ROWS and summary["opportunities"] > 0
+    record(
+        "replay_throughput", durations,
+        rows=ROWS, pairs=len(pairs),
+        events_per_sec=round(ROWS / min(durations)),
+        opportunities=summary["opportunities"],
+    )
+
+    # CLI end to end on the same data
+    mapping_path = tmp_path / "arb_mappings.json"
+    mapping_path.write_text(json.dumps({"bench": mapping}))
+    assert replay.main(["--history", root, "--mapping", str(mapping_path), "--min-edge", "0.5", "--top", "3"]) == 0
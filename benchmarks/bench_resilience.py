@@ -0,0 +1,119 @@
+"""
+Serving !search results when an upstream misbehaves: a slow Gamma answered
+within the deadline from the last good snapshot (vs waiting for fresh data),
+and a Kalshi outage failed fast by its circuit breaker, then probed and closed.
+"""
+import asyncio
+import statistics
+import time
+
+from benchmarks.conftest import FakeInteraction, record, run
+from benchmarks.bench_views import _assert_rendered, _clear_caches
+from managers import breaker, config, metrics
+
+ARGS = ("KXNBAGAME", "NBA", "moneyline")
+DEADLINE = 0.2
+SLOW_GAMMA = 0.5 # seconds per Gamma request
+ITERATIONS = 5
+
+
+class TimedInteraction(FakeInteraction):
+    """Records when each edit landed (seconds after t0)."""
+
+    def __init__(self):
+        super().__init__()
+        self.t0 = time.perf_counter()
+        self.at = []
+
+    async def edit_original_response(self, **kwargs):
+        self.at.append(time.perf_counter() - self.t0)
+        await super().edit_original_response(**kwargs)
+
+
+def _is_stale(edit):
+    embed = edit.get("embed")
+    return embed is not None and (embed.description or "").startswith("⚠️ **Stale:**")
+
+
+def bench_serve_stale_slow_gamma(upstreams, monkeypatch):
+    """Gamma slowed to SLOW_GAMMA per request: first paint (stale) vs the fresh render after it."""
+    import views
+
+    monkeypatch.setattr(config, "SERVE_DEADLINE", DEADLINE)
+
+    async def main():
+        _clear_caches()
+        async with upstreams() as (kalshi, gamma, clob):
+            primer = FakeInteraction()
+            await views.show_results(primer, *ARGS) # last good snapshot
+            _assert_rendered(primer)
+
+            gamma.latency = SLOW_GAMMA
+            metrics.reset()
+            first, fresh = [], []
+            for _ in range(ITERATIONS):
+                _clear_caches()
+                interaction = TimedInteraction()
+                await views.show_results(interaction, *ARGS)
+                assert _is_stale(interaction.edits[0]), interaction.edits[0]
+                assert not _is_stale(interaction.edits[-1])
+                _assert_rendered(interaction)
+                first.append(interaction.at[0])
+                fresh.append(interaction.at[-1])
+
+            assert max(first) < DEADLINE + 0.15, first
+            record("serve_stale_slow_gamma", first,
+                   deadline_ms=DEADLINE * 1000,
+                   fresh_render_p50_ms=round(statistics.median(fresh) * 1000, 3),
+                   served={l["outcome"]: v for l, v in metrics.counters("snapshot_serve_total")})
+
+    run(main())
+
+
+def bench_breaker_kalshi_outage(upstreams, monkeypatch):
+    """Kalshi answers 503: the breaker opens after BREAKER_FAILURES, later clicks cost no Kalshi requests."""
+    import views
+
+    clicks = 20
+
+    async def main():
+        _clear_caches()
+        async with upstreams() as (kalshi, gamma, clob):
+            primer = FakeInteraction()
+            await views.show_results(primer, *ARGS)
+
+            kalshi.fail_status = 503
+            kalshi.reset_counters()
+            metrics.reset()
+            durations = []
+            for _ in range(clicks):
+                _clear_caches()
+                interaction = FakeInteraction()
+                t0 = time.perf_counter()
+                await views.show_results(interaction, *ARGS)
+                durations.append(time.perf_counter() - t0)
+                assert _is_stale(interaction.edits[-1]), interaction.edits[-1]
+
+            b = breaker.get(kalshi.url.split("//")[1])
+            assert b.state == breaker.OPEN
+            assert kalshi.total_requests == config.BREAKER_FAILURES, kalshi.requests
+            outage_requests = kalshi.total_requests
+
+            # Venue back, cooldown over: one probe closes the breaker
+            kalshi.fail_status = None
+            b.cooldown = 0.05
+            await asyncio.sleep(0.06)
+            _clear_caches()
+            interaction = FakeInteraction()
+            await views.show_results(interaction, *ARGS)
+            assert b.state == breaker.CLOSED
+            _assert_rendered(interaction)
+            assert not _is_stale(interaction.edits[-1])
+
+            record("breaker_kalshi_outage", durations,
+                   clicks=clicks,
+                   kalshi_requests_during_outage=outage_requests,
+                   rejected=sum(v for _, v in metrics.counters("circuit_rejected_total")),
+                   trips=sum(v for _, v in metrics.counters("circuit_trips_total")))
+
+    run(main())
@@ -0,0 +1,162 @@
+"""
+A user's !search click while a background sweep has Kalshi's budget full:
+with priority classes (the click's requests skip the queued sweep) vs one FIFO
+queue (the click waits behind it), a click joining a prefetch's in-flight
+load (raised to the click's class vs left at prefetch priority), plus the
+shared rate budget holding under a mix of classes.
+"""
+import asyncio
+import statistics
+import time
+
+from benchmarks.conftest import FakeInteraction, record, run
+from benchmarks.bench_views import _assert_rendered, _clear_caches
+from managers import metrics, scheduler
+from managers.http_client import client_session, upstream_name
+
+ARGS = ("KXNBAGAME", "NBA", "moneyline")
+SWEEP = 160 # background requests queued ahead of the click
+CONCURRENCY = 8
+RESERVED = 2
+ITERATIONS = 5
+
+
+def _install(stub, rate=0):
+    """A scheduler with a small budget for the stub's upstream."""
+    from yarl import URL
+    name = upstream_name(URL(stub.url))
+    s = scheduler.UpstreamScheduler(name, rate=rate, concurrency=CONCURRENCY, reserved=RESERVED)
+    scheduler._schedulers[name] = s
+    return s
+
+
+async def _sweep(session, kalshi, n, cls):
+    async def one():
+        with scheduler.priority(cls):
+            async with session.get(f"{kalshi.url}/trade-api/v2/exchange/status") as resp:
+                await resp.read()
+    return asyncio.gather(*(one() for _ in range(n)))
+
+
+def _click_under_sweep(upstreams, click_priority, sweep_size=SWEEP):
+    """Durations of a cold show_results started right after sweep_size refresh requests were queued."""
+    import views
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            kalshi.latency = 0.05
+            sched = _install(kalshi)
+            durations, depths = [], []
+            async with client_session() as session:
+                for _ in range(ITERATIONS):
+                    _clear_caches()
+                    sweep = asyncio.ensure_future(await _sweep(session, kalshi, sweep_size, scheduler.REFRESH))
+                    await asyncio.sleep(0) # let the sweep queue up
+                    depths.append(sched.queued()[scheduler.REFRESH])
+                    interaction = FakeInteraction()
+                    t0 = time.perf_counter()
+                    with scheduler.priority(click_priority):
+                        await views.show_results(interaction, *ARGS)
+                    durations.append(time.perf_counter() - t0)
+                    _assert_rendered(interaction)
+                    await sweep
+            return durations, depths
+
+    return run(main())
+
+
+def bench_click_no_sweep(upstreams):
+    """Baseline: the same cold click (50ms Kalshi latency) with nothing else queued."""
+    durations, _ = _click_under_sweep(upstreams, scheduler.INTERACTIVE, sweep_size=0)
+    record("click_no_sweep", durations)
+
+
+def bench_click_under_sweep_prioritized(upstreams):
+    metrics.reset()
+    durations, depths = _click_under_sweep(upstreams, scheduler.INTERACTIVE)
+    waits = {l["priority"]: round(h.mean, 1) for l, h in metrics.histograms("scheduler_wait_ms")}
+    record("click_under_sweep_prioritized", durations,
+           refresh_queued_at_click=statistics.median(depths),
+           mean_wait_ms=waits,
+           preempted=sum(v for _, v in metrics.counters("scheduler_preempted_total")))
+
+
+def bench_click_under_sweep_fifo(upstreams):
+    """Same click in the sweep's class: what every request got before priorities."""
+    metrics.reset()
+    durations, depths = _click_under_sweep(upstreams, scheduler.REFRESH)
+    record("click_under_sweep_fifo", durations, refresh_queued_at_click=statistics.median(depths))
+
+
+def _click_joining_prefetch(upstreams, monkeypatch, promote):
+    """A cold click that joins a prefetch warm of the same snapshot while a sweep is queued."""
+    import views
+    from managers import market_data
+
+    if not promote:
+        monkeypatch.setattr(scheduler, "join", lambda share: None) # joiners keep the starter's class
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            kalshi.latency = 0.05
+            _install(kalshi)
+            durations = []
+            async with client_session() as session:
+                for _ in range(ITERATIONS):
+                    _clear_caches()
+                    sweep = asyncio.ensure_future(await _sweep(session, kalshi, SWEEP, scheduler.REFRESH))
+                    with scheduler.priority(scheduler.PREFETCH):
+                        prefetch = asyncio.ensure_future(market_data.warm(*ARGS))
+                    await asyncio.sleep(0.01) # the warm's first requests are queued behind the sweep
+                    interaction = FakeInteraction()
+                    t0 = time.perf_counter()
+                    with scheduler.priority(scheduler.INTERACTIVE):
+                        await views.show_results(interaction, *ARGS)
+                    durations.append(time.perf_counter() - t0)
+                    _assert_rendered(interaction)
+                    await asyncio.gather(sweep, prefetch)
+            return durations
+
+    return run(main())
+
+
+def bench_click_joins_prefetch_promoted(upstreams, monkeypatch):
+    durations = _click_joining_prefetch(upstreams, monkeypatch, promote=True)
+    record("click_joins_prefetch_promoted", durations)
+
+
+def bench_click_joins_prefetch_unpromoted(upstreams, monkeypatch):
+    """The same click when a shared load keeps the prefetch's class (before promotion)."""
+    durations = _click_joining_prefetch(upstreams, monkeypatch, promote=False)
+    record("click_joins_prefetch_unpromoted", durations)
+
+
+def bench_rate_budget(upstreams):
+    """200 requests across all four classes against a 100 req/s budget: achieved rate and finish order."""
+    rate, n = 100, 200
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            _install(kalshi, rate=rate)
+            finished = {cls: [] for cls in scheduler.PRIORITIES}
+            async with client_session() as session:
+                async def one(cls):
+                    with scheduler.priority(cls):
+                        async with session.get(f"{kalshi.url}/trade-api/v2/exchange/status") as resp:
+                            await resp.read()
+                    finished[cls].append(time.perf_counter() - t0)
+
+                t0 = time.perf_counter()
+                # Lowest class queued first; the higher classes still finish first
+                await asyncio.gather(*(one(cls) for cls in reversed(scheduler.PRIORITIES) for _ in range(n // 4)))
+                elapsed = time.perf_counter() - t0
+
+            achieved = n / elapsed
+            # One second of burst, then the rate
+            assert achieved <= rate * 2, achieved
+            medians = [statistics.median(finished[cls]) for cls in scheduler.PRIORITIES]
+            assert medians == sorted(medians), medians
+            record("rate_budget", [elapsed], requests=n, budget_rps=rate, achieved_rps=round(achieved, 1),
+                   median_finish_ms={cls: round(m * 1000, 1) for cls, m in zip(scheduler.PRIORITIES, medians)})
+
+    run(main())
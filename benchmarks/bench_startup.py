@@ -0,0 +1,57 @@
+"""Startup benchmarks: cold import of bot.py and the slash-command sync gate."""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.conftest import ROOT, record, run
+
+STARTUP_RUNS = int(os.getenv("BENCH_STARTUP_RUNS", "5"))
+
+
+def bench_import_bot(tmp_path):
+    # Fresh interpreter each run; cwd without a .env so nothing is loaded from disk
+    code = (
+        "import time; t0 = time.perf_counter(); import bot; "
+        "print(time.perf_counter() - t0)"
+    )
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    durations = []
+    for _ in range(STARTUP_RUNS):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True, check=True
+        )
+        durations.append(float(out.stdout.strip().splitlines()[-1]))
+    record("import_bot", durations)
+
+
+def bench_tree_sync_gate(tmp_path, monkeypatch):
+    """Second setup with an unchanged command tree must not call tree.sync()."""
+    import bot
+    from managers import config
+
+    monkeypatch.setattr(config, "TREE_STATE_FILE", str(tmp_path / "tree.json"))
+    monkeypatch.setattr(bot.bot._connection, "application_id", 1234)
+    syncs = []
+
+    async def fake_sync(*args, **kwargs):
+        # Stand-in for the Discord round trip (rate limited in production)
+        await asyncio.sleep(0.2)
+        syncs.append(1)
+
+    monkeypatch.setattr(bot.bot.tree, "sync", fake_sync)
+
+    async def main():
+        if "cogs.mapper" not in bot.bot.extensions:
+            await bot.bot.load_extension("cogs.mapper")
+        durations = []
+        for _ in range(STARTUP_RUNS):
+            t0 = time.perf_counter()
+            await bot.sync_command_tree_if_changed(bot.bot)
+            durations.append(time.perf_counter() - t0)
+        return durations
+
+    durations = run(main())
+    assert len(syncs) == 1
+    record("tree_sync_gate", durations, syncs=len(syncs))
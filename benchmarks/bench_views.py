@@ -0,0 +1,87 @@
+"""End-to-end benchmark of the !search results screen."""
+from benchmarks.conftest import FakeInteraction, run
+
+
+def _assert_rendered(interaction):
+    embed = interaction.edits[-1].get("embed")
+    assert embed is not None and embed.fields, interaction.edits[-1]
+    assert "Kalshi x" in embed.fields[0].value # order book depth lines
+    assert "Poly x" in embed.fields[0].value
+
+
+def _clear_caches():
+    from managers import market_data, orderbook_manager
+    market_data.GAMES_CACHE.invalidate()
+    market_data.POLY_MATCH_CACHE.invalidate()
+    orderbook_manager.KALSHI_BOOKS.invalidate()
+    orderbook_manager.POLY_BOOKS.invalidate()
+
+
+def bench_show_results(upstreams, bench):
+    """Repeated clicks within the cache TTL (the common case)."""
+    import views
+
+    async def main():
+        _clear_caches()
+        async with upstreams() as (kalshi, gamma, clob):
+            b = bench(kalshi=kalshi, gamma=gamma, clob=clob)
+
+            async def once():
+                interaction = FakeInteraction()
+                await views.show_results(interaction, "KXNBAGAME", "NBA", "moneyline")
+                _assert_rendered(interaction)
+
+            return await b.run(once)
+
+    run(main())
+
+
+def bench_show_results_cold(upstreams, bench):
+    """Every click misses the caches and goes upstream."""
+    import views
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            b = bench(kalshi=kalshi, gamma=gamma, clob=clob)
+
+            async def setup():
+                _clear_caches()
+
+            async def once():
+                interaction = FakeInteraction()
+                await views.show_results(interaction, "KXNBAGAME", "NBA", "moneyline")
+                _assert_rendered(interaction)
+
+            return await b.run(once, setup=setup)
+
+    run(main())
+
+
+def bench_show_results_via_daemon(upstreams, bench, monkeypatch, tmp_path):
+    """Bot-side cost when snapshots come from the market data service over the Unix socket."""
+    import views
+    from managers import config, snapshot_service
+    from managers.snapshot_service import SnapshotServer
+
+    socket_path = str(tmp_path / "md.sock")
+    monkeypatch.setattr(config, "MARKET_DAEMON_SOCKET", socket_path)
+    monkeypatch.setattr(snapshot_service, "_client", None)
+
+    async def main():
+        _clear_caches()
+        async with upstreams() as (kalshi, gamma, clob):
+            server = await SnapshotServer(socket_path).start()
+            try:
+                b = bench(kalshi=kalshi, gamma=gamma, clob=clob)
+
+                async def once():
+                    interaction = FakeInteraction()
+                    await views.show_results(interaction, "KXNBAGAME", "NBA", "moneyline")
+                    _assert_rendered(interaction)
+
+                return await b.run(once)
+            finally:
+                await snapshot_service._client.close()
+                await server.stop()
+
+    run(main())
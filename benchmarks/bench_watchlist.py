@@ -0,0 +1,103 @@
+"""
+Watchlists: one upstream subscription per ticker however many users watch it,
+fan-out cost per quote update and index memory as watchers grow, and !watch
+end to end against the stub.
+"""
+import time
+import tracemalloc
+
+from benchmarks.conftest import ITERATIONS, FakeContext, record, run
+from managers import watchlist
+from managers.quote_bus import QuoteBus
+
+WATCHERS = (10, 100, 1000, 10000)
+TICKER = "KXNFLGAME-BENCH-SEA"
+
+
+def _bus():
+    async def no_fetch(tickers):
+        return {}
+    return QuoteBus(fetch=no_fetch)
+
+
+def bench_watch_fanout(tmp_path):
+    async def main():
+        results = {}
+        for n in WATCHERS:
+            delivered = []
+
+            async def notify(user_ids, update):
+                # Stand-in for the DM loop: touch every watcher once
+                delivered.append(sum(1 for _ in user_ids))
+
+            bus = _bus()
+            tracemalloc.start()
+            index = watchlist.WatchIndex(str(tmp_path / f"w{n}.json"), bus=bus, notify=notify,
+                                         min_move=0, cooldown=0)
+            for u in range(n):
+                index._add(u, TICKER)
+            index_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            assert bus.refcount(TICKER) == 1 and bus.tickers() == [TICKER]
+
+            bus.publish(TICKER, 40, 42) # baseline
+            durations = []
+            for k in range(ITERATIONS):
+                price = 43 + k
+                t0 = time.perf_counter()
+                bus.publish(TICKER, price, price + 2)
+                for task in list(index._tasks):
+                    await task
+                durations.append(time.perf_counter() - t0)
+            assert delivered == [n] * ITERATIONS
+
+            results[n] = record(
+                f"watch_fanout_{n}", durations, watchers=n, upstream_subscriptions=len(bus.tickers()),
+                index_bytes_per_watcher=round(index_bytes / n, 1),
+            )
+        return results
+
+    results = run(main())
+    # Per-watcher memory stays flat as watchers grow (set growth steps aside)
+    per = [results[n]["index_bytes_per_watcher"] for n in WATCHERS[1:]]
+    assert max(per) < 4 * min(per)
+
+
+def bench_watch_persistence(tmp_path):
+    path = str(tmp_path / "watchlists.json")
+    index = watchlist.WatchIndex(path, bus=_bus())
+    for u in range(500):
+        for t in range(5):
+            assert index.watch(u, f"KXBENCH-{(u + t) % 50}") == "added"
+
+    durations = []
+    for _ in range(ITERATIONS):
+        t0 = time.perf_counter()
+        reloaded = watchlist.WatchIndex(path, bus=_bus())
+        durations.append(time.perf_counter() - t0)
+    assert reloaded.by_user == index.by_user and len(reloaded.by_ticker) == 50
+    record("watch_reload", durations, users=500, pairs=2500)
+
+
+def bench_watch_command(upstreams, bench, tmp_path, monkeypatch, catalog):
+    import bot
+
+    ticker = next(iter(catalog["kalshi_markets"].values()))[0]["ticker"]
+    index = watchlist.WatchIndex(str(tmp_path / "watchlists.json"), bus=_bus())
+    monkeypatch.setattr(watchlist, "_index", index)
+    monkeypatch.setattr(bot.quote_bus, "get_bus", lambda: index.bus)
+
+    async def main():
+        async with upstreams() as (kalshi, gamma, clob):
+            b = bench(kalshi=kalshi)
+
+            async def once():
+                ctx = FakeContext()
+                await bot.watch(ctx, ticker)
+                assert "Watching" in ctx.sent[-1][0][0]
+                await bot.unwatch(ctx, ticker)
+
+            return await b.run(once)
+
+    run(main())
+    assert not index.by_ticker and not index.bus.tickers()
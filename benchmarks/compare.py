@@ -0,0 +1,48 @@
+"""
+Compares two benchmark result files.
+
+Usage:
+    python -m benchmarks.compare bench_results/OLD.json bench_results/NEW.json
+"""
+import json
+import sys
+
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _delta(old, new):
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def compare(old, new):
+    rows = []
+    names = sorted(set(old["results"]) | set(new["results"]))
+    for name in names:
+        o = old["results"].get(name)
+        n = new["results"].get(name)
+        if not o or not n:
+            rows.append(f"{name:<28} {'(only in ' + ('new' if n else 'old') + ')':>40}")
+            continue
+        o_reqs = sum(o["upstream_requests_per_iter"].values())
+        n_reqs = sum(n["upstream_requests_per_iter"].values())
+        rows.append(
+            f"{name:<28} "
+            f"p50 {o['p50_ms']:>9.1f} -> {n['p50_ms']:>9.1f} ms ({_delta(o['p50_ms'], n['p50_ms']):>7})  "
+            f"p99 {o['p99_ms']:>9.1f} -> {n['p99_ms']:>9.1f} ms ({_delta(o['p99_ms'], n['p99_ms']):>7})  "
+            f"reqs {o_reqs:>6.1f} -> {n_reqs:>6.1f}"
+        )
+    return "\n".join(rows)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+    old, new = _load(sys.argv[1]), _load(sys.argv[2])
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    print(compare(old, new))
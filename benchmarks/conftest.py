@@ -0,0 +1,271 @@
+"""
+Shared fixtures for the benchmark suite.
+
+Knobs (environment variables):
+    BENCH_ITERATIONS  - timed iterations per benchmark (default 20)
+    BENCH_LATENCY_MS  - latency injected into every stub response (default 5)
+    BENCH_GAMES       - Kalshi games in the synthetic slate (default 15)
+    BENCH_FILLER      - extra non-matching Gamma events (default 200)
+    BENCH_OUTPUT      - results file (default bench_results/<git sha>.json)
+"""
+import asyncio
+import json
+import math
+import os
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from benchmarks.stubs import ClobStub, GammaStub, KalshiStub, build_catalog
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "20"))
+LATENCY = float(os.getenv("BENCH_LATENCY_MS", "5")) / 1000.0
+N_GAMES = int(os.getenv("BENCH_GAMES", "15"))
+N_FILLER = int(os.getenv("BENCH_FILLER", "200"))
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_RESULTS = {}
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile (samples need not be sorted)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def _git_sha():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _RESULTS:
+        return
+    output = os.getenv("BENCH_OUTPUT") or str(ROOT / "bench_results" / f"{_git_sha()}.json")
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "commit": _git_sha(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "iterations": ITERATIONS,
+            "latency_ms": LATENCY * 1000,
+            "games": N_GAMES,
+            "filler": N_FILLER,
+        },
+        "results": _RESULTS,
+    }
+    with open(output, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    print(f"\nBenchmark results written to {output}")
+
+
+def record(name, durations, **extra):
+    """Stores p50/p99/mean for a list of durations (seconds) under `name`."""
+    result = {
+        "iterations": len(durations),
+        "p50_ms": round(percentile(durations, 50) * 1000, 3),
+        "p99_ms": round(percentile(durations, 99) * 1000, 3),
+        "mean_ms": round(sum(durations) / len(durations) * 1000, 3),
+    }
+    result.update(extra)
+    _RESULTS[name] = result
+    return result
+
+
+class Bench:
+    """Times an async callable against the stub servers and records the result."""
+
+    def __init__(self, name, stubs):
+        self.name = name
+        self.stubs = stubs
+
+    async def run(self, fn, iterations=ITERATIONS, setup=None, **extra):
+        # One untimed warm-up pass (imports, key loading, first connection)
+        if setup:
+            await setup()
+        await fn()
+
+        for s in self.stubs.values():
+            s.reset_counters()
+
+        durations = []
+        for _ in range(iterations):
+            if setup:
+                await setup()
+            t0 = time.perf_counter()
+            await fn()
+            durations.append(time.perf_counter() - t0)
+
+        return record(
+            self.name,
+            durations,
+            upstream_requests_per_iter={
+                k: round(s.total_requests / iterations, 2) for k, s in self.stubs.items()
+            },
+            upstream_bytes_per_iter={
+                k: round(s.bytes_sent / iterations) for k, s in self.stubs.items()
+            },
+            **extra,
+        )
+
+
+@pytest.fixture(scope="session")
+def kalshi_key_path(tmp_path_factory):
+    """Throwaway RSA key so sign_request runs for real against the stubs."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path = tmp_path_factory.mktemp("keys") / "kalshi.pem"
+    path.write_bytes(key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.TraditionalOpenSSL,
+        encryption_algorithm=serialization.NoEncryption(),
+    ))
+    return str(path)
+
+
+@pytest.fixture
+def catalog():
+    return build_catalog(n_games=N_GAMES, n_filler=N_FILLER)
+
+
+@pytest.fixture
+def upstreams(monkeypatch, kalshi_key_path, catalog):
+    """
+    Returns an async context manager factory that starts the Kalshi, Gamma and
+    CLOB stubs and points every manager module at them.
+
+    Usage:
+        async with upstreams() as (kalshi, gamma, clob): ...
+    """
+    from contextlib import asynccontextmanager
+
+    from managers import accounts, breaker, market_manager, orderbook_manager, polymarket_manager, scheduler, snapshot_service
+
+    @asynccontextmanager
+    async def _start(latency=LATENCY):
+        async with KalshiStub(catalog, latency) as kalshi, GammaStub(catalog, latency) as gamma, \
+                ClobStub(catalog, latency) as clob:
+            kalshi_api = f"{kalshi.url}/trade-api/v2"
+            for mod in (market_manager, orderbook_manager):
+                monkeypatch.setattr(mod, "BASE_URL", kalshi_api)
+                monkeypatch.setattr(mod, "KALSHI_KEY_ID", "bench-key")
+                monkeypatch.setattr(mod, "KALSHI_PRIVATE_KEY_PATH", kalshi_key_path)
+            # Portfolio calls go through the account list (bench_accounts.py swaps in several)
+            monkeypatch.setattr(accounts, "BASE_URL", kalshi_api)
+            monkeypatch.setattr(accounts, "_accounts", [
+                accounts.KalshiAccount("main", "bench-key", kalshi_key_path)
+            ])
+            monkeypatch.setattr(polymarket_manager, "GAMMA_URL", f"{gamma.url}/events")
+            monkeypatch.setattr(orderbook_manager, "CLOB_URL", clob.url)
+            # No breaker/scheduler state or last good snapshot carried over from another benchmark
+            breaker.reset()
+            scheduler.reset()
+            snapshot_service.LAST_GOOD.invalidate()
+            try:
+                yield kalshi, gamma, clob
+            finally:
+                await accounts.close_all()
+
+    return _start
+
+
+@pytest.fixture
+def bench(request):
+    """Factory: bench(kalshi=..., gamma=...) -> Bench named after the current test."""
+    def _make(**stubs):
+        return Bench(request.node.name.replace("bench_", "", 1), stubs)
+    return _make
+
+
+def run(coro):
+    """Benchmarks are plain sync tests; each one owns its event loop."""
+    return asyncio.run(coro)
+
+
+# --- Fake Discord objects ---
+
+class FakeResponse:
+    def __init__(self):
+        self.deferred = False
+        self.sent = []
+
+    async def defer(self, **kwargs):
+        self.deferred = True
+
+    async def send_message(self, *args, **kwargs):
+        self.sent.append((args, kwargs))
+
+    def is_done(self):
+        return self.deferred or bool(self.sent)
+
+
+class FakeInteraction:
+    """Just enough of discord.Interaction for views.show_results and button callbacks."""
+
+    def __init__(self):
+        self.response = FakeResponse()
+        self.edits = []
+        self.followups = []
+        self.user = FakeUser()
+        self.id = 0
+
+    async def edit_original_response(self, **kwargs):
+        self.edits.append(kwargs)
+
+    @property
+    def followup(self):
+        return self
+
+    async def send(self, *args, **kwargs):
+        self.followups.append((args, kwargs))
+
+
+class FakeUser:
+    id = 1
+    name = "bench-user"
+
+
+class FakeMessage:
+    """What channel.send returns: records edits (live boards)."""
+
+    def __init__(self, kwargs):
+        self.kwargs = kwargs
+        self.edits = []
+
+    async def edit(self, **kwargs):
+        self.edits.append(kwargs)
+
+
+class FakeChannel:
+    """Stands in for a TextChannel (ctx.send / channel.send)."""
+
+    def __init__(self, name="order-logs", channel_id=1):
+        self.name = name
+        self.id = channel_id
+        self.sent = []
+        self.messages = []
+
+    async def send(self, *args, **kwargs):
+        self.sent.append((args, kwargs))
+        message = FakeMessage(kwargs)
+        self.messages.append(message)
+        return message
+
+
+class FakeContext(FakeChannel):
+    def __init__(self, channel_id=1):
+        super().__init__(name="bench", channel_id=channel_id)
+        self.author = FakeUser()
+        self.channel = self
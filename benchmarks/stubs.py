@@ -0,0 +1,421 @@
+"""
+Local stand-ins for the Kalshi and Gamma APIs used by the benchmark suite.
+
+Both servers are plain aiohttp apps bound to 127.0.0.1 on a random port.
+Every request is counted (per path) and can be delayed by an injected latency
+or failed with an injected status (an outage), so benchmarks can report upstream-request counts next to wall-clock numbers.
+"""
+import asyncio
+import json
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from aiohttp import web
+
+# --- Synthetic Catalog ---
+
+# (Kalshi city name, Polymarket nickname, Kalshi code)
+# City names must match the keys in polymarket_manager's nba_map.
+NBA_TEAMS = [
+    ("Atlanta", "Hawks", "ATL"), ("Boston", "Celtics", "BOS"), ("Brooklyn", "Nets", "BKN"),
+    ("Charlotte", "Hornets", "CHA"), ("Chicago", "Bulls", "CHI"), ("Cleveland", "Cavaliers", "CLE"),
+    ("Dallas", "Mavericks", "DAL"), ("Denver", "Nuggets", "DEN"), ("Detroit", "Pistons", "DET"),
+    ("Golden State", "Warriors", "GSW"), ("Houston", "Rockets", "HOU"), ("Indiana", "Pacers", "IND"),
+    ("Los Angeles C", "Clippers", "LAC"), ("Los Angeles L", "Lakers", "LAL"), ("Memphis", "Grizzlies", "MEM"),
+    ("Miami", "Heat", "MIA"), ("Milwaukee", "Bucks", "MIL"), ("Minnesota", "Timberwolves", "MIN"),
+    ("New Orleans", "Pelicans", "NOP"), ("New York", "Knicks", "NYK"), ("Oklahoma City", "Thunder", "OKC"),
+    ("Orlando", "Magic", "ORL"), ("Philadelphia", "76ers", "PHI"), ("Phoenix", "Suns", "PHX"),
+    ("Portland", "Trail Blazers", "POR"), ("Sacramento", "Kings", "SAC"), ("San Antonio", "Spurs", "SAS"),
+    ("Toronto", "Raptors", "TOR"), ("Utah", "Jazz", "UTA"), ("Washington", "Wizards", "WAS"),
+]
+
+NBA_TAG_ID = 745
+
+# Long filler text so Gamma payloads are roughly as heavy as the real ones.
+FILLER_DESCRIPTION = (
+    "This market will resolve according to the official league box score. "
+    "If the game is postponed or cancelled, the market resolves 50-50. "
+) * 8
+
+
+def _date_code(day):
+    """25DEC15 style code used inside Kalshi tickers."""
+    return day.strftime("%y%b%d").upper()
+
+
+def build_catalog(n_games=15, n_filler=200, series_ticker="KXNBAGAME"):
+    """
+    Builds a synthetic NBA slate.
+
+    Returns a dict with:
+        - kalshi_events: { series_ticker: [event, ...] }
+        - kalshi_markets: { event_ticker: [market, ...] }
+        - gamma_events: [event, ...] (matching games first, then filler)
+        - fills / positions: portfolio fixtures
+    """
+    today = datetime.now()
+    kalshi_events = {series_ticker: []}
+    kalshi_markets = {}
+    gamma_events = []
+
+    for i in range(n_games):
+        # Pair teams cyclically, 15 games per "day"
+        day = today + timedelta(days=(i // 15))
+        away = NBA_TEAMS[(2 * i) % len(NBA_TEAMS)]
+        home = NBA_TEAMS[(2 * i + 1) % len(NBA_TEAMS)]
+        event_ticker = f"{series_ticker}-{_date_code(day)}{away[2]}{home[2]}"
+        if i >= 15:
+            event_ticker = f"{event_ticker}{i}"
+
+        kalshi_events[series_ticker].append({
+            "event_ticker": event_ticker,
+            "series_ticker": series_ticker,
+            "title": f"{away[0]} at {home[0]}",
+            "start_time": day.isoformat(),
+        })
+        kalshi_markets[event_ticker] = [
+            {
+                "ticker": f"{event_ticker}-{team[2]}",
+                "event_ticker": event_ticker,
+                "series_ticker": series_ticker,
+                "title": f"{away[0]} at {home[0]} Winner?",
+                "subtitle": team[0],
+                "yes_bid": 40 + (i + side) % 20,
+                "no_bid": 40 + (i + 1 - side) % 20,
+            }
+            for side, team in enumerate((away, home))
+        ]
+
+        title = f"{away[1]} vs. {home[1]}"
+        token_base = 10_000_000 + i * 10
+        gamma_events.append({
+            "id": str(100000 + i),
+            "slug": f"nba-{away[2].lower()}-{home[2].lower()}-{day:%Y-%m-%d}",
+            "title": title,
+            "description": FILLER_DESCRIPTION,
+            "tags": [{"id": NBA_TAG_ID}],
+            "markets": [
+                {
+                    "id": str(500000 + i * 3 + k),
+                    "question": q,
+                    "description": FILLER_DESCRIPTION,
+                    "conditionId": f"0x{i:060x}{k:04x}",
+                    "groupItemTitle": q,
+                    "outcomes": json.dumps([away[1], home[1]]),
+                    "outcomePrices": json.dumps(["0.48", "0.52"]),
+                    "clobTokenIds": json.dumps([str(token_base + 2 * k), str(token_base + 2 * k + 1)]),
+                    "bestAsk": 0.49,
+                }
+                for k, q in enumerate((title, f"Spread: {away[1]} (-4.5)", f"{title}: O/U 221.5"))
+            ],
+        })
+
+    for j in range(n_filler):
+        gamma_events.append({
+            "id": str(900000 + j),
+            "slug": f"filler-event-{j}",
+            "title": f"Will player {j} score over {10 + j % 30}.5 points?",
+            "description": FILLER_DESCRIPTION,
+            "tags": [{"id": NBA_TAG_ID if j % 2 == 0 else 1}],
+            "markets": [{
+                "id": str(700000 + j),
+                "question": f"Player {j} over {10 + j % 30}.5?",
+                "description": FILLER_DESCRIPTION,
+                "conditionId": f"0x{j:064x}",
+                "outcomes": json.dumps(["Yes", "No"]),
+                "outcomePrices": json.dumps(["0.5", "0.5"]),
+                "clobTokenIds": json.dumps([str(j * 2), str(j * 2 + 1)]),
+            }],
+        })
+
+    # Portfolio fixtures: newest fill first, like the real API.
+    all_markets = [m for ms in kalshi_markets.values() for m in ms]
+    fills = [
+        {
+            "trade_id": f"trade-{k}",
+            "ticker": all_markets[k % len(all_markets)]["ticker"],
+            "side": "yes" if k % 2 else "no",
+            "action": "buy",
+            "count": 10 + k,
+            "yes_price": 45,
+            "created_time": (today - timedelta(minutes=k)).isoformat(),
+        }
+        for k in range(50)
+    ]
+    positions = [
+        {"ticker": m["ticker"], "position": 5 + k, "market_exposure": (5 + k) * 47}
+        for k, m in enumerate(all_markets[:12])
+    ]
+
+    return {
+        "kalshi_events": kalshi_events,
+        "kalshi_markets": kalshi_markets,
+        "gamma_events": gamma_events,
+        "fills": fills,
+        "positions": positions,
+    }
+
+
+# --- Servers ---
+
+class StubServer:
+    """Base class: request counting, byte counting, latency and failure injection."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.fail_status = None # e.g. 503: every request answers with it (an outage)
+        self.requests = Counter()
+        self.bytes_sent = 0
+        self.url = None
+        self.app = web.Application(middlewares=[self._middleware])
+        self._runner = None
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        self.requests[request.path] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail_status:
+            return web.json_response({"error": "stub outage"}, status=self.fail_status)
+        resp = await handler(request)
+        if resp.body is not None:
+            self.bytes_sent += len(resp.body)
+        return resp
+
+    @property
+    def total_requests(self):
+        return sum(self.requests.values())
+
+    def reset_counters(self):
+        self.requests.clear()
+        self.bytes_sent = 0
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+class KalshiStub(StubServer):
+    """Serves /trade-api/v2 events, markets, orderbooks and portfolio endpoints."""
+
+    PREFIX = "/trade-api/v2"
+
+    def __init__(self, catalog, latency=0.0):
+        super().__init__(latency)
+        self.catalog = catalog
+        self.balance = 123456
+        self.key_delays = {} # KALSHI-ACCESS-KEY -> extra seconds on portfolio calls (slow accounts)
+        # Order entry: share of each order that fills (IOC), extra seconds per order, orders seen
+        self.fill_ratio = 1.0
+        self.order_delay = 0.0
+        self.orders = []
+        self._markets_by_ticker = {
+            m["ticker"]: m for ms in catalog["kalshi_markets"].values() for m in ms
+        }
+        p = self.PREFIX
+        self.app.router.add_get(f"{p}/events", self.events)
+        self.app.router.add_get(f"{p}/events/{{ticker}}", self.event)
+        self.app.router.add_get(f"{p}/markets", self.markets)
+        self.app.router.add_get(f"{p}/markets/{{ticker}}", self.market)
+        self.app.router.add_get(f"{p}/markets/{{ticker}}/orderbook", self.orderbook)
+        self.app.router.add_get(f"{p}/portfolio/balance", self.portfolio_balance)
+        self.app.router.add_get(f"{p}/portfolio/positions", self.portfolio_positions)
+        self.app.router.add_get(f"{p}/portfolio/fills", self.portfolio_fills)
+        self.app.router.add_post(f"{p}/portfolio/orders", self.create_order)
+        self.app.router.add_get(f"{p}/exchange/status", self.exchange_status)
+
+    async def events(self, request):
+        events = self.catalog["kalshi_events"].get(request.query.get("series_ticker"), [])
+        if request.query.get("with_nested_markets") == "true":
+            events = [dict(e, markets=self.catalog["kalshi_markets"].get(e["event_ticker"], [])) for e in events]
+        return web.json_response({"events": events, "cursor": ""})
+
+    async def event(self, request):
+        ticker = request.match_info["ticker"]
+        event = next((e for es in self.catalog["kalshi_events"].values() for e in es
+                      if e["event_ticker"] == ticker), None)
+        if event is None:
+            return web.json_response({"error": "not found"}, status=404)
+        markets = self.catalog["kalshi_markets"].get(ticker, [])
+        if request.query.get("with_nested_markets") == "true":
+            return web.json_response({"event": dict(event, markets=markets)})
+        return web.json_response({"event": event, "markets": markets})
+
+    async def markets(self, request):
+        if "tickers" in request.query:
+            wanted = request.query["tickers"].split(",")
+            markets = [self._markets_by_ticker[t] for t in wanted if t in self._markets_by_ticker]
+            return web.json_response({"markets": markets, "cursor": ""})
+        markets = self.catalog["kalshi_markets"].get(request.query.get("event_ticker"), [])
+        return web.json_response({"markets": markets, "cursor": ""})
+
+    async def market(self, request):
+        m = self._markets_by_ticker.get(request.match_info["ticker"])
+        if not m:
+            return web.json_response({"error": "not found"}, status=404)
+        return web.json_response({"market": m})
+
+    async def orderbook(self, request):
+        """Five resting bid levels per side below yes_bid/no_bid, growing in size."""
+        m = self._markets_by_ticker.get(request.match_info["ticker"])
+        if not m:
+            return web.json_response({"error": "not found"}, status=404)
+        depth = int(request.query.get("depth", 5))
+        book = {
+            side: [[m[f"{side}_bid"] - k, 40 + 30 * k] for k in range(min(depth, 5))]
+            for side in ("yes", "no")
+        }
+        return web.json_response({"orderbook": book})
+
+    async def _account_delay(self, request):
+        delay = self.key_delays.get(request.headers.get("KALSHI-ACCESS-KEY"))
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def portfolio_balance(self, request):
+        await self._account_delay(request)
+        return web.json_response({"balance": self.balance})
+
+    async def portfolio_positions(self, request):
+        await self._account_delay(request)
+        return web.json_response({"market_positions": self.catalog["positions"], "cursor": ""})
+
+    async def portfolio_fills(self, request):
+        """Newest first; min_ts (unix seconds) filter and an offset cursor like the real API."""
+        await self._account_delay(request)
+        limit = int(request.query.get("limit", 100))
+        offset = int(request.query.get("cursor") or 0)
+        fills = self.catalog["fills"]
+        if "min_ts" in request.query:
+            min_ts = int(request.query["min_ts"])
+            fills = [f for f in fills if datetime.fromisoformat(f["created_time"]).timestamp() >= min_ts]
+        page = fills[offset:offset + limit]
+        cursor = str(offset + limit) if offset + limit < len(fills) else ""
+        return web.json_response({"fills": page, "cursor": cursor})
+
+
+    async def exchange_status(self, request):
+        return web.json_response({"exchange_active": True, "trading_active": True})
+
+    async def create_order(self, request):
+        """IOC orders: fills fill_ratio of the count, cancels the rest."""
+        if "KALSHI-ACCESS-SIGNATURE" not in request.headers:
+            return web.json_response({"error": "unauthorized"}, status=401)
+        body = await request.json()
+        self.orders.append(body)
+        if self.order_delay:
+            await asyncio.sleep(self.order_delay)
+        filled = int(body["count"] * self.fill_ratio)
+        return web.json_response({"order": {
+            "order_id": f"stub-{len(self.orders)}",
+            "client_order_id": body.get("client_order_id"),
+            "status": "executed" if filled == body["count"] else "canceled",
+            "fill_count": filled,
+            "remaining_count": 0,
+        }}, status=201)
+
+
+class GammaStub(StubServer):
+    """Serves Gamma /events with tag_id, limit and offset support, and single events by slug or ID."""
+
+    def __init__(self, catalog, latency=0.0):
+        super().__init__(latency)
+        self.catalog = catalog
+        self.app.router.add_get("/events", self.events)
+        self.app.router.add_get("/events/slug/{slug}", self.event)
+        self.app.router.add_get("/events/{id}", self.event)
+
+    async def event(self, request):
+        key, value = next(iter(request.match_info.items()))
+        event = next((e for e in self.catalog["gamma_events"] if str(e.get(key)) == value), None)
+        if event is None:
+            return web.json_response({"error": "not found"}, status=404)
+        return web.json_response(event)
+
+    async def events(self, request):
+        q = request.query
+        events = self.catalog["gamma_events"]
+        tag_id = q.get("tag_id")
+        if tag_id:
+            events = [e for e in events if any(str(t["id"]) == tag_id for t in e.get("tags", []))]
+        offset = int(q.get("offset", 0))
+        limit = int(q.get("limit", 100))
+        return web.json_response(events[offset:offset + limit])
+
+
+class ClobStub(StubServer):
+    """Serves Polymarket CLOB POST /books for every token in the Gamma catalog, and order entry."""
+
+    def __init__(self, catalog, latency=0.0):
+        super().__init__(latency)
+        # token_id -> outcome price (from the Gamma markets)
+        self.prices = {}
+        for e in catalog["gamma_events"]:
+            for m in e["markets"]:
+                for token, price in zip(json.loads(m["clobTokenIds"]), json.loads(m["outcomePrices"])):
+                    self.prices[token] = float(price)
+        self.app.router.add_post("/books", self.books)
+        # Order entry (FOK): whether orders fill, extra seconds per order, orders seen
+        self.fill = True
+        self.order_delay = 0.0
+        self.orders = []
+        self.app.router.add_post("/order", self.post_order)
+        self.app.router.add_get("/time", self.time)
+        self.app.router.add_get("/tick-size", self.tick_size)
+        self.app.router.add_get("/neg-risk", self.neg_risk)
+
+    def _book(self, token):
+        mid = self.prices[token]
+        return {
+            "asset_id": token,
+            "market": "0x0",
+            # Two-cent spread, five levels per side
+            "bids": [{"price": f"{mid - 0.01 - k / 100:.2f}", "size": str(100 + 50 * k)} for k in range(5)],
+            "asks": [{"price": f"{mid + 0.01 + k / 100:.2f}", "size": str(100 + 50 * k)} for k in range(5)],
+        }
+
+    async def books(self, request):
+        body = await request.json()
+        tokens = [b.get("token_id") for b in body]
+        return web.json_response([self._book(t) for t in tokens if t in self.prices])
+
+    async def time(self, request):
+        return web.json_response(int(time.time()))
+
+    async def tick_size(self, request):
+        return web.json_response({"minimum_tick_size": 0.01})
+
+    async def neg_risk(self, request):
+        return web.json_response({"neg_risk": False})
+
+    async def post_order(self, request):
+        """FOK orders: all or nothing, per `fill`."""
+        if "POLY_SIGNATURE" not in request.headers:
+            return web.json_response({"error": "unauthorized"}, status=401)
+        body = await request.json()
+        self.orders.append(body)
+        if self.order_delay:
+            await asyncio.sleep(self.order_delay)
+        if not self.fill:
+            return web.json_response({"success": False, "status": "unmatched", "errorMsg":
+                                      "order couldn't be fully filled. FOK orders are fully filled or killed."})
+        order = body["order"]
+        return web.json_response({"success": True, "errorMsg": "", "orderID": f"0x{len(self.orders):064x}",
+                                  "status": "matched", "takingAmount": order["takerAmount"],
+                                  "makingAmount": order["makerAmount"]})
@@ -1,11 +1,15 @@
+import time
+import math
+# Startup clock (taken before the heavy imports below)
+_PROCESS_T0 = time.perf_counter()
+
 import os
+import hashlib
 import discord
 from discord.ext import commands
-import aiohttp
-from dotenv import load_dotenv
 
 # Modules
-from managers.auth import sign_request
+from managers import config
 from managers import series_manager
 from managers import polymarket_manager
 import views # Phase 3 UI
@@ -16,61 +20,139 @@ import asyncio
 from datetime import datetime
 import re
 from managers import market_manager
-
-# Load environment variables
-from pathlib import Path
-env_path = Path('.') / '.env'
-load_dotenv(dotenv_path=env_path)
-
-if not os.path.exists(env_path):
-    print(f"WARNING: No .env file found at {os.path.abspath(env_path)}")
+from managers import metrics
+from managers import tracing
+from managers import quote_store
+from managers import pnl_manager
+from managers import accounts
+from managers import alert_manager
+from managers import watchlist
+from managers import quote_bus
+from managers import board_manager
+from managers import prefetch
+from managers import arb_registry
+from managers import execution
+from managers import breaker
+from managers import scheduler
+from managers.channels import ChannelResolver
+from managers.poll_interval import AdaptiveInterval
+
+_IMPORTS_DONE = time.perf_counter()
+
+# Environment variables are loaded once, in managers/config.py
+if not config.ENV_FOUND:
+    print(f"WARNING: No .env file found at {os.path.abspath(config.ENV_PATH)}")
     print("Please make sure you have created a .env file based on .env.example")
 
-DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
-KALSHI_KEY_ID = os.getenv("KALSHI_KEY_ID")
-KALSHI_PRIVATE_KEY_PATH = os.getenv("KALSHI_PRIVATE_KEY_PATH")
+DISCORD_TOKEN = config.DISCORD_TOKEN
+METRICS_PORT = config.METRICS_PORT
 
 if not DISCORD_TOKEN:
     print("ERROR: DISCORD_TOKEN is missing or None.")
 
-BASE_URL = "https://api.elections.kalshi.com"
+# --- Command Tree Sync ---
+def command_tree_hash(tree):
+    """Stable hash of every registered app command (names, options, permissions...)."""
+    payload = sorted((cmd.to_dict(tree) for cmd in tree.get_commands()), key=lambda d: (d.get("type", 1), d["name"]))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
 
-# Setup Bot
-intents = discord.Intents.default()
-intents.message_content = True
-# Disable default help command to use our custom one
-bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
+async def sync_command_tree_if_changed(client):
+    """
+    Syncs slash commands only when their hash differs from the last successful sync.
+    The hash is persisted per application in TREE_STATE_FILE.
+    """
+    tree_hash = command_tree_hash(client.tree)
+    app_key = str(client.application_id)
 
-# --- Helper: Fetch Data (retained for Balance/Pos) ---
-async def fetch_data(path, method="GET"):
-    """Generic helper to fetch data from Kalshi API with signing."""
+    state = {}
+    if os.path.exists(config.TREE_STATE_FILE):
+        try:
+            with open(config.TREE_STATE_FILE, "r") as f:
+                state = json.load(f)
+        except Exception as e:
+            print(f"Error reading tree state file: {e}")
+
+    if state.get(app_key) == tree_hash and not config.FORCE_TREE_SYNC:
+        print("Slash commands unchanged, skipping sync")
+        return False
+
+    await client.tree.sync()
+    state[app_key] = tree_hash
     try:
-        headers = sign_request(method, path, KALSHI_KEY_ID, KALSHI_PRIVATE_KEY_PATH)
+        with open(config.TREE_STATE_FILE, "w") as f:
+            json.dump(state, f)
     except Exception as e:
-        return None, f"Key Error: {e}"
+        print(f"Error writing tree state file: {e}")
+    print("Slash commands synced")
+    return True
 
-    url = f"{BASE_URL}{path}"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            if response.status == 200:
-                return await response.json(), None
-            else:
-                text = await response.text()
-                return None, f"Status {response.status}: {text}"
+# Setup Bot
+class KalshiBot(commands.Bot):
+    async def setup_hook(self):
+        # Runs once per process, before connecting to the gateway.
+        # (on_ready fires again on every reconnect, so one-time work lives here.)
+        # Quote history has one writer: the market data daemon when there is one
+        if config.QUOTE_HISTORY_DIR and not config.MARKET_DAEMON_SOCKET:
+            quote_store.enable(config.QUOTE_HISTORY_DIR)
+        # Mapping registry: loaded once here, reloaded on change by its readers
+        registry = arb_registry.get_registry()
+        print(f"Loaded {len(registry)} arb mappings from {registry.path}")
+        # Order path: keys, signers and exchange connections ready before the first !arb_exec
+        executor = execution.get_executor()
+        if executor.configured:
+            await executor.start()
+            print(f"Execution ready ({'dry run' if executor.dry_run else 'LIVE'})")
+        try:
+            await self.load_extension("cogs.mapper")
+            print("Loaded cogs.mapper")
+            await sync_command_tree_if_changed(self)
+        except Exception as e:
+            print(f"Failed to load cogs: {e}")
+
+    async def close(self):
+        # Flush buffered quote history before the loop goes away
+        await quote_store.disable()
+        alert_manager.get_engine().stop()
+        await quote_bus.get_bus().stop()
+        await accounts.close_all()
+        await execution.get_executor().close()
+        await super().close()
+
+intents = discord.Intents.default()
+intents.message_content = True
+# Disable default help command to use our custom one
+bot = KalshiBot(command_prefix="!", intents=intents, help_command=None)
+_startup_reported = False
+
+# --- Helper: Account Status ---
+def _stale_note(row):
+    """' (stale, 2m old)' style suffix for an accounts.query_all row, '' when fresh."""
+    if not row["stale"]:
+        return ""
+    if row["age_s"] is None:
+        return " (stale, no data yet)"
+    return f" (stale, {row['age_s'] / 60:.0f}m old)"
 
 @bot.event
 async def on_ready():
+    global _startup_reported
     print(f"Logged in as {bot.user}")
-    
-    # Load Cogs
-    try:
-        await bot.load_extension("cogs.mapper")
-        print("Loaded cogs.mapper")
-        # Sync Command Tree
-        await bot.tree.sync()
-        print("Slash commands synced")
-    except Exception as e:
-        print(f"Failed to load cogs: {e}")
+
+    # Startup timing (first ready only; later calls are gateway reconnects)
+    if not _startup_reported:
+        _startup_reported = True
+        ready_s = time.perf_counter() - _PROCESS_T0
+        imports_s = _IMPORTS_DONE - _PROCESS_T0
+        metrics.set_value("startup_seconds", round(ready_s, 3), phase="ready")
+        metrics.set_value("startup_seconds", round(imports_s, 3), phase="imports")
+        print(f"Startup: imports {imports_s:.2f}s, ready {ready_s:.2f}s")
+
+    # Metrics endpoint (idempotent across reconnects)
+    if METRICS_PORT:
+        try:
+            await metrics.start_http_server(METRICS_PORT)
+        except OSError as e:
+            print(f"Failed to start metrics endpoint: {e}")
 
     print("Kalshi Bot Ready: !bal, !pos, !search.")
     
@@ -78,73 +160,170 @@ async def on_ready():
     if not order_monitor.is_running():
         order_monitor.start()
 
+    # Catch the P&L aggregates up once (a no-op fetch when the cursor is current)
+    if not _pnl_synced:
+        asyncio.create_task(_sync_pnl())
+
+    # Watchlists: index is loaded (and its tickers subscribed) once; DMs fan out per quote change
+    index = watchlist.get_index()
+    index.notify = send_watch_update
+    if index.by_ticker:
+        quote_bus.get_bus().start()
+
+    # Price-move alerts: positions are resynced periodically, fills keep them current in between
+    if alert_manager.get_engine().enabled and not alert_positions.is_running():
+        alert_manager.get_engine().send = send_price_alert
+        alert_positions.start()
+
+_pnl_synced = False
+
+async def _sync_pnl():
+    global _pnl_synced
+    _pnl_synced = True
+    try:
+        with scheduler.priority(scheduler.FILLS):
+            applied = await pnl_manager.get_engine().sync()
+        if applied is None:
+            print("P&L sync incomplete, order_monitor will retry")
+        else:
+            print(f"P&L synced ({applied} new fills)")
+    except Exception as e:
+        print(f"P&L sync failed: {e}")
+
 # --- Background Tasks ---
-@tasks.loop(seconds=5)
+# Log channels by name, resolved once and kept by ID (invalidated by the channel events below)
+channels = ChannelResolver(bot)
+
+# order_monitor polls every MONITOR_MIN_INTERVAL after a fill, backing off to MONITOR_MAX_INTERVAL while idle
+monitor_interval = AdaptiveInterval(config.MONITOR_MIN_INTERVAL, config.MONITOR_MAX_INTERVAL, config.MONITOR_BACKOFF)
+
+metrics.describe("order_monitor_step_ms", "order_monitor tick cost per step (channel, fills, log).")
+metrics.describe("order_monitor_interval_seconds", "Seconds until the next order_monitor tick.")
+
+@bot.event
+async def on_guild_channel_create(channel):
+    channels.invalidate()
+
+@bot.event
+async def on_guild_channel_delete(channel):
+    channels.invalidate()
+
+@bot.event
+async def on_guild_channel_update(before, after):
+    if before.name != after.name:
+        channels.invalidate()
+
+@bot.event
+async def on_guild_join(guild):
+    channels.invalidate()
+
+@bot.event
+async def on_guild_remove(guild):
+    channels.invalidate()
+
+@tasks.loop(seconds=config.MONITOR_MIN_INTERVAL)
+@metrics.instrument("task:order_monitor")
+@tracing.traced("task.order_monitor")
 async def order_monitor():
-    """Checks for new fills and logs them to #order-logs."""
-    channel = discord.utils.get(bot.get_all_channels(), name="order-logs")
+    """Checks for new fills and logs them to #order-logs, then sets the next interval."""
+    logged = 0
+    try:
+        logged = await log_new_fills()
+    finally:
+        interval = monitor_interval.update(active=logged > 0)
+        order_monitor.change_interval(seconds=interval)
+        metrics.set_value("order_monitor_interval_seconds", interval)
+
+async def log_new_fills():
+    """One order_monitor tick. Returns how many new fills were logged."""
+    with metrics.timer("order_monitor_step_ms", step="channel"):
+        channel = channels.get("order-logs")
     if not channel:
         print("Warning: #order-logs channel not found.")
-        return
+        return 0
 
-    # 1. Fetch recent fills
-    fills = await portfolio_manager.get_recent_fills(limit=5)
-    if not fills:
-        return
-
-    # 2. Load State (Last seen fill ID)
+    # 1. Load State (Last seen fill ID per account)
     state_file = "bot_state.json"
-    last_fill_trade_id = None
+    state = {}
     if os.path.exists(state_file):
         try:
             with open(state_file, "r") as f:
                 state = json.load(f)
-                last_fill_trade_id = state.get("last_fill_trade_id")
         except Exception as e:
             print(f"Error reading state file: {e}")
+    last_ids = state.get("accounts", {})
+    if "last_fill_trade_id" in state and accounts.primary().name not in last_ids:
+        # Single-account state from before multi-account support
+        last_ids[accounts.primary().name] = state["last_fill_trade_id"]
+    state_changed = False
+
+    # 2. Fetch recent fills (every account, concurrently; slow accounts time out).
+    # An account's window pages back to its last seen fill, so a burst bigger
+    # than the limit between two ticks is still logged in full.
+    with metrics.timer("order_monitor_step_ms", step="fills"):
+        results = await portfolio_manager.get_all_recent_fills(limit=5, last_ids=last_ids)
+
+    # Keep the P&L aggregates current (primary account; only fills past its cursor are applied)
+    primary = results[0]
+    if primary["result"] and not primary["stale"]:
+        try:
+            await pnl_manager.get_engine().ingest_recent(primary["result"])
+        except Exception as e:
+            print(f"Error updating P&L: {e}")
 
     # 3. Filter New Fills
     # Fills are usually returned newest first.
-    # If we have a last_fill_trade_id, stop when we hit it.
-    new_fills = []
-    
-    if last_fill_trade_id:
+    # If we have a last_fill_trade_id for the account, stop when we hit it.
+    new_fills = [] # (account, fill), oldest first per account
+    for row in results:
+        fills = row["result"]
+        name = row["account"].name
+        if row["stale"] or not fills:
+            # Stale rows hold a cached window; the next tick picks the fills up
+            if row["error"]:
+                print(f"order_monitor: {name}: {row['error']}")
+            continue
+
+        last_fill_trade_id = last_ids.get(name)
+        if not last_fill_trade_id:
+            # First run for this account? User wants ONLY new trades, so don't log
+            # the history: remember the newest fill and wait for the next loop.
+            last_ids[name] = fills[0].get("trade_id")
+            state_changed = True
+            continue
+
+        account_new = []
         for fill in fills:
             if fill.get("trade_id") == last_fill_trade_id:
                 break
-            new_fills.append(fill)
-    else:
-        # First run or no state file? 
-        # User wants ONLY new trades. So we should NOT log the history.
-        # We just set the state to the most recent fill (if any) and wait for next loop.
-        if fills:
-            # Fills are usually newest first. 
-            # We save the newest ID so we only catch things AFTER this.
-            latest_id = fills[0].get("trade_id")
-            
-            # Save State immediately
-            try:
-                with open(state_file, "w") as f:
-                    json.dump({"last_fill_trade_id": latest_id}, f)
-            except Exception as e:
-                print(f"Error writing state file: {e}")
-                
-        # Do not process these fills
-        return
+            account_new.append(fill)
+        # Reverse to log oldest to newest
+        new_fills.extend((row["account"], fill) for fill in reversed(account_new))
+
+    # Held tickers for price alerts follow the fills as they arrive
+    if new_fills and alert_manager.get_engine().enabled:
+        alert_manager.get_engine().apply_fills([fill for _, fill in new_fills])
+
+    def save_state():
+        try:
+            with open(state_file, "w") as f:
+                json.dump({"accounts": last_ids}, f)
+        except Exception as e:
+            print(f"Error writing state file: {e}")
 
     if not new_fills:
-        return
-        
-    # Reverse to log oldest to newest
-    new_fills.reverse()
+        if state_changed:
+            save_state()
+        return 0
 
     # 4. Log to Discord
-    # Fetch balance once for the batch? Or per log? 
-    # Fetching once is safer for rate limits and sufficiency.
-    current_balance_cents = await portfolio_manager.get_balance()
-    current_balance_str = f"${current_balance_cents/100:,.2f}"
+    log_t0 = time.perf_counter()
+    # Fetch balance once per account with new fills (safer for rate limits).
+    with_fills = list({id(a): a for a, _ in new_fills}.values())
+    cents = await asyncio.gather(*(portfolio_manager.get_balance(a) for a in with_fills))
+    balances = {a.name: f"${c/100:,.2f}" for a, c in zip(with_fills, cents)}
 
-    for fill in new_fills:
+    for account, fill in new_fills:
         # Fill object structure assumption:
         # {
         #   "trade_id": "...",
@@ -234,7 +413,7 @@ async def order_monitor():
         )
         
         # Row 1: Core Details
-        embed.add_field(name="Details", value=f"**Type:** {market_type}\n**Ticker:** `{ticker}`", inline=False)
+        embed.add_field(name="Details", value=f"**Account:** {account.name}\n**Type:** {market_type}\n**Ticker:** `{ticker}`", inline=False)
 
         # Row 2: Trade Specifics
         embed.add_field(name="Side", value=f"**{side}**", inline=True)
@@ -242,7 +421,7 @@ async def order_monitor():
         embed.add_field(name="Cost/Credit", value=f"${(count * price)/100:,.2f}", inline=True)
 
         # Row 3: Account Status
-        embed.add_field(name="Updated Balance", value=f"**{current_balance_str}**", inline=False)
+        embed.add_field(name="Updated Balance", value=f"**{balances[account.name]}** ({account.name})", inline=False)
         
         # embed.add_field(name="Links", value=f"[View Market]({market_url})", inline=False) # Removed as per request (Button exists)
         
@@ -255,24 +434,66 @@ async def order_monitor():
         await channel.send(embed=embed, view=view)
         
         # Update Loop Variable to track latest
-        last_fill_trade_id = fill.get("trade_id")
+        last_ids[account.name] = fill.get("trade_id")
 
     # 5. Save State
-    if last_fill_trade_id:
-        try:
-            with open(state_file, "w") as f:
-                json.dump({"last_fill_trade_id": last_fill_trade_id}, f)
-        except Exception as e:
-            print(f"Error writing state file: {e}")
+    save_state()
+    metrics.observe("order_monitor_step_ms", (time.perf_counter() - log_t0) * 1000, step="log")
+    return len(new_fills)
 
 @order_monitor.before_loop
 async def before_order_monitor():
     await bot.wait_until_ready()
 
+@tasks.loop(seconds=config.ALERT_POSITION_REFRESH)
+@metrics.instrument("task:alert_positions")
+async def alert_positions():
+    """Resyncs the alert engine's held set from positions (and starts its quote poller)."""
+    engine = alert_manager.get_engine()
+    added, removed = await engine.refresh_positions()
+    if added or removed:
+        print(f"Price alerts: +{len(added)} -{len(removed)} tickers ({len(engine.held)} held)")
+    engine.bus.start()
+
+@alert_positions.before_loop
+async def before_alert_positions():
+    await bot.wait_until_ready()
+
+async def send_price_alert(alert):
+    """Posts one alert from alert_manager to ALERT_CHANNEL."""
+    channel = channels.get(config.ALERT_CHANNEL)
+    if not channel:
+        print(f"Warning: #{config.ALERT_CHANNEL} channel not found.")
+        return
+
+    ticker = alert["ticker"]
+    arrow = "📈" if alert["up"] else "📉"
+    if alert["kind"] == "cross":
+        headline = f"{arrow} {alert['side']} crossed {alert['level']:g}¢"
+    else:
+        headline = f"{arrow} {alert['side']} moved {alert['to'] - alert['from']:+.1f}¢"
+
+    market_info = await market_manager.get_market_info(ticker)
+    title = market_info.get("title", ticker) if market_info else ticker
+
+    embed = discord.Embed(
+        title=title,
+        description=f"**{headline}**",
+        color=discord.Color.green() if alert["up"] else discord.Color.red(),
+        timestamp=datetime.now()
+    )
+    embed.add_field(name="Position", value=f"{alert['qty']}x **{alert['side']}**\n`{ticker}`", inline=True)
+    embed.add_field(name="Price", value=f"{alert['from']:.1f}¢ → **{alert['to']:.1f}¢**", inline=True)
+    bid = f"{alert['bid']}¢" if alert["bid"] is not None else "-"
+    ask = f"{alert['ask']}¢" if alert["ask"] is not None else "-"
+    embed.add_field(name="YES Bid/Ask", value=f"{bid} / {ask}", inline=True)
+    await channel.send(embed=embed)
+
 # --- Commands ---
 
 # 1. SEARCH (New Interactive Flow)
 @bot.command()
+@metrics.instrument("cmd:search")
 async def search(ctx):
     """Starts the interactive search menu."""
     # 1. Fetch active sports first
@@ -291,6 +512,7 @@ async def search(ctx):
 
 # 2. BALANCE
 @bot.command(aliases=['bal'])
+@metrics.instrument("cmd:balance")
 async def balance(ctx, account: str = "all"):
     """
     Check account balance.
@@ -298,11 +520,23 @@ async def balance(ctx, account: str = "all"):
     """
     account = account.lower()
     
-    # helper to get kalshi
+    # helper to get kalshi (every account concurrently; a slow one shows as stale)
     async def get_kalshi():
-        d, e = await fetch_data("/trade-api/v2/portfolio/balance")
-        if e: return 0.0, f"Error: {e}"
-        return d.get("balance", 0) / 100.0, None # Return dollars
+        rows = await portfolio_manager.get_all_balances()
+        total, lines, errors = 0.0, [], []
+        for row in rows:
+            name = row["account"].name
+            if row["result"] is None:
+                lines.append(f"{name}: ⚠️ {row['error']}")
+                errors.append(f"Error: {row['error']}")
+                continue
+            val = row["result"] / 100.0 # Return dollars
+            total += val
+            lines.append(f"{name}: ${val:,.2f}{_stale_note(row)}")
+        if len(rows) == 1:
+            # Single account: plain value (plus a stale marker when it timed out)
+            return total, (errors[0] if errors else None), _stale_note(rows[0])
+        return total, None, "\n" + "\n".join(lines)
 
     # helper to get poly
     async def get_poly():
@@ -316,13 +550,12 @@ async def balance(ctx, account: str = "all"):
 
     if account == "all":
         # fetch both
-        k_val, k_err = await get_kalshi()
-        p_val, p_err = await get_poly()
+        (k_val, k_err, k_detail), (p_val, p_err) = await asyncio.gather(get_kalshi(), get_poly())
         
         embed = discord.Embed(title="Portfolio Balance", color=discord.Color.blue(), timestamp=datetime.now())
         
         # Kalshi Field
-        k_str = f"${k_val:,.2f}" if not k_err else f"⚠️ {k_err}"
+        k_str = f"${k_val:,.2f}{k_detail}" if not k_err else f"⚠️ {k_err}"
         embed.add_field(name="Kalshi", value=k_str, inline=True)
         
         # Poly Field
@@ -336,8 +569,8 @@ async def balance(ctx, account: str = "all"):
         await ctx.send(embed=embed)
 
     elif account.startswith("k"):
-        val, err = await get_kalshi()
-        msg = f"**Kalshi Balance**: ${val:,.2f}" if not err else f"[Kalshi] Error: {err}"
+        val, err, detail = await get_kalshi()
+        msg = f"**Kalshi Balance**: ${val:,.2f}{detail}" if not err else f"[Kalshi] Error: {err}"
         await ctx.send(msg)
         
     elif account.startswith("p"):
@@ -350,23 +583,34 @@ async def balance(ctx, account: str = "all"):
 
 # 3. POSITIONS
 @bot.command(aliases=['pos'])
+@metrics.instrument("cmd:positions")
 async def positions(ctx):
-    """List active positions."""
-    data, error = await fetch_data("/trade-api/v2/portfolio/positions")
-    if error:
-        await ctx.send(f"Error: {error}")
+    """List active positions (all accounts)."""
+    rows = await portfolio_manager.get_all_positions()
+    if all(row["result"] is None for row in rows):
+        await ctx.send(f"Error: {rows[0]['error']}")
         return
-    
-    positions = [p for p in data.get("market_positions", []) if p.get("position", 0) > 0]
-    
+
+    # (account name, position), tagged so each line shows which account holds it
+    positions = [
+        (row["account"].name, p)
+        for row in rows for p in (row["result"] or []) if p.get("position", 0) > 0
+    ]
+    notes = [
+        f"⚠️ {row['account'].name}: {row['error']}{_stale_note(row)}"
+        for row in rows if row["error"]
+    ]
+
     if not positions:
-        await ctx.send("You have no active positions.")
+        await ctx.send("\n".join(["You have no active positions."] + notes))
         return
         
     embed = discord.Embed(title="Your Active Positions", color=discord.Color.blue())
+    if notes:
+        embed.description = "\n".join(notes)
     
     # Process positions (limit to 10 for now to avoid rate limits/timeouts on title fetches)
-    for p in positions[:10]:
+    for account_name, p in positions[:10]:
         t = p.get('ticker')
         c = p.get('position')
         exp = p.get('market_exposure', 0)
@@ -409,15 +653,173 @@ async def positions(ctx):
             f"**Line:** {line_name} - {side}\n"
             f"**ID:** `{t}`\n"
             f"**Price:** {c}x ${avg_dollars:.2f}\n"
-            f"**Platform:** Kalshi"
+            f"**Platform:** Kalshi ({account_name})"
         )
         
         embed.add_field(name=event_name, value=val_str, inline=False)
         
     await ctx.send(embed=embed)
 
-# 4. HELP
+# 4. WATCHLIST
+DM_CONCURRENCY = 10
+
+async def send_watch_update(user_ids, update):
+    """One embed per quote change, DMed to every watcher of the ticker."""
+    ticker = update["ticker"]
+    arrow = "📈" if update["to"] > update["from"] else "📉"
+    bid = f"{update['bid']}¢" if update["bid"] is not None else "-"
+    ask = f"{update['ask']}¢" if update["ask"] is not None else "-"
+    embed = discord.Embed(
+        title=f"{arrow} {ticker}",
+        description=f"{update['from']:.1f}¢ → **{update['to']:.1f}¢**\nYES Bid/Ask: {bid} / {ask}",
+        color=discord.Color.green() if update["to"] > update["from"] else discord.Color.red(),
+        timestamp=datetime.now()
+    )
+    embed.set_footer(text="!unwatch to stop")
+
+    sem = asyncio.Semaphore(DM_CONCURRENCY)
+    async def dm(user_id):
+        async with sem:
+            try:
+                user = bot.get_user(user_id) or await bot.fetch_user(user_id)
+                await user.send(embed=embed)
+            except Exception as e:
+                print(f"Watch DM to {user_id} failed: {e}")
+
+    await asyncio.gather(*(dm(u) for u in user_ids))
+
+@bot.command()
+@metrics.instrument("cmd:watch")
+async def watch(ctx, ticker: str = None):
+    """
+    Follow a market and get DMs when its price changes.
+    Usage: !watch KXNFLGAME-25DEC18LASEA-SEA, or !watch to list yours
+    """
+    index = watchlist.get_index()
+    if not ticker:
+        tickers = index.tickers_for(ctx.author.id)
+        if not tickers:
+            await ctx.send("You aren't watching anything. Use `!watch <ticker>`.")
+        else:
+            await ctx.send("**Watching:** " + ", ".join(f"`{t}`" for t in tickers))
+        return
+
+    ticker = ticker.upper()
+    if ticker not in index.by_ticker:
+        # Only the first watcher pays for the lookup
+        if not await market_manager.get_market_info(ticker):
+            await ctx.send(f"Unknown market `{ticker}`.")
+            return
+
+    result = index.watch(ctx.author.id, ticker)
+    if result == "full":
+        await ctx.send(f"You can watch at most {index.max_per_user} markets. `!unwatch` one first.")
+    elif result == "exists":
+        await ctx.send(f"Already watching `{ticker}`.")
+    else:
+        index.notify = send_watch_update
+        quote_bus.get_bus().start()
+        await ctx.send(f"Watching `{ticker}`. You'll get a DM when it moves.")
+
+@bot.command()
+@metrics.instrument("cmd:unwatch")
+async def unwatch(ctx, ticker: str = "all"):
+    """Stop following a market (!unwatch <ticker>) or everything (!unwatch)."""
+    index = watchlist.get_index()
+    removed = index.unwatch(ctx.author.id, None if ticker.lower() == "all" else ticker.upper())
+    if not removed:
+        await ctx.send("Nothing to remove.")
+    else:
+        await ctx.send("Stopped watching " + ", ".join(f"`{t}`" for t in removed) + ".")
+
+# 5. LIVE BOARD
+MARKET_TYPES = {"moneyline": "moneyline", "ml": "moneyline", "spread": "spread", "spreads": "spread", "total": "total", "totals": "total"}
+
+def _find_league(name):
+    """(league name, tickers dict) from series_manager.ALLOWED_SERIES, case-insensitive."""
+    name = name.lower()
+    for leagues in series_manager.ALLOWED_SERIES.values():
+        for league, tickers in leagues.items():
+            if league.lower() == name:
+                return league, tickers
+    return None, None
+
+@bot.command()
+@metrics.instrument("cmd:board")
+async def board(ctx, *args):
+    """
+    Posts a board that keeps updating in place.
+    Usage: !board NFL moneyline, !board "College Football" spread, !board stop
+    """
+    if args and args[0].lower() == "stop":
+        stopped = await board_manager.close_channel(ctx.channel.id)
+        await ctx.send(f"Stopped {stopped} board(s)." if stopped else "No live boards in this channel.")
+        return
+
+    market_type = MARKET_TYPES.get(args[-1].lower()) if args else None
+    league, tickers = _find_league(" ".join(args[:-1])) if market_type else (None, None)
+    if not league:
+        leagues = ", ".join(l for ls in series_manager.ALLOWED_SERIES.values() for l in ls)
+        await ctx.send(f"Usage: `!board <league> <moneyline|spread|total>`. Leagues: {leagues}")
+        return
+    series_ticker = tickers.get(market_type)
+    if not series_ticker:
+        await ctx.send(f"Sorry, **{market_type.title()}** markets are not mapped for {league}.")
+        return
+
+    feed = board_manager.get_feed(series_ticker, league, market_type, views.render_game_field,
+                                  views.game_fingerprint, max_fields=views.BOARD_MAX_FIELDS)
+    if feed.snapshot is None:
+        await feed.refresh()
+        if feed.snapshot is None:
+            await ctx.send(f"Error: {feed.error}")
+            return
+
+    def assemble(fields, feed, note):
+        return views.board_embed(feed.sport, feed.market_type, fields, feed.snapshot.get("generated_at"), note)
+
+    message = await ctx.send(embed=assemble(feed.fields(), feed, None))
+    await board_manager.open_board(ctx.channel.id, feed, lambda embed: message.edit(embed=embed), assemble)
+
+# 6. P&L
+def _cents_str(cents):
+    sign = "-" if cents < 0 else "+"
+    return f"{sign}${abs(cents) / 100:,.2f}"
+
+@bot.command()
+@metrics.instrument("cmd:pnl")
+async def pnl(ctx, period: str = "day"):
+    """
+    Realized + unrealized P&L from the incrementally maintained fill aggregates.
+    Usage: !pnl (today, UTC), !pnl week, !pnl all
+    """
+    period = period.lower()
+    if period not in pnl_manager.PERIODS:
+        await ctx.send("Invalid period. Use `!pnl day`, `!pnl week` or `!pnl all`.")
+        return
+
+    engine = pnl_manager.get_engine()
+    if not engine.synced_once:
+        await ctx.send("P&L is still catching up on fill history, try again shortly.")
+        return
+
+    s = engine.summary(period)
+    labels = {"day": "Today (UTC)", "week": "Last 7 Days", "all": "All Time"}
+    color = discord.Color.green() if s["realized"] + s["unrealized"] >= 0 else discord.Color.red()
+    embed = discord.Embed(title=f"P&L - {labels[period]}", color=color, timestamp=datetime.now())
+    embed.add_field(name="Realized", value=f"**{_cents_str(s['realized'])}**\n{s['fills']} fills", inline=True)
+
+    unrealized = f"**{_cents_str(s['unrealized'])}**\n{s['open_positions']} open"
+    if s["unmarked"]:
+        unrealized += f" ({s['unmarked']} unquoted)"
+    embed.add_field(name="Unrealized (now)", value=unrealized, inline=True)
+    embed.set_footer(text="Kalshi fills only • excludes fees")
+
+    await ctx.send(embed=embed)
+
+# 7. HELP
 @bot.command()
+@metrics.instrument("cmd:help")
 async def help(ctx):
     """Shows available commands."""
     embed = discord.Embed(
@@ -429,10 +831,173 @@ async def help(ctx):
     embed.add_field(name="`!search`", value="Browse sports and check live odds.", inline=False)
     embed.add_field(name="`!balance [k/p]`", value="Check balance. Default=Combined. `k`=Kalshi, `p`=Polymarket.", inline=False)
     embed.add_field(name="`!positions`", value="See your active trades and exposure.", inline=False)
+    embed.add_field(name="`!board <league> <type>`", value="Live-updating odds board, e.g. `!board NFL moneyline`. `!board stop` ends it.", inline=False)
+    embed.add_field(name="`!watch [ticker]` / `!unwatch [ticker]`", value="Follow markets and get DMs when they move. `!watch` lists yours.", inline=False)
+    embed.add_field(name="`!pnl [day/week/all]`", value="Realized and unrealized P&L from your Kalshi fills.", inline=False)
+    embed.add_field(name="`!arb_exec <ticker> <yes|no> <count>`", value="(Admin) Buy a mapped pair on both exchanges at once (dry run by default).", inline=False)
+    embed.add_field(name="`!stats`", value="(Admin) Latency, error, cache, circuit breaker, scheduler and order monitor stats.", inline=False)
     
     embed.set_footer(text="Trade Responsibly! • Kalshi API")
     
     await ctx.send(embed=embed)
 
+# 8. STATS (Admin)
+def _histogram_rows(metric, limit=12):
+    """Histogram family as [(labels, histogram, 'n=.. p50<=..ms p95<=..ms')], busiest first."""
+    rows = sorted(metrics.histograms(metric), key=lambda lh: lh[1].count, reverse=True)[:limit]
+    return [
+        (labels, h, f"n={h.count} p50≤{h.percentile(50):g}ms p95≤{h.percentile(95):g}ms")
+        for labels, h in rows
+    ]
+
+def _clip(lines, empty="No data yet."):
+    """Joins lines and keeps the result under the 1024-char field limit."""
+    out = ""
+    for line in lines:
+        if len(out) + len(line) + 1 > 1000:
+            out += "\n…"
+            break
+        out += ("\n" if out else "") + line
+    return out or empty
+
+@bot.command()
+@commands.has_permissions(administrator=True)
+@metrics.instrument("cmd:stats")
+async def stats(ctx):
+    """Shows upstream latency, handler latency, error counts and cache ratios."""
+    embed = discord.Embed(title="Bot Stats", color=discord.Color.dark_teal(), timestamp=datetime.now())
+
+    # Upstream endpoints (with error counts)
+    errors = {(l["upstream"], l["endpoint"]): v for l, v in metrics.counters("upstream_errors_total")}
+    upstream_lines = []
+    for l, h, summary in _histogram_rows("upstream_latency_ms"):
+        line = f"`{l['upstream']} {l['method']} {l['endpoint']}` {summary}"
+        err = errors.get((l["upstream"], l["endpoint"]), 0)
+        upstream_lines.append(f"{line} err={err}" if err else line)
+    embed.add_field(name="Upstream Latency", value=_clip(upstream_lines), inline=False)
+
+    # Handlers (+ upstream calls per action)
+    calls = {l["handler"]: h.mean for l, h in metrics.histograms("upstream_calls_per_action")}
+    handler_lines = [
+        f"`{l['handler']}` {summary} calls≈{calls.get(l['handler'], 0):.1f}"
+        for l, h, summary in _histogram_rows("handler_latency_ms")
+    ]
+    embed.add_field(name="Handlers", value=_clip(handler_lines), inline=False)
+
+    # Bytes + caches
+    byte_lines = [f"`{l['upstream']}` {v / 1_000_000:,.2f} MB" for l, v in metrics.counters("upstream_bytes_total")]
+    embed.add_field(name="Bytes Received", value=_clip(byte_lines), inline=True)
+
+    cache_lines = []
+    for name, (hits, misses) in sorted(metrics.cache_ratios().items()):
+        total = hits + misses
+        cache_lines.append(f"`{name}` {hits}/{total} ({hits / total:.0%})" if total else f"`{name}` 0/0")
+    embed.add_field(name="Cache Hit Ratio", value=_clip(cache_lines), inline=True)
+
+    pf = prefetch.rates()
+    if pf["hit"] + pf["miss"] + pf["wasted"] + pf["cancelled"]:
+        hit_rate = f"{pf['hit_rate']:.0%}" if pf["hit_rate"] is not None else "-"
+        waste_rate = f"{pf['waste_rate']:.0%}" if pf["waste_rate"] is not None else "-"
+        embed.add_field(
+            name="Menu Prefetch",
+            value=f"hit {pf['hit']}/{pf['hit'] + pf['miss']} ({hit_rate})\n"
+                  f"wasted {pf['wasted']} cancelled {pf['cancelled']} (waste {waste_rate})",
+            inline=True,
+        )
+
+    exec_lines = [f"`{l['step']}` {summary}" for l, h, summary in _histogram_rows("execution_step_ms")]
+    if exec_lines:
+        outcomes = " ".join(f"{l['outcome']}={v:g}" for l, v in metrics.counters("executions_total"))
+        embed.add_field(name="Execution", value=_clip(exec_lines + ([outcomes] if outcomes else [])), inline=False)
+
+    trips = {l["upstream"]: v for l, v in metrics.counters("circuit_trips_total")}
+    rejected = {l["upstream"]: v for l, v in metrics.counters("circuit_rejected_total")}
+    circuit_lines = []
+    for name, b in sorted(breaker.states().items()):
+        state = f"**OPEN** (probe in {b.retry_in():.0f}s)" if b.state == breaker.OPEN else b.state.replace("_", " ")
+        circuit_lines.append(f"`{name}` {state} trips={trips.get(name, 0):g} rejected={rejected.get(name, 0):g}")
+    served = " ".join(f"{l['outcome']}={v:g}" for l, v in metrics.counters("snapshot_serve_total"))
+    if circuit_lines or served:
+        embed.add_field(name="Circuit Breakers", value=_clip(circuit_lines + ([f"served: {served}"] if served else [])), inline=False)
+
+    # Request scheduler: wait per priority class (all upstreams), queued right now
+    waits = {}
+    for l, h in metrics.histograms("scheduler_wait_ms"):
+        merged = waits.setdefault(l["priority"], metrics.Histogram())
+        merged.counts = [x + y for x, y in zip(merged.counts, h.counts)]
+        merged.count += h.count
+        merged.sum += h.sum
+    queued = {}
+    for s in scheduler.schedulers().values():
+        for cls, n in s.queued().items():
+            queued[cls] = queued.get(cls, 0) + n
+    sched_lines = []
+    for cls in scheduler.PRIORITIES:
+        h = waits.get(cls)
+        if h:
+            sched_lines.append(f"`{cls}` n={h.count} p50≤{h.percentile(50):g}ms p95≤{h.percentile(95):g}ms queued={queued.get(cls, 0)}")
+    preempted = sum(v for _, v in metrics.counters("scheduler_preempted_total"))
+    if sched_lines:
+        embed.add_field(name="Request Scheduler", value=_clip(sched_lines + [f"preempted: {preempted:g}"]), inline=False)
+
+    # order_monitor: current interval and per-tick cost by step
+    monitor_lines = [f"`{l['step']}` {summary}" for l, h, summary in _histogram_rows("order_monitor_step_ms")]
+    if monitor_lines:
+        scans = sum(v for _, v in metrics.counters("channel_scans_total"))
+        monitor_lines.append(f"next tick in {monitor_interval.current:g}s, channel scans={scans:g}")
+        embed.add_field(name="Order Monitor", value=_clip(monitor_lines), inline=False)
+
+    await ctx.send(embed=embed)
+
+# 9. TWO-LEG EXECUTION (Admin)
+@bot.command(name="arb_exec")
+@commands.has_permissions(administrator=True)
+@metrics.instrument("cmd:arb_exec")
+async def arb_exec(ctx, ticker: str = None, side: str = "yes", count: int = 1):
+    """
+    Buys a mapped pair on both exchanges at the current asks (a dry run unless EXEC_DRY_RUN=false).
+    Usage: !arb_exec KXNBAGAME-25DEC15BOSMIA-BOS yes 10
+    """
+    if not ticker:
+        await ctx.send("Usage: `!arb_exec <kalshi ticker> <yes|no> <count>`")
+        return
+    ticker, side = ticker.upper(), side.lower()
+    registry = arb_registry.get_registry()
+    registry.reload_if_changed()
+    token = registry.token_for(ticker, side)
+    if token is None:
+        await ctx.send(f"`{ticker}` {side} isn't mapped. Map it with `/setup_arb` first.")
+        return
+
+    k_price, p_price = await execution.quote_pair(ticker, side, token)
+    if k_price is None or p_price is None:
+        await ctx.send("No ask on one side right now.")
+        return
+    # Kalshi orders take whole cents: round a fractional ask up so the limit still reaches it
+    k_price = math.ceil(k_price)
+    if k_price + p_price >= 100:
+        await ctx.send(f"No edge: {k_price:g}¢ + {p_price:g}¢ = {k_price + p_price:g}¢.")
+        return
+
+    result = await execution.get_executor().execute(ticker, side, k_price, token, p_price, count)
+    color = discord.Color.green() if result["status"] in ("filled", "dry_run") else discord.Color.red()
+    embed = discord.Embed(
+        title=f"Arb {result['status'].upper()}: {ticker} {side.upper()}",
+        description=f"{count} × ({k_price:g}¢ Kalshi + {p_price:g}¢ Poly) = {k_price + p_price:g}¢ per pair",
+        color=color,
+    )
+    for name in ("kalshi", "poly", "unwind"):
+        leg = result[name]
+        if leg:
+            value = f"{leg['status']}, filled {leg['filled']}"
+            if leg.get("error"):
+                value += f"\n{leg['error'][:200]}"
+            embed.add_field(name=name.title(), value=value, inline=True)
+    if result["error"]:
+        embed.add_field(name="Note", value=result["error"], inline=False)
+    timings = " ".join(f"{step}={ms:.1f}ms" for step, ms in result["timings"].items())
+    embed.set_footer(text=timings or "no timings")
+    await ctx.send(embed=embed)
+
 if __name__ == "__main__":
     bot.run(DISCORD_TOKEN)
@@ -2,8 +2,13 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from managers.polymarket_manager import search_events, find_polymarket_match
-from managers.mapping_logic import parse_kalshi_ticker, generate_arbitrage_mapping
+from managers.mapping_logic import parse_kalshi_ticker, generate_arbitrage_mapping, build_pair_mapping
 from managers.market_manager import get_market_info
+from managers import metrics
+from managers import tracing
+from managers import batch_mapper
+from managers import arb_registry
+from managers import series_manager
 # We need a way to fetch full kalshi event details. 
 # market_manager.py has `get_market_info` but that might be for a single market.
 # `client.get_event(ticker)`?
@@ -15,12 +20,20 @@ class MarketMapper(commands.Cog):
 
     @app_commands.command(name="setup_arb", description="Map a Kalshi event to Polymarket for arbitrage.")
     @app_commands.checks.has_permissions(administrator=True)
+    @metrics.instrument("cmd:setup_arb")
+    @tracing.traced("cmd.setup_arb")
     async def setup_arb(self, interaction: discord.Interaction, kalshi_ticker: str):
         """
         Interactive setup for arbitrage mapping.
         kalshi_ticker: The Series or Market ticker (e.g. KXNFL-25DEC-KCBAL)
         """
+        tracing.annotate(user_id=interaction.user.id, interaction_id=interaction.id, kalshi_ticker=kalshi_ticker)
         await interaction.response.defer(ephemeral=True)
+
+        # A bare series ticker (no dashes, e.g. KXNFLGAME) maps the whole series
+        if "-" not in kalshi_ticker:
+            await self.setup_series(interaction, kalshi_ticker.upper())
+            return
         
         # 1. Parse Ticker -> Get Event Title
         # For now, heuristic from ticker string
@@ -65,7 +78,6 @@ class MarketMapper(commands.Cog):
         # Or better: Ask user to select sport?
         # Let's try searching the date code?
         
-        candidates = await search_events(query="" , tag_id=450) # NFL default? No.
         # We need a proper query.
         # Let's ask the user to confirm the Poly query if heuristics fail?
         # NO, "The Selection UI" implies we present options.
@@ -95,6 +107,97 @@ class MarketMapper(commands.Cog):
         view = PolySelectionView(poly_candidates[:25], kalshi_ticker, parsed)
         await interaction.followup.send("Select the matching Polymarket event:", view=view)
 
+    async def setup_series(self, interaction, series_ticker):
+        """Batch mode: maps every open event, writes the confident pairs, queues the rest for review."""
+        sport = series_manager.league_for_series(series_ticker)
+        if not sport:
+            await interaction.followup.send(f"⚠️ `{series_ticker}` is not a known game series (see `!search`).")
+            return
+        await interaction.followup.send(f"🔎 Mapping every open `{series_ticker}` event...")
+
+        result = await batch_mapper.map_series(series_ticker, sport)
+        if result["error"]:
+            await interaction.followup.send(f"⚠️ {result['error']}")
+            return
+
+        accepted, review = result["accepted"], result["review"]
+        registry = arb_registry.get_registry()
+        written = None
+        if accepted:
+            written = registry.put_many({a["event_ticker"]: a["entry"] for a in accepted})
+
+        embed = discord.Embed(
+            title=f"Batch Mapping: {series_ticker}",
+            description=f"{result['events']} events, {result['candidates']} Polymarket candidates",
+            color=discord.Color.green() if not review else discord.Color.orange(),
+        )
+        accepted_lines = [f"`{a['event_ticker']}` → {a['candidates'][0]['title']} ({a['candidates'][0]['score']:.2f})" for a in accepted]
+        review_lines = [f"`{r['event_ticker']}` {r['title']}: {r['reason']}" for r in review]
+        embed.add_field(name=f"✅ Accepted ({len(accepted)})", value=_clip(accepted_lines), inline=False)
+        embed.add_field(name=f"🔍 Needs Review ({len(review)})", value=_clip(review_lines), inline=False)
+        if written is None and accepted:
+            embed.set_footer(text="⚠️ Could not write the mapping file, nothing was saved.")
+        elif written is not None:
+            embed.set_footer(text=f"Wrote {len(accepted)} mappings to {registry.path} ({written} total)")
+        await interaction.followup.send(embed=embed)
+
+        # One review prompt per ambiguous event that has something to pick from
+        queued = [r for r in review if r["candidates"]]
+        for item in queued[:REVIEW_PROMPTS_MAX]:
+            await interaction.followup.send(
+                f"**{item['title']}** (`{item['event_ticker']}`): {item['reason']}. Pick the matching event:",
+                view=ReviewView(item),
+            )
+        if len(queued) > REVIEW_PROMPTS_MAX:
+            await interaction.followup.send(f"{len(queued) - REVIEW_PROMPTS_MAX} more need review; run the batch again after these.")
+
+# Review prompts sent per batch (each is one message with a Select)
+REVIEW_PROMPTS_MAX = 10
+
+def _clip(lines, empty="None"):
+    """Joins lines under the 1024-char field limit."""
+    out = ""
+    for line in lines:
+        if len(out) + len(line) + 1 > 1000:
+            out += "\n…"
+            break
+        out += ("\n" if out else "") + line
+    return out or empty
+
+class ReviewView(discord.ui.View):
+    def __init__(self, item):
+        super().__init__(timeout=600)
+        self.item = item
+        options = [
+            discord.SelectOption(label=(c["title"] or "Unknown")[:100], value=str(i), description=f"score {c['score']:.2f}")
+            for i, c in enumerate(item["candidates"][:24])
+        ]
+        options.append(discord.SelectOption(label="None of these", value="skip"))
+        self.add_item(ReviewSelect(options))
+
+class ReviewSelect(discord.ui.Select):
+    def __init__(self, options):
+        super().__init__(placeholder="Choose Event...", min_values=1, max_values=1, options=options)
+
+    @metrics.instrument("ui:setup_arb_review")
+    async def callback(self, interaction: discord.Interaction):
+        item = self.view.item
+        self.view.stop()
+        if self.values[0] == "skip":
+            await interaction.response.edit_message(content=f"⏭️ Skipped `{item['event_ticker']}`.", view=None)
+            return
+        candidate = item["candidates"][int(self.values[0])]
+        entry = batch_mapper.complete_entry(item["kalshi"], candidate["poly"])
+        if entry is None:
+            await interaction.response.edit_message(
+                content=f"❌ `{item['event_ticker']}`: teams did not pair with the outcomes of {candidate['title']}.", view=None)
+            return
+        if arb_registry.get_registry().put(item["event_ticker"], entry) is None:
+            await interaction.response.edit_message(content="❌ Could not write the mapping file.", view=None)
+            return
+        await interaction.response.edit_message(
+            content=f"✅ Mapped `{item['event_ticker']}` → {candidate['title']}.", view=None)
+
 class PolySelectionView(discord.ui.View):
     def __init__(self, candidates, k_ticker, k_parsed):
         super().__init__(timeout=60)
@@ -114,57 +217,39 @@ class PolySelect(discord.ui.Select):
     def __init__(self, options, k_ticker):
         super().__init__(placeholder="Choose Event...", min_values=1, max_values=1, options=options)
         self.k_ticker = k_ticker
+        # Gamma ID per option, for events listed without a slug
+        self.event_ids = {o.value: o.description for o in options}
 
+    @metrics.instrument("ui:setup_arb_select")
+    @tracing.traced("ui.setup_arb_select")
     async def callback(self, interaction: discord.Interaction):
         # 4. Automated Mapping
         slug = self.values[0]
-        full_event = None
-        
-        # We need to fetch full details for the slug to get Markets and Outcomes
-        # We can implement `get_event_by_slug` or search again.
-        # Let's assume we can find it in the previous list logic or fetch anew.
-        # For now, let's assume we have the ID from description.
-        
-        # Actually, we need the FULL market list (YES/NO IDs).
-        # Reuse polymarket_manager to fetch event details?
-        # It has `get_events` with slug?
-        # Let's just use the logic from mapping_logic if passed data.
-        
-        # We'll send a "Generating..." message
+        tracing.annotate(user_id=interaction.user.id, interaction_id=interaction.id, kalshi_ticker=self.k_ticker, slug=slug)
         await interaction.response.send_message(f"🧠 Mapping `{self.k_ticker}` to `{slug}`...", ephemeral=True)
-        
-        # Fetch full poly data (we need markets/outcomes)
-        # Using a helper from polymarket_manager
-        # (We might need to add `get_event_by_slug` there if not exists)
-        from managers.polymarket_manager import search_events
-        events = await search_events(slug) # Search by slug usually returns the exact event
-        if events:
-            poly_data = events[0]
-            
-            # Construct Mock Kalshi Data for logic
-            # We assume K_Ticker ends in Mismatch?
-            # Ticker: KXNFL-DEC-KCBAL
-            # Markets: KCBAL-KC, KCBAL-BAL
-            # We need to split the matchup to get suffixes.
-            matchup = self.view.k_parsed['matchup']
-            # Heuristic split: first half, second half?
-            mid = len(matchup) // 2
-            code_a = matchup[:mid]
-            code_b = matchup[mid:]
-            
-            k_data = {
-                "ticker": self.k_ticker,
-                "markets": [
-                    {"ticker": f"{self.k_ticker}-{code_a}", "outcome": code_a},
-                    {"ticker": f"{self.k_ticker}-{code_b}", "outcome": code_b}
-                ]
-            }
-            
-            config_block = generate_arbitrage_mapping(k_data, poly_data)
-            
-            await interaction.followup.send(f"✅ **Usage:** Copy to `market_config.py`:\n```python\n{config_block}\n```")
+
+        # Exact data for both sides: the Kalshi event (real market tickers and team
+        # names) and the picked Gamma event, fetched concurrently
+        if slug == "unknown":
+            k_data, poly_data, error = await batch_mapper.fetch_pair(self.k_ticker, event_id=self.event_ids.get(slug))
         else:
-            await interaction.followup.send("❌ Error fetching Polymarket details.")
+            k_data, poly_data, error = await batch_mapper.fetch_pair(self.k_ticker, slug=slug)
+        if error:
+            await interaction.followup.send(f"❌ {error}")
+            return
+
+        config_block = generate_arbitrage_mapping(k_data, poly_data)
+        mapping = build_pair_mapping(k_data, poly_data)
+        if not mapping:
+            await interaction.followup.send(f"⚠️ Nothing saved:\n```python\n{config_block}\n```")
+            return
+
+        # Saved to the mapping registry (the scanner and !search pick it up without a restart)
+        registry = arb_registry.get_registry()
+        if registry.put(k_data["ticker"], arb_registry.make_entry(mapping, poly_data)) is None:
+            await interaction.followup.send(f"❌ Could not write `{registry.path}`. Mapping:\n```python\n{config_block}\n```")
+            return
+        await interaction.followup.send(f"✅ Saved to `{registry.path}`:\n```python\n{config_block}\n```")
 
 async def setup(bot):
     await bot.add_cog(MarketMapper(bot))
@@ -0,0 +1,136 @@
+import time
+import asyncio
+import aiohttp
+from .http_client import client_session
+from .auth import sign_request
+from .config import KALSHI_KEY_ID, KALSHI_PRIVATE_KEY_PATH, KALSHI_ACCOUNTS, KALSHI_ACCOUNT_TIMEOUT, KALSHI_API_URL as BASE_URL
+
+# --- Kalshi Accounts ---
+# One KalshiAccount per configured API key, each with its own signer and its
+# own (lazily created, reused) connection pool. query_all() runs a call on
+# every account concurrently with a per-account timeout, so one slow account
+# is reported as stale (with its last good result) instead of holding up the rest.
+
+POOL_SIZE = 10 # connections per account
+
+
+class KalshiAccount:
+    def __init__(self, name, key_id, private_key_path, base_url=None):
+        self.name = name
+        self.key_id = key_id
+        self.private_key_path = private_key_path
+        self.base_url = base_url or BASE_URL
+        self.last_good = {} # kind -> (result, monotonic time)
+        self._session = None
+        self._loop = None
+
+    def __repr__(self):
+        return f"KalshiAccount({self.name!r})"
+
+    @property
+    def configured(self):
+        return bool(self.key_id and self.private_key_path)
+
+    def sign(self, method, endpoint):
+        """Headers for `endpoint` (relative to base_url, e.g. /portfolio/balance)."""
+        return sign_request(method, f"/trade-api/v2{endpoint}", self.key_id, self.private_key_path)
+
+    def session(self):
+        """This account's session; recreated if closed or owned by another event loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = client_session(connector=aiohttp.TCPConnector(limit=POOL_SIZE))
+            self._loop = loop
+        return self._session
+
+    async def get(self, endpoint, params=None):
+        """Signed GET. Returns (json, None) or (None, error string)."""
+        if not self.configured:
+            return None, "Missing Kalshi credentials"
+        try:
+            headers = self.sign("GET", endpoint)
+        except Exception as e:
+            return None, f"Key Error: {e}"
+        try:
+            async with self.session().get(f"{self.base_url}{endpoint}", headers=headers, params=params) as resp:
+                if resp.status == 200:
+                    return await resp.json(), None
+                return None, f"Status {resp.status}: {await resp.text()}"
+        except Exception as e:
+            return None, f"Exception: {e}"
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def parse_accounts(spec):
+    """'name:key_id:key_path,name2:...' -> [KalshiAccount]. Malformed entries are skipped."""
+    accounts = []
+    for entry in (spec or "").split(","):
+        parts = entry.strip().split(":", 2)
+        if len(parts) != 3 or not all(p.strip() for p in parts):
+            if entry.strip():
+                print(f"Warning: ignoring malformed KALSHI_ACCOUNTS entry {entry.strip()!r}")
+            continue
+        name, key_id, key_path = (p.strip() for p in parts)
+        accounts.append(KalshiAccount(name, key_id, key_path))
+    return accounts
+
+
+def _load():
+    accounts = parse_accounts(KALSHI_ACCOUNTS)
+    if not accounts:
+        # Single-account setups keep working with just KALSHI_KEY_ID / KALSHI_PRIVATE_KEY_PATH
+        accounts = [KalshiAccount("main", KALSHI_KEY_ID, KALSHI_PRIVATE_KEY_PATH)]
+    return accounts
+
+
+_accounts = None
+
+def get_accounts():
+    global _accounts
+    if _accounts is None:
+        _accounts = _load()
+    return _accounts
+
+def primary():
+    """First configured account (the P&L engine and single-account callers use it)."""
+    return get_accounts()[0]
+
+def configure(accounts):
+    """Replaces the account list (returns the previous one)."""
+    global _accounts
+    previous, _accounts = _accounts, list(accounts)
+    return previous
+
+async def close_all():
+    for account in _accounts or []:
+        await account.close()
+
+
+async def query_all(kind, fn, timeout=None):
+    """
+    Runs `await fn(account)` for every account concurrently. fn returns (result, error).
+    Returns [{"account", "result", "error", "stale", "age_s"}] in account order.
+    On timeout the account's last good result for `kind` (if any) is returned with stale=True.
+    """
+    timeout = KALSHI_ACCOUNT_TIMEOUT if timeout is None else timeout
+    accounts = get_accounts()
+
+    async def one(account):
+        try:
+            result, error = await asyncio.wait_for(fn(account), timeout)
+        except asyncio.TimeoutError:
+            cached = account.last_good.get(kind)
+            return {
+                "account": account, "result": cached[0] if cached else None,
+                "error": f"timed out after {timeout:g}s", "stale": True,
+                "age_s": time.monotonic() - cached[1] if cached else None,
+            }
+        if error is None:
+            account.last_good[kind] = (result, time.monotonic())
+        return {"account": account, "result": result, "error": error, "stale": False, "age_s": 0.0}
+
+    return await asyncio.gather(*(one(a) for a in accounts))
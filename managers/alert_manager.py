@@ -0,0 +1,170 @@
+import time
+import asyncio
+from bisect import bisect_right
+from . import portfolio_manager
+from . import quote_bus
+from .pnl_manager import yes_equivalent
+from .config import ALERT_MOVE_CENTS, ALERT_LEVELS, ALERT_COOLDOWN
+
+# --- Position Price Alerts ---
+# Keeps the set of held tickers (from positions, then kept current by fills)
+# and subscribes to exactly those tickers on the quote bus. Each quote update
+# is checked in O(1): a move of ALERT_MOVE_CENTS from the reference price, or
+# a crossing of one of ALERT_LEVELS (a bisect over a handful of levels).
+# Alerts per ticker are rate limited by ALERT_COOLDOWN.
+#
+# Prices are the YES mid in cents; alerts are phrased from the held side
+# (a NO holder sees 100 - mid).
+
+
+def _mid(bid, ask):
+    if bid is not None and ask is not None:
+        return (bid + ask) / 2
+    return bid if bid is not None else ask
+
+
+class AlertEngine:
+    def __init__(self, bus=None, send=None, move_cents=ALERT_MOVE_CENTS, levels=ALERT_LEVELS, cooldown=ALERT_COOLDOWN):
+        self.bus = bus or quote_bus.get_bus()
+        self.send = send # async fn(alert dict)
+        self.move_cents = move_cents
+        self.levels = sorted(levels)
+        self.cooldown = cooldown
+        self.held = {} # ticker -> signed YES-equivalent contracts (all accounts)
+        self._ref = {} # ticker -> reference mid (first quote, then last alert)
+        self._band = {} # ticker -> index between levels the mid sits in
+        self._last_alert = {} # ticker -> monotonic time
+        self._tasks = set()
+        self.updates = 0
+        self.alerts = 0
+        self.suppressed = 0
+
+    @property
+    def enabled(self):
+        return bool(self.move_cents or self.levels)
+
+    # --- Held Set ---
+
+    def set_positions(self, positions):
+        """
+        positions: {ticker: signed qty}. Subscribes/unsubscribes only the difference
+        between the old and new held sets. Returns (added, removed).
+        """
+        new = {t: q for t, q in positions.items() if q}
+        old_set, new_set = set(self.held), set(new)
+        added, removed = new_set - old_set, old_set - new_set
+        for t in removed:
+            self.bus.unsubscribe(t, self.on_quote)
+            for state in (self._ref, self._band, self._last_alert):
+                state.pop(t, None)
+        for t in added:
+            self.bus.subscribe(t, self.on_quote)
+        self.held = new
+        return added, removed
+
+    def apply_fills(self, fills):
+        """Applies fills (already deduplicated by the caller) to the held quantities."""
+        positions = dict(self.held)
+        for fill in fills:
+            ticker = fill.get("ticker")
+            if ticker:
+                delta, _ = yes_equivalent(fill)
+                positions[ticker] = positions.get(ticker, 0) + delta
+        return self.set_positions(positions)
+
+    async def refresh_positions(self):
+        """
+        Rebuilds the held set from every account's positions. Tickers of accounts
+        that failed or timed out are kept, so a slow account never drops alerts.
+        """
+        rows = await portfolio_manager.get_all_positions()
+        positions = {}
+        complete = True
+        for row in rows:
+            if row["stale"] or row["result"] is None:
+                complete = False
+                continue
+            for p in row["result"]:
+                positions[p["ticker"]] = positions.get(p["ticker"], 0) + p.get("position", 0)
+        if not complete:
+            for t, q in self.held.items():
+                positions.setdefault(t, q)
+        return self.set_positions(positions)
+
+    # --- Evaluation ---
+
+    def on_quote(self, ticker, bid, ask):
+        qty = self.held.get(ticker)
+        mid = _mid(bid, ask)
+        if not qty or mid is None:
+            return None
+        self.updates += 1
+
+        ref = self._ref.get(ticker)
+        band = bisect_right(self.levels, mid)
+        if ref is None:
+            # First quote since we started holding it: baseline only
+            self._ref[ticker] = mid
+            self._band[ticker] = band
+            return None
+
+        old_band = self._band[ticker]
+        kind = level = None
+        if band != old_band:
+            kind = "cross"
+            level = self.levels[min(band, old_band)]
+        elif self.move_cents and abs(mid - ref) >= self.move_cents:
+            kind = "move"
+        if kind is None:
+            return None
+
+        now = time.monotonic()
+        last = self._last_alert.get(ticker)
+        if last is not None and now - last < self.cooldown:
+            # Keep the reference so the alert fires once the cooldown is over
+            self.suppressed += 1
+            return None
+
+        self._ref[ticker] = mid
+        self._band[ticker] = band
+        self._last_alert[ticker] = now
+        self.alerts += 1
+
+        side = "YES" if qty > 0 else "NO"
+        to_side = (lambda p: p) if qty > 0 else (lambda p: 100 - p)
+        alert = {
+            "ticker": ticker, "kind": kind, "side": side, "qty": abs(qty),
+            "from": to_side(ref), "to": to_side(mid),
+            # favourable for the holder?
+            "up": (mid > ref) == (qty > 0),
+            "level": to_side(level) if level is not None else None,
+            "bid": bid, "ask": ask,
+        }
+        self._emit(alert)
+        return alert
+
+    def _emit(self, alert):
+        if self.send is None:
+            return
+        task = asyncio.get_running_loop().create_task(self.send(alert))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        await self.refresh_positions()
+        self.bus.start()
+
+    def stop(self):
+        """Drops every subscription (the bus itself is shared and stopped by its owner)."""
+        self.set_positions({})
+
+
+_engine = None
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = AlertEngine()
+    return _engine
@@ -0,0 +1,183 @@
+import os
+import json
+from .mapping_logic import mapping_pairs
+from .config import ARB_MAPPINGS_FILE
+
+# --- Arbitrage Mapping Registry ---
+# The mapping file (ARB_MAPPINGS_FILE) holds one block per Kalshi event:
+#   {"KXNBAGAME-25DEC15BOSMIA": {
+#       "KXNBAGAME-25DEC15BOSMIA-BOS-yes": "<poly token>", ...-no, ...   (mapping_logic pairs)
+#       "_poly": {"id", "slug", "title", "outcomes": [...], "tokens": [...]}  (game market, optional)
+#   }, ...}
+# Older files (one NEW_PAIR dict, or a list of them) are read too.
+#
+# It is loaded into a MappingIndex with O(1) lookups by (Kalshi ticker, side),
+# by Polymarket token and by event. An index is never modified: a reload or a
+# write builds a new one and swaps the registry's reference, so readers holding
+# `registry.index` always see one consistent version. reload_if_changed() only
+# stats the file, so users call it before a lookup pass (one os.stat) and pick
+# up edits without a restart, in the bot and in market_daemon.py alike.
+# /setup_arb writes through put_many() (one atomic file replace).
+
+META_KEY = "_poly"
+
+
+def _blocks(data):
+    """Mapping file contents -> {name: block}."""
+    if isinstance(data, list):
+        blocks = data
+    elif data and all(isinstance(v, dict) for v in data.values()):
+        return dict(data)
+    else:
+        blocks = [data] if data else []
+    out = {}
+    for i, block in enumerate(blocks):
+        pairs = mapping_pairs(block)
+        # Name legacy blocks after their event (the Kalshi ticker minus the team code)
+        name = pairs[0][0].rpartition("-")[0] if pairs else f"block-{i}"
+        out[name] = block
+    return out
+
+
+def make_entry(mapping, poly):
+    """
+    mapping: build_pair_mapping() output; poly: its Poly input (id, slug, title and one
+    market per outcome). Returns the block stored per event, with the game metadata.
+    """
+    markets = poly.get("markets", [])
+    entry = dict(mapping)
+    entry[META_KEY] = {
+        "id": poly.get("id"),
+        "slug": poly.get("slug"),
+        "title": poly.get("title"),
+        "outcomes": [m.get("groupItemTitle") for m in markets],
+        "tokens": [str((m.get("clobTokenIds") or [None])[0]) for m in markets],
+    }
+    return entry
+
+
+class MappingIndex:
+    __slots__ = ("events", "by_kalshi", "by_token", "by_market")
+
+    def __init__(self, events):
+        self.events = events # event ticker -> block
+        self.by_kalshi = {} # (kalshi ticker, side) -> poly token
+        self.by_token = {} # poly token -> [(kalshi ticker, side), ...]
+        self.by_market = {} # kalshi ticker -> event ticker
+        for event, block in events.items():
+            for ticker, side, token in mapping_pairs(block):
+                self.by_kalshi[(ticker, side)] = token
+                self.by_token.setdefault(token, []).append((ticker, side))
+                self.by_market[ticker] = event
+
+    def __len__(self):
+        return len(self.events)
+
+
+class MappingRegistry:
+    def __init__(self, path=None):
+        self.path = path or ARB_MAPPINGS_FILE
+        self.index = MappingIndex({})
+        self._stamp = None # (mtime_ns, size) of the file the index was built from
+        self.reloads = 0
+        self.load()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _read(self):
+        with open(self.path, "r") as f:
+            return _blocks(json.load(f))
+
+    def load(self):
+        """(Re)builds the index from the file. A bad file keeps the current index. Returns True if swapped."""
+        stamp = self._stat()
+        if stamp is None:
+            events = {}
+        else:
+            try:
+                events = self._read()
+            except Exception as e:
+                print(f"Error reading {self.path}, keeping {len(self.index)} mappings: {e}")
+                self._stamp = stamp # don't retry until it changes again
+                return False
+        self.index = MappingIndex(events)
+        self._stamp = stamp
+        self.reloads += 1
+        return True
+
+    def reload_if_changed(self):
+        if self._stat() == self._stamp:
+            return False
+        return self.load()
+
+    # --- Writes ---
+
+    def put_many(self, entries):
+        """
+        Merges {event_ticker: block} into the file with one atomic replace and swaps
+        in the new index. Returns the number of events mapped, or None if the file
+        couldn't be read or written (the file and index are left as they were).
+        """
+        events = dict(self.index.events)
+        stamp = self._stat()
+        if stamp != self._stamp:
+            # Edited on disk since we loaded it: merge into what's there now
+            try:
+                events = self._read() if stamp is not None else {}
+            except Exception as e:
+                print(f"Error reading {self.path}: {e}")
+                return None
+        events.update(entries)
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(events, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Error writing {self.path}: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return None
+        self.index = MappingIndex(events)
+        self._stamp = self._stat()
+        return len(events)
+
+    def put(self, event_ticker, entry):
+        return self.put_many({event_ticker: entry})
+
+    # --- Lookups ---
+
+    def token_for(self, kalshi_ticker, side):
+        return self.index.by_kalshi.get((kalshi_ticker, side))
+
+    def sides_for(self, token):
+        return self.index.by_token.get(str(token), [])
+
+    def event(self, event_ticker):
+        return self.index.events.get(event_ticker)
+
+    def event_for_market(self, kalshi_ticker):
+        return self.index.by_market.get(kalshi_ticker)
+
+    def pairs(self):
+        """[(kalshi_ticker, side, poly_token), ...] over every mapped event."""
+        return [(t, s, token) for (t, s), token in self.index.by_kalshi.items()]
+
+    def __len__(self):
+        return len(self.index)
+
+
+_registry = None
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        _registry = MappingRegistry()
+    return _registry
@@ -1,8 +1,53 @@
 import time
 import base64
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import padding
-from cryptography.hazmat.primitives import serialization
+import functools
+
+# `cryptography` is imported lazily (first signed request), keeping it off the startup path.
+
+@functools.lru_cache(maxsize=8)
+def load_private_key(private_key_path):
+    """
+    Loads and caches the RSA key so the .pem is parsed once per process,
+    not once per request.
+    """
+    from cryptography.hazmat.primitives import serialization
+
+    # We read the .pem file as bytes ('rb') and load it into a cryptography object
+    with open(private_key_path, "rb") as key_file:
+        return serialization.load_pem_private_key(
+            key_file.read(),
+            password=None # Kalshi keys usually don't have a password
+        )
+
+class KalshiSigner:
+    """
+    Signing material prepared once: the parsed key plus the PSS padding and hash
+    objects, so a signature is just the RSA operation. Shared per key through
+    get_signer(), which sign_request() and the order path (managers/execution.py) use.
+    """
+
+    def __init__(self, key_id, private_key_path):
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+        self.key_id = key_id
+        self._key = load_private_key(private_key_path)
+        self._hash = hashes.SHA256()
+        self._padding = padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH)
+
+    def headers(self, method, path):
+        """Same headers as sign_request()."""
+        timestamp = str(int(time.time() * 1000))
+        signature = self._key.sign(f"{timestamp}{method}{path}".encode('utf-8'), self._padding, self._hash)
+        return {
+            "KALSHI-ACCESS-KEY": self.key_id,
+            "KALSHI-ACCESS-SIGNATURE": base64.b64encode(signature).decode('utf-8'),
+            "KALSHI-ACCESS-TIMESTAMP": timestamp
+        }
+
+@functools.lru_cache(maxsize=8)
+def get_signer(key_id, private_key_path):
+    """One KalshiSigner per (key id, .pem path) for the life of the process."""
+    return KalshiSigner(key_id, private_key_path)
 
 def sign_request(method, path, key_id, private_key_path):
     """
@@ -20,39 +65,4 @@ def sign_request(method, path, key_id, private_key_path):
             - KALSHI-ACCESS-SIGNATURE
             - KALSHI-ACCESS-TIMESTAMP
     """
-    # 1. Get current timestamp in milliseconds
-    timestamp = str(int(time.time() * 1000))
-
-    # 2. Construct the message to be signed
-    # Format: {timestamp}{method}{path}
-    payload = f"{timestamp}{method}{path}"
-    
-    # 3. Load the private key
-    # We read the .pem file as bytes ('rb') and load it into a cryptography object
-    with open(private_key_path, "rb") as key_file:
-        private_key = serialization.load_pem_private_key(
-            key_file.read(),
-            password=None # Kalshi keys usually don't have a password
-        )
-
-    # 4. Sign the payload using RSA-PSS with SHA256
-    # This is the cryptographic standard Kalshi requires to prove YOU are the one sending the request.
-    signature = private_key.sign(
-        payload.encode('utf-8'), # Convert string to bytes
-        padding.PSS(
-            mgf=padding.MGF1(hashes.SHA256()),
-            salt_length=padding.PSS.MAX_LENGTH
-        ),
-        hashes.SHA256()
-    )
-
-    # 5. Encode the signature in Base64
-    # The signature is raw bytes, so we convert it to a string for the HTTP header
-    signature_b64 = base64.b64encode(signature).decode('utf-8')
-
-    # 6. Return the headers
-    return {
-        "KALSHI-ACCESS-KEY": key_id,
-        "KALSHI-ACCESS-SIGNATURE": signature_b64,
-        "KALSHI-ACCESS-TIMESTAMP": timestamp
-    }
+    return get_signer(key_id, private_key_path).headers(method, path)
@@ -0,0 +1,215 @@
+import os
+import re
+import asyncio
+from datetime import datetime
+from . import config
+from . import market_manager
+from . import polymarket_manager
+from . import tracing
+from . import series_manager
+from .arb_registry import make_entry
+from .mapping_logic import build_pair_mapping
+from .match_pool import MatchExecutor, DEFAULT_CHUNK_SIZE
+from .config import BATCH_ACCEPT_SCORE, BATCH_MIN_MARGIN
+
+# --- Batch Mapping (/setup_arb <series ticker>) ---
+# Maps every open event of a Kalshi game series in one pass:
+#   1. the series' events (markets nested) and the league's Gamma events are
+#      fetched concurrently: one Kalshi request, one paged Gamma tag scan;
+#   2. every Kalshi title is ranked against the Gamma events at once in the
+#      MatchExecutor process pool;
+#   3. a pair is accepted when its best candidate (same game day) scores at
+#      least BATCH_ACCEPT_SCORE, leads the runner-up by BATCH_MIN_MARGIN and
+#      both teams pair with an outcome token. Everything else is queued for
+#      review with its candidates;
+#   4. accepted entries are written to the mapping registry (arb_registry) in
+#      one atomic write.
+
+
+def _ticker_day(event_ticker):
+    """KXNBAGAME-25DEC15BOSMIA -> date(2025, 12, 15), or None."""
+    match = re.search(r'-(\d{2})([A-Z]{3})(\d{2})', event_ticker or "")
+    if not match:
+        return None
+    try:
+        return datetime.strptime("".join(match.groups()), "%y%b%d").date()
+    except ValueError:
+        return None
+
+
+def _slug_day(slug):
+    """nba-bos-mia-2025-12-15 -> date(2025, 12, 15), or None."""
+    match = re.search(r'(\d{4}-\d{2}-\d{2})$', slug or "")
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def kalshi_side(event, sport):
+    """Kalshi event (markets nested) -> build_pair_mapping input, team names translated to Poly nicknames."""
+    team_map = polymarket_manager.TEAM_MAPS.get(sport, {})
+    markets = []
+    for m in event.get("markets", []):
+        name = (m.get("yes_sub_title") or m.get("subtitle") or "").strip()
+        markets.append({"ticker": m.get("ticker"), "outcome": team_map.get(name.lower(), name)})
+    return {"ticker": event.get("event_ticker"), "markets": markets}
+
+
+def poly_side(event):
+    """Gamma event -> build_pair_mapping input: one entry per outcome of the game market (its YES token)."""
+    market = polymarket_manager.select_game_market(event)
+    if market is None:
+        return None
+    # Gamma events are projected at ingest, so these are already lists
+    outcomes = market.get("outcomes") or []
+    tokens = market.get("clobTokenIds") or []
+    return {
+        "id": event.get("id"),
+        "slug": event.get("slug"),
+        "title": event.get("title"),
+        "markets": [{"groupItemTitle": o, "clobTokenIds": [t]} for o, t in zip(outcomes, tokens)],
+    }
+
+
+def complete_entry(k_data, poly):
+    """Registry entry (see arb_registry.make_entry), or None unless every Kalshi market got both sides."""
+    mapping = build_pair_mapping(k_data, poly)
+    if not mapping or len(mapping) != 2 * len(k_data["markets"]):
+        return None
+    return make_entry(mapping, poly)
+
+
+def decide(event, ranked, sport, accept=BATCH_ACCEPT_SCORE, margin=BATCH_MIN_MARGIN):
+    """
+    event: Kalshi event with markets; ranked: [(gamma_event, score), ...] best first.
+    Returns {"event_ticker", "title", "status": "accepted"|"review", "reason", "kalshi",
+             "entry" (accepted only), "candidates": [{"title", "slug", "score", "poly"}, ...]}
+    "kalshi" and each candidate's "poly" are build_pair_mapping inputs, so a reviewer's
+    pick can be mapped without fetching anything again.
+    """
+    day = _ticker_day(event.get("event_ticker"))
+    candidates = []
+    exact_day = False
+    for gamma_event, score in ranked:
+        slug_day = _slug_day(gamma_event.get("slug"))
+        offset = abs((slug_day - day).days) if day and slug_day else None
+        if offset is not None and offset > 1:
+            continue # same teams, another game
+        poly = poly_side(gamma_event)
+        if poly is not None:
+            exact_day = exact_day or offset == 0
+            candidates.append({"title": gamma_event.get("title"), "slug": gamma_event.get("slug"),
+                               "score": round(score, 3), "poly": poly, "offset": offset})
+    if exact_day:
+        # A slug on the game day beats one a day off (time zones), e.g. back-to-backs
+        candidates = [c for c in candidates if c["offset"] != 1]
+    for c in candidates:
+        del c["offset"]
+
+    k_data = kalshi_side(event, sport)
+    result = {"event_ticker": event.get("event_ticker"), "title": event.get("title"),
+              "status": "review", "reason": None, "kalshi": k_data, "candidates": candidates}
+    if not candidates:
+        result["reason"] = "no candidates"
+        return result
+    best = candidates[0]
+    runner_up = candidates[1]["score"] if len(candidates) > 1 else 0.0
+    if best["score"] < accept:
+        result["reason"] = f"best score {best['score']:.2f}"
+        return result
+    if best["score"] - runner_up < margin:
+        result["reason"] = f"ambiguous ({best['score']:.2f} vs {runner_up:.2f})"
+        return result
+
+    entry = complete_entry(k_data, best["poly"])
+    if entry is None:
+        result["reason"] = "teams did not pair with outcomes"
+        return result
+    result["status"] = "accepted"
+    result["entry"] = entry
+    return result
+
+
+# --- Single Events (/setup_arb <event ticker>) ---
+# The picked pair is fetched exactly: the Kalshi event with its markets by ticker
+# and the Gamma event by slug (or ID), concurrently. Two small requests.
+
+async def fetch_kalshi_event(ticker):
+    """Event by ticker; a market ticker (one more "-CODE") falls back to its event."""
+    event = await market_manager.get_event(ticker)
+    if event is None and ticker.count("-") >= 2:
+        event = await market_manager.get_event(ticker.rpartition("-")[0])
+    return event
+
+
+async def fetch_pair(kalshi_ticker, slug=None, event_id=None):
+    """
+    Returns (k_data, poly, error): build_pair_mapping inputs for one Kalshi event and
+    one Gamma event (the game market's outcomes when it has one, else every market).
+    """
+    k_event, gamma_event = await asyncio.gather(
+        fetch_kalshi_event(kalshi_ticker),
+        polymarket_manager.get_event(slug=slug, event_id=event_id),
+    )
+    if k_event is None:
+        return None, None, f"Kalshi event `{kalshi_ticker}` not found."
+    if gamma_event is None:
+        return None, None, f"Polymarket event `{slug or event_id}` not found."
+    sport = series_manager.league_for_series(k_event.get("series_ticker") or kalshi_ticker.partition("-")[0])
+    poly = poly_side(gamma_event) or gamma_event
+    return kalshi_side(k_event, sport), poly, None
+
+
+async def fetch_candidates(sport):
+    """Every active Gamma event under the league's tag (the whole scan when there is no tag)."""
+    tag_id = polymarket_manager.sport_tag_id(sport)
+    events = []
+    async for page in polymarket_manager.iter_event_pages(tag_id=tag_id):
+        events.extend(page)
+    return events
+
+
+@tracing.traced("mapper.map_series")
+async def map_series(series_ticker, sport, accept=BATCH_ACCEPT_SCORE, margin=BATCH_MIN_MARGIN, workers=None):
+    """
+    Returns {"series_ticker", "sport", "error", "events", "candidates",
+             "accepted": [result, ...], "review": [result, ...]} (see decide()).
+    Nothing is written; pass the accepted entries to arb_registry.put_many().
+    """
+    tracing.annotate(series_ticker=series_ticker, sport=sport)
+    out = {"series_ticker": series_ticker, "sport": sport, "error": None,
+           "events": 0, "candidates": 0, "accepted": [], "review": []}
+    events, gamma_events = await asyncio.gather(
+        market_manager.get_series_events(series_ticker),
+        fetch_candidates(sport),
+    )
+    if isinstance(events, str):
+        out["error"] = events
+        return out
+    if not events:
+        out["error"] = "No open events."
+        return out
+    out["events"] = len(events)
+    out["candidates"] = len(gamma_events)
+
+    if gamma_events:
+        # No more workers than there are chunks to hand out
+        chunks = -(-len(events) // DEFAULT_CHUNK_SIZE)
+        workers = workers or min(config.MATCH_WORKERS or os.cpu_count() or 1, chunks)
+        executor = await MatchExecutor(gamma_events, workers=workers).start()
+        try:
+            ranked = await executor.rank([(e.get("title") or "", sport) for e in events])
+        finally:
+            executor.close()
+    else:
+        ranked = [[] for _ in events]
+
+    for event, candidates in zip(events, ranked):
+        result = decide(event, candidates, sport, accept, margin)
+        out[result["status"]].append(result)
+    tracing.annotate(accepted=len(out["accepted"]), review=len(out["review"]))
+    return out
+
@@ -0,0 +1,236 @@
+import time
+import asyncio
+from . import snapshot_service
+from . import scheduler
+from .config import BOARD_REFRESH, BOARD_MIN_EDIT_INTERVAL, BOARD_DEBOUNCE, BOARD_TTL
+
+# --- Live Boards ---
+# A board is a posted message that is edited in place as its snapshot changes.
+#
+# BoardFeed: one refresh loop per (series, sport, market type), shared by every
+#   board showing it, in any channel. It renders each game's field once per
+#   change: fields are cached by game and only re-rendered when the game's
+#   fingerprint (the inputs the renderer reads) differs.
+# Board: one message. Updates mark it dirty; edits are debounced and coalesced
+#   (at most one per BOARD_MIN_EDIT_INTERVAL) and skipped entirely when the
+#   rendered fields are identical to what the message already shows.
+#   Boards expire after BOARD_TTL: the feed loop closes expired boards before
+#   each refresh (a quiet market never edits, so flush() alone isn't enough),
+#   and stops once no board is left.
+#
+# Rendering itself is passed in (views.render_game_field / game_fingerprint /
+# board_embed), so this module has no Discord dependency.
+
+
+EXPIRED_NOTE = "Board expired. Run `!board` again for live prices."
+
+
+class BoardFeed:
+    def __init__(self, series_ticker, sport, market_type, render_field, fingerprint,
+                 max_fields=4, refresh=BOARD_REFRESH, fetch=None):
+        self.series_ticker = series_ticker
+        self.sport = sport
+        self.market_type = market_type
+        self.render_field = render_field
+        self.fingerprint = fingerprint
+        self.max_fields = max_fields
+        self.refresh_interval = refresh
+        self.fetch = fetch or snapshot_service.get_snapshot
+        self.boards = set()
+        self.snapshot = None
+        self.error = None
+        self.version = 0
+        self._fields = [] # rendered (name, value) for the current version
+        self._cache = {} # game key -> (fingerprint, field or None)
+        self._task = None
+        self.fetches = 0
+        self.renders = 0
+        self.reused = 0
+
+    @property
+    def key(self):
+        return (self.series_ticker, self.sport, self.market_type)
+
+    def fields(self):
+        return self._fields
+
+    async def refresh(self):
+        """Fetches a snapshot, re-renders changed games and notifies boards if anything changed."""
+        self.fetches += 1
+        snapshot = await self.fetch(self.series_ticker, self.sport, self.market_type)
+        if snapshot.get("error"):
+            # Keep showing the last good data
+            self.error = snapshot["error"]
+            return False
+        self.error = None
+        self.snapshot = snapshot
+
+        fields, cache = [], {}
+        for item in snapshot["games"]:
+            if len(fields) >= self.max_fields:
+                break
+            key = item["game"].get("event_ticker") or item["game"].get("event_title")
+            fp = self.fingerprint(item, self.market_type)
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == fp:
+                field = cached[1]
+                self.reused += 1
+            else:
+                field = self.render_field(item, self.market_type)
+                self.renders += 1
+            cache[key] = (fp, field)
+            if field:
+                fields.append(field)
+        self._cache = cache
+
+        if fields == self._fields and self.version:
+            return False
+        self._fields = fields
+        self.version += 1
+        for board in list(self.boards):
+            board.mark_dirty()
+        return True
+
+    async def _run(self):
+        while self.boards:
+            await asyncio.sleep(self.refresh_interval)
+            now = time.monotonic()
+            for board in [b for b in self.boards if now >= b.expires]:
+                await board.close(EXPIRED_NOTE)
+            if not self.boards:
+                break
+            try:
+                # Started by !board, but the refreshes are background work
+                with scheduler.priority(scheduler.REFRESH):
+                    await self.refresh()
+            except Exception as e:
+                print(f"Board refresh failed for {self.key}: {e}")
+
+    def attach(self, board):
+        self.boards.add(board)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def detach(self, board):
+        self.boards.discard(board)
+        if not self.boards and self._task is not None:
+            if self._task is not asyncio.current_task(): # the loop itself stops on its own
+                self._task.cancel()
+            self._task = None
+
+
+class Board:
+    """
+    edit: async fn(payload) that edits the message.
+    assemble: fn(fields, feed, note) -> payload (e.g. views.board_embed).
+    """
+
+    def __init__(self, feed, edit, assemble, min_interval=BOARD_MIN_EDIT_INTERVAL,
+                 debounce=BOARD_DEBOUNCE, ttl=BOARD_TTL):
+        self.feed = feed
+        self.edit = edit
+        self.assemble = assemble
+        self.min_interval = min_interval
+        self.debounce = debounce
+        self.expires = time.monotonic() + ttl
+        self.closed = False
+        self._shown = feed.fields() # what the message displays right now
+        self._dirty = False
+        self._timer = None
+        self._last_edit = time.monotonic()
+        self.updates = 0
+        self.coalesced = 0
+        self.edits = 0
+        self.unchanged = 0
+
+    def mark_dirty(self):
+        if self.closed:
+            return
+        self.updates += 1
+        self._dirty = True
+        if self._timer is not None:
+            self.coalesced += 1
+            return
+        delay = max(self.debounce, self._last_edit + self.min_interval - time.monotonic())
+        self._timer = asyncio.get_running_loop().create_task(self._flush_after(delay))
+
+    async def _flush_after(self, delay):
+        try:
+            await asyncio.sleep(delay)
+            while self._dirty and not self.closed:
+                self._dirty = False
+                await self.flush()
+                if self._dirty:
+                    # More updates arrived during the edit: one more, once the interval allows
+                    await asyncio.sleep(max(0.0, self._last_edit + self.min_interval - time.monotonic()))
+        finally:
+            self._timer = None
+
+    async def flush(self):
+        if time.monotonic() >= self.expires:
+            await self.close(EXPIRED_NOTE)
+            return
+        fields = self.feed.fields()
+        if fields == self._shown:
+            self.unchanged += 1
+            return
+        try:
+            await self.edit(self.assemble(fields, self.feed, None))
+        except Exception as e:
+            # Message deleted / no access: nothing left to update
+            print(f"Board edit failed, closing: {e}")
+            await self.close()
+            return
+        self._shown = fields
+        self._last_edit = time.monotonic()
+        self.edits += 1
+
+    async def close(self, note=None):
+        if self.closed:
+            return
+        self.closed = True
+        self.feed.detach(self)
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        if note:
+            try:
+                await self.edit(self.assemble(self._shown, self.feed, note))
+            except Exception:
+                pass
+
+
+# --- Registry ---
+
+_feeds = {} # (series, sport, market type) -> BoardFeed
+_boards = {} # (channel id, feed key) -> Board
+
+def get_feed(series_ticker, sport, market_type, render_field, fingerprint, **kwargs):
+    key = (series_ticker, sport, market_type)
+    feed = _feeds.get(key)
+    if feed is None or not feed.boards:
+        # Feeds with no boards left are rebuilt (their data is stale anyway)
+        feed = _feeds[key] = BoardFeed(series_ticker, sport, market_type, render_field, fingerprint, **kwargs)
+    return feed
+
+async def open_board(channel_id, feed, edit, assemble, **kwargs):
+    """Starts a board (replacing this channel's board for the same feed, if any)."""
+    old = _boards.get((channel_id, feed.key))
+    if old is not None:
+        await old.close("Replaced by a newer board.")
+    board = Board(feed, edit, assemble, **kwargs)
+    _boards[(channel_id, feed.key)] = board
+    feed.attach(board)
+    return board
+
+async def close_channel(channel_id):
+    """Stops every board in a channel. Returns how many were stopped."""
+    keys = [k for k in _boards if k[0] == channel_id]
+    for k in keys:
+        await _boards.pop(k).close("Board stopped.")
+    return len(keys)
+
+def active_boards():
+    for k, b in list(_boards.items()):
+        if b.closed:
+            del _boards[k]
+    return list(_boards.values())
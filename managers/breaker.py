@@ -0,0 +1,101 @@
+import time
+import aiohttp
+from . import metrics
+from .config import BREAKER_FAILURES, BREAKER_COOLDOWN
+
+# --- Circuit Breakers ---
+# One breaker per upstream (kalshi, gamma, clob), fed by every request made
+# through http_client. After BREAKER_FAILURES consecutive failures (5xx, 429,
+# connection errors, timeouts) it opens: requests to that upstream fail at once
+# with CircuitOpenError instead of adding load to a venue that is down. After
+# BREAKER_COOLDOWN seconds one probe request is let through (half open); its
+# success closes the breaker, its failure opens it for another cooldown.
+# Exported as circuit_state{upstream} (0 closed, 1 half open, 2 open), plus
+# circuit_trips_total and circuit_rejected_total.
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+metrics.describe("circuit_state", "Circuit breaker state per upstream (0 closed, 1 half open, 2 open).")
+metrics.describe("circuit_trips_total", "Times each upstream's breaker opened.")
+metrics.describe("circuit_rejected_total", "Requests failed fast by an open breaker.")
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Raised instead of sending a request to an upstream whose breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, name, failures=None, cooldown=None):
+        self.name = name
+        self.failures = failures or BREAKER_FAILURES
+        self.cooldown = cooldown if cooldown is not None else BREAKER_COOLDOWN
+        self.state = CLOSED
+        self.consecutive = 0
+        self.opened_at = None
+        self._probe_at = None # when the half-open probe went out
+        self._set(CLOSED)
+
+    def _set(self, state):
+        self.state = state
+        metrics.set_value("circuit_state", STATE_VALUES[state], upstream=self.name)
+
+    def allow(self):
+        """True if a request may go out now (counts it as the probe when half open)."""
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now - self.opened_at < self.cooldown:
+                return False
+            self._set(HALF_OPEN)
+            self._probe_at = None
+        # Half open: one probe at a time (a probe that never reported back expires)
+        if self._probe_at is not None and now - self._probe_at < self.cooldown:
+            return False
+        self._probe_at = now
+        return True
+
+    def record_success(self):
+        self.consecutive = 0
+        if self.state != CLOSED:
+            self._probe_at = None
+            self._set(CLOSED)
+
+    def record_failure(self):
+        self.consecutive += 1
+        if self.state == OPEN:
+            return
+        if self.state == HALF_OPEN or self.consecutive >= self.failures:
+            self.opened_at = time.monotonic()
+            self._probe_at = None
+            metrics.inc("circuit_trips_total", upstream=self.name)
+            self._set(OPEN)
+
+    def release(self):
+        """A request ended without an answer either way (cancelled by its caller)."""
+        self._probe_at = None
+
+    def retry_in(self):
+        """Seconds until an open breaker lets a probe through (0 otherwise)."""
+        if self.state != OPEN:
+            return 0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+
+_breakers = {}
+
+def get(upstream):
+    b = _breakers.get(upstream)
+    if b is None:
+        b = _breakers[upstream] = CircuitBreaker(upstream)
+    return b
+
+def states():
+    """{upstream: breaker} for every upstream seen so far."""
+    return dict(_breakers)
+
+def reset():
+    _breakers.clear()
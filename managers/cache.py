@@ -0,0 +1,90 @@
+import time
+import asyncio
+from collections import OrderedDict
+from . import metrics
+from . import scheduler
+
+class TTLCache:
+    """
+    Small in-memory TTL cache with single-flight loading.
+
+    - get_or_load(): concurrent callers for the same key share one upstream fetch.
+    - Entries expire after `ttl` seconds; the least recently used entry is
+      evicted once `maxsize` is reached.
+    - Hits/misses are reported to metrics under `name`.
+    """
+
+    def __init__(self, name, ttl, maxsize=256):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict() # key -> (stored_at, value)
+        self._inflight = {} # key -> (Future, SharedPriority)
+
+    def _fresh(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl:
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def get(self, key, default=None):
+        entry = self._fresh(key)
+        if entry is None:
+            metrics.cache_miss(self.name)
+            return default
+        metrics.cache_hit(self.name)
+        return entry[1]
+
+    def peek(self, key):
+        """Returns (value, age_seconds) even if expired, or (None, None). No metrics."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None, None
+        return entry[1], time.monotonic() - entry[0]
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._data.clear()
+        else:
+            self._data.pop(key, None)
+
+    def __contains__(self, key):
+        return self._fresh(key) is not None
+
+    async def get_or_load(self, key, loader, cache_if=None):
+        """
+        Returns the cached value or awaits loader() once for all concurrent callers.
+        cache_if(value) -> bool decides whether a loaded value is stored (e.g. skip errors).
+        """
+        entry = self._fresh(key)
+        if entry is not None:
+            metrics.cache_hit(self.name)
+            return entry[1]
+        metrics.cache_miss(self.name)
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = self._inflight[key] = scheduler.start_shared(self._load(key, loader, cache_if))
+        else:
+            scheduler.join(inflight[1]) # runs at the highest waiting caller's priority
+        # shield: one cancelled caller must not cancel the shared load
+        return await asyncio.shield(inflight[0])
+
+    async def _load(self, key, loader, cache_if):
+        try:
+            value = await loader()
+            if cache_if is None or cache_if(value):
+                self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
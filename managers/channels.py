@@ -0,0 +1,37 @@
+from . import metrics
+
+# --- Channel Resolution ---
+# Background tasks post to channels by name (#order-logs, ALERT_CHANNEL).
+# Finding one by name is a scan of every channel in every guild, so each name
+# is resolved once and kept as a channel ID; later lookups are one
+# client.get_channel(id). A name that matched nothing is remembered too.
+# bot.py invalidates on channel create/delete/update and guild join/remove,
+# and a cached ID whose channel is gone or renamed is rescanned anyway.
+
+metrics.describe("channel_scans_total", "Full channel scans to resolve a channel by name.")
+
+
+class ChannelResolver:
+    def __init__(self, client):
+        self.client = client
+        self._ids = {} # name -> channel id, None if no channel had that name
+
+    def get(self, name):
+        """The channel named `name` (first match across guilds), or None."""
+        if name in self._ids:
+            channel_id = self._ids[name]
+            if channel_id is None:
+                return None
+            channel = self.client.get_channel(channel_id)
+            if channel is not None and channel.name == name:
+                return channel
+        return self._scan(name)
+
+    def _scan(self, name):
+        metrics.inc("channel_scans_total", channel=name)
+        channel = next((c for c in self.client.get_all_channels() if c.name == name), None)
+        self._ids[name] = channel.id if channel is not None else None
+        return channel
+
+    def invalidate(self):
+        self._ids.clear()
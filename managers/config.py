@@ -0,0 +1,126 @@
+import os
+from pathlib import Path
+
+# --- Configuration ---
+# The .env file is read exactly once per process, here. Every other module
+# imports its settings from this module instead of calling load_dotenv() itself.
+
+# Next to bot.py, wherever the bot is started from
+ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+ENV_FOUND = ENV_PATH.exists()
+
+if ENV_FOUND:
+    # python-dotenv is only needed when there is a file to parse
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=ENV_PATH)
+
+# Discord
+DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
+
+# Kalshi
+KALSHI_KEY_ID = os.getenv("KALSHI_KEY_ID")
+KALSHI_PRIVATE_KEY_PATH = os.getenv("KALSHI_PRIVATE_KEY_PATH")
+KALSHI_HOST = "https://api.elections.kalshi.com"
+KALSHI_API_URL = f"{KALSHI_HOST}/trade-api/v2"
+# Extra accounts for !bal / !pos / order_monitor: "name:key_id:key_path,name2:..."
+# Unset = one account ("main") from KALSHI_KEY_ID / KALSHI_PRIVATE_KEY_PATH.
+KALSHI_ACCOUNTS = os.getenv("KALSHI_ACCOUNTS")
+# Seconds before a slow account is shown as stale
+KALSHI_ACCOUNT_TIMEOUT = float(os.getenv("KALSHI_ACCOUNT_TIMEOUT", "4"))
+
+# Polymarket
+POLY_API_KEY = os.getenv("POLY_API_KEY")
+POLY_SECRET = os.getenv("POLY_SECRET")
+POLY_PASSPHRASE = os.getenv("POLY_PASSPHRASE")
+POLY_WALLET_KEY = os.getenv("POLY_WALLET_KEY")
+POLY_PROXY_ADDRESS = os.getenv("POLY_PROXY_ADDRESS")
+POLY_CLOB_URL = "https://clob.polymarket.com"
+
+# Order book depth: contracts used for the executable prices shown in !search
+DEPTH_TARGET_QTY = int(os.getenv("DEPTH_TARGET_QTY", "100"))
+
+# Quote history recorder (managers/quote_store.py). Unset = don't record.
+QUOTE_HISTORY_DIR = os.getenv("QUOTE_HISTORY_DIR")
+
+# Incremental P&L state (fill cursor + aggregates) for !pnl
+PNL_STATE_FILE = os.getenv("PNL_STATE_FILE", "pnl_state.json")
+
+# Price-move alerts for held positions (managers/alert_manager.py).
+# Alert when the price moves ALERT_MOVE_CENTS from the last alert (0 = off) or
+# crosses one of ALERT_LEVELS (comma-separated cents, e.g. "25,50,75").
+ALERT_CHANNEL = os.getenv("ALERT_CHANNEL", "price-alerts")
+ALERT_MOVE_CENTS = float(os.getenv("ALERT_MOVE_CENTS", "5"))
+ALERT_LEVELS = [float(x) for x in os.getenv("ALERT_LEVELS", "").split(",") if x.strip()]
+ALERT_COOLDOWN = float(os.getenv("ALERT_COOLDOWN", "300")) # seconds per ticker
+# Seconds between batched quote polls for subscribed tickers, and between position resyncs
+QUOTE_POLL_INTERVAL = float(os.getenv("QUOTE_POLL_INTERVAL", "5"))
+ALERT_POSITION_REFRESH = float(os.getenv("ALERT_POSITION_REFRESH", "300"))
+
+# Per-user watchlists (!watch): persisted index, per-user cap, and DM rules per ticker
+WATCHLIST_FILE = os.getenv("WATCHLIST_FILE", "watchlists.json")
+WATCH_MAX_PER_USER = int(os.getenv("WATCH_MAX_PER_USER", "25"))
+WATCH_MIN_MOVE = float(os.getenv("WATCH_MIN_MOVE", "1")) # cents of mid move before a DM
+WATCH_COOLDOWN = float(os.getenv("WATCH_COOLDOWN", "60")) # seconds between DMs per ticker
+
+# Live boards (!board): snapshot refresh, edit pacing per message, and lifetime (seconds)
+BOARD_REFRESH = float(os.getenv("BOARD_REFRESH", "5"))
+BOARD_MIN_EDIT_INTERVAL = float(os.getenv("BOARD_MIN_EDIT_INTERVAL", "2"))
+BOARD_DEBOUNCE = float(os.getenv("BOARD_DEBOUNCE", "0.5"))
+BOARD_TTL = float(os.getenv("BOARD_TTL", "3600"))
+
+# Menu prefetch (!search): series warmed per user while they click through the menu
+# (0 = off), warms running at once across all users, and how long a warm counts (seconds)
+PREFETCH_MAX_SERIES = int(os.getenv("PREFETCH_MAX_SERIES", "6"))
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", "2"))
+PREFETCH_TTL = float(os.getenv("PREFETCH_TTL", "10"))
+
+# Arbitrage mappings written by /setup_arb ({event ticker: {"<kalshi ticker>-yes": poly token, ...}})
+ARB_MAPPINGS_FILE = os.getenv("ARB_MAPPINGS_FILE", "arb_mappings.json")
+# Batch /setup_arb <series>: auto-accept a match scoring at least this, ahead of the runner-up by the margin
+BATCH_ACCEPT_SCORE = float(os.getenv("BATCH_ACCEPT_SCORE", "0.85"))
+BATCH_MIN_MARGIN = float(os.getenv("BATCH_MIN_MARGIN", "0.1"))
+
+# Two-leg execution (!arb_exec, managers/execution.py). Dry run (sign, don't send) unless false.
+EXEC_DRY_RUN = os.getenv("EXEC_DRY_RUN", "true").lower() not in ("0", "false", "no")
+EXEC_TIMEOUT = float(os.getenv("EXEC_TIMEOUT", "2")) # seconds per leg
+EXEC_UNWIND = os.getenv("EXEC_UNWIND", "flatten") # one-sided fill: "flatten" (sell the excess) or "hold"
+EXEC_MAX_CONTRACTS = int(os.getenv("EXEC_MAX_CONTRACTS", "100"))
+EXEC_KEEPALIVE = float(os.getenv("EXEC_KEEPALIVE", "20")) # seconds between connection keep-warm pings
+
+# Serving !search results: seconds before the last good snapshot is shown instead (marked stale),
+# how old that snapshot may be, and how long a stale or late reply keeps waiting for fresh data
+SERVE_DEADLINE = float(os.getenv("SERVE_DEADLINE", "2.5"))
+SERVE_STALE_MAX = float(os.getenv("SERVE_STALE_MAX", "600"))
+SERVE_LATE_WAIT = float(os.getenv("SERVE_LATE_WAIT", "20"))
+# Circuit breakers per upstream: consecutive failures before opening, seconds before a probe
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "30"))
+
+# Upstream request scheduler: requests/second per upstream (0 = no limit), requests in flight
+# per upstream, and how many of those slots only interactive requests (commands, buttons) may use
+SCHED_RATE_KALSHI = float(os.getenv("SCHED_RATE_KALSHI", "20"))
+SCHED_RATE_GAMMA = float(os.getenv("SCHED_RATE_GAMMA", "50"))
+SCHED_RATE_CLOB = float(os.getenv("SCHED_RATE_CLOB", "50"))
+SCHED_CONCURRENCY = int(os.getenv("SCHED_CONCURRENCY", "16"))
+SCHED_RESERVED = int(os.getenv("SCHED_RESERVED", "4"))
+
+# order_monitor polling: seconds between fill checks right after a fill, the idle ceiling,
+# and the factor the interval grows by on each tick without fills
+MONITOR_MIN_INTERVAL = float(os.getenv("MONITOR_MIN_INTERVAL", "2"))
+MONITOR_MAX_INTERVAL = float(os.getenv("MONITOR_MAX_INTERVAL", "15"))
+MONITOR_BACKOFF = float(os.getenv("MONITOR_BACKOFF", "1.5"))
+
+# Market data service (market_daemon.py). Unset = build snapshots in-process.
+MARKET_DAEMON_SOCKET = os.getenv("MARKET_DAEMON_SOCKET")
+
+# Worker processes for slate matching (managers/match_pool.py). 0 = one per CPU.
+MATCH_WORKERS = int(os.getenv("MATCH_WORKERS", "0"))
+
+# Ops
+# Structured JSON tracing spans on stdout
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "").lower() in ("1", "true", "yes")
+# Prometheus-text endpoint (local only). Set to 0 to disable.
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+# Persisted hash of the registered slash commands (sync only when it changes)
+TREE_STATE_FILE = os.getenv("TREE_STATE_FILE", "command_tree_state.json")
+FORCE_TREE_SYNC = os.getenv("FORCE_TREE_SYNC", "").lower() in ("1", "true", "yes")
@@ -0,0 +1,480 @@
+import json
+import time
+import uuid
+import hmac
+import base64
+import hashlib
+import asyncio
+import aiohttp
+from . import metrics
+from . import tracing
+from . import orderbook_manager
+from .http_client import client_session
+from .auth import get_signer
+from .config import (
+    KALSHI_KEY_ID, KALSHI_PRIVATE_KEY_PATH, KALSHI_API_URL,
+    POLY_API_KEY, POLY_SECRET, POLY_PASSPHRASE, POLY_WALLET_KEY, POLY_PROXY_ADDRESS, POLY_CLOB_URL,
+    EXEC_DRY_RUN, EXEC_TIMEOUT, EXEC_UNWIND, EXEC_MAX_CONTRACTS, EXEC_KEEPALIVE,
+)
+
+# --- Two-Leg Execution ---
+# Buys both sides of a hedged pair (a Kalshi contract and the Polymarket token
+# that pays when it doesn't, see arb_registry) at the same time:
+#   * prepare() runs before any opportunity: parses both keys, builds the Poly
+#     order signer for each exchange contract, and opens one connection per
+#     exchange, kept warm by a ping every EXEC_KEEPALIVE seconds. A token's tick
+#     size / neg-risk flag is fetched once and cached;
+#   * execute() signs both orders first, then sends them together (Kalshi IOC
+#     limit, Poly FOK), each leg under EXEC_TIMEOUT;
+#   * legs that fill different amounts are unwound with EXEC_UNWIND=flatten (the
+#     excess is sold back at any price) or left open with "hold". A leg whose
+#     outcome is unknown (timeout, transport error, 5xx or unreadable answer,
+#     delayed match) is never guessed at: nothing is unwound and the result
+#     says so. Only a 4xx or an explicit refusal counts as "rejected";
+#   * every step is timed, returned with the result and observed as
+#     execution_step_ms{step=...}; outcomes count in executions_total{outcome=...}.
+# dry_run signs both orders but sends nothing.
+
+KALSHI_SIGN_PREFIX = "/trade-api/v2"
+KALSHI_ORDER_PATH = "/portfolio/orders"
+POLY_ORDER_PATH = "/order"
+POLY_CHAIN_ID = 137 # Polygon
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+POOL_SIZE = 4 # connections per exchange
+
+metrics.describe("execution_step_ms", "Two-leg execution time per step (prepare, sign_*, legs, unwind, total).")
+metrics.describe("executions_total", "Two-leg executions by outcome (filled, missed, unwound, exposed, unknown, dry_run).")
+
+# Leg statuses whose fill we know; anything else ("timeout", "error", "pending") we don't
+KNOWN = ("filled", "partial", "missed", "rejected", "dry_run")
+
+
+def refused_leg(http_status, error):
+    """
+    A leg whose order POST failed. Only a 4xx is the exchange refusing the order
+    ("rejected", known unfilled); a 5xx (gateway, overload) may still have placed it.
+    """
+    status = "rejected" if 400 <= http_status < 500 else "error"
+    return {"status": status, "filled": 0, "error": f"Status {http_status}: {error}"}
+
+
+def leg_status(filled, count):
+    if filled <= 0:
+        return "missed"
+    return "filled" if filled >= count else "partial"
+
+
+def kalshi_filled(order, count):
+    """Contracts filled by a Kalshi order response (newer and older field names)."""
+    for key in ("fill_count", "taker_fill_count"):
+        if order.get(key) is not None:
+            return int(order[key])
+    return count if order.get("status") == "executed" else 0
+
+
+class _Venue:
+    """Shared: a keep-alive connection pool per event loop, and warming."""
+
+    base_url = None
+    warm_path = None
+
+    def __init__(self):
+        self._session = None
+        self._loop = None
+
+    def session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # keepalive_timeout above the ping interval, so the warm connection is reused
+            connector = aiohttp.TCPConnector(limit=POOL_SIZE, keepalive_timeout=max(EXEC_KEEPALIVE * 3, 30))
+            # No circuit breaker or scheduler queue: an order (or its unwind) is always sent, at once
+            self._session = client_session(circuit=False, scheduled=False, connector=connector)
+            self._loop = loop
+        return self._session
+
+    async def warm(self):
+        """Opens (or keeps open) a connection. Returns False if the exchange didn't answer."""
+        try:
+            async with self.session().get(f"{self.base_url}{self.warm_path}") as resp:
+                await resp.read()
+                return resp.status == 200
+        except Exception as e:
+            print(f"Warming {self.base_url} failed: {e}")
+            return False
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class KalshiVenue(_Venue):
+    warm_path = "/exchange/status"
+
+    def __init__(self, key_id=None, private_key_path=None, base_url=None):
+        super().__init__()
+        self.key_id = key_id or KALSHI_KEY_ID
+        self.private_key_path = private_key_path or KALSHI_PRIVATE_KEY_PATH
+        self.base_url = base_url or KALSHI_API_URL
+        self._signer = None
+
+    @property
+    def configured(self):
+        return bool(self.key_id and self.private_key_path)
+
+    async def prepare(self):
+        if self._signer is None:
+            self._signer = get_signer(self.key_id, self.private_key_path)
+        return await self.warm()
+
+    def sign_order(self, ticker, side, count, price, action="buy"):
+        """(body, headers) for an immediate-or-cancel limit order; price in cents for `side`."""
+        body = json.dumps({
+            "ticker": ticker,
+            "client_order_id": str(uuid.uuid4()),
+            "type": "limit",
+            "action": action,
+            "side": side,
+            "count": count,
+            f"{side}_price": price,
+            "time_in_force": "immediate_or_cancel",
+        })
+        headers = self._signer.headers("POST", f"{KALSHI_SIGN_PREFIX}{KALSHI_ORDER_PATH}")
+        headers["Content-Type"] = "application/json"
+        return body, headers
+
+    async def send(self, signed, count):
+        body, headers = signed
+        async with self.session().post(f"{self.base_url}{KALSHI_ORDER_PATH}", data=body, headers=headers) as resp:
+            if resp.status not in (200, 201):
+                return refused_leg(resp.status, await resp.text())
+            try:
+                order = (await resp.json()).get("order") or {}
+            except (ValueError, aiohttp.ContentTypeError, AttributeError) as e:
+                # Accepted, but we can't tell what filled
+                return {"status": "error", "filled": 0, "error": f"Unreadable order response: {e}"}
+        filled = kalshi_filled(order, count)
+        return {"status": leg_status(filled, count), "filled": filled, "order_id": order.get("order_id")}
+
+    def sign_unwind(self, ticker, side, count):
+        # Sell what we hold at the lowest price: takes every bid down to 1¢ (IOC)
+        return self.sign_order(ticker, side, count, 1, action="sell")
+
+
+class PolyVenue(_Venue):
+    warm_path = "/time"
+
+    def __init__(self, api_key=None, secret=None, passphrase=None, wallet_key=None, funder=None, base_url=None):
+        super().__init__()
+        self.api_key = api_key or POLY_API_KEY
+        self.secret = secret or POLY_SECRET
+        self.passphrase = passphrase or POLY_PASSPHRASE
+        self.wallet_key = wallet_key or POLY_WALLET_KEY
+        self.funder = funder or POLY_PROXY_ADDRESS
+        self.base_url = base_url or POLY_CLOB_URL
+        self.markets = {} # token -> (tick size str, neg_risk)
+        self._builders = None # neg_risk -> py_order_utils OrderBuilder (exchange contract + key)
+        self._amounts = None
+        self._address = None
+        self._hmac_key = None
+
+    @property
+    def configured(self):
+        return bool(self.api_key and self.secret and self.passphrase and self.wallet_key)
+
+    def _load_signers(self):
+        # py_clob_client (and its py_order_utils) is only needed once trading is configured
+        from py_clob_client.signer import Signer
+        from py_clob_client.config import get_contract_config
+        from py_clob_client.order_builder.builder import OrderBuilder as AmountsBuilder
+        from py_order_utils.builders import OrderBuilder
+        from py_order_utils.signer import Signer as UtilsSigner
+
+        signer = Signer(self.wallet_key, POLY_CHAIN_ID)
+        self._address = signer.address()
+        # Proxy wallets sign as POLY_PROXY (1), a plain wallet as EOA (0)
+        sig_type = 1 if self.funder else 0
+        self._amounts = AmountsBuilder(signer, sig_type=sig_type, funder=self.funder or self._address)
+        self._builders = {
+            neg_risk: OrderBuilder(get_contract_config(POLY_CHAIN_ID, neg_risk).exchange, POLY_CHAIN_ID,
+                                   UtilsSigner(key=self.wallet_key))
+            for neg_risk in (False, True)
+        }
+        self._hmac_key = base64.urlsafe_b64decode(self.secret)
+
+    async def prepare(self, tokens=()):
+        if self._builders is None:
+            self._load_signers()
+        warmed, _ = await asyncio.gather(self.warm(), self.load_markets(tokens))
+        return warmed
+
+    async def load_markets(self, tokens):
+        """Tick size and neg-risk flag per token (fixed per market), fetched once."""
+        missing = [str(t) for t in dict.fromkeys(tokens) if str(t) not in self.markets]
+        sem = asyncio.Semaphore(POOL_SIZE)
+
+        async def load(token):
+            async with sem:
+                try:
+                    tick, neg = await asyncio.gather(
+                        self._get_json("/tick-size", token), self._get_json("/neg-risk", token))
+                    self.markets[token] = (str(tick["minimum_tick_size"]), bool(neg["neg_risk"]))
+                except Exception as e:
+                    print(f"Loading CLOB market info for {token} failed: {e}")
+
+        await asyncio.gather(*(load(t) for t in missing))
+
+    async def _get_json(self, path, token):
+        async with self.session().get(f"{self.base_url}{path}", params={"token_id": token}) as resp:
+            resp.raise_for_status()
+            return await resp.json()
+
+    def sign_order(self, token, price, size, side="BUY"):
+        """(body, headers) for a fill-or-kill order; price in cents, size in shares."""
+        from py_order_utils.model import OrderData
+        from py_clob_client.order_builder.builder import ROUNDING_CONFIG
+
+        tick, neg_risk = self.markets.get(str(token), ("0.01", False))
+        side_code, maker_amount, taker_amount = self._amounts.get_order_amounts(
+            side, size, price / 100, ROUNDING_CONFIG[tick])
+        order = self._builders[neg_risk].build_signed_order(OrderData(
+            maker=self._amounts.funder,
+            taker=ZERO_ADDRESS,
+            tokenId=str(token),
+            makerAmount=str(maker_amount),
+            takerAmount=str(taker_amount),
+            side=side_code,
+            feeRateBps="0",
+            nonce="0",
+            signer=self._address,
+            expiration="0",
+            signatureType=self._amounts.sig_type,
+        ))
+        body = json.dumps({"order": order.dict(), "owner": self.api_key, "orderType": "FOK"})
+        # L2 auth: HMAC over timestamp + method + path + the exact body sent
+        timestamp = str(int(time.time()))
+        digest = hmac.new(self._hmac_key, f"{timestamp}POST{POLY_ORDER_PATH}{body}".encode("utf-8"), hashlib.sha256).digest()
+        headers = {
+            "POLY_ADDRESS": self._address,
+            "POLY_SIGNATURE": base64.urlsafe_b64encode(digest).decode("utf-8"),
+            "POLY_TIMESTAMP": timestamp,
+            "POLY_API_KEY": self.api_key,
+            "POLY_PASSPHRASE": self.passphrase,
+            "Content-Type": "application/json",
+        }
+        return body, headers
+
+    async def send(self, signed, size):
+        body, headers = signed
+        async with self.session().post(f"{self.base_url}{POLY_ORDER_PATH}", data=body, headers=headers) as resp:
+            text = await resp.text()
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        if resp.status >= 500 or not isinstance(data, dict):
+            # Gateway error or unreadable body: the order may have been placed
+            return {"status": "error", "filled": 0, "error": f"Status {resp.status}: {text[:200]}"}
+        if not data.get("success"):
+            # 4xx or an explicit refusal in a 2xx body
+            return {"status": "rejected", "filled": 0, "error": f"Status {resp.status}: {data.get('errorMsg') or text[:200]}"}
+        status = data.get("status")
+        if status == "delayed":
+            # Marketable order queued by the exchange: it may still fill
+            return {"status": "pending", "filled": 0, "order_id": data.get("orderID")}
+        filled = size if status == "matched" else 0 # FOK: all or nothing
+        return {"status": leg_status(filled, size), "filled": filled, "order_id": data.get("orderID")}
+
+    def sign_unwind(self, token, size):
+        tick, _ = self.markets.get(str(token), ("0.01", False))
+        # Lowest valid price: sells into every bid (FOK)
+        return self.sign_order(token, float(tick) * 100, size, side="SELL")
+
+
+class TwoLegExecutor:
+    def __init__(self, kalshi=None, poly=None, timeout=EXEC_TIMEOUT, unwind=EXEC_UNWIND,
+                 dry_run=EXEC_DRY_RUN, max_contracts=EXEC_MAX_CONTRACTS, keepalive=EXEC_KEEPALIVE):
+        self.kalshi = kalshi or KalshiVenue()
+        self.poly = poly or PolyVenue()
+        self.timeout = timeout
+        self.unwind = unwind
+        self.dry_run = dry_run
+        self.max_contracts = max_contracts
+        self.keepalive = keepalive
+        self.prepared = False
+        self._keepalive_task = None
+
+    @property
+    def configured(self):
+        return self.kalshi.configured and self.poly.configured
+
+    async def prepare(self, tokens=()):
+        """Keys, order signers, warm connections and `tokens`' market info. Returns step timings."""
+        t0 = time.perf_counter()
+        await asyncio.gather(self.kalshi.prepare(), self.poly.prepare(tokens))
+        self.prepared = True
+        timings = {"prepare": _ms(t0)}
+        _observe(timings)
+        return timings
+
+    async def start(self, tokens=()):
+        await self.prepare(tokens)
+        if self.keepalive and (self._keepalive_task is None or self._keepalive_task.done()):
+            self._keepalive_task = asyncio.create_task(self._keep_warm())
+
+    async def _keep_warm(self):
+        while True:
+            await asyncio.sleep(self.keepalive)
+            await asyncio.gather(self.kalshi.warm(), self.poly.warm())
+
+    async def close(self):
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        await asyncio.gather(self.kalshi.close(), self.poly.close())
+        self.prepared = False
+
+    async def _leg(self, send, signed, count):
+        """One send under the timeout. Never raises; "ms" is the round trip."""
+        t0 = time.perf_counter()
+        try:
+            leg = await asyncio.wait_for(send(signed, count), self.timeout)
+        except asyncio.TimeoutError:
+            leg = {"status": "timeout", "filled": 0, "error": f"no answer in {self.timeout}s"}
+        except Exception as e:
+            leg = {"status": "error", "filled": 0, "error": str(e)}
+        leg["ms"] = _ms(t0)
+        return leg
+
+    @tracing.traced("execution.execute")
+    async def execute(self, kalshi_ticker, side, kalshi_price, poly_token, poly_price, count):
+        """
+        Buys `count` Kalshi `side` contracts at up to kalshi_price¢ and `count` poly_token
+        shares at up to poly_price¢. Returns {
+            "status": "filled" | "missed" | "unwound" | "exposed" | "unknown" | "dry_run" | "refused",
+            "hedged": pairs held on both sides, "kalshi": leg, "poly": leg, "unwind": leg | None,
+            "error": str | None, "dry_run": bool, "timings": {step: ms}
+        }
+        A leg is {"status", "filled", "ms", "order_id"?, "error"?}.
+        """
+        tracing.annotate(kalshi_ticker=kalshi_ticker, side=side, poly_token=poly_token, count=count,
+                         dry_run=self.dry_run)
+        t_start = time.perf_counter()
+        result = {"status": "refused", "hedged": 0, "kalshi": None, "poly": None, "unwind": None,
+                  "error": None, "dry_run": self.dry_run, "timings": {}}
+        timings = result["timings"]
+        if not self.configured:
+            result["error"] = "Kalshi and Polymarket trading keys are not configured."
+            return result
+        if side not in ("yes", "no") or not 0 < count <= self.max_contracts:
+            result["error"] = f"Need side yes/no and 1-{self.max_contracts} contracts."
+            return result
+        if not (0 < kalshi_price < 100 and 0 < poly_price < 100):
+            result["error"] = "Prices must be between 1¢ and 99¢."
+            return result
+
+        # Cold path (nothing prepared yet, or a token never traded) is timed on its own
+        if not self.prepared:
+            timings.update(await self.prepare([poly_token]))
+        elif str(poly_token) not in self.poly.markets:
+            t0 = time.perf_counter()
+            await self.poly.load_markets([poly_token])
+            timings["market_info"] = _ms(t0)
+
+        # Sign both before sending either, so the legs leave together
+        t0 = time.perf_counter()
+        k_signed = self.kalshi.sign_order(kalshi_ticker, side, count, kalshi_price)
+        timings["sign_kalshi"] = _ms(t0)
+        t0 = time.perf_counter()
+        p_signed = self.poly.sign_order(poly_token, poly_price, count)
+        timings["sign_poly"] = _ms(t0)
+
+        if self.dry_run:
+            result["status"] = "dry_run"
+            result["kalshi"] = {"status": "dry_run", "filled": 0, "request": json.loads(k_signed[0])}
+            result["poly"] = {"status": "dry_run", "filled": 0, "request": json.loads(p_signed[0])}
+            return self._finish(result, t_start)
+
+        t0 = time.perf_counter()
+        k_leg, p_leg = await asyncio.gather(
+            self._leg(self.kalshi.send, k_signed, count),
+            self._leg(self.poly.send, p_signed, count),
+        )
+        timings["legs"] = _ms(t0)
+        timings["kalshi"] = k_leg["ms"]
+        timings["poly"] = p_leg["ms"]
+        result["kalshi"], result["poly"] = k_leg, p_leg
+
+        if k_leg["status"] not in KNOWN or p_leg["status"] not in KNOWN:
+            result["status"] = "unknown"
+            result["error"] = "A leg's outcome is unknown; check both exchanges before acting."
+            return self._finish(result, t_start)
+
+        k_filled, p_filled = k_leg["filled"], p_leg["filled"]
+        result["hedged"] = min(k_filled, p_filled)
+        if k_filled == p_filled:
+            result["status"] = "filled" if k_filled else "missed"
+            return self._finish(result, t_start)
+
+        # One side filled more than the other
+        excess = abs(k_filled - p_filled)
+        if self.unwind != "flatten":
+            result["status"] = "exposed"
+            return self._finish(result, t_start)
+        t0 = time.perf_counter()
+        if k_filled > p_filled:
+            signed = self.kalshi.sign_unwind(kalshi_ticker, side, excess)
+            unwind = await self._leg(self.kalshi.send, signed, excess)
+        else:
+            signed = self.poly.sign_unwind(poly_token, excess)
+            unwind = await self._leg(self.poly.send, signed, excess)
+        timings["unwind"] = _ms(t0)
+        result["unwind"] = unwind
+        result["status"] = "unwound" if unwind["status"] == "filled" else "exposed"
+        return self._finish(result, t_start)
+
+    def _finish(self, result, t_start):
+        result["timings"]["total"] = _ms(t_start)
+        _observe(result["timings"])
+        metrics.inc("executions_total", outcome=result["status"])
+        tracing.annotate(outcome=result["status"], hedged=result["hedged"])
+        if result["status"] in ("exposed", "unknown"):
+            print(f"Execution needs attention: {result['status']} {result['kalshi']} {result['poly']} {result['unwind']}")
+        return result
+
+
+def _ms(t0):
+    return round((time.perf_counter() - t0) * 1000, 3)
+
+
+def _observe(timings):
+    for step, ms in timings.items():
+        metrics.observe("execution_step_ms", ms, step=step)
+
+
+async def quote_pair(kalshi_ticker, side, poly_token):
+    """
+    (kalshi_price, poly_price) in cents: the best ask for the Kalshi side and the
+    Poly token, from fresh books. None for a side with no ask.
+    """
+    # Cached books may be seconds old: a price to trade at is fetched now
+    orderbook_manager.KALSHI_BOOKS.invalidate(kalshi_ticker)
+    orderbook_manager.POLY_BOOKS.invalidate(str(poly_token))
+    books, poly_books = await asyncio.gather(
+        orderbook_manager.get_kalshi_books([kalshi_ticker]),
+        orderbook_manager.get_poly_books([poly_token]),
+    )
+    book = books.get(kalshi_ticker)
+    if book is not None and side == "no":
+        book = book.inverted()
+    poly_book = poly_books.get(str(poly_token))
+    return (book.best_ask if book else None), (poly_book.best_ask if poly_book else None)
+
+
+_executor = None
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = TwoLegExecutor()
+    return _executor
@@ -0,0 +1,164 @@
+import re
+import time
+import asyncio
+import aiohttp
+from . import metrics
+from . import tracing
+from . import breaker
+from . import scheduler
+
+# --- Instrumented aiohttp Sessions ---
+# Every outbound call goes through a session created here, so latency, status,
+# bytes and per-action call counts are recorded without touching call sites.
+# Each request also passes its upstream's circuit breaker (see breaker.py) and
+# waits for a slot in its upstream's budget, by priority (see scheduler.py).
+#
+# Each end/exception hook only acts on what its own start hook recorded on ctx:
+# aiohttp before 3.14 fires on_request_exception on every trace config, even
+# ones whose on_request_start never ran or raised.
+
+# Host substring -> upstream label
+UPSTREAMS = {
+    "kalshi": "kalshi",
+    "gamma-api": "gamma",
+    "clob.polymarket": "clob",
+}
+
+# Path segments that are IDs/tickers get collapsed so label cardinality stays bounded.
+# e.g. /trade-api/v2/markets/KXNBAGAME-25DEC15MEMLAC-MEM -> /trade-api/v2/markets/{id}
+_ID_SEGMENT = re.compile(r"^(?!v\d+$).*(\d|[A-Z]{3,}-).*$")
+
+
+def upstream_name(url):
+    host = url.host or ""
+    for needle, name in UPSTREAMS.items():
+        if needle in host:
+            return name
+    return f"{host}:{url.port}" if url.port else host
+
+
+def endpoint_name(url):
+    parts = [("{id}" if _ID_SEGMENT.match(p) else p) for p in url.path.split("/")]
+    return "/".join(parts) or "/"
+
+
+async def _on_request_start(session, ctx, params):
+    ctx.start = time.perf_counter()
+    ctx.upstream = upstream_name(params.url)
+    ctx.endpoint = endpoint_name(params.url)
+    ctx.span = tracing.start_span(f"{ctx.upstream}.request", method=params.method, endpoint=ctx.endpoint)
+
+
+async def _on_request_end(session, ctx, params):
+    elapsed_ms = (time.perf_counter() - ctx.start) * 1000
+    metrics.record_upstream(ctx.upstream, ctx.endpoint, params.method, params.response.status, elapsed_ms)
+    ctx.span.set(status=params.response.status)
+    ctx.span.end()
+
+
+async def _on_request_exception(session, ctx, params):
+    if getattr(ctx, "start", None) is None:
+        return
+    elapsed_ms = (time.perf_counter() - ctx.start) * 1000
+    metrics.record_upstream(ctx.upstream, ctx.endpoint, params.method, "error", elapsed_ms)
+    ctx.span.end(error=params.exception)
+
+
+async def _on_response_chunk_received(session, ctx, params):
+    metrics.record_bytes(ctx.upstream, len(params.chunk))
+
+
+# --- Circuit Breakers ---
+# A separate TraceConfig, attached first: a request refused by an open breaker
+# raises CircuitOpenError from on_request_start before it is sent or timed.
+
+async def _on_circuit_start(session, ctx, params):
+    upstream = breaker.get(upstream_name(params.url))
+    if not upstream.allow():
+        metrics.inc("circuit_rejected_total", upstream=upstream.name)
+        raise breaker.CircuitOpenError(f"{upstream.name} circuit open, retry in {upstream.retry_in():.0f}s")
+    ctx.breaker = upstream
+
+
+async def _on_circuit_end(session, ctx, params):
+    status = params.response.status
+    if status >= 500 or status == 429:
+        ctx.breaker.record_failure()
+    else:
+        ctx.breaker.record_success()
+
+
+async def _on_circuit_exception(session, ctx, params):
+    if getattr(ctx, "breaker", None) is None:
+        # Refused by the breaker itself: nothing was let through
+        return
+    if isinstance(params.exception, asyncio.CancelledError):
+        # The caller gave up (deadline, user navigated away): says nothing about the upstream
+        ctx.breaker.release()
+    else:
+        ctx.breaker.record_failure()
+
+
+def _build_circuit_config():
+    tc = aiohttp.TraceConfig()
+    tc.on_request_start.append(_on_circuit_start)
+    tc.on_request_end.append(_on_circuit_end)
+    tc.on_request_exception.append(_on_circuit_exception)
+    return tc
+
+
+# --- Scheduling ---
+# Attached after the breaker (refused requests take no slot) and before the
+# instrumentation (upstream latency doesn't include the queue). The slot is held
+# until the response headers arrive or the request fails.
+
+async def _on_schedule_start(session, ctx, params):
+    budget = scheduler.get(upstream_name(params.url))
+    await budget.acquire(scheduler.current_priority(), scheduler.current_share())
+    # Set only once the slot is held, so a cancelled wait releases nothing
+    ctx.scheduler = budget
+
+
+async def _on_schedule_done(session, ctx, params):
+    budget = getattr(ctx, "scheduler", None)
+    if budget is None:
+        return
+    ctx.scheduler = None
+    budget.release()
+
+
+def _build_schedule_config():
+    tc = aiohttp.TraceConfig()
+    tc.on_request_start.append(_on_schedule_start)
+    tc.on_request_end.append(_on_schedule_done)
+    tc.on_request_exception.append(_on_schedule_done)
+    return tc
+
+
+def _build_trace_config():
+    tc = aiohttp.TraceConfig()
+    tc.on_request_start.append(_on_request_start)
+    tc.on_request_end.append(_on_request_end)
+    tc.on_request_exception.append(_on_request_exception)
+    tc.on_response_chunk_received.append(_on_response_chunk_received)
+    return tc
+
+
+TRACE_CONFIG = _build_trace_config()
+CIRCUIT_CONFIG = _build_circuit_config()
+SCHEDULE_CONFIG = _build_schedule_config()
+
+
+def client_session(circuit=True, scheduled=True, **kwargs):
+    """
+    Drop-in replacement for aiohttp.ClientSession() with instrumentation attached.
+    circuit=False skips the circuit breakers and scheduled=False the request
+    scheduler (order placement must always be attempted, and sent right away).
+    """
+    trace_configs = list(kwargs.pop("trace_configs", []))
+    if scheduled:
+        trace_configs.append(SCHEDULE_CONFIG)
+    trace_configs.append(TRACE_CONFIG)
+    if circuit:
+        trace_configs.insert(0, CIRCUIT_CONFIG)
+    return aiohttp.ClientSession(trace_configs=trace_configs, **kwargs)
@@ -0,0 +1,76 @@
+import json
+import codecs
+
+# --- Incremental JSON Array Parsing ---
+# Gamma returns one big JSON array of events. Instead of resp.json() (whole body
+# as text, then every nested object at once), elements are decoded one at a time
+# as chunks arrive, so callers can project each one and drop the rest.
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def _skip_ws(buf, i):
+    while i < len(buf) and buf[i] in _WHITESPACE:
+        i += 1
+    return i
+
+
+async def iter_json_array(chunks):
+    """
+    Async generator yielding the elements of a top-level JSON array.
+
+    chunks: async iterable of bytes (e.g. resp.content.iter_chunked(CHUNK_SIZE)).
+    Raises ValueError if the body is not a well-formed array.
+    """
+    text = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    i = 0
+    started = False
+    done = False
+    eof = False
+    chunk_iter = chunks.__aiter__()
+
+    while not done:
+        # 1. Pull more data
+        if not eof:
+            try:
+                chunk = await chunk_iter.__anext__()
+                buf = buf[i:] + text.decode(chunk)
+            except StopAsyncIteration:
+                eof = True
+                buf = buf[i:] + text.decode(b"", final=True)
+            i = 0
+
+        # 2. Consume every complete element in the buffer
+        while True:
+            i = _skip_ws(buf, i)
+            if i >= len(buf):
+                break
+            if not started:
+                if buf[i] != "[":
+                    raise ValueError(f"Expected JSON array, got {buf[i]!r}")
+                started = True
+                i += 1
+                continue
+            if buf[i] == "]":
+                done = True
+                break
+            if buf[i] == ",":
+                i += 1
+                continue
+            try:
+                value, end = _decoder.raw_decode(buf, i)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError("Truncated or malformed JSON array")
+                break # Element not complete yet
+            if end == len(buf) and not eof:
+                break # A bare number could still continue in the next chunk
+            i = end
+            yield value
+
+        if eof and not done:
+            raise ValueError("Truncated JSON array")
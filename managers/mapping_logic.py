@@ -45,12 +45,30 @@ def parse_kalshi_ticker(ticker):
 
 def generate_arbitrage_mapping(kalshi_event_data, poly_event_data):
     """
-    Generates the arbitrage mapping config string.
+    Generates the arbitrage mapping config string (see build_pair_mapping()).
+    """
+    mapping = build_pair_mapping(kalshi_event_data, poly_event_data)
+    if mapping is None:
+        return "# Error: Poly event does not have exactly 2 teams/outcomes."
+
+    # Format as Python Block
+    output = "NEW_PAIR = {\n"
+    for k, v in mapping.items():
+        output += f'    "{k}": "{v}",\n'
+    output += "}"
+    
+    return output
+
+def build_pair_mapping(kalshi_event_data, poly_event_data):
+    """
+    Pairs Kalshi team markets with Polymarket outcome tokens.
+    Returns {"<kalshi_ticker>-yes": poly_token, "<kalshi_ticker>-no": poly_token, ...},
+    or None if the Poly event doesn't have exactly 2 outcomes.
     
     kalshi_event_data: {
         "ticker": "KXNFL-25DEC-KCBAL",
         "markets": [
-            {"ticker": "KX...-KC", "outcome": "KC"}, 
+            {"ticker": "KX...-KC", "outcome": "KC"}, # outcome: code or team name ("Chiefs")
             {"ticker": "KX...-BAL", "outcome": "BAL"}
         ]
     }
@@ -78,7 +96,9 @@ def generate_arbitrage_mapping(kalshi_event_data, poly_event_data):
         parts = t.split('-')
         if parts:
             code = parts[-1] 
-            k_teams.append({"code": code, "ticker": t})
+            # Optional team name (e.g. the Poly nickname) for codes that don't appear in Poly titles
+            name = (m.get("outcome") or "").lower()
+            k_teams.append({"code": code, "ticker": t, "name": name})
             
     # 2. Extract Poly Teams
     # Poly markets usually have 'groupItemTitle' or similar for the team name.
@@ -136,6 +156,9 @@ def generate_arbitrage_mapping(kalshi_event_data, poly_event_data):
             # Or use nfl_map reversed?
             
             # Simple check:
+            if kt["name"] and kt["name"] in p_name.lower():
+                found_poly = pt
+                break
             if k_code.lower() in p_name.lower():
                 found_poly = pt
                 break
@@ -196,7 +219,7 @@ def generate_arbitrage_mapping(kalshi_event_data, poly_event_data):
     # We need to know who is Team A and Team B to find "Opposite".
     # Assume 2 teams exactly.
     if len(p_teams) != 2:
-        return "# Error: Poly event does not have exactly 2 teams/outcomes."
+        return None
         
     for k_team, p_team in matched_pairs:
         # P_Team is the SAME side.
@@ -215,10 +238,39 @@ def generate_arbitrage_mapping(kalshi_event_data, poly_event_data):
             # Key: K_Ticker-no -> Value: Same_Poly_Yes_ID
             mapping[f"{k_team['ticker']}-no"] = p_team["yes_id"]
             
-    # Format as Python Block
-    output = "NEW_PAIR = {\n"
-    for k, v in mapping.items():
-        output += f'    "{k}": "{v}",\n'
-    output += "}"
-    
-    return output
+    return mapping
+
+# --- Pair Evaluation ---
+# Each mapping entry is one hedged pair: buying the Kalshi side and the mapped
+# Poly token pays out 100¢ whatever happens, so the pair is an arb when the two
+# asks add up to less than 100¢.
+
+def mapping_pairs(mapping):
+    """{"<ticker>-yes": token, ...} -> [(kalshi_ticker, "yes"|"no", poly_token), ...]"""
+    pairs = []
+    for key, token in mapping.items():
+        ticker, _, side = key.rpartition("-")
+        if ticker and side in ("yes", "no") and token:
+            pairs.append((ticker, side, str(token)))
+    return pairs
+
+def evaluate_pair(kalshi_side, kalshi_quote, poly_quote):
+    """
+    kalshi_quote: Kalshi YES top of book (bid, ask, bid_size, ask_size), cents.
+    poly_quote: the Poly token's top of book, same shape.
+    Returns (cost_cents, size): total cost of one hedged pair at the asks and how
+    many pairs the top levels can fill, or None if either ask is missing.
+    """
+    if kalshi_quote is None or poly_quote is None:
+        return None
+    k_bid, k_ask, k_bid_size, k_ask_size = kalshi_quote
+    if kalshi_side == "yes":
+        k_price, k_size = k_ask, k_ask_size
+    else:
+        # Buying NO at 100 - yes_bid takes the YES bid
+        k_price = None if k_bid is None else 100 - k_bid
+        k_size = k_bid_size
+    p_price, p_size = poly_quote[1], poly_quote[3]
+    if k_price is None or p_price is None:
+        return None
+    return k_price + p_price, min(k_size, p_size)
@@ -0,0 +1,222 @@
+import re
+import time
+import asyncio
+from datetime import datetime, timedelta
+from . import market_manager
+from . import polymarket_manager
+from . import orderbook_manager
+from . import tracing
+from . import arb_registry
+from .cache import TTLCache
+from .config import DEPTH_TARGET_QTY
+
+# --- Market Data Snapshots ---
+# Everything show_results needs (Kalshi games for one series + market type,
+# filtered/sorted, plus their Polymarket matches) as one JSON-safe dict.
+# Built in-process, or by market_daemon.py and served over a Unix socket.
+
+GAMES_TTL = 10 # seconds; Kalshi odds move, keep this short
+POLY_MATCH_TTL = 60 # Poly event lookups are expensive and rarely change
+
+# How many games get Polymarket matching / are shown
+MAX_GAMES = 5
+# Markets per game that get order book depth (views shows at most 5)
+DEPTH_MARKETS_PER_GAME = 5
+
+GAMES_CACHE = TTLCache("kalshi_games", ttl=GAMES_TTL, maxsize=64)
+POLY_MATCH_CACHE = TTLCache("poly_match", ttl=POLY_MATCH_TTL, maxsize=1024)
+
+
+async def get_games(series_ticker):
+    """get_games_with_odds() behind the cache. Error strings are not cached."""
+    return await GAMES_CACHE.get_or_load(
+        series_ticker,
+        lambda: market_manager.get_games_with_odds(series_ticker),
+        cache_if=lambda v: isinstance(v, list),
+    )
+
+
+async def get_poly_match(title, sport):
+    """find_polymarket_match() behind the cache (misses are cached too)."""
+    return await POLY_MATCH_CACHE.get_or_load(
+        (title, sport),
+        lambda: polymarket_manager.find_polymarket_match(title, sport=sport),
+    )
+
+
+async def warm(series_ticker, sport_name, market_type):
+    """
+    Loads what build_snapshot() would fetch first (games + Polymarket matches)
+    into GAMES_CACHE / POLY_MATCH_CACHE, without order books. Returns False on error.
+    """
+    games = await get_games(series_ticker)
+    if isinstance(games, str):
+        return False
+    selected = select_games(games, market_type)[:MAX_GAMES]
+    registry = arb_registry.get_registry()
+    await asyncio.gather(*(
+        get_poly_match(item["game"].get("event_title"), sport_name) for item in selected
+        if registry.event(item["game"].get("event_ticker")) is None
+    ))
+    return True
+
+
+def mapped_poly_data(registry, event_ticker):
+    """
+    poly_data for an event in the mapping registry, built from the stored game
+    market (no Gamma search). Prices are filled in from the CLOB books. None if unmapped.
+    """
+    block = registry.event(event_ticker) if event_ticker else None
+    meta = block.get(arb_registry.META_KEY) if block else None
+    if not meta or len(meta.get("tokens") or []) < 2:
+        return None
+    return {
+        "title": meta.get("title"),
+        "id": meta.get("id"),
+        "condition_id": None,
+        "yes_id": meta["tokens"][0],
+        "no_id": meta["tokens"][1],
+        "yes": 0,
+        "no": 0,
+        "outcomes": meta.get("outcomes") or ["Yes", "No"],
+        "url": f"https://polymarket.com/event/{meta.get('slug')}",
+        "mapped": True,
+    }
+
+
+def select_games(games, market_type, now=None):
+    """
+    Keeps games that have `market_type` markets in the next ~48h, sorted by date.
+    Returns [{"game", "markets", "sort_date", "date_display"}, ...]
+    """
+    now = now or datetime.now()
+    # Note: Server time might differ from Game time (US/ET).
+    # We'll be lenient, maybe 3-4 days to be safe given TZ diffs, but user asked for 48h.
+    # Ticker format: YYMMMDD -> 25DEC15.
+    cutoff = now + timedelta(days=3) # Using 3 days to catch "next 48h" fully including today remainder
+
+    processed_games = []
+
+    for g in games:
+        # Check markets
+        markets = g["markets"].get(market_type, [])
+        if not markets:
+            continue
+
+        # Parse Date from first market ticker to filter Event
+        # Ticker e.g. KXNBAGAME-25DEC15MEMLAC...
+        m_ticker = markets[0].get("ticker", "")
+        # Regex for '25DEC15' inside the string
+        match = re.search(r'(\d{2})([A-Z]{3})(\d{2})', m_ticker)
+
+        game_date = datetime.max # Default to far future if no date found
+        date_str_display = ""
+
+        if match:
+            yy, mmm, dd = match.groups()
+            try:
+                # Parse "25Dec15"
+                game_date = datetime.strptime(f"{yy}{mmm}{dd}", "%y%b%d")
+                # Format for display: Dec 15
+                date_str_display = f"{mmm.title()} {dd}"
+            except ValueError:
+                pass
+
+        # Strict "upcoming" filter: skip far future
+        if game_date > cutoff:
+            continue
+
+        processed_games.append({
+            "game": g,
+            "markets": markets,
+            "sort_date": game_date,
+            "date_display": date_str_display
+        })
+
+    # Sort by Date
+    processed_games.sort(key=lambda x: x["sort_date"])
+    return processed_games
+
+
+@tracing.traced("market_data.build_snapshot")
+async def build_snapshot(series_ticker, sport_name, market_type):
+    """
+    Returns {
+        "series_ticker", "sport", "market_type", "generated_at",
+        "error": str | None,
+        "games": [{"game", "markets", "date_display", "poly_data"}, ...]  # at most MAX_GAMES
+    }
+    The first DEPTH_MARKETS_PER_GAME markets of each game, and each poly_data, carry
+    "depth": {"yes": {...}, "no": {...}} (see orderbook_manager.depth_summary) for DEPTH_TARGET_QTY.
+    """
+    snapshot = {
+        "series_ticker": series_ticker,
+        "sport": sport_name,
+        "market_type": market_type,
+        "generated_at": time.time(),
+        "error": None,
+        "games": [],
+    }
+
+    games = await get_games(series_ticker)
+    if isinstance(games, str):
+        snapshot["error"] = games
+        return snapshot
+
+    selected = select_games(games, market_type)[:MAX_GAMES]
+
+    # Games in the mapping registry resolve their Poly side directly; the rest are searched
+    registry = arb_registry.get_registry()
+    registry.reload_if_changed()
+
+    # Concurrent Polymarket matching (limit to 5 concurrent requests)
+    sem = asyncio.Semaphore(5)
+
+    async def fetch_poly_data(item):
+        mapped = mapped_poly_data(registry, item["game"].get("event_ticker"))
+        if mapped is not None:
+            return mapped
+        async with sem:
+            return await get_poly_match(item["game"].get("event_title"), sport_name)
+
+    async def fetch_poly_side():
+        # Matches first, then one batched CLOB call for every matched token
+        matches = await asyncio.gather(*(fetch_poly_data(item) for item in selected))
+        token_ids = [p[k] for p in matches if p for k in ("yes_id", "no_id") if p.get(k)]
+        return matches, await orderbook_manager.get_poly_books(token_ids)
+
+    depth_tickers = [
+        m.get("ticker") for item in selected for m in item["markets"][:DEPTH_MARKETS_PER_GAME]
+    ]
+    books, (poly_results, poly_books) = await asyncio.gather(
+        orderbook_manager.get_kalshi_books(depth_tickers),
+        fetch_poly_side(),
+    )
+
+    for item, p_data in zip(selected, poly_results):
+        # Copies: market dicts are shared with GAMES_CACHE
+        markets = [dict(m) for m in item["markets"]]
+        for m in markets[:DEPTH_MARKETS_PER_GAME]:
+            book = books.get(m.get("ticker"))
+            if book is not None:
+                m["depth"] = orderbook_manager.kalshi_depth(book, DEPTH_TARGET_QTY)
+        if p_data:
+            # Copy: p_data is shared with POLY_MATCH_CACHE
+            p_data = dict(p_data)
+            depth = orderbook_manager.poly_depth(
+                poly_books.get(str(p_data.get("yes_id"))), poly_books.get(str(p_data.get("no_id"))), DEPTH_TARGET_QTY
+            )
+            if depth:
+                p_data["depth"] = depth
+            if p_data.get("mapped"):
+                # No Gamma prices for mapped games: each outcome's best ask instead
+                p_data["yes"] = (depth.get("yes") or {}).get("ask") or 0 if depth else 0
+                p_data["no"] = (depth.get("no") or {}).get("ask") or 0 if depth else 0
+        snapshot["games"].append({
+            "game": item["game"],
+            "markets": markets,
+            "date_display": item["date_display"],
+            "poly_data": p_data,
+        })
+
+    return snapshot
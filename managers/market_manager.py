@@ -1,17 +1,12 @@
-import aiohttp
+from .http_client import client_session
 import asyncio
-import os
 import json
-from dotenv import load_dotenv
 from .auth import sign_request
+from . import tracing
+from . import quote_store
+from .config import KALSHI_KEY_ID, KALSHI_PRIVATE_KEY_PATH, KALSHI_API_URL as BASE_URL
 
-# Load environment variables
-load_dotenv()
-
-KALSHI_KEY_ID = os.getenv("KALSHI_KEY_ID")
-KALSHI_PRIVATE_KEY_PATH = os.getenv("KALSHI_PRIVATE_KEY_PATH")
-BASE_URL = "https://api.elections.kalshi.com/trade-api/v2"
-
+@tracing.traced("kalshi.get_games_with_odds")
 async def get_games_with_odds(series_ticker):
     """
     Fetches active games and drills down into markets (Moneyline, Spread, Total).
@@ -29,7 +24,7 @@ async def get_games_with_odds(series_ticker):
     # Sign 'GET /trade-api/v2/events'
     headers = sign_request("GET", "/trade-api/v2/events", KALSHI_KEY_ID, KALSHI_PRIVATE_KEY_PATH)
     
-    async with aiohttp.ClientSession() as session:
+    async with client_session() as session:
         # 1. Fetch Events
         try:
             async with session.get(events_url, headers=headers, params=events_params) as resp:
@@ -84,6 +79,11 @@ async def get_games_with_odds(series_ticker):
                             ticker = m.get("ticker")
                             yes_bid = m.get("yes_bid")
                             no_bid = m.get("no_bid")
+                            # Top of book for the history recorder (a NO bid at q is a YES ask at 100 - q)
+                            quote_store.record_quote(
+                                "kalshi", ticker, bid=yes_bid or None,
+                                ask=(100 - no_bid) if no_bid else None,
+                            )
                             
                             market_obj = {
                                 "ticker": ticker,
@@ -129,6 +129,48 @@ async def get_games_with_odds(series_ticker):
 
     print(json.dumps(result, indent=4))
 
+QUOTE_BATCH_SIZE = 100 # tickers per GET /markets?tickers=
+
+async def _fetch_quote_batch(session, tickers):
+    try:
+        headers = sign_request("GET", "/trade-api/v2/markets", KALSHI_KEY_ID, KALSHI_PRIVATE_KEY_PATH)
+        params = {"tickers": ",".join(tickers), "limit": len(tickers)}
+        async with session.get(f"{BASE_URL}/markets", headers=headers, params=params) as resp:
+            if resp.status != 200:
+                print(f"Error fetching market quotes: {resp.status}")
+                return {}
+            data = await resp.json()
+    except Exception as e:
+        print(f"Exception fetching market quotes: {e}")
+        return {}
+
+    quotes = {}
+    for m in data.get("markets", []):
+        ticker = m.get("ticker")
+        yes_bid = m.get("yes_bid") or None
+        no_bid = m.get("no_bid")
+        yes_ask = (100 - no_bid) if no_bid else None
+        quote_store.record_quote("kalshi", ticker, bid=yes_bid, ask=yes_ask)
+        quotes[ticker] = (yes_bid, yes_ask)
+    return quotes
+
+@tracing.traced("kalshi.get_market_quotes")
+async def get_market_quotes(tickers):
+    """
+    Top of book for many tickers, QUOTE_BATCH_SIZE per request, batches in parallel.
+    Returns {ticker: (yes_bid, yes_ask)} (None for an empty side; missing tickers omitted).
+    """
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    tracing.annotate(tickers=len(tickers))
+    if not tickers or not KALSHI_KEY_ID:
+        return {}
+    batches = [tickers[i:i + QUOTE_BATCH_SIZE] for i in range(0, len(tickers), QUOTE_BATCH_SIZE)]
+    quotes = {}
+    async with client_session() as session:
+        for part in await asyncio.gather(*(_fetch_quote_batch(session, b) for b in batches)):
+            quotes.update(part)
+    return quotes
+
 async def get_market_info(market_ticker):
     """
     Fetches details for a single market to get Series/Event tickers (for URL) and Title.
@@ -146,7 +188,7 @@ async def get_market_info(market_ticker):
         print(f"Error signing request: {e}")
         return None
 
-    async with aiohttp.ClientSession() as session:
+    async with client_session() as session:
         try:
             async with session.get(url, headers=headers) as resp:
                 if resp.status == 200:
@@ -159,3 +201,68 @@ async def get_market_info(market_ticker):
         except Exception as e:
             print(f"Exception fetching market info: {e}")
             return None
+
+@tracing.traced("kalshi.get_event")
+async def get_event(event_ticker):
+    """
+    One event with its markets nested (GET /events/{ticker}?with_nested_markets=true).
+    Returns the event dict (with "markets"), or None if it doesn't exist or the call fails.
+    """
+    tracing.annotate(event_ticker=event_ticker)
+    if not KALSHI_KEY_ID:
+        return None
+    endpoint = f"/events/{event_ticker}"
+    try:
+        headers = sign_request("GET", f"/trade-api/v2{endpoint}", KALSHI_KEY_ID, KALSHI_PRIVATE_KEY_PATH)
+    except Exception as e:
+        print(f"Error signing request: {e}")
+        return None
+
+    async with client_session() as session:
+        try:
+            async with session.get(f"{BASE_URL}{endpoint}", headers=headers,
+                                   params={"with_nested_markets": "true"}) as resp:
+                if resp.status != 200:
+                    # e.g. 404 for a market ticker or a typo
+                    return None
+                data = await resp.json()
+        except Exception as e:
+            print(f"Exception fetching event: {e}")
+            return None
+    event = data.get("event")
+    if event is not None and "markets" not in event:
+        # Older responses list the markets next to the event
+        event = dict(event, markets=data.get("markets") or [])
+    return event
+
+@tracing.traced("kalshi.get_series_events")
+async def get_series_events(series_ticker):
+    """
+    Every open event of a series with its markets nested (one request per page
+    of 200 events, instead of one /markets call per event).
+    Returns [event, ...] (each with "markets") or an error string.
+    """
+    tracing.annotate(series_ticker=series_ticker)
+    if not KALSHI_KEY_ID:
+        return "Kalshi API key not configured."
+    url = f"{BASE_URL}/events"
+    params = {"series_ticker": series_ticker, "status": "open", "with_nested_markets": "true", "limit": 200}
+    events = []
+    async with client_session() as session:
+        while True:
+            headers = sign_request("GET", "/trade-api/v2/events", KALSHI_KEY_ID, KALSHI_PRIVATE_KEY_PATH)
+            try:
+                async with session.get(url, headers=headers, params=params) as resp:
+                    if resp.status != 200:
+                        print(f"Error fetching events: {resp.status} {await resp.text()}")
+                        return "Error fetching events."
+                    data = await resp.json()
+            except Exception as e:
+                return f"Exception fetching events: {e}"
+            events.extend(data.get("events", []))
+            cursor = data.get("cursor")
+            if not cursor:
+                break
+            params["cursor"] = cursor
+    tracing.annotate(events=len(events))
+    return events
@@ -0,0 +1,124 @@
+import os
+import heapq
+import asyncio
+from difflib import SequenceMatcher
+from concurrent.futures import ProcessPoolExecutor
+from . import config
+from .polymarket_manager import normalize_kalshi_title
+
+# --- Process-Pool Matching ---
+# Fuzzy-scoring a whole slate (hundreds of Kalshi events against thousands of
+# Gamma events) is CPU-bound. MatchExecutor runs it in warm worker processes that
+# hold the candidate catalog, so the Discord loop only ships small target batches.
+#
+# Used by batch_mapper (/setup_arb on a whole series). show_results and the
+# prefetch/daemon warms still match on the loop through find_polymarket_match:
+# at most MAX_GAMES games per snapshot, each scored only against the Gamma
+# events whose titles contain its team name, which is too little work to pay
+# for a round trip to the pool.
+
+DEFAULT_CHUNK_SIZE = 16
+DEFAULT_TOP_K = 3
+
+# Worker-process globals (set once by _init_worker)
+_CATALOG_TITLES = None
+
+
+def _init_worker(titles):
+    global _CATALOG_TITLES
+    _CATALOG_TITLES = titles
+
+
+def _ping():
+    """Used to force every worker to start (and load the catalog) up front."""
+    return os.getpid()
+
+
+def rank_titles(match_title, titles, top_k=DEFAULT_TOP_K, threshold=0.0):
+    """
+    Returns the top_k [(score, index), ...] of `titles` against `match_title`, best first.
+
+    Same metric as utils.similar (SequenceMatcher ratio on lowercased text). The target
+    is held as seq2 so its index is built once, and real_quick_ratio()/quick_ratio()
+    upper bounds skip candidates that can no longer make the top_k (as in
+    difflib.get_close_matches).
+    """
+    target = match_title.lower()
+    s = SequenceMatcher()
+    s.set_seq2(target)
+    best = [] # min-heap of (score, -index)
+    floor = threshold
+    for i, title in enumerate(titles):
+        if not title:
+            continue
+        s.set_seq1(title)
+        if s.real_quick_ratio() < floor or s.quick_ratio() < floor:
+            continue
+        score = s.ratio()
+        if score < floor:
+            continue
+        if len(best) < top_k:
+            heapq.heappush(best, (score, -i))
+        else:
+            heapq.heappushpop(best, (score, -i))
+        if len(best) == top_k:
+            floor = max(threshold, best[0][0])
+    return [(score, -neg_i) for score, neg_i in sorted(best, reverse=True)]
+
+
+def _rank_chunk(chunk, top_k, threshold):
+    """Worker entry: chunk is [(kalshi_title, sport), ...] -> [[(score, index), ...], ...]."""
+    out = []
+    for kalshi_title, sport in chunk:
+        _, _, match_title = normalize_kalshi_title(kalshi_title, sport)
+        out.append(rank_titles(match_title, _CATALOG_TITLES, top_k, threshold))
+    return out
+
+
+class MatchExecutor:
+    """
+    Process pool preloaded with a Gamma catalog.
+
+    Usage:
+        executor = MatchExecutor(gamma_events, workers=4)
+        await executor.start()
+        ranked = await executor.rank([("Boston at Miami", "NBA"), ...])
+        # ranked[i] -> [(event, score), ...] best first
+        executor.close()
+    """
+
+    def __init__(self, catalog, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, top_k=DEFAULT_TOP_K, threshold=0.4):
+        self.catalog = list(catalog)
+        self.workers = workers or config.MATCH_WORKERS or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.top_k = top_k
+        self.threshold = threshold
+        titles = [(c.get("title") or "").lower() for c in self.catalog]
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(titles,)
+        )
+
+    async def start(self):
+        """Spawns every worker now so the first real batch doesn't pay process start-up."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _ping) for _ in range(self.workers)))
+        return self
+
+    async def rank(self, targets):
+        """targets: [(kalshi_title, sport), ...] -> [[(catalog_event, score), ...], ...] (same order)."""
+        if not targets:
+            return []
+        loop = asyncio.get_running_loop()
+        chunks = [targets[i:i + self.chunk_size] for i in range(0, len(targets), self.chunk_size)]
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self._pool, _rank_chunk, chunk, self.top_k, self.threshold)
+            for chunk in chunks
+        ))
+        ranked = []
+        for chunk_result in results:
+            for candidates in chunk_result:
+                ranked.append([(self.catalog[i], score) for score, i in candidates])
+        return ranked
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
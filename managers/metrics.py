@@ -0,0 +1,269 @@
+import time
+import functools
+import contextvars
+
+# --- Metrics Registry ---
+# Everything lives in plain module-level dicts keyed by (metric name, label tuple).
+# Cheap enough to update on every request; rendered on demand by !stats and /metrics.
+
+# Latency buckets in milliseconds (Prometheus style, cumulative on render)
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+_counters = {}
+_histograms = {}
+_help = {}
+
+# The user action (command / button press) currently running in this task.
+# Outbound calls made while it is set are attributed to it.
+_current_action = contextvars.ContextVar("current_action", default=None)
+
+
+class Histogram:
+    """Fixed-bucket histogram. Percentiles are estimated from bucket bounds."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th observation."""
+        if not self.count:
+            return 0.0
+        target = self.count * pct / 100.0
+        running = 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if running >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def describe(name, text):
+    """Registers a HELP line for the Prometheus output."""
+    _help[name] = text
+
+
+def inc(name, amount=1, **labels):
+    k = _key(name, labels)
+    _counters[k] = _counters.get(k, 0) + amount
+
+
+def set_value(name, value, **labels):
+    """Gauge-style write (stored alongside counters)."""
+    _counters[_key(name, labels)] = value
+
+
+def observe(name, value, buckets=LATENCY_BUCKETS_MS, **labels):
+    k = _key(name, labels)
+    h = _histograms.get(k)
+    if h is None:
+        h = _histograms[k] = Histogram(buckets)
+    h.observe(value)
+
+
+def get_counter(name, **labels):
+    return _counters.get(_key(name, labels), 0)
+
+
+def histograms(name):
+    """Returns [(labels_dict, Histogram), ...] for one metric name."""
+    return [(dict(lbl), h) for (n, lbl), h in _histograms.items() if n == name]
+
+
+def counters(name):
+    return [(dict(lbl), v) for (n, lbl), v in _counters.items() if n == name]
+
+
+def reset():
+    _counters.clear()
+    _histograms.clear()
+
+
+# --- Cache Ratios ---
+
+def cache_hit(cache_name):
+    inc("cache_requests_total", cache=cache_name, result="hit")
+
+
+def cache_miss(cache_name):
+    inc("cache_requests_total", cache=cache_name, result="miss")
+
+
+def cache_ratios():
+    """Returns { cache_name: (hits, misses) }."""
+    out = {}
+    for labels, v in counters("cache_requests_total"):
+        hits, misses = out.get(labels["cache"], (0, 0))
+        if labels["result"] == "hit":
+            hits += v
+        else:
+            misses += v
+        out[labels["cache"]] = (hits, misses)
+    return out
+
+
+# --- Upstream Calls (fed by managers.http_client) ---
+
+def record_upstream(upstream, endpoint, method, status, latency_ms):
+    """One finished outbound HTTP request. status is an int or 'error'."""
+    observe("upstream_latency_ms", latency_ms, upstream=upstream, endpoint=endpoint, method=method)
+    inc("upstream_requests_total", upstream=upstream, endpoint=endpoint, status=str(status))
+    if status == "error" or (isinstance(status, int) and status >= 400):
+        inc("upstream_errors_total", upstream=upstream, endpoint=endpoint)
+
+    action = _current_action.get()
+    if action is not None:
+        action["upstream_calls"] += 1
+
+
+def current_action_name():
+    """Name of the instrumented handler running in this task (e.g. "cmd:search"), or None."""
+    action = _current_action.get()
+    return action["name"] if action is not None else None
+
+
+def record_bytes(upstream, n_bytes):
+    inc("upstream_bytes_total", n_bytes, upstream=upstream)
+
+
+# --- User Actions (commands, interactions, tasks) ---
+
+def instrument(name):
+    """
+    Decorator for command / interaction / task coroutines.
+    Records handler latency, errors and how many upstream calls the action made.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            action = {"name": name, "upstream_calls": 0}
+            token = _current_action.set(action)
+            t0 = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                inc("handler_errors_total", handler=name)
+                raise
+            finally:
+                _current_action.reset(token)
+                observe("handler_latency_ms", (time.perf_counter() - t0) * 1000, handler=name)
+                observe("upstream_calls_per_action", action["upstream_calls"],
+                        buckets=[0, 1, 2, 5, 10, 20, 50, 100], handler=name)
+        return wrapper
+    return decorator
+
+
+class timer:
+    """
+    Times an in-process section (matching, rendering).
+    Usage: with metrics.timer("section_latency_ms", section="fuzzy_match"): ...
+    """
+
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, (time.perf_counter() - self.t0) * 1000, **self.labels)
+        return False
+
+
+# --- Prometheus Text Exposition ---
+
+describe("upstream_latency_ms", "Outbound HTTP latency to response headers (ms).")
+describe("upstream_requests_total", "Outbound HTTP requests by status.")
+describe("upstream_errors_total", "Outbound HTTP requests that errored or returned >= 400.")
+describe("upstream_bytes_total", "Response bytes received per upstream.")
+describe("handler_latency_ms", "Command / interaction / task handler latency (ms).")
+describe("handler_errors_total", "Handlers that raised.")
+describe("upstream_calls_per_action", "Outbound HTTP requests made per user action.")
+describe("cache_requests_total", "Cache lookups by result.")
+describe("section_latency_ms", "In-process work such as fuzzy matching and embed rendering (ms).")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels, extra=None):
+    items = list(labels.items()) + (list(extra.items()) if extra else [])
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in items)
+    return "{" + body + "}"
+
+
+def render_prometheus():
+    lines = []
+    seen = set()
+
+    def header(name, kind):
+        if name in seen:
+            return
+        seen.add(name)
+        if name in _help:
+            lines.append(f"# HELP {name} {_help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    for (name, lbl), value in sorted(_counters.items()):
+        header(name, "counter" if name.endswith("_total") else "gauge")
+        lines.append(f"{name}{_fmt_labels(dict(lbl))} {value}")
+
+    for (name, lbl), h in sorted(_histograms.items(), key=lambda kv: kv[0]):
+        header(name, "histogram")
+        labels = dict(lbl)
+        running = 0
+        for bound, c in zip(h.buckets, h.counts):
+            running += c
+            lines.append(f"{name}_bucket{_fmt_labels(labels, {'le': bound})} {running}")
+        lines.append(f"{name}_bucket{_fmt_labels(labels, {'le': '+Inf'})} {h.count}")
+        lines.append(f"{name}_sum{_fmt_labels(labels)} {h.sum:.3f}")
+        lines.append(f"{name}_count{_fmt_labels(labels)} {h.count}")
+
+    return "\n".join(lines) + "\n"
+
+
+_http_runner = None
+
+async def start_http_server(port, host="127.0.0.1"):
+    """Serves /metrics in Prometheus text format. Safe to call more than once."""
+    global _http_runner
+    if _http_runner is not None:
+        return
+
+    # aiohttp.web is only needed once the endpoint is actually started
+    from aiohttp import web
+
+    async def handle_metrics(request):
+        return web.Response(text=render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    _http_runner = runner
+    print(f"Metrics endpoint on http://{host}:{port}/metrics")
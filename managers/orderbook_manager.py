@@ -0,0 +1,268 @@
+from .http_client import client_session
+import asyncio
+from .auth import sign_request
+from .cache import TTLCache
+from . import tracing
+from . import metrics
+from . import quote_store
+from .config import KALSHI_KEY_ID, KALSHI_PRIVATE_KEY_PATH, KALSHI_API_URL as BASE_URL, POLY_CLOB_URL as CLOB_URL
+
+# --- Order Book Depth ---
+# Top-of-book (yes_bid/no_bid) says nothing about size. Books are kept as price
+# levels so any caller (show_results, arb logic) can ask what a given quantity
+# would actually cost.
+#
+# Prices are in cents (1-99) on every venue; sizes are contracts/shares.
+
+BOOK_TTL = 5 # seconds; a REST snapshot is refetched after this
+BOOK_DEPTH = 20 # levels requested per side
+MAX_CONCURRENT = 8
+
+POLY_BATCH_SIZE = 50 # token ids per POST /books
+
+KALSHI_BOOKS = TTLCache("kalshi_books", ttl=BOOK_TTL, maxsize=512)
+# Bounded: LRU eviction past maxsize, and only BOOK_DEPTH levels kept per side
+POLY_BOOKS = TTLCache("poly_books", ttl=BOOK_TTL, maxsize=512)
+
+
+class DepthBook:
+    """
+    One contract's book: bids/asks as {price_cents: size}.
+    Levels change through set_level()/apply_snapshot(); levels() returns sorted copies.
+    """
+
+    def __init__(self, bids=None, asks=None):
+        self.bids = dict(bids or {})
+        self.asks = dict(asks or {})
+
+    def _side(self, side):
+        return self.bids if side == "bid" else self.asks
+
+    def set_level(self, side, price, size):
+        levels = self._side(side)
+        if size > 0:
+            levels[price] = size
+        else:
+            levels.pop(price, None)
+
+    def apply_snapshot(self, other):
+        """
+        Brings this book to `other`'s levels by applying only the differences.
+        Returns how many levels changed (0 when the books are identical).
+        """
+        changed = 0
+        for side in ("bid", "ask"):
+            mine, theirs = self._side(side), other._side(side)
+            for price in set(mine) | set(theirs):
+                size = theirs.get(price, 0)
+                if mine.get(price, 0) != size:
+                    self.set_level(side, price, size)
+                    changed += 1
+        return changed
+
+    def levels(self, side):
+        """Best first: bids high -> low, asks low -> high."""
+        return sorted(self._side(side).items(), reverse=(side == "bid"))
+
+    @property
+    def best_bid(self):
+        return max(self.bids) if self.bids else None
+
+    @property
+    def best_ask(self):
+        return min(self.asks) if self.asks else None
+
+    def inverted(self):
+        """The complementary contract (YES book -> NO book): price p becomes 100 - p."""
+        return DepthBook(
+            bids={100 - p: s for p, s in self.asks.items()},
+            asks={100 - p: s for p, s in self.bids.items()},
+        )
+
+
+def executable_price(book, qty, action="buy"):
+    """
+    Walks the book for `qty` contracts.
+    Buying takes asks (cheapest first), selling hits bids (highest first).
+
+    Returns (vwap_cents, fillable): fillable <= qty is what the book can absorb,
+    vwap_cents is the average price over that amount (None if nothing fills).
+    """
+    remaining = qty
+    cost = 0.0
+    for price, size in book.levels("ask" if action == "buy" else "bid"):
+        if remaining <= 0:
+            break
+        take = min(size, remaining)
+        cost += take * price
+        remaining -= take
+    fillable = qty - remaining
+    if fillable <= 0:
+        return None, 0
+    return cost / fillable, fillable
+
+
+def depth_summary(book, qty):
+    """JSON-safe view of one contract's book for a target size (used in snapshots)."""
+    vwap, fillable = executable_price(book, qty, "buy")
+    return {
+        "bid": book.best_bid,
+        "ask": book.best_ask,
+        "qty": qty,
+        "vwap": round(vwap, 2) if vwap is not None else None,
+        "fillable": fillable,
+    }
+
+
+# --- Kalshi ---
+# GET /markets/{ticker}/orderbook returns resting *bids* only:
+#   {"orderbook": {"yes": [[price, qty], ...], "no": [[price, qty], ...]}}
+# A NO bid at q is a YES ask at 100 - q, so both sides fit in one YES DepthBook.
+# Books are refreshed by polling (BOOK_TTL). Each ticker keeps one DepthBook:
+# a new REST snapshot is diffed against it and only the changed levels are
+# applied (kalshi_book_levels_changed_total counts them), so callers holding the
+# book see it move rather than a new object per poll.
+
+metrics.describe("kalshi_book_levels_changed_total", "Kalshi book levels changed between successive snapshots.")
+metrics.describe("kalshi_book_refreshes_total", "Kalshi book refreshes by outcome (new, changed, unchanged).")
+
+def kalshi_book_from_snapshot(orderbook):
+    return DepthBook(
+        bids={p: q for p, q in (orderbook.get("yes") or [])},
+        asks={100 - p: q for p, q in (orderbook.get("no") or [])},
+    )
+
+
+def _apply_kalshi_snapshot(ticker, fresh):
+    """Applies a fresh snapshot to the ticker's cached book as deltas. Returns the book to cache."""
+    book, _ = KALSHI_BOOKS.peek(ticker) # expired entries too: that is what gets refreshed
+    if book is None:
+        metrics.inc("kalshi_book_refreshes_total", outcome="new")
+        return fresh
+    changed = book.apply_snapshot(fresh)
+    metrics.inc("kalshi_book_levels_changed_total", changed)
+    metrics.inc("kalshi_book_refreshes_total", outcome="changed" if changed else "unchanged")
+    return book
+
+
+async def _fetch_kalshi_book(session, ticker, depth):
+    path = f"/trade-api/v2/markets/{ticker}/orderbook"
+    try:
+        headers = sign_request("GET", path, KALSHI_KEY_ID, KALSHI_PRIVATE_KEY_PATH)
+        async with session.get(f"{BASE_URL}/markets/{ticker}/orderbook", headers=headers, params={"depth": depth}) as resp:
+            if resp.status != 200:
+                print(f"Error fetching orderbook for {ticker}: {resp.status}")
+                return None
+            data = await resp.json()
+            book = _apply_kalshi_snapshot(ticker, kalshi_book_from_snapshot(data.get("orderbook") or {}))
+            quote_store.record_book("kalshi", ticker, book)
+            return book
+    except Exception as e:
+        print(f"Exception fetching orderbook for {ticker}: {e}")
+        return None
+
+
+@tracing.traced("kalshi.get_books")
+async def get_kalshi_books(tickers, depth=BOOK_DEPTH):
+    """
+    YES-contract DepthBooks for many tickers: one session, bounded concurrency,
+    cached per ticker. Returns {ticker: DepthBook} (failed tickers are omitted).
+    Use book.inverted() for the NO contract.
+    """
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    tracing.annotate(tickers=len(tickers))
+    if not tickers:
+        return {}
+
+    sem = asyncio.Semaphore(MAX_CONCURRENT)
+    async with client_session() as session:
+        async def load(ticker):
+            async with sem:
+                return await _fetch_kalshi_book(session, ticker, depth)
+
+        books = await asyncio.gather(*(
+            KALSHI_BOOKS.get_or_load(t, lambda t=t: load(t), cache_if=lambda b: b is not None)
+            for t in tickers
+        ))
+    return {t: b for t, b in zip(tickers, books) if b is not None}
+
+
+def kalshi_depth(book, qty):
+    """{"yes": summary, "no": summary} for a Kalshi YES book."""
+    return {"yes": depth_summary(book, qty), "no": depth_summary(book.inverted(), qty)}
+
+
+# --- Polymarket CLOB ---
+# POST /books takes [{"token_id": ...}, ...] and returns one book per token:
+#   [{"asset_id": "...", "bids": [{"price": "0.48", "size": "120"}], "asks": [...]}, ...]
+# Each outcome token (yes_id / no_id) has its own book.
+
+def _top_levels(levels, depth, reverse):
+    """[{"price": "0.48", "size": "120"}, ...] -> {48.0: 120.0}, best `depth` levels only."""
+    parsed = []
+    for lvl in levels or []:
+        try:
+            parsed.append((round(float(lvl["price"]) * 100, 2), float(lvl["size"])))
+        except (KeyError, TypeError, ValueError):
+            continue
+    parsed.sort(reverse=reverse)
+    return dict(parsed[:depth])
+
+
+def poly_book_from_snapshot(book, depth=BOOK_DEPTH):
+    return DepthBook(
+        bids=_top_levels(book.get("bids"), depth, reverse=True),
+        asks=_top_levels(book.get("asks"), depth, reverse=False),
+    )
+
+
+async def _fetch_poly_batch(session, token_ids, depth):
+    try:
+        async with session.post(f"{CLOB_URL}/books", json=[{"token_id": t} for t in token_ids]) as resp:
+            if resp.status != 200:
+                print(f"Error fetching CLOB books: {resp.status}")
+                return {}
+            data = await resp.json()
+    except Exception as e:
+        print(f"Exception fetching CLOB books: {e}")
+        return {}
+    return {b.get("asset_id"): poly_book_from_snapshot(b, depth) for b in data or [] if b.get("asset_id")}
+
+
+@tracing.traced("clob.get_books")
+async def get_poly_books(token_ids, depth=BOOK_DEPTH):
+    """
+    DepthBooks for Polymarket outcome tokens. Cached tokens are served from
+    POLY_BOOKS; the rest go out in batched POST /books calls (concurrently).
+    Returns {token_id: DepthBook} (unknown/failed tokens are omitted).
+    """
+    token_ids = list(dict.fromkeys(str(t) for t in token_ids if t))
+    books = {}
+    missing = []
+    for t in token_ids:
+        book = POLY_BOOKS.get(t)
+        if book is None:
+            missing.append(t)
+        else:
+            books[t] = book
+    tracing.annotate(tokens=len(token_ids), fetched=len(missing))
+
+    if missing:
+        batches = [missing[i:i + POLY_BATCH_SIZE] for i in range(0, len(missing), POLY_BATCH_SIZE)]
+        async with client_session() as session:
+            results = await asyncio.gather(*(_fetch_poly_batch(session, b, depth) for b in batches))
+        for fetched in results:
+            for t, book in fetched.items():
+                POLY_BOOKS.set(t, book)
+                quote_store.record_book("poly", t, book)
+                books[t] = book
+    return books
+
+
+def poly_depth(yes_book, no_book, qty):
+    """{"yes": summary, "no": summary} from the two outcome token books (either may be None)."""
+    return {
+        side: depth_summary(book, qty)
+        for side, book in (("yes", yes_book), ("no", no_book))
+        if book is not None
+    }
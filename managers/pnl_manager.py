@@ -0,0 +1,296 @@
+import os
+import json
+import time
+from datetime import datetime, timezone, timedelta
+from . import portfolio_manager
+from . import quote_store
+from .config import PNL_STATE_FILE
+
+# --- P&L Engine ---
+# Folds Kalshi fills into per-ticker positions incrementally. A persisted cursor
+# (newest fill time + the trade ids at that time) means fills are only ever
+# fetched once; realized P&L is bucketed by UTC day so !pnl day/week/all are
+# answered from the aggregates without touching the API.
+#
+# Positions are kept in YES-equivalent contracts: buying NO at 100 - p is the
+# same exposure as selling YES at p, so every fill becomes (+/- count, yes_price).
+# Amounts are in cents. Fees are not included (fills don't carry them).
+#
+# Pages come newest first, but fills must be applied oldest first, so a sync
+# collects every page before applying any. A long backfill is resumable: each
+# sync() fetches at most SYNC_MAX_PAGES pages and persists the paging cursor
+# and the fills collected so far ("sync_pending"), and the next call continues
+# from there. After a failed fetch, ingest_recent waits (SYNC_RETRY_MIN doubling
+# up to SYNC_RETRY_MAX seconds) before trying again.
+
+PERIODS = ("day", "week", "all")
+SYNC_PAGE_SIZE = 100
+SYNC_MAX_PAGES = 50 # pages per sync() call; a longer backfill resumes on the next call
+SYNC_RETRY_MIN = 5 # seconds
+SYNC_RETRY_MAX = 300
+# Kept for fills waiting in a resumable backfill (what apply_fill reads)
+FILL_FIELDS = ("trade_id", "ticker", "created_time", "count", "yes_price", "no_price", "price", "action", "side")
+
+
+def fill_time(fill):
+    """created_time as unix seconds (0 if missing/unparsable)."""
+    raw = fill.get("created_time")
+    if not raw:
+        return 0.0
+    try:
+        return datetime.fromisoformat(raw.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def _day(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def yes_equivalent(fill):
+    """(signed YES contracts, yes price in cents) for one fill."""
+    count = int(fill.get("count", 0) or 0)
+    price = fill.get("yes_price")
+    if price is None:
+        no_price = fill.get("no_price")
+        price = 100 - no_price if no_price is not None else (fill.get("price") or 0)
+    buying = (fill.get("action", "buy").lower() == "buy")
+    yes_side = (fill.get("side", "yes").lower() == "yes")
+    sign = 1 if buying == yes_side else -1
+    return sign * count, float(price)
+
+
+class PnLEngine:
+    def __init__(self, state_file=PNL_STATE_FILE):
+        self.state_file = state_file
+        self.cursor_ts = 0.0
+        self.cursor_ids = set()
+        self.positions = {} # ticker -> {"qty", "avg", "realized", "fills"}
+        self.realized_by_day = {} # "YYYY-MM-DD" -> cents
+        self.fills_by_day = {}
+        self.realized_total = 0.0
+        self.fills_total = 0
+        self.synced_once = False
+        self.pending = None # backfill in progress: {"min_ts", "cursor", "fills"}
+        self.retry_at = 0.0 # monotonic; ingest_recent doesn't sync before this
+        self._failures = 0
+        self._load()
+
+    # --- Persistence ---
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r") as f:
+                state = json.load(f)
+        except Exception as e:
+            print(f"Error reading P&L state: {e}")
+            return
+        self.cursor_ts = state.get("cursor_ts", 0.0)
+        self.cursor_ids = set(state.get("cursor_ids", []))
+        self.positions = state.get("positions", {})
+        self.realized_by_day = state.get("realized_by_day", {})
+        self.fills_by_day = state.get("fills_by_day", {})
+        self.realized_total = state.get("realized_total", 0.0)
+        self.fills_total = state.get("fills_total", 0)
+        self.synced_once = bool(self.cursor_ts)
+        self.pending = state.get("sync_pending")
+
+    def save(self):
+        state = {
+            "cursor_ts": self.cursor_ts,
+            "cursor_ids": sorted(self.cursor_ids),
+            "positions": self.positions,
+            "realized_by_day": self.realized_by_day,
+            "fills_by_day": self.fills_by_day,
+            "realized_total": self.realized_total,
+            "fills_total": self.fills_total,
+            "sync_pending": self.pending,
+        }
+        try:
+            tmp = f"{self.state_file}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp, self.state_file)
+        except Exception as e:
+            print(f"Error writing P&L state: {e}")
+
+    # --- Ingest ---
+
+    def _is_new(self, fill):
+        ts = fill_time(fill)
+        return ts > self.cursor_ts or (ts == self.cursor_ts and fill.get("trade_id") not in self.cursor_ids)
+
+    def apply_fill(self, fill):
+        """Updates position, average cost and realized P&L for one fill. Returns realized cents."""
+        ticker = fill.get("ticker")
+        if not ticker:
+            return 0.0
+        delta, price = yes_equivalent(fill)
+        pos = self.positions.setdefault(ticker, {"qty": 0, "avg": 0.0, "realized": 0.0, "fills": 0})
+        pos["fills"] += 1
+        qty, avg = pos["qty"], pos["avg"]
+        realized = 0.0
+
+        if qty == 0 or (qty > 0) == (delta > 0):
+            # Opening or adding: blend the average cost
+            new_qty = qty + delta
+            if new_qty:
+                pos["avg"] = (avg * abs(qty) + price * abs(delta)) / abs(new_qty)
+            pos["qty"] = new_qty
+        else:
+            # Reducing (and maybe flipping)
+            closing = min(abs(delta), abs(qty))
+            realized = (price - avg) * closing * (1 if qty > 0 else -1)
+            leftover = abs(delta) - closing
+            if leftover:
+                pos["qty"] = leftover * (1 if delta > 0 else -1)
+                pos["avg"] = price
+            else:
+                pos["qty"] = qty + (closing if delta > 0 else -closing)
+                if pos["qty"] == 0:
+                    pos["avg"] = 0.0
+
+        ts = fill_time(fill)
+        day = _day(ts)
+        pos["realized"] += realized
+        self.realized_total += realized
+        self.realized_by_day[day] = self.realized_by_day.get(day, 0.0) + realized
+        self.fills_by_day[day] = self.fills_by_day.get(day, 0) + 1
+        self.fills_total += 1
+
+        if ts > self.cursor_ts:
+            self.cursor_ts = ts
+            self.cursor_ids = set()
+        self.cursor_ids.add(fill.get("trade_id"))
+        return realized
+
+    def ingest(self, fills):
+        """Applies the fills newer than the cursor (any order, duplicates ignored). Returns how many."""
+        new = [f for f in fills if self._is_new(f)]
+        new.sort(key=fill_time)
+        for f in new:
+            if self._is_new(f): # duplicates within the batch
+                self.apply_fill(f)
+        if new:
+            self.save()
+        return len(new)
+
+    async def sync(self, max_pages=SYNC_MAX_PAGES):
+        """
+        Fetches every fill since the cursor (the full history only on the very first run)
+        and applies them oldest first. Returns how many were applied, or None if the
+        backfill isn't finished: a failed page (the next call retries it) or max_pages
+        reached (the next call continues from the saved paging cursor). The cursor and
+        aggregates only move once every page is in.
+        """
+        pending = self.pending or {
+            "min_ts": int(self.cursor_ts) if self.cursor_ts else None,
+            "cursor": None,
+            "fills": [],
+        }
+        for _ in range(max_pages):
+            fills, cursor = await portfolio_manager.get_fills_page(
+                min_ts=pending["min_ts"], cursor=pending["cursor"], limit=SYNC_PAGE_SIZE)
+            if fills is None:
+                self._sync_failed(pending)
+                return None
+            pending["fills"].extend({k: f[k] for k in FILL_FIELDS if k in f} for f in fills)
+            pending["cursor"] = cursor
+            if not cursor or not fills:
+                self.pending = None
+                self._failures = 0
+                self.retry_at = 0.0
+                applied = self.ingest(pending["fills"])
+                self.synced_once = True
+                self.save() # clears sync_pending (ingest only saves when something was new)
+                return applied
+        self.pending = pending
+        self.save()
+        print(f"P&L sync: {len(pending['fills'])} fills fetched, continuing on the next sync")
+        return None
+
+    def _sync_failed(self, pending):
+        """Keeps the pages fetched so far and backs off ingest_recent's retries."""
+        self.pending = pending
+        self.save()
+        self._failures += 1
+        delay = min(SYNC_RETRY_MAX, SYNC_RETRY_MIN * 2 ** (self._failures - 1))
+        self.retry_at = time.monotonic() + delay
+        print(f"P&L sync failed, retrying in {delay}s")
+
+    async def ingest_recent(self, fills):
+        """
+        For order_monitor's newest-first window: applies the new ones. If every fill in
+        the window is new (there may be more behind it), sync() runs first, from the
+        cursor as it was; ingesting the window first would move the cursor past the gap.
+        While a backfill is unfinished (or backing off after a failure) the window is
+        left for a later tick.
+        """
+        if not fills:
+            return 0
+        if not self.synced_once or self.pending or all(self._is_new(f) for f in fills):
+            if time.monotonic() < self.retry_at:
+                return 0
+            applied = await self.sync()
+            if applied is None:
+                return 0 # window left for the next tick, cursor unchanged
+            return applied + self.ingest(fills)
+        return self.ingest(fills)
+
+    # --- Queries ---
+
+    def realized(self, period="all", now=None):
+        if period == "all":
+            return self.realized_total, self.fills_total
+        now = now or datetime.now(timezone.utc)
+        days = 1 if period == "day" else 7
+        keys = [(now - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+        return (
+            sum(self.realized_by_day.get(k, 0.0) for k in keys),
+            sum(self.fills_by_day.get(k, 0) for k in keys),
+        )
+
+    def open_positions(self):
+        return {t: p for t, p in self.positions.items() if p["qty"]}
+
+    def unrealized(self):
+        """
+        Marks open positions from the latest cached quotes: longs at the YES bid,
+        shorts at the YES ask. Returns (cents, marked, unmarked).
+        """
+        total = 0.0
+        marked = unmarked = 0
+        for ticker, p in self.open_positions().items():
+            q = quote_store.last_quote("kalshi", ticker)
+            price = None
+            if q:
+                price = q[0] if p["qty"] > 0 else q[1]
+            if price is None:
+                unmarked += 1
+                continue
+            total += (price - p["avg"]) * p["qty"]
+            marked += 1
+        return total, marked, unmarked
+
+    def summary(self, period="day"):
+        realized, fills = self.realized(period)
+        unrealized, marked, unmarked = self.unrealized()
+        return {
+            "period": period,
+            "realized": realized,
+            "fills": fills,
+            "unrealized": unrealized,
+            "open_positions": marked + unmarked,
+            "unmarked": unmarked,
+        }
+
+
+_engine = None
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = PnLEngine()
+    return _engine
@@ -0,0 +1,21 @@
+# --- Adaptive Poll Interval ---
+# For loops that poll for activity (order_monitor): right after activity the
+# interval drops to `minimum`, then every idle tick multiplies it by `backoff`
+# up to `maximum`. Fills tend to come in bursts, so a burst is followed
+# closely while a quiet account costs a request every `maximum` seconds.
+
+
+class AdaptiveInterval:
+    def __init__(self, minimum, maximum, backoff=2.0):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.backoff = max(1.0, backoff)
+        self.current = minimum
+
+    def update(self, active):
+        """Interval (seconds) until the next tick, after one with (or without) activity."""
+        if active:
+            self.current = self.minimum
+        else:
+            self.current = min(self.maximum, self.current * self.backoff)
+        return self.current
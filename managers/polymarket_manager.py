@@ -1,20 +1,16 @@
 
-import aiohttp
+from .http_client import client_session
+import json
 import asyncio
+from contextlib import aclosing
 from datetime import datetime
 from .utils import find_best_match
-
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from . import metrics
+from . import tracing
+from .json_stream import iter_json_array, CHUNK_SIZE
+from .config import POLY_API_KEY, POLY_SECRET, POLY_PASSPHRASE, POLY_WALLET_KEY, POLY_PROXY_ADDRESS, POLY_CLOB_URL
 
 GAMMA_URL = "https://gamma-api.polymarket.com/events"
-POLY_API_KEY = os.getenv("POLY_API_KEY")
-POLY_SECRET = os.getenv("POLY_SECRET")
-POLY_PASSPHRASE = os.getenv("POLY_PASSPHRASE")
-POLY_WALLET_KEY = os.getenv("POLY_WALLET_KEY")
-POLY_PROXY_ADDRESS = os.getenv("POLY_PROXY_ADDRESS")
 
 async def get_balance():
     """
@@ -33,7 +29,7 @@ async def get_balance():
         # host: https://clob.polymarket.com
         # chain_id: 137 (Polygon Mainnet)
         client = ClobClient(
-            host="https://clob.polymarket.com",
+            host=POLY_CLOB_URL,
             key=POLY_WALLET_KEY,
             chain_id=137, # Polygon
             signature_type=1 # 0 or 1? Usually 1 (EIP712) or 2? Let's try default or 1.
@@ -69,55 +65,179 @@ async def get_balance():
     except Exception as e:
         return None, f"Polymarket Client Error: {e}"
 
-async def search_events(query, tag_id=None):
+# --- Gamma Paging ---
+# /events is read in offset/limit pages so callers can stop once they have what
+# they need, while big tags (NFL props etc.) are still covered past the first page.
+GAMMA_PAGE_SIZE = 100
+GAMMA_MAX_EVENTS = 5000 # Safety cap on how deep a tagged scan goes
+GAMMA_GLOBAL_MAX_EVENTS = 1000 # Untagged scans read the whole feed: keep them at the old single-request depth
+EARLY_STOP_SCORE = 0.8 # try_search stops paging once a candidate scores this high
+
+# --- Ingest Projection ---
+# Gamma events carry every market with long descriptions; only these fields are
+# kept. JSON-string fields ('["0.52", "0.48"]') are decoded once, here.
+EVENT_FIELDS = ("id", "slug", "title")
+MARKET_FIELDS = ("id", "question", "groupItemTitle", "outcomes", "outcomePrices", "clobTokenIds", "bestAsk", "conditionId")
+JSON_STRING_FIELDS = ("outcomes", "outcomePrices", "clobTokenIds")
+
+def _decode_list(value):
+    """'["a", "b"]' -> ["a", "b"]; lists pass through; anything unparsable -> []."""
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        try:
+            decoded = json.loads(value)
+            return decoded if isinstance(decoded, list) else []
+        except ValueError:
+            return []
+    return []
+
+def project_event(event):
+    """Trims a raw Gamma event down to the fields the bot reads."""
+    out = {k: event.get(k) for k in EVENT_FIELDS}
+    markets = []
+    for m in event.get("markets") or []:
+        pm = {k: m.get(k) for k in MARKET_FIELDS if k in m}
+        for k in JSON_STRING_FIELDS:
+            if k in pm:
+                pm[k] = _decode_list(pm[k])
+        markets.append(pm)
+    out["markets"] = markets
+    return out
+
+async def iter_event_pages(query=None, tag_id=None, page_size=None, max_events=None):
     """
-    Search Polymarket events by query string (e.g. Team Name).
-    Optional: Filter by Tag ID (e.g. 450 for NFL).
+    Async generator over active Gamma events, one page (list of events) at a time.
+    Responses are parsed incrementally and every event goes through project_event().
+    Stops after a short page, an API error or `max_events` (default
+    GAMMA_MAX_EVENTS with a tag, GAMMA_GLOBAL_MAX_EVENTS without).
+    Wrap in contextlib.aclosing() when breaking out early so the session closes.
     """
+    page_size = page_size or GAMMA_PAGE_SIZE
+    max_events = max_events or (GAMMA_MAX_EVENTS if tag_id else GAMMA_GLOBAL_MAX_EVENTS)
     params = {
-        "limit": 10,
+        "limit": page_size,
         "active": "true",
         "closed": "false",
-        "q": query
     }
-    
-    async with aiohttp.ClientSession() as session:
+    # API seems to ignore 'q', so callers filter locally. tag_id is filtered server side.
+    if query:
+        params["q"] = query
+    if tag_id:
+        params["tag_id"] = tag_id
+
+    async with client_session() as session:
+        offset = 0
+        while offset < max_events:
+            params["offset"] = offset
+            try:
+                async with session.get(GAMMA_URL, params=params) as resp:
+                    if resp.status != 200:
+                        print(f"Polymarket API Error: {resp.status}")
+                        return
+                    page = [
+                        project_event(e)
+                        async for e in iter_json_array(resp.content.iter_chunked(CHUNK_SIZE))
+                    ]
+            except Exception as e:
+                print(f"Polymarket Request Error: {e}")
+                return
+
+            yield page
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+async def iter_search_events(query, tag_id=None, page_size=None, max_events=None):
+    """
+    Like search_events(), but yields the matches of each page as it arrives
+    (pages without matches are skipped).
+    """
+    # Client-side validation: Ensure query is actually in title
+    q_low = query.lower()
+    pages = iter_event_pages(query, tag_id=tag_id, page_size=page_size, max_events=max_events)
+    async with aclosing(pages):
+        async for page in pages:
+            matched = [e for e in page if q_low in (e.get("title") or "").lower()]
+            if matched:
+                yield matched
+
+class SharedScan:
+    """
+    One Gamma scan (per tag) shared by several queries: pages are fetched once,
+    only as far as some query needs, and replayed to the next. The API ignores
+    'q', so every query of a scan filters the same pages. close() when done.
+    """
+
+    def __init__(self, tag_id=None):
+        self.pages = []
+        self._source = iter_event_pages(tag_id=tag_id)
+        self._exhausted = False
+
+    async def iter_pages(self):
+        i = 0
+        while True:
+            if i == len(self.pages):
+                if self._exhausted:
+                    return
+                try:
+                    self.pages.append(await self._source.__anext__())
+                except StopAsyncIteration:
+                    self._exhausted = True
+                    return
+            yield self.pages[i]
+            i += 1
+
+    async def close(self):
+        await self._source.aclose()
+
+@tracing.traced("gamma.search")
+async def search_events(query, tag_id=None):
+    """
+    Search Polymarket events by query string (e.g. Team Name).
+    Optional: Filter by Tag ID (e.g. 450 for NFL).
+    Reads every page; use iter_search_events() to stop early.
+    """
+    tracing.annotate(query=query, tag_id=tag_id)
+    q_low = query.lower()
+    fetched = 0
+    pages = 0
+    filtered = []
+    async for page in iter_event_pages(query, tag_id=tag_id):
+        fetched += len(page)
+        pages += 1
+        # If query is "Seattle", match "Seattle"
+        filtered.extend(e for e in page if q_low in (e.get("title") or "").lower())
+
+    tracing.annotate(fetched=fetched, pages=pages, matched=len(filtered))
+    return filtered
+
+@tracing.traced("gamma.get_event")
+async def get_event(slug=None, event_id=None):
+    """
+    One Gamma event by slug (GET /events/slug/{slug}) or ID (GET /events/{id}),
+    through project_event(). Returns None if not found or on error.
+    """
+    tracing.annotate(slug=slug, event_id=event_id)
+    if slug:
+        url = f"{GAMMA_URL}/slug/{slug}"
+    elif event_id:
+        url = f"{GAMMA_URL}/{event_id}"
+    else:
+        return None
+    async with client_session() as session:
         try:
-            # API seems to ignore 'q', so we fetch more and filter locally.
-            # Using limit 1000 to catch active sports games from popular feed.
-            # If tag_id is provided, filter by it on server side!
-            req_params = {
-                "limit": 1000,
-                "active": "true",
-                "closed": "false",
-                "q": query 
-            }
-            if tag_id:
-                req_params["tag_id"] = tag_id
-                # Keep limit high (1000) even with tag, as categories like NFL have many events (props).
-                # req_params["limit"] = 100
-            async with session.get(GAMMA_URL, params=req_params) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    # Client-side validation: Ensure query is actually in title
-                    # Split query into words to be lenient? 
-                    # Or just query.lower() in title.lower()
-                    
-                    q_low = query.lower()
-                    filtered = []
-                    for e in data:
-                        t = e.get("title", "").lower()
-                        # If query is "Seattle", match "Seattle"
-                        if q_low in t:
-                            filtered.append(e)
-                            
-                    return filtered 
-                else:
-                    print(f"Polymarket API Error: {resp.status}")
-                    return []
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    return None
+                event = await resp.json()
         except Exception as e:
             print(f"Polymarket Request Error: {e}")
-            return []
+            return None
+    # /events?slug= style responses are lists
+    if isinstance(event, list):
+        event = event[0] if event else None
+    return project_event(event) if event else None
 
 async def get_market_odds(condition_id):
     """
@@ -127,76 +247,81 @@ async def get_market_odds(condition_id):
     """
     pass
 
-async def find_polymarket_match(kalshi_title, sport=None, date_str=None):
-    """
-    Finds a matching Polymarket event for a Kalshi event.
-    kalshi_title: "Los Angeles Lakers vs Golden State Warriors"
-    sport: "NFL", "NBA", etc. (Optional, speeds up search)
-    date_str: "Dec 25" (Optional, for validation)
-    """
-    
-    tag_id = None
-    if sport:
-        # Map Kalshi Sport to Poly Tag
-        sport_map = {
-            "NFL": 450,
-            "NBA": 745,
-            "NHL": 899,
-            "MLB": 2217, # Heuristic
-            "Football": 10, # Generic generic
-            "Basketball": 28
-        }
-        # Kalshi usually gives "NFL", "NBA".
-        tag_id = sport_map.get(sport.upper())
-    
-    # NFL Team Mapping (Kalshi City/Abbr -> Poly Nickname)
-    nfl_map = {
-        "arizona": "cardinals", "atlanta": "falcons", "baltimore": "ravens", 
-        "buffalo": "bills", "carolina": "panthers", "chicago": "bears",
-        "cincinnati": "bengals", "cleveland": "browns", "dallas": "cowboys",
-        "denver": "broncos", "detroit": "lions", "green bay": "packers",
-        "houston": "texans", "indianapolis": "colts", "jacksonville": "jaguars",
-        "kansas city": "chiefs", "las vegas": "raiders", "los angeles c": "chargers",
-        "los angeles r": "rams", "miami": "dolphins", "minnesota": "vikings",
-        "new england": "patriots", "new orleans": "saints", "new york g": "giants",
-        "new york j": "jets", "philadelphia": "eagles", "pittsburgh": "steelers",
-        "san francisco": "49ers", "seattle": "seahawks", "tampa bay": "buccaneers",
-        "tennessee": "titans", "washington": "commanders"
-    }
+# Map Kalshi Sport to Poly Tag
+SPORT_TAGS = {
+    "NFL": 450,
+    "NBA": 745,
+    "NHL": 899,
+    "MLB": 2217, # Heuristic
+    "Football": 10, # Generic generic
+    "Basketball": 28
+}
 
-    # NBA Team Mapping
-    nba_map = {
-        "atlanta": "hawks", "boston": "celtics", "brooklyn": "nets",
-        "charlotte": "hornets", "chicago": "bulls", "cleveland": "cavaliers",
-        "dallas": "mavericks", "denver": "nuggets", "detroit": "pistons",
-        "golden state": "warriors", "houston": "rockets", "indiana": "pacers",
-        "los angeles c": "clippers", "lac": "clippers",
-        "los angeles l": "lakers", "lal": "lakers",
-        "memphis": "grizzlies", "miami": "heat", "milwaukee": "bucks",
-        "minnesota": "timberwolves", "new orleans": "pelicans", "new york": "knicks",
-        "oklahoma city": "thunder", "orlando": "magic", "philadelphia": "76ers",
-        "phoenix": "suns", "portland": "trail blazers", "sacramento": "kings",
-        "san antonio": "spurs", "toronto": "raptors", "utah": "jazz",
-        "washington": "wizards"
-    }
-    
-    # NHL Team Mapping
-    nhl_map = {
-        "anaheim": "ducks", "boston": "bruins", "buffalo": "sabres",
-        "calgary": "flames", "carolina": "hurricanes", "chicago": "blackhawks",
-        "colorado": "avalanche", "columbus": "blue jackets", "dallas": "stars",
-        "detroit": "red wings", "edmonton": "oilers", "florida": "panthers",
-        "los angeles": "kings", "minnesota": "wild", "montreal": "canadiens",
-        "nashville": "predators", "new jersey": "devils", 
-        "new york i": "islanders", "nyi": "islanders",
-        "new york r": "rangers", "nyr": "rangers",
-        "ottawa": "senators", "philadelphia": "flyers", "pittsburgh": "penguins",
-        "san jose": "sharks", "seattle": "kraken", "st. louis": "blues",
-        "tampa bay": "lightning", "toronto": "maple leafs", "utah": "hockey club",
-        "vancouver": "canucks", "vegas": "golden knights", "las vegas": "golden knights",
-        "washington": "capitals", "winnipeg": "jets"
-    }
+# NFL Team Mapping (Kalshi City/Abbr -> Poly Nickname)
+NFL_TEAMS = {
+    "arizona": "cardinals", "atlanta": "falcons", "baltimore": "ravens", 
+    "buffalo": "bills", "carolina": "panthers", "chicago": "bears",
+    "cincinnati": "bengals", "cleveland": "browns", "dallas": "cowboys",
+    "denver": "broncos", "detroit": "lions", "green bay": "packers",
+    "houston": "texans", "indianapolis": "colts", "jacksonville": "jaguars",
+    "kansas city": "chiefs", "las vegas": "raiders", "los angeles c": "chargers",
+    "los angeles r": "rams", "miami": "dolphins", "minnesota": "vikings",
+    "new england": "patriots", "new orleans": "saints", "new york g": "giants",
+    "new york j": "jets", "philadelphia": "eagles", "pittsburgh": "steelers",
+    "san francisco": "49ers", "seattle": "seahawks", "tampa bay": "buccaneers",
+    "tennessee": "titans", "washington": "commanders"
+}
+
+# NBA Team Mapping
+NBA_TEAMS = {
+    "atlanta": "hawks", "boston": "celtics", "brooklyn": "nets",
+    "charlotte": "hornets", "chicago": "bulls", "cleveland": "cavaliers",
+    "dallas": "mavericks", "denver": "nuggets", "detroit": "pistons",
+    "golden state": "warriors", "houston": "rockets", "indiana": "pacers",
+    "los angeles c": "clippers", "lac": "clippers",
+    "los angeles l": "lakers", "lal": "lakers",
+    "memphis": "grizzlies", "miami": "heat", "milwaukee": "bucks",
+    "minnesota": "timberwolves", "new orleans": "pelicans", "new york": "knicks",
+    "oklahoma city": "thunder", "orlando": "magic", "philadelphia": "76ers",
+    "phoenix": "suns", "portland": "trail blazers", "sacramento": "kings",
+    "san antonio": "spurs", "toronto": "raptors", "utah": "jazz",
+    "washington": "wizards"
+}
+
+# NHL Team Mapping
+NHL_TEAMS = {
+    "anaheim": "ducks", "boston": "bruins", "buffalo": "sabres",
+    "calgary": "flames", "carolina": "hurricanes", "chicago": "blackhawks",
+    "colorado": "avalanche", "columbus": "blue jackets", "dallas": "stars",
+    "detroit": "red wings", "edmonton": "oilers", "florida": "panthers",
+    "los angeles": "kings", "minnesota": "wild", "montreal": "canadiens",
+    "nashville": "predators", "new jersey": "devils", 
+    "new york i": "islanders", "nyi": "islanders",
+    "new york r": "rangers", "nyr": "rangers",
+    "ottawa": "senators", "philadelphia": "flyers", "pittsburgh": "penguins",
+    "san jose": "sharks", "seattle": "kraken", "st. louis": "blues",
+    "tampa bay": "lightning", "toronto": "maple leafs", "utah": "hockey club",
+    "vancouver": "canucks", "vegas": "golden knights", "las vegas": "golden knights",
+    "washington": "capitals", "winnipeg": "jets"
+}
 
+TEAM_MAPS = {"NFL": NFL_TEAMS, "NBA": NBA_TEAMS, "NHL": NHL_TEAMS}
+
+def sport_tag_id(sport):
+    """Polymarket tag for a Kalshi sport/league name (e.g. "NBA" -> 745), or None."""
+    if not sport:
+        return None
+    # Kalshi usually gives "NFL", "NBA".
+    return SPORT_TAGS.get(sport.upper())
+
+def normalize_kalshi_title(kalshi_title, sport=None):
+    """
+    Splits a Kalshi title into teams and translates them to Polymarket nicknames.
+    Pure function (no I/O) so it can also run in the match_pool worker processes.
+
+    Returns (team_a, team_b, match_title):
+        "Los Angeles R at Seattle", "NFL" -> ("rams", "seahawks", "Rams vs Seahawks")
+    """
     # 1. Extract Teams
     # Kalshi: "Team A vs Team B" or "Team A at Team B"
     s_title = kalshi_title.lower().strip()
@@ -215,21 +340,97 @@ async def find_polymarket_match(kalshi_title, sport=None, date_str=None):
         # Fallback
         team_a = s_title
 
-    if sport == "NFL":
-        team_a = nfl_map.get(team_a, team_a)
-        team_b = nfl_map.get(team_b, team_b)
-
-    if sport == "NBA":
-        team_a = nba_map.get(team_a, team_a)
-        team_b = nba_map.get(team_b, team_b)
-        
-    if sport == "NHL":
-        team_a = nhl_map.get(team_a, team_a)
-        team_b = nhl_map.get(team_b, team_b)
+    team_map = TEAM_MAPS.get(sport)
+    if team_map:
+        team_a = team_map.get(team_a, team_a)
+        team_b = team_map.get(team_b, team_b)
             
     # Validated: If team name was translated, using it for search is usually better.
     # e.g. "Kings" works better than "Sacramento".
 
+    # Use mapped title for matching if we translated it
+    match_title = kalshi_title
+    if team_map and team_a and team_b:
+        # Construct "Rams vs Seahawks" or "Kings vs Trail Blazers" to match Poly format
+        # Poly format often "Home vs Away" or "Away @ Home" or just "vs".
+        match_title = f"{team_a.title()} vs {team_b.title()}"
+
+    return team_a, team_b, match_title
+
+def select_game_market(event):
+    """
+    The event's "Winner" / moneyline market: the market titled like the event,
+    else the shortest question that isn't a spread/total/prop, else the first.
+    """
+    markets = event.get("markets") or []
+    if not markets:
+        return None
+
+    m = None
+    
+    # Smart selection of the "Moneyline" / "Winner" market
+    # 1. Try Exact Title Match first
+    for market in markets:
+        if market.get("question") == event.get("title"):
+            m = market
+            break
+            
+    # 2. If no exact match, try filtering out props/spreads
+    if not m:
+        candidates = []
+        exclusion_keywords = ["Spread", "Total", "Over", "Under", "Handicap", "Touchdown", "Yards", "Field Goal", "1H", "2H", "Quarter"]
+        
+        for market in markets:
+            q_text = market.get("question", "")
+            is_excluded = any(k in q_text for k in exclusion_keywords)
+            if not is_excluded:
+                candidates.append(market)
+        
+        # Pick the shortest question candidate (usually the cleanest "Team A vs Team B")
+        if candidates:
+            candidates.sort(key=lambda x: len(x.get("question", "")))
+            m = candidates[0]
+            
+    # 3. Fallback
+    if not m:
+         m = markets[0]
+
+    return m
+
+@tracing.traced("polymarket.match")
+async def find_polymarket_match(kalshi_title, sport=None, date_str=None):
+    """
+    Finds a matching Polymarket event for a Kalshi event.
+    kalshi_title: "Los Angeles Lakers vs Golden State Warriors"
+    sport: "NFL", "NBA", etc. (Optional, speeds up search)
+    date_str: "Dec 25" (Optional, for validation)
+    """
+    
+    tag_id = sport_tag_id(sport)
+    team_a, team_b, match_title = normalize_kalshi_title(kalshi_title, sport)
+
+    # Every query below (both teams, stripped names) reads the same tagged and
+    # global scans: a page is fetched at most once per match.
+    scans = {}
+
+    async def search_until_confident(q, tag):
+        # Page through Gamma, stopping as soon as a candidate is a confident match
+        if tag not in scans:
+            scans[tag] = SharedScan(tag)
+        q_low = q.lower()
+        found = []
+        pages = scans[tag].iter_pages()
+        async with aclosing(pages):
+            async for page in pages:
+                matches = [e for e in page if q_low in (e.get("title") or "").lower()]
+                if not matches:
+                    continue
+                found.extend(matches)
+                _, score = find_best_match(match_title, found, threshold=EARLY_STOP_SCORE)
+                if score >= EARLY_STOP_SCORE:
+                    break
+        return found
+
     # Helper to search and filter
     async def try_search(q):
         # Remove single letter suffixes usually found in Kalshi (e.g. "Los Angeles R")
@@ -237,14 +438,14 @@ async def find_polymarket_match(kalshi_title, sport=None, date_str=None):
         # Actually, let's just search raw first, if 0, try stripping.
         
         # Try searching with Tag first (more specific)
-        cands = await search_events(q, tag_id=tag_id)
+        cands = await search_until_confident(q, tag_id)
         if cands: 
             return cands
             
         # If no results with Tag, try Global search (Fallback)
         # Sometimes events are tagged incorrectly or API fails with tag filter
         if tag_id:
-            cands = await search_events(q, tag_id=None)
+            cands = await search_until_confident(q, None)
             if cands: 
                 return cands
         
@@ -253,11 +454,11 @@ async def find_polymarket_match(kalshi_title, sport=None, date_str=None):
         if len(q.split()) > 1 and len(q.split()[-1]) == 1:
              q_stripped = " ".join(q.split()[:-1])
              # Try stripped with tag
-             cands = await search_events(q_stripped, tag_id=tag_id)
+             cands = await search_until_confident(q_stripped, tag_id)
              if cands: return cands
              # Try stripped global
              if tag_id:
-                 cands = await search_events(q_stripped, tag_id=None)
+                 cands = await search_until_confident(q_stripped, None)
                  if cands: return cands
              
         return []
@@ -267,12 +468,17 @@ async def find_polymarket_match(kalshi_title, sport=None, date_str=None):
     # Polymarket search is usually good with one keyword (e.g. "Seahawks")
     
     candidates = []
-    if team_a:
-        candidates = await try_search(team_a)
-        
-    if not candidates and team_b:
-        candidates = await try_search(team_b)
-        
+    try:
+        if team_a:
+            candidates = await try_search(team_a)
+
+        if not candidates and team_b:
+            candidates = await try_search(team_b)
+    finally:
+        for scan in scans.values():
+            await scan.close()
+        tracing.annotate(gamma_pages=sum(len(scan.pages) for scan in scans.values()))
+
     if not candidates:
         return None
         
@@ -289,14 +495,10 @@ async def find_polymarket_match(kalshi_title, sport=None, date_str=None):
             "slug": c.get("slug")
         })
         
-    # Use mapped title for matching if we translated it
-    match_title = kalshi_title
-    if (sport == "NFL" or sport == "NBA" or sport == "NHL") and team_a and team_b:
-        # Construct "Rams vs Seahawks" or "Kings vs Trail Blazers" to match Poly format
-        # Poly format often "Home vs Away" or "Away @ Home" or just "vs".
-        match_title = f"{team_a.title()} vs {team_b.title()}"
-    
-    match, score = find_best_match(match_title, cand_list, threshold=0.4) # Lower threshold slightly
+    with metrics.timer("section_latency_ms", section="fuzzy_match"), \
+            tracing.span("fuzzy_match", target=match_title, candidates=len(cand_list)) as sp:
+        match, score = find_best_match(match_title, cand_list, threshold=0.4) # Lower threshold slightly
+        sp.set(score=round(score, 3), matched=match is not None)
     
     if match:
         # 4. Extract Odds
@@ -306,45 +508,12 @@ async def find_polymarket_match(kalshi_title, sport=None, date_str=None):
         if not markets:
             return None
             
-        # Find Moneyline equivalent
-        # Often the main market. Look for "match winner" or binary.
-        # For simple mapping, let's take the market with highest volume? Or just the first one.
-        # Let's take the first one for now.
-        
-        m = None
-        
-        # Smart selection of the "Moneyline" / "Winner" market
-        # 1. Try Exact Title Match first
-        for market in markets:
-            if market.get("question") == match.get("title"):
-                m = market
-                break
-                
-        # 2. If no exact match, try filtering out props/spreads
-        if not m:
-            candidates = []
-            exclusion_keywords = ["Spread", "Total", "Over", "Under", "Handicap", "Touchdown", "Yards", "Field Goal", "1H", "2H", "Quarter"]
-            
-            for market in markets:
-                q_text = market.get("question", "")
-                is_excluded = any(k in q_text for k in exclusion_keywords)
-                if not is_excluded:
-                    candidates.append(market)
-            
-            # Pick the shortest question candidate (usually the cleanest "Team A vs Team B")
-            if candidates:
-                candidates.sort(key=lambda x: len(x.get("question", "")))
-                m = candidates[0]
-                
-        # 3. Fallback
-        if not m:
-             m = markets[0]
+        m = select_game_market(match)
              
         # Use Best Bid/Ask if available for more real-time accuracy, fallback to outcomePrices
         # Check if we have bestBid/bestAsk in the market object (from Gamma)
         
-        prices = m.get("outcomePrices") # e.g. '["0.52", "0.48"]' (It's a JSON string!)
-        import json
+        prices = m.get("outcomePrices") # e.g. ["0.52", "0.48"] (decoded at ingest)
         
         yes_price = 0
         no_price = 0
@@ -359,7 +528,7 @@ async def find_polymarket_match(kalshi_title, sport=None, date_str=None):
 
         if yes_price == 0 and prices:
             try:
-                p_list = json.loads(prices)
+                p_list = _decode_list(prices)
                 if len(p_list) >= 2:
                     yes_price = float(p_list[0]) * 100 # Convert to cents
                     no_price = float(p_list[1]) * 100
@@ -1,88 +1,116 @@
-import aiohttp
-import os
 import asyncio
-from dotenv import load_dotenv
-from .auth import sign_request
+from . import accounts
 
-# Load environment variables
-load_dotenv()
+# Every call takes an optional `account` (managers/accounts.py); the default is the
+# primary account. The get_all_* helpers query every configured account concurrently
+# and return accounts.query_all() rows ({"account", "result", "error", "stale", "age_s"}).
 
-KALSHI_KEY_ID = os.getenv("KALSHI_KEY_ID")
-KALSHI_PRIVATE_KEY_PATH = os.getenv("KALSHI_PRIVATE_KEY_PATH")
-BASE_URL = "https://api.elections.kalshi.com/trade-api/v2"
-
-async def get_recent_fills(limit=10):
+async def get_recent_fills(limit=10, account=None):
     """
     Fetches the recent fills from the portfolio.
     """
-    # API Endpoint Suffix
-    # API Endpoint Suffix
-    endpoint = "/portfolio/fills"
-    params = {"limit": limit}
-    
-    # We must handle the case where keys are missing to avoid crashing if run locally without env
-    if not KALSHI_KEY_ID or not KALSHI_PRIVATE_KEY_PATH:
-        print("Warning: Missing Kalshi credentials. Cannot fetch fills.")
+    account = account or accounts.primary()
+    if not account.configured:
+        print(f"Warning: Missing Kalshi credentials for {account.name}. Cannot fetch fills.")
         return []
 
-    # Full path for signing (must include /trade-api/v2)
-    sign_path = f"/trade-api/v2{endpoint}"
-
-    try:
-        headers = sign_request("GET", sign_path, KALSHI_KEY_ID, KALSHI_PRIVATE_KEY_PATH)
-    except Exception as e:
-        print(f"Error signing request: {e}")
+    # Response expected: {"fills": [...]}
+    data, error = await account.get("/portfolio/fills", params={"limit": limit})
+    if error:
+        print(f"Error fetching fills ({account.name}): {error}")
         return []
+    return data.get("fills", [])
+
+async def get_fills_page(min_ts=None, cursor=None, limit=100, account=None):
+    """
+    One page of fills, newest first.
+    min_ts: only fills at/after this unix time (seconds). cursor: from the previous page.
+    Returns (fills, next_cursor); (None, None) on error so callers can retry later.
+    """
+    account = account or accounts.primary()
+    params = {"limit": limit}
+    if min_ts is not None:
+        params["min_ts"] = int(min_ts)
+    if cursor:
+        params["cursor"] = cursor
+
+    if not account.configured:
+        return None, None
 
-    # URL construction
-    # BASE_URL includes /trade-api/v2, so we just append endpoint
-    url = f"{BASE_URL}{endpoint}"
-    
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(url, headers=headers, params=params) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    # Response expected: {"fills": [...]}
-                    return data.get("fills", [])
-                else:
-                    text = await resp.text()
-                    print(f"Error fetching fills: {resp.status} {text}")
-                    return []
-        except Exception as e:
-            print(f"Exception fetching fills: {e}")
-            return []
-
-async def get_balance():
+    data, error = await account.get("/portfolio/fills", params=params)
+    if error:
+        print(f"Error fetching fills page ({account.name}): {error}")
+        return None, None
+    return data.get("fills", []), data.get("cursor") or None
+
+async def get_balance(account=None):
     """
-    Fetches the current available balance.
+    Fetches the current available balance (cents).
     """
-    endpoint = "/portfolio/balance"
-    sign_path = f"/trade-api/v2{endpoint}"
-    
-    if not KALSHI_KEY_ID or not KALSHI_PRIVATE_KEY_PATH:
+    account = account or accounts.primary()
+    if not account.configured:
         return 0
 
-    try:
-        headers = sign_request("GET", sign_path, KALSHI_KEY_ID, KALSHI_PRIVATE_KEY_PATH)
-    except Exception as e:
-        print(f"Error signing request: {e}")
+    data, error = await account.get("/portfolio/balance")
+    if error:
+        print(f"Error fetching balance ({account.name}): {error}")
         return 0
+    return data.get("balance", 0)
+
+async def get_positions(account=None):
+    """
+    Open market positions (non-zero). Returns (positions, error).
+    """
+    account = account or accounts.primary()
+    data, error = await account.get("/portfolio/positions")
+    if error:
+        return None, error
+    return [p for p in data.get("market_positions", []) if p.get("position", 0) != 0], None
+
+# --- All Accounts ---
+
+async def _balance_or_error(account):
+    data, error = await account.get("/portfolio/balance")
+    return (data.get("balance", 0), None) if not error else (None, error)
+
+# A tick asks for a small window of fills. A burst bigger than the window
+# since the last seen fill is caught up with cursor pages until that fill shows
+# up (at most FILL_CATCHUP_PAGES more pages), so no fill falls between ticks.
+FILL_CATCHUP_PAGE_SIZE = 100
+FILL_CATCHUP_PAGES = 5
 
-    url = f"{BASE_URL}{endpoint}"
-    
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(url, headers=headers) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    return data.get("balance", 0)
-                else:
-                    print(f"Error fetching balance: {resp.status}")
-                    return 0
-        except Exception as e:
-            print(f"Exception fetching balance: {e}")
-            return 0
+async def _fills_or_error(account, limit, last_trade_id=None):
+    data, error = await account.get("/portfolio/fills", params={"limit": limit})
+    if error:
+        return None, error
+    fills = data.get("fills", [])
+    cursor = data.get("cursor")
+    pages = 0
+    while last_trade_id and cursor and pages < FILL_CATCHUP_PAGES \
+            and not any(f.get("trade_id") == last_trade_id for f in fills):
+        data, error = await account.get("/portfolio/fills", params={"limit": FILL_CATCHUP_PAGE_SIZE, "cursor": cursor})
+        if error:
+            return None, error # partial window: the next tick retries from the same fill
+        fills.extend(data.get("fills", []))
+        cursor = data.get("cursor")
+        pages += 1
+    return fills, None
+
+async def get_all_balances(timeout=None):
+    """Balance (cents) per account."""
+    return await accounts.query_all("balance", _balance_or_error, timeout)
+
+async def get_all_positions(timeout=None):
+    """Open positions per account."""
+    return await accounts.query_all("positions", get_positions, timeout)
+
+async def get_all_recent_fills(limit=10, timeout=None, last_ids=None):
+    """
+    Recent fills (newest first) per account.
+    last_ids: {account name: last seen trade_id}; an account's window reaches back to that fill.
+    """
+    last_ids = last_ids or {}
+    return await accounts.query_all("fills", lambda a: _fills_or_error(a, limit, last_ids.get(a.name)), timeout)
 
 if __name__ == "__main__":
     fills = asyncio.run(get_recent_fills())
@@ -0,0 +1,177 @@
+import time
+import asyncio
+from . import metrics
+from . import snapshot_service
+from . import scheduler
+from .config import PREFETCH_MAX_SERIES, PREFETCH_CONCURRENCY, PREFETCH_TTL
+
+# --- Menu Prefetch ---
+# The !search menu takes two clicks (category, league) before show_results
+# fetches anything. Each click hands the prefetcher the snapshots the user is
+# likely to ask for next, in priority order, and they are warmed in the
+# background so the final click usually hits warm caches.
+#
+# Budget: at most PREFETCH_MAX_SERIES targets per user, and PREFETCH_CONCURRENCY
+# warms running at once across everyone. A new plan from the same user cancels
+# whatever of the old plan it no longer wants; the final click and view
+# timeouts cancel the rest.
+#
+# Outcomes (metrics "prefetch_total"):
+#   hit       show_results found its snapshot warm (or still warming)
+#             (a warm still in flight is raised to the click's priority)
+#   miss      show_results found nothing prefetched
+#   wasted    a warm expired (PREFETCH_TTL) without being used
+#   cancelled a planned warm was dropped before it finished
+
+MARKET_TYPE_ORDER = ("moneyline", "spread", "total") # most requested first
+
+metrics.describe("prefetch_total", "Menu prefetches by outcome (hit, miss, wasted, cancelled).")
+
+
+def category_targets(sub_map):
+    """Category click: every league's moneyline first, then the other market types."""
+    return [
+        (tickers[mt], league, mt)
+        for mt in MARKET_TYPE_ORDER
+        for league, tickers in sub_map.items()
+        if tickers.get(mt)
+    ]
+
+
+def series_targets(tickers_dict, sport_name):
+    """League click: that league's market types."""
+    return [(tickers_dict[mt], sport_name, mt) for mt in MARKET_TYPE_ORDER if tickers_dict.get(mt)]
+
+
+class Prefetcher:
+    def __init__(self, warm=None, max_series=PREFETCH_MAX_SERIES, concurrency=PREFETCH_CONCURRENCY, ttl=PREFETCH_TTL):
+        self.warm = warm or snapshot_service.warm # async fn(series, sport, market_type) -> bool
+        self.max_series = max_series
+        self.concurrency = concurrency
+        self.ttl = ttl
+        self._plans = {} # owner -> {target: Task}
+        self._running = set() # targets past the budget gate, warming now
+        self._warmed = {} # target -> monotonic time, not yet used
+        self._sem = None
+        self._sem_loop = None
+
+    @property
+    def enabled(self):
+        return self.max_series > 0
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._sem_loop is not loop:
+            self._sem = asyncio.Semaphore(max(1, self.concurrency))
+            self._sem_loop = loop
+        return self._sem
+
+    def _sweep(self):
+        now = time.monotonic()
+        for target, at in list(self._warmed.items()):
+            if now - at > self.ttl:
+                del self._warmed[target]
+                metrics.inc("prefetch_total", outcome="wasted")
+
+    # --- Planning ---
+
+    def plan(self, owner, targets):
+        """
+        Replaces `owner`'s plan with the first max_series targets. Targets already
+        warm or warming are left alone. Returns how many warms were started.
+        """
+        if not self.enabled:
+            return 0
+        self._sweep()
+        wanted = list(dict.fromkeys(targets))[:self.max_series]
+        old = self._plans.pop(owner, {})
+        for target, task in old.items():
+            if target not in wanted:
+                self._cancel(task)
+
+        plan = {}
+        started = 0
+        for target in wanted:
+            task = old.get(target)
+            if task is not None and not task.done():
+                plan[target] = task
+            elif target not in self._warmed and not self._warming(target):
+                plan[target] = asyncio.get_running_loop().create_task(self._run(owner, target))
+                started += 1
+        if plan:
+            self._plans[owner] = plan
+        return started
+
+    def _warming(self, target):
+        return any(target in p and not p[target].done() for p in self._plans.values())
+
+    async def _run(self, owner, target):
+        async with self._semaphore():
+            self._running.add(target)
+            try:
+                # Lowest priority: never ahead of the click it is guessing at
+                with scheduler.priority(scheduler.PREFETCH):
+                    ok = await self.warm(*target)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Prefetch failed for {target}: {e}")
+                ok = False
+            finally:
+                self._running.discard(target)
+        plan = self._plans.get(owner)
+        if plan is None or plan.get(target) is not asyncio.current_task():
+            return # used or dropped while warming
+        del plan[target]
+        if not plan:
+            del self._plans[owner]
+        if ok:
+            self._warmed[target] = time.monotonic()
+
+    def _cancel(self, task):
+        if not task.done():
+            task.cancel()
+            metrics.inc("prefetch_total", outcome="cancelled")
+
+    def cancel(self, owner):
+        """Drops `owner`'s pending warms (menu closed or timed out)."""
+        for task in self._plans.pop(owner, {}).values():
+            self._cancel(task)
+
+    # --- Use ---
+
+    def consume(self, owner, target):
+        """
+        Called by the final click, right before the snapshot is fetched for real.
+        Counts a hit or miss and cancels the rest of the owner's plan. Returns True on a hit.
+        """
+        self._sweep()
+        hit = self._warmed.pop(target, None) is not None or target in self._running
+        metrics.inc("prefetch_total", outcome="hit" if hit else "miss")
+        for t, task in self._plans.pop(owner, {}).items():
+            if t == target and t in self._running:
+                continue # show_results joins this load; leave it to finish
+            self._cancel(task)
+        return hit
+
+
+def rates():
+    """Returns {outcome: count} plus "hit_rate" (of results shown) and "waste_rate" (of warms done)."""
+    counts = {"hit": 0, "miss": 0, "wasted": 0, "cancelled": 0}
+    for labels, v in metrics.counters("prefetch_total"):
+        counts[labels["outcome"]] = counts.get(labels["outcome"], 0) + v
+    shown = counts["hit"] + counts["miss"]
+    counts["hit_rate"] = counts["hit"] / shown if shown else None
+    # Warms that were used vs. thrown away (expired or cancelled)
+    spent = counts["hit"] + counts["wasted"] + counts["cancelled"]
+    counts["waste_rate"] = (counts["wasted"] + counts["cancelled"]) / spent if spent else None
+    return counts
+
+
+_prefetcher = None
+
+def get_prefetcher():
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = Prefetcher()
+    return _prefetcher
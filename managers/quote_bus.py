@@ -0,0 +1,101 @@
+import asyncio
+from . import market_manager
+from . import scheduler
+from .config import QUOTE_POLL_INTERVAL
+
+# --- Quote Bus ---
+# Ref-counted per-ticker quote subscriptions. One background poller fetches
+# top of book for every subscribed ticker in batched requests
+# (market_manager.get_market_quotes) and calls subscribers only when a
+# ticker's quote actually changed. Tickers nobody subscribes to are never polled.
+
+
+class QuoteBus:
+    def __init__(self, fetch=None, interval=QUOTE_POLL_INTERVAL):
+        self.fetch = fetch or market_manager.get_market_quotes
+        self.interval = interval
+        self._subs = {} # ticker -> {callback: refcount}
+        self._last = {} # ticker -> (bid, ask) last published
+        self._task = None
+        self.polls = 0
+        self.published = 0
+
+    # --- Subscriptions ---
+
+    def subscribe(self, ticker, callback):
+        refs = self._subs.setdefault(ticker, {})
+        refs[callback] = refs.get(callback, 0) + 1
+
+    def unsubscribe(self, ticker, callback):
+        refs = self._subs.get(ticker)
+        if not refs or callback not in refs:
+            return
+        refs[callback] -= 1
+        if refs[callback] <= 0:
+            del refs[callback]
+        if not refs:
+            del self._subs[ticker]
+            self._last.pop(ticker, None)
+
+    def tickers(self):
+        return list(self._subs)
+
+    def refcount(self, ticker):
+        return sum(self._subs.get(ticker, {}).values())
+
+    # --- Publishing ---
+
+    def publish(self, ticker, bid, ask):
+        """Delivers a quote to the ticker's subscribers if it changed. Returns True if delivered."""
+        if ticker not in self._subs or self._last.get(ticker) == (bid, ask):
+            return False
+        self._last[ticker] = (bid, ask)
+        self.published += 1
+        for callback in list(self._subs[ticker]):
+            try:
+                callback(ticker, bid, ask)
+            except Exception as e:
+                print(f"Quote subscriber failed for {ticker}: {e}")
+        return True
+
+    async def poll_once(self):
+        """One batched fetch of every subscribed ticker. Returns how many quotes changed."""
+        tickers = self.tickers()
+        if not tickers:
+            return 0
+        self.polls += 1
+        quotes = await self.fetch(tickers)
+        return sum(self.publish(t, bid, ask) for t, (bid, ask) in quotes.items())
+
+    # --- Poller ---
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                with scheduler.priority(scheduler.REFRESH):
+                    await self.poll_once()
+            except Exception as e:
+                print(f"Quote poll failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_bus = None
+
+def get_bus():
+    global _bus
+    if _bus is None:
+        _bus = QuoteBus()
+    return _bus
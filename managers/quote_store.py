@@ -0,0 +1,377 @@
+import os
+import json
+import mmap
+import time
+import array
+import asyncio
+from bisect import bisect_left
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Quote History (columnar, day-partitioned) ---
+# Every quote we observe is appended as one row to fixed-width column files:
+#
+#   <root>/instruments.json          ["kalshi:KXNBAGAME-...-ATL", "poly:1234...", ...]
+#   <root>/2025-12-15/ts.col         int64   microseconds since epoch (UTC)
+#   <root>/2025-12-15/instrument.col uint32  index into instruments.json
+#   <root>/2025-12-15/bid.col        int16   tenths of a cent, -1 = no bid
+#   <root>/2025-12-15/ask.col        int16   tenths of a cent, -1 = no ask
+#   <root>/2025-12-15/bid_size.col   uint32  contracts/shares at the best bid
+#   <root>/2025-12-15/ask_size.col   uint32  contracts/shares at the best ask
+#
+# Rows are appended in time order, so ts is sorted within a day and time-range
+# queries are a binary search over a memory-mapped column (no copies, no parse).
+# Plain array/mmap keeps this dependency-free.
+
+COLUMNS = (
+    ("ts", "q"),
+    ("instrument", "I"),
+    ("bid", "h"),
+    ("ask", "h"),
+    ("bid_size", "I"),
+    ("ask_size", "I"),
+)
+PRICE_SCALE = 10 # stored prices are cents * 10
+NO_PRICE = -1
+
+FLUSH_INTERVAL = 2.0 # seconds between background flushes
+FLUSH_ROWS = 5000 # flush early once this many rows are buffered
+
+
+def to_price(cents):
+    return NO_PRICE if cents is None else int(round(cents * PRICE_SCALE))
+
+
+def from_price(value):
+    return None if value == NO_PRICE else value / PRICE_SCALE
+
+
+def day_of(ts_us):
+    return datetime.fromtimestamp(ts_us / 1_000_000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _day_bounds(ts_us):
+    """(start_us, end_us) of the UTC day containing ts_us."""
+    day = datetime.fromtimestamp(ts_us / 1_000_000, tz=timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = int(day.timestamp() * 1_000_000)
+    return start, start + 86_400_000_000
+
+
+def _new_buffers():
+    return {name: array.array(code) for name, code in COLUMNS}
+
+
+class QuoteRecorder:
+    """
+    Buffers quotes in memory (cheap, on the event loop) and appends them to disk
+    from a single background writer thread.
+
+    Usage:
+        recorder = QuoteRecorder("quote_history")
+        recorder.start()                      # periodic flush task
+        recorder.record("kalshi", "KXNBAGAME-...-ATL", bid=45, ask=48, bid_size=40, ask_size=70)
+        await recorder.stop()                 # final flush
+    """
+
+    def __init__(self, root, flush_interval=FLUSH_INTERVAL, flush_rows=FLUSH_ROWS):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        os.makedirs(root, exist_ok=True)
+        self._instruments = _load_instruments(root)
+        self._ids = {name: i for i, name in enumerate(self._instruments)}
+        self._persisted = len(self._instruments)
+        self._buffers = {} # day -> {column: array}
+        self._rows = 0
+        self._last_ts = 0
+        self._day = None
+        self._day_end = 0
+        self._day_start = 0
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="quote-writer")
+        self._flusher = None
+        self._pending = None # last submitted write (Future)
+        self.rows_written = 0
+
+    def instrument_id(self, venue, instrument):
+        name = f"{venue}:{instrument}"
+        i = self._ids.get(name)
+        if i is None:
+            i = len(self._instruments)
+            self._instruments.append(name)
+            self._ids[name] = i
+        return i
+
+    def record(self, venue, instrument, bid=None, ask=None, bid_size=0, ask_size=0, ts_us=None):
+        """Appends one quote (prices in cents). Never blocks on I/O."""
+        ts = ts_us if ts_us is not None else time.time_ns() // 1000
+        # Keep ts non-decreasing so reads can binary search
+        if ts < self._last_ts:
+            ts = self._last_ts
+        self._last_ts = ts
+
+        if not (self._day_start <= ts < self._day_end):
+            self._day_start, self._day_end = _day_bounds(ts)
+            self._day = day_of(ts)
+        cols = self._buffers.get(self._day)
+        if cols is None:
+            cols = self._buffers[self._day] = _new_buffers()
+
+        cols["ts"].append(ts)
+        cols["instrument"].append(self.instrument_id(venue, instrument))
+        cols["bid"].append(to_price(bid))
+        cols["ask"].append(to_price(ask))
+        cols["bid_size"].append(max(0, int(bid_size or 0)))
+        cols["ask_size"].append(max(0, int(ask_size or 0)))
+        self._rows += 1
+        if self._rows >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        """Hands the current buffers to the writer thread. Returns the write Future (or None)."""
+        if not self._rows:
+            return None
+        buffers, self._buffers, self._rows = self._buffers, {}, 0
+        new_names = self._instruments[self._persisted:]
+        self._persisted = len(self._instruments)
+        instruments = list(self._instruments) if new_names else None
+        self._pending = self._writer.submit(self._write, buffers, instruments)
+        return self._pending
+
+    def _write(self, buffers, instruments):
+        # Instruments first: a row must never reference an id that isn't on disk
+        if instruments is not None:
+            tmp = os.path.join(self.root, "instruments.json.tmp")
+            with open(tmp, "w") as f:
+                json.dump(instruments, f)
+            os.replace(tmp, os.path.join(self.root, "instruments.json"))
+        for day, cols in buffers.items():
+            part = os.path.join(self.root, day)
+            os.makedirs(part, exist_ok=True)
+            for name, _ in COLUMNS:
+                with open(os.path.join(part, f"{name}.col"), "ab") as f:
+                    cols[name].tofile(f)
+            self.rows_written += len(cols["ts"])
+
+    def start(self):
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+        return self
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Quote history flush failed: {e}")
+
+    async def stop(self):
+        if self._flusher:
+            self._flusher.cancel()
+            self._flusher = None
+        self.flush()
+        if self._pending is not None:
+            await asyncio.wrap_future(self._pending)
+        self._writer.shutdown(wait=True)
+
+
+def _load_instruments(root):
+    path = os.path.join(root, "instruments.json")
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+# --- Reads ---
+
+class QuoteSlice:
+    """
+    Rows [lo, hi) of one day partition. Columns are memoryviews over the mmapped
+    files (zero-copy); keep the slice (or its store) open while using them.
+    """
+
+    def __init__(self, day, columns, lo, hi, instruments):
+        self.day = day
+        self.columns = {name: col[lo:hi] for name, col in columns.items()}
+        self.instruments = instruments
+
+    def __len__(self):
+        return len(self.columns["ts"])
+
+    def rows(self, instrument_ids=None):
+        """Yields (ts_us, instrument_name, bid_cents, ask_cents, bid_size, ask_size)."""
+        c = self.columns
+        names = self.instruments
+        for ts, inst, bid, ask, bsz, asz in zip(c["ts"], c["instrument"], c["bid"], c["ask"], c["bid_size"], c["ask_size"]):
+            if instrument_ids is not None and inst not in instrument_ids:
+                continue
+            yield ts, names[inst], from_price(bid), from_price(ask), bsz, asz
+
+    def release(self):
+        for col in self.columns.values():
+            col.release()
+
+
+class QuoteStore:
+    """Read side. Use as a context manager so the mmaps get closed."""
+
+    def __init__(self, root):
+        self.root = root
+        self.instruments = _load_instruments(root)
+        self._files = [] # (file, mmap)
+        self._views = [] # every memoryview handed out (released before the mmaps close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for v in self._views:
+            v.release()
+        for f, mm in self._files:
+            try:
+                mm.close()
+            except BufferError:
+                pass # caller still holds a view; the map closes when it's collected
+            f.close()
+        self._views = []
+        self._files = []
+
+    def days(self):
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def _open_day(self, day):
+        """{column: memoryview} for one partition (rows = shortest column, in case of a torn write)."""
+        cols = {}
+        for name, code in COLUMNS:
+            path = os.path.join(self.root, day, f"{name}.col")
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                return None
+            f = open(path, "rb")
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            width = array.array(code).itemsize
+            raw = memoryview(mm)
+            view = raw[:len(mm) // width * width].cast(code)
+            self._files.append((f, mm))
+            self._views.extend((raw, view))
+            cols[name] = view
+        n = min(len(v) for v in cols.values())
+        return {name: v[:n] for name, v in cols.items()}
+
+    def instrument_ids(self, names):
+        wanted = set(names)
+        return {i for i, name in enumerate(self.instruments) if name in wanted}
+
+    def query(self, start_us=None, end_us=None):
+        """QuoteSlices covering [start_us, end_us) (None = open), one per day partition, in time order."""
+        first = day_of(start_us) if start_us is not None else None
+        last = day_of(end_us - 1) if end_us is not None else None
+        out = []
+        for day in self.days():
+            if (first and day < first) or (last and day > last):
+                continue
+            cols = self._open_day(day)
+            if cols is None:
+                continue
+            ts = cols["ts"]
+            lo = bisect_left(ts, start_us) if start_us is not None else 0
+            hi = bisect_left(ts, end_us, lo) if end_us is not None else len(ts)
+            if hi > lo:
+                s = QuoteSlice(day, cols, lo, hi, self.instruments)
+                self._views.extend(s.columns.values())
+                out.append(s)
+            self._views.extend(cols.values())
+        return out
+
+    def iter_rows(self, start_us=None, end_us=None, instruments=None):
+        """All rows in [start_us, end_us) in time order, optionally for some instrument names."""
+        ids = self.instrument_ids(instruments) if instruments is not None else None
+        for s in self.query(start_us, end_us):
+            yield from s.rows(ids)
+
+
+# --- Process-wide recorder ---
+# Enabled by QUOTE_HISTORY_DIR; orderbook_manager reports every book it fetches.
+# The latest quote per instrument is kept in memory either way (used for marks).
+#
+# One process records into a history directory: instrument ids are numbered per
+# recorder and rows are appended in that process's clock order, so two writers
+# would remap ids and interleave time. The market data daemon records when it
+# runs (the bot then only records without one), and enable() takes an exclusive
+# lock on <root>/.recorder.lock so a second process is refused, not mixed in.
+
+LOCK_FILE = ".recorder.lock"
+
+_recorder = None
+_lock = None # open lock file while this process records
+_last_quotes = {} # "venue:instrument" -> (bid, ask, bid_size, ask_size, monotonic time)
+
+
+def last_quote(venue, instrument):
+    """(bid, ask, bid_size, ask_size, age_seconds) of the latest observed quote, or None."""
+    q = _last_quotes.get(f"{venue}:{instrument}")
+    if q is None:
+        return None
+    return q[:4] + (time.monotonic() - q[4],)
+
+
+def _take_lock(root):
+    """Open lock file if no other process records into root, else None."""
+    import fcntl
+    os.makedirs(root, exist_ok=True)
+    f = open(os.path.join(root, LOCK_FILE), "w")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+def enable(root):
+    """Starts recording into root. Returns the recorder, or None if another process already records there."""
+    global _recorder, _lock
+    if _recorder is None:
+        lock = _take_lock(root)
+        if lock is None:
+            print(f"Quote history in {root} is being recorded by another process, not recording here.")
+            return None
+        _lock = lock
+        _recorder = QuoteRecorder(root).start()
+        print(f"Recording quote history to {root}")
+    return _recorder
+
+
+async def disable():
+    global _recorder, _lock
+    if _recorder is not None:
+        rec, _recorder = _recorder, None
+        await rec.stop()
+    if _lock is not None:
+        _lock.close() # releases the flock
+        _lock = None
+
+
+def record_quote(venue, instrument, bid=None, ask=None, bid_size=0, ask_size=0):
+    """Remembers one quote (cents) and records it if recording is enabled."""
+    _last_quotes[f"{venue}:{instrument}"] = (bid, ask, bid_size, ask_size, time.monotonic())
+    if _recorder is not None:
+        _recorder.record(venue, instrument, bid=bid, ask=ask, bid_size=bid_size, ask_size=ask_size)
+
+
+def record_book(venue, instrument, book):
+    """record_quote() for the top of a DepthBook."""
+    if book is None:
+        return
+    bid = book.best_bid
+    ask = book.best_ask
+    record_quote(
+        venue, instrument,
+        bid=bid, ask=ask,
+        bid_size=book.bids.get(bid, 0) if bid is not None else 0,
+        ask_size=book.asks.get(ask, 0) if ask is not None else 0,
+    )
+
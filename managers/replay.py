@@ -0,0 +1,187 @@
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, timezone
+from .quote_store import QuoteStore, NO_PRICE, PRICE_SCALE
+from .mapping_logic import evaluate_pair
+from .arb_registry import MappingRegistry
+
+# --- Replay / Backtest ---
+# Streams recorded quote history (quote_store) in timestamp order through the
+# same pair evaluation live arb logic uses (mapping_logic.evaluate_pair) and
+# reports every window in which a hedged pair cost less than 100¢.
+# Runs as fast as the CPU allows; no sleeping between events.
+#
+#   python -m managers.replay --history quote_history --mapping arb_mappings.json \
+#       [--start 2025-12-15T00:00] [--end 2025-12-16T00:00] [--min-edge 1] [--min-size 10]
+
+
+class ReplayEngine:
+    """
+    pairs: [(kalshi_ticker, "yes"|"no", poly_token), ...] (see mapping_logic.mapping_pairs)
+    min_edge: cents below 100 a pair must cost to count (fees/slippage buffer)
+    min_size: pairs fillable at the top levels for it to count
+    """
+
+    def __init__(self, store, pairs, min_edge=0.0, min_size=1):
+        self.store = store
+        self.pairs = list(pairs)
+        self.min_edge = min_edge
+        self.min_size = min_size
+
+        ids = {name: i for i, name in enumerate(store.instruments)}
+        self._pair_ids = [] # (kalshi_id, side, poly_id) per pair, None ids when never recorded
+        self._watch = {} # instrument id -> [pair index, ...]
+        for n, (ticker, side, token) in enumerate(self.pairs):
+            k_id = ids.get(f"kalshi:{ticker}")
+            p_id = ids.get(f"poly:{token}")
+            self._pair_ids.append((k_id, side, p_id))
+            for i in (k_id, p_id):
+                if i is not None:
+                    self._watch.setdefault(i, []).append(n)
+
+    def run(self, start_us=None, end_us=None):
+        watch = self._watch
+        pair_ids = self._pair_ids
+        threshold = 100 - self.min_edge
+        min_size = self.min_size
+        quotes = {} # instrument id -> (bid, ask, bid_size, ask_size) in cents
+        open_ = {} # pair index -> opportunity being tracked
+        closed = []
+        rows = 0
+        updates = 0
+        last_ts = None
+
+        t0 = time.perf_counter()
+        for s in self.store.query(start_us, end_us):
+            c = s.columns
+            rows += len(s)
+            for ts, inst, bid, ask, bsz, asz in zip(c["ts"], c["instrument"], c["bid"], c["ask"], c["bid_size"], c["ask_size"]):
+                affected = watch.get(inst)
+                if affected is None:
+                    continue
+                updates += 1
+                last_ts = ts
+                quotes[inst] = (
+                    None if bid == NO_PRICE else bid / PRICE_SCALE,
+                    None if ask == NO_PRICE else ask / PRICE_SCALE,
+                    bsz, asz,
+                )
+                for n in affected:
+                    k_id, side, p_id = pair_ids[n]
+                    result = evaluate_pair(side, quotes.get(k_id), quotes.get(p_id))
+                    live = result is not None and result[0] <= threshold and result[1] >= min_size
+                    opp = open_.get(n)
+                    if live:
+                        edge = 100 - result[0]
+                        if opp is None:
+                            open_[n] = {
+                                "pair": n, "start_us": ts, "best_edge": edge,
+                                "max_size": result[1], "fillable_at_best": result[1],
+                            }
+                        else:
+                            if edge > opp["best_edge"]:
+                                opp["best_edge"] = edge
+                                opp["fillable_at_best"] = result[1]
+                            if result[1] > opp["max_size"]:
+                                opp["max_size"] = result[1]
+                    elif opp is not None:
+                        closed.append(self._close(open_.pop(n), ts))
+        elapsed = time.perf_counter() - t0
+
+        for opp in open_.values():
+            closed.append(self._close(opp, last_ts, still_open=True))
+        closed.sort(key=lambda o: o["start_us"])
+        return {
+            "rows": rows,
+            "updates": updates,
+            "pairs": len(self.pairs),
+            "elapsed_s": elapsed,
+            "events_per_sec": rows / elapsed if elapsed > 0 else 0.0,
+            "opportunities": closed,
+        }
+
+    def _close(self, opp, end_ts, still_open=False):
+        ticker, side, token = self.pairs[opp["pair"]]
+        opp = dict(opp, kalshi_ticker=ticker, kalshi_side=side, poly_token=token)
+        opp["end_us"] = end_ts
+        opp["duration_s"] = (end_ts - opp["start_us"]) / 1_000_000
+        opp["open_at_end"] = still_open
+        return opp
+
+
+def load_pairs(path):
+    """
+    Pairs from a mapping file (see arb_registry): the registry format written by
+    /setup_arb, one NEW_PAIR-style dict {"<ticker>-yes": token, ...}, or a list of them.
+    """
+    return MappingRegistry(path).pairs()
+
+
+def summarize(report):
+    opps = report["opportunities"]
+    durations = sorted(o["duration_s"] for o in opps)
+    pct = lambda p: durations[min(len(durations) - 1, int(p / 100 * len(durations)))] if durations else 0.0
+    return {
+        "rows": report["rows"],
+        "updates": report["updates"],
+        "pairs": report["pairs"],
+        "events_per_sec": round(report["events_per_sec"]),
+        "opportunities": len(opps),
+        "duration_p50_s": round(pct(50), 3),
+        "duration_p90_s": round(pct(90), 3),
+        "avg_best_edge_c": round(sum(o["best_edge"] for o in opps) / len(opps), 2) if opps else 0.0,
+        "total_fillable_at_best": sum(o["fillable_at_best"] for o in opps),
+    }
+
+
+def _parse_time(value):
+    """ISO date/time (UTC unless an offset is given) -> microseconds."""
+    if value is None:
+        return None
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1_000_000)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded quotes through the arb pair evaluation")
+    parser.add_argument("--history", required=True, help="QUOTE_HISTORY_DIR to read")
+    parser.add_argument("--mapping", required=True, help="JSON mapping file (NEW_PAIR dicts)")
+    parser.add_argument("--start", help="ISO start time (UTC)")
+    parser.add_argument("--end", help="ISO end time (UTC)")
+    parser.add_argument("--min-edge", type=float, default=0.0, help="cents under 100 required (default 0)")
+    parser.add_argument("--min-size", type=int, default=1, help="minimum fillable pairs (default 1)")
+    parser.add_argument("--top", type=int, default=10, help="opportunities to list (by edge)")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    pairs = load_pairs(args.mapping)
+    if not pairs:
+        print("No pairs found in mapping file.")
+        return 1
+
+    with QuoteStore(args.history) as store:
+        engine = ReplayEngine(store, pairs, min_edge=args.min_edge, min_size=args.min_size)
+        report = engine.run(_parse_time(args.start), _parse_time(args.end))
+
+    if args.json:
+        json.dump(dict(report, summary=summarize(report)), sys.stdout, indent=2)
+        print()
+        return 0
+
+    for k, v in summarize(report).items():
+        print(f"{k:>24}: {v}")
+    top = sorted(report["opportunities"], key=lambda o: o["best_edge"], reverse=True)[:args.top]
+    for o in top:
+        start = datetime.fromtimestamp(o["start_us"] / 1_000_000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{start}  {o['kalshi_ticker']} {o['kalshi_side'].upper():<3} + poly {o['poly_token']}  "
+              f"edge {o['best_edge']:.1f}¢ x{o['fillable_at_best']}  {o['duration_s']:.1f}s"
+              f"{' (open)' if o['open_at_end'] else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
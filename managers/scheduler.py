@@ -0,0 +1,277 @@
+import time
+import asyncio
+import contextvars
+from collections import deque
+from . import metrics
+from .config import SCHED_RATE_KALSHI, SCHED_RATE_GAMMA, SCHED_RATE_CLOB, SCHED_CONCURRENCY, SCHED_RESERVED
+
+# --- Upstream Request Scheduler ---
+# Every request made through http_client waits here for a slot on its upstream.
+# Each upstream has one budget shared by all callers: a request rate (token
+# bucket, one second of burst) and a number of requests in flight. Waiting
+# requests are queued per priority class and started strictly in order:
+#
+#   interactive  commands and button presses (a user is waiting, 3s budget)
+#   fills        order_monitor and P&L catch-up
+#   refresh      boards, quote polls, alerts, daemon refreshes (the default)
+#   prefetch     !search menu warming
+#
+# An interactive request skips every queued background request, and the last
+# SCHED_RESERVED in-flight slots are interactive-only, so a refresh sweep that
+# fills the budget can't make a user wait behind it.
+#
+# The class comes from the instrumented handler running the request
+# (metrics.instrument: cmd:/ui: -> interactive, task:order_monitor -> fills,
+# other task: -> refresh), or is set explicitly with `with priority(...)`.
+# Tasks inherit it from whoever created them.
+#
+# Single-flight loads (TTLCache.get_or_load, snapshot refreshes and daemon
+# builds) are shared by every caller that joins them, so they run under a
+# SharedPriority: it starts at the creator's class and join() raises it to the
+# highest class waiting on the load, including its requests already queued and
+# the shared loads it is itself waiting on. A click that joins a prefetch's
+# load doesn't wait at prefetch priority.
+#
+# Metrics: scheduler_queue_depth{upstream, priority} (gauge),
+# scheduler_wait_ms{upstream, priority}, scheduler_preempted_total{upstream}.
+
+INTERACTIVE = "interactive"
+FILLS = "fills"
+REFRESH = "refresh"
+PREFETCH = "prefetch"
+PRIORITIES = (INTERACTIVE, FILLS, REFRESH, PREFETCH) # highest first
+
+# Requests/second per upstream (http_client labels); others are only bounded in flight
+RATES = {
+    "kalshi": SCHED_RATE_KALSHI,
+    "gamma": SCHED_RATE_GAMMA,
+    "clob": SCHED_RATE_CLOB,
+}
+
+# Handlers whose requests are not their prefix's default class
+ACTION_PRIORITIES = {
+    "task:order_monitor": FILLS,
+}
+
+metrics.describe("scheduler_queue_depth", "Requests waiting for an upstream slot, per priority class.")
+metrics.describe("scheduler_wait_ms", "Time requests waited for an upstream slot, per priority class.")
+metrics.describe("scheduler_preempted_total", "Interactive requests started ahead of queued background requests.")
+
+_priority = contextvars.ContextVar("request_priority", default=None)
+
+
+class SharedPriority:
+    """The class of a shared load: the highest of everyone waiting on it."""
+
+    __slots__ = ("cls", "waiting", "children")
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.waiting = set() # (UpstreamScheduler, future) of its queued requests
+        self.children = [] # shared loads it waits on
+
+    def raise_to(self, cls):
+        if PRIORITIES.index(cls) >= PRIORITIES.index(self.cls):
+            return
+        self.cls = cls
+        for sched, fut in list(self.waiting):
+            sched.promote(fut, cls)
+        for child in self.children:
+            child.raise_to(cls)
+
+
+def start_shared(coro):
+    """
+    asyncio.ensure_future(coro) for a load other callers may join. Returns
+    (task, SharedPriority); joiners pass the SharedPriority to join().
+    """
+    share = SharedPriority(current_priority())
+    parent = _priority.get()
+    if isinstance(parent, SharedPriority):
+        parent.children.append(share)
+    token = _priority.set(share)
+    try:
+        task = asyncio.ensure_future(coro)
+    finally:
+        _priority.reset(token)
+    return task, share
+
+
+def join(share):
+    """Called by a caller joining a shared load: raises it to the caller's class."""
+    share.raise_to(current_priority())
+    caller = _priority.get()
+    if isinstance(caller, SharedPriority) and caller is not share:
+        caller.children.append(share)
+
+
+class priority:
+    """
+    Runs the enclosed block's requests (and tasks it creates) in one class.
+    Usage: with scheduler.priority(scheduler.REFRESH): ...
+    """
+
+    def __init__(self, cls):
+        if cls not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {cls}")
+        self.cls = cls
+
+    def __enter__(self):
+        self._token = _priority.set(self.cls)
+        return self
+
+    def __exit__(self, *exc):
+        _priority.reset(self._token)
+
+
+def current_share():
+    """The SharedPriority of the shared load running this code, or None."""
+    explicit = _priority.get()
+    return explicit if isinstance(explicit, SharedPriority) else None
+
+
+def current_priority():
+    explicit = _priority.get()
+    if isinstance(explicit, SharedPriority):
+        return explicit.cls
+    if explicit is not None:
+        return explicit
+    name = metrics.current_action_name()
+    if name is None:
+        return REFRESH
+    if name in ACTION_PRIORITIES:
+        return ACTION_PRIORITIES[name]
+    return REFRESH if name.startswith("task:") else INTERACTIVE
+
+
+class UpstreamScheduler:
+    def __init__(self, name, rate=0, concurrency=None, reserved=None):
+        self.name = name
+        self.rate = rate
+        self.burst = max(rate, 1)
+        self.concurrency = concurrency or SCHED_CONCURRENCY
+        reserved = SCHED_RESERVED if reserved is None else reserved
+        self.reserved = max(0, min(reserved, self.concurrency - 1))
+        self.tokens = self.burst
+        self._stamp = time.monotonic()
+        self.in_flight = 0
+        self.queues = {cls: deque() for cls in PRIORITIES}
+        self._queued_as = {} # waiting future -> class of the queue it is in
+        self._timer = None
+
+    def _limit(self, cls):
+        return self.concurrency if cls == INTERACTIVE else self.concurrency - self.reserved
+
+    def _can_start(self, cls):
+        if self.in_flight >= self._limit(cls):
+            return False
+        if self.rate:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            if self.tokens < 1:
+                return False
+        return True
+
+    def _start(self, cls):
+        self.in_flight += 1
+        if self.rate:
+            self.tokens -= 1
+        if cls == INTERACTIVE and any(self.queues[c] for c in PRIORITIES[1:]):
+            metrics.inc("scheduler_preempted_total", upstream=self.name)
+
+    def _depth(self, cls):
+        metrics.set_value("scheduler_queue_depth", len(self.queues[cls]), upstream=self.name, priority=cls)
+
+    def _queued_ahead(self, cls):
+        """Anything waiting in this class or a higher one."""
+        return any(self.queues[c] for c in PRIORITIES[:PRIORITIES.index(cls) + 1])
+
+    async def acquire(self, cls, share=None):
+        """Waits for a slot. share: the SharedPriority of the load making the request (may raise cls while queued)."""
+        t0 = time.perf_counter()
+        if not self._queued_ahead(cls) and self._can_start(cls):
+            self._start(cls)
+        else:
+            fut = asyncio.get_running_loop().create_future()
+            self.queues[cls].append(fut)
+            self._queued_as[fut] = cls
+            self._depth(cls)
+            if share is not None:
+                share.waiting.add((self, fut))
+            self._dispatch()
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    self.release() # granted, then cancelled before it ran
+                else:
+                    queued = self._queued_as.pop(fut, None)
+                    if queued is not None:
+                        self.queues[queued].remove(fut)
+                        self._depth(queued)
+                raise
+            finally:
+                if share is not None:
+                    share.waiting.discard((self, fut))
+            cls = share.cls if share is not None else cls
+        metrics.observe("scheduler_wait_ms", (time.perf_counter() - t0) * 1000, upstream=self.name, priority=cls)
+
+    def promote(self, fut, cls):
+        """Moves a queued request to a higher class's queue."""
+        old = self._queued_as.get(fut)
+        if old is None or PRIORITIES.index(cls) >= PRIORITIES.index(old):
+            return
+        self.queues[old].remove(fut)
+        self.queues[cls].append(fut)
+        self._queued_as[fut] = cls
+        self._depth(old)
+        self._depth(cls)
+        self._dispatch()
+
+    def release(self):
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Starts waiting requests, highest class first, while the budget allows."""
+        for cls in PRIORITIES:
+            queue = self.queues[cls]
+            while queue:
+                if queue[0].done(): # cancelled while waiting
+                    self._queued_as.pop(queue.popleft(), None)
+                    continue
+                if not self._can_start(cls):
+                    # Lower classes wait behind this one. Out of tokens: retry when one is due
+                    if self.in_flight < self._limit(cls) and self._timer is None:
+                        delay = (1 - self.tokens) / self.rate
+                        self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+                    self._depth(cls)
+                    return
+                self._start(cls)
+                fut = queue.popleft()
+                del self._queued_as[fut]
+                fut.set_result(None)
+            self._depth(cls)
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+    def queued(self):
+        return {cls: len(q) for cls, q in self.queues.items()}
+
+
+_schedulers = {}
+
+def get(upstream):
+    s = _schedulers.get(upstream)
+    if s is None:
+        s = _schedulers[upstream] = UpstreamScheduler(upstream, rate=RATES.get(upstream, 0))
+    return s
+
+def schedulers():
+    return dict(_schedulers)
+
+def reset():
+    _schedulers.clear()
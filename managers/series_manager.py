@@ -1,16 +1,5 @@
-import aiohttp
 import asyncio
-import os
 import json
-from dotenv import load_dotenv
-from .auth import sign_request
-
-# Load environment variables
-load_dotenv()
-
-KALSHI_KEY_ID = os.getenv("KALSHI_KEY_ID")
-KALSHI_PRIVATE_KEY_PATH = os.getenv("KALSHI_PRIVATE_KEY_PATH")
-BASE_URL = "https://api.elections.kalshi.com/trade-api/v2"
 
 
 
@@ -71,6 +60,15 @@ async def fetch_sports_series():
     return ALLOWED_SERIES
 
 
+def league_for_series(series_ticker):
+    """League name ("NBA") of any whitelisted series ticker, or None."""
+    for leagues in ALLOWED_SERIES.values():
+        for league, tickers in leagues.items():
+            if series_ticker in tickers.values():
+                return league
+    return None
+
+
 if __name__ == "__main__":
     result = asyncio.run(fetch_sports_series())
     print(json.dumps(result, indent=4))
@@ -0,0 +1,370 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import itertools
+from . import config
+from . import market_data
+from . import metrics
+from . import scheduler
+from .cache import TTLCache
+
+# --- Snapshot Service (Unix socket) ---
+# market_daemon.py owns the Kalshi/Gamma clients, caches and matching, and serves
+# versioned snapshots to any number of bot processes over a local Unix socket.
+#
+# Protocol: one JSON object per line in each direction.
+#   -> {"id": 1, "op": "snapshot", "series_ticker": "KXNBAGAME", "sport": "NBA",
+#       "market_type": "moneyline", "since_version": 3, "priority": "interactive"}
+#   <- {"id": 1, "ok": true, "version": 4, "snapshot": {...}}
+#   <- {"id": 1, "ok": true, "version": 3, "unchanged": true}   (client already has it)
+#   -> {"id": 2, "op": "ping"}   <- {"id": 2, "ok": true, "pong": <server time>}
+#   <- {"id": n, "ok": false, "error": "..."}
+# "priority" is the caller's scheduler class; the daemon's upstream requests for
+# a build run in it (a build shared by several callers keeps the first one's).
+
+SNAPSHOT_MAX_AGE = 10 # seconds before a requested snapshot is rebuilt
+REFRESH_INTERVAL = 5 # background refresh of recently requested snapshots
+HOT_SECONDS = 300 # a snapshot stays "hot" (kept refreshed) this long after its last request
+REQUEST_TIMEOUT = 8.0
+STREAM_LIMIT = 8 * 1024 * 1024 # max line size
+
+
+def _encode(obj):
+    return (json.dumps(obj, default=str, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _snapshot_key(series_ticker, sport, market_type):
+    return f"{series_ticker}|{sport}|{market_type}"
+
+
+# --- Server ---
+
+class SnapshotServer:
+    def __init__(self, socket_path, max_age=SNAPSHOT_MAX_AGE, refresh_interval=REFRESH_INTERVAL):
+        self.socket_path = socket_path
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+        self._entries = {} # key -> {"version", "digest", "snapshot", "built_at", "args"}
+        self._last_requested = {} # key -> monotonic time
+        self._building = {} # key -> (Future, SharedPriority) (single flight)
+        self._server = None
+        self._refresher = None
+
+    async def start(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path) # stale socket from a previous run
+        self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path, limit=STREAM_LIMIT)
+        self._refresher = asyncio.create_task(self._refresh_loop())
+        print(f"Market data service listening on {self.socket_path}")
+        return self
+
+    async def stop(self):
+        if self._refresher:
+            self._refresher.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        answers = set() # kept referenced until done, and finished before the writer closes
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                # Requests on one connection are answered concurrently (responses carry the id)
+                task = asyncio.create_task(self._answer(line, writer))
+                answers.add(task)
+                task.add_done_callback(answers.discard)
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            for task in answers:
+                task.cancel()
+            raise
+        finally:
+            if answers:
+                await asyncio.gather(*answers, return_exceptions=True)
+            writer.close()
+
+    async def _answer(self, line, writer):
+        req_id = None
+        try:
+            req = json.loads(line)
+            req_id = req.get("id")
+            resp = await self.dispatch(req)
+        except Exception as e:
+            resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        resp["id"] = req_id
+        try:
+            writer.write(_encode(resp))
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def dispatch(self, req):
+        op = req.get("op")
+        if op == "ping":
+            return {"ok": True, "pong": time.time()}
+        if op == "snapshot":
+            args = (req["series_ticker"], req.get("sport"), req["market_type"])
+            cls = req.get("priority")
+            with scheduler.priority(cls if cls in scheduler.PRIORITIES else scheduler.REFRESH):
+                entry = await self.get_entry(*args)
+            if req.get("since_version") == entry["version"]:
+                return {"ok": True, "version": entry["version"], "unchanged": True}
+            return {"ok": True, "version": entry["version"], "snapshot": entry["snapshot"]}
+        return {"ok": False, "error": f"Unknown op: {op}"}
+
+    async def get_entry(self, series_ticker, sport, market_type):
+        key = _snapshot_key(series_ticker, sport, market_type)
+        self._last_requested[key] = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry["built_at"] <= self.max_age:
+            return entry
+        return await self._build(key, (series_ticker, sport, market_type))
+
+    async def _build(self, key, args):
+        building = self._building.get(key)
+        if building is None:
+            building = self._building[key] = scheduler.start_shared(self._build_once(key, args))
+        else:
+            scheduler.join(building[1]) # an interactive request raises a refresh-loop build
+        return await asyncio.shield(building[0])
+
+    async def _build_once(self, key, args):
+        try:
+            snapshot = await market_data.build_snapshot(*args)
+            # Version only moves when the content does (generated_at excluded)
+            content = {k: v for k, v in snapshot.items() if k != "generated_at"}
+            digest = hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+            old = self._entries.get(key)
+            version = old["version"] if old else 0
+            if not old or old["digest"] != digest:
+                version += 1
+            entry = {
+                "version": version,
+                "digest": digest,
+                "snapshot": snapshot,
+                "built_at": time.monotonic(),
+                "args": args,
+            }
+            self._entries[key] = entry
+            return entry
+        finally:
+            self._building.pop(key, None)
+
+    async def _refresh_loop(self):
+        """Keeps recently requested snapshots warm so bot requests rarely wait on upstream."""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            now = time.monotonic()
+            for key, last in list(self._last_requested.items()):
+                if now - last > HOT_SECONDS:
+                    # Cold: stop refreshing and free memory
+                    self._last_requested.pop(key, None)
+                    self._entries.pop(key, None)
+                    continue
+                entry = self._entries.get(key)
+                if entry and now - entry["built_at"] >= self.refresh_interval:
+                    try:
+                        with scheduler.priority(scheduler.REFRESH):
+                            await self._build(key, entry["args"])
+                    except Exception as e:
+                        print(f"Snapshot refresh failed for {key}: {e}")
+
+
+# --- Client ---
+
+class SnapshotClient:
+    """One persistent connection to the daemon; requests are multiplexed by id."""
+
+    def __init__(self, socket_path, timeout=REQUEST_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+        self._known = {} # key -> (version, snapshot), lets the daemon answer "unchanged"
+
+    async def _ensure_connected(self):
+        if self._writer is not None and not self._writer.is_closing():
+            return
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path, limit=STREAM_LIMIT)
+            self._reader_task = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                msg = json.loads(line)
+                fut = self._pending.pop(msg.get("id"), None)
+                if fut and not fut.done():
+                    fut.set_result(msg)
+        except Exception as e:
+            print(f"Snapshot client read error: {e}")
+        finally:
+            # Fail everything still waiting; next request reconnects
+            for fut in self._pending.values():
+                if not fut.done():
+                    fut.set_exception(ConnectionError("market data service disconnected"))
+            self._pending.clear()
+            if self._writer:
+                self._writer.close()
+            self._writer = None
+
+    async def request(self, payload):
+        await self._ensure_connected()
+        # _read_loop drops self._writer when the daemon goes away, even mid-request
+        writer = self._writer
+        if writer is None or writer.is_closing():
+            raise ConnectionError("market data service disconnected")
+        req_id = next(self._ids)
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[req_id] = fut
+        try:
+            writer.write(_encode(dict(payload, id=req_id)))
+            await writer.drain()
+            resp = await asyncio.wait_for(fut, self.timeout)
+        finally:
+            self._pending.pop(req_id, None)
+        if not resp.get("ok"):
+            raise RuntimeError(resp.get("error", "unknown error"))
+        return resp
+
+    async def get_snapshot(self, series_ticker, sport, market_type):
+        key = _snapshot_key(series_ticker, sport, market_type)
+        known = self._known.get(key)
+        resp = await self.request({
+            "op": "snapshot",
+            "series_ticker": series_ticker,
+            "sport": sport,
+            "market_type": market_type,
+            "since_version": known[0] if known else None,
+            "priority": scheduler.current_priority(),
+        })
+        if resp.get("unchanged") and known:
+            return known[1]
+        self._known[key] = (resp["version"], resp["snapshot"])
+        return resp["snapshot"]
+
+    async def close(self):
+        if self._reader_task:
+            self._reader_task.cancel()
+        if self._writer:
+            self._writer.close()
+
+
+# --- Entry point used by the bot ---
+
+_client = None
+
+async def get_snapshot(series_ticker, sport, market_type):
+    """
+    Snapshot from the market data daemon when MARKET_DAEMON_SOCKET is set,
+    otherwise built in-process. Falls back to in-process if the daemon is down.
+    """
+    global _client
+    if config.MARKET_DAEMON_SOCKET:
+        if _client is None:
+            _client = SnapshotClient(config.MARKET_DAEMON_SOCKET)
+        try:
+            return await _client.get_snapshot(series_ticker, sport, market_type)
+        except (OSError, ConnectionError, asyncio.TimeoutError, RuntimeError) as e:
+            print(f"Market data service unavailable ({e}), building snapshot in-process.")
+    return await market_data.build_snapshot(series_ticker, sport, market_type)
+
+async def warm(series_ticker, sport, market_type):
+    """
+    Prepares a snapshot ahead of the request for it. The daemon builds the full
+    snapshot (and keeps it hot); in-process, only the cached lookups are warmed.
+    """
+    if config.MARKET_DAEMON_SOCKET:
+        snapshot = await get_snapshot(series_ticker, sport, market_type)
+        return not snapshot.get("error")
+    return await market_data.warm(series_ticker, sport, market_type)
+
+
+# --- Serving Policy (stale-while-revalidate) ---
+# An interaction gets SERVE_DEADLINE seconds. A fresh snapshot ready by then is
+# served and kept as the last good one. Otherwise (slow upstream, open breaker,
+# error) the last good snapshot, up to SERVE_STALE_MAX old, is served with its
+# age while the refresh keeps running; the caller may await "pending" for it.
+# One refresh per key at a time, however many users ask.
+
+LAST_GOOD = TTLCache("last_good_snapshot", ttl=config.SERVE_STALE_MAX, maxsize=256)
+_refreshing = {} # key -> (Task, SharedPriority)
+
+metrics.describe("snapshot_serve_total", "show_results snapshots by outcome (fresh, stale, error, late).")
+
+
+async def _refresh_once(key, args):
+    snapshot = await get_snapshot(*args)
+    if not snapshot.get("error"):
+        LAST_GOOD.set(key, snapshot)
+    return snapshot
+
+
+def _refresh_done(key, task):
+    _refreshing.pop(key, None)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Snapshot refresh failed for {key}: {task.exception()}")
+
+
+def refresh(series_ticker, sport, market_type):
+    """The in-flight refresh for this snapshot, started if there is none."""
+    key = _snapshot_key(series_ticker, sport, market_type)
+    refreshing = _refreshing.get(key)
+    if refreshing is None:
+        refreshing = _refreshing[key] = scheduler.start_shared(_refresh_once(key, (series_ticker, sport, market_type)))
+        refreshing[0].add_done_callback(lambda t: _refresh_done(key, t))
+    else:
+        scheduler.join(refreshing[1]) # runs at the highest waiting caller's priority
+    return refreshing[0]
+
+
+async def serve(series_ticker, sport, market_type, deadline=None):
+    """
+    Returns {"snapshot", "stale_age", "pending"}:
+      fresh:  snapshot, stale_age None, pending None
+      stale:  last good snapshot, its age in seconds, pending = the refresh (None if it failed)
+      error:  the error snapshot (nothing good to fall back on), pending None
+      late:   snapshot None, pending = the refresh (nothing to show yet)
+    """
+    deadline = config.SERVE_DEADLINE if deadline is None else deadline
+    key = _snapshot_key(series_ticker, sport, market_type)
+    task = refresh(series_ticker, sport, market_type)
+    try:
+        # shield: missing the deadline must not cancel the shared refresh
+        snapshot = await asyncio.wait_for(asyncio.shield(task), deadline)
+    except asyncio.TimeoutError:
+        snapshot = None
+    except Exception as e:
+        snapshot = {"error": f"{type(e).__name__}: {e}", "games": []}
+
+    if snapshot is not None and not snapshot.get("error"):
+        metrics.inc("snapshot_serve_total", outcome="fresh")
+        return {"snapshot": snapshot, "stale_age": None, "pending": None}
+
+    last, age = LAST_GOOD.peek(key)
+    if last is not None and age <= config.SERVE_STALE_MAX:
+        metrics.inc("snapshot_serve_total", outcome="stale")
+        return {"snapshot": last, "stale_age": age, "pending": task if snapshot is None else None}
+    if snapshot is not None:
+        metrics.inc("snapshot_serve_total", outcome="error")
+        return {"snapshot": snapshot, "stale_age": None, "pending": None}
+    metrics.inc("snapshot_serve_total", outcome="late")
+    return {"snapshot": None, "stale_age": None, "pending": task}
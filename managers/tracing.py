@@ -0,0 +1,152 @@
+import json
+import time
+import uuid
+import functools
+import contextvars
+from . import config
+
+# --- Lightweight Tracing ---
+# One root span per command / button press / task tick, with child spans for
+# upstream calls, Gamma searches, fuzzy matching and embed rendering.
+# Finished spans are printed as one JSON object per line:
+#   {"trace_id": "...", "span_id": "...", "parent_id": "...", "name": "...", "duration_ms": 12.3, ...}
+#
+# When disabled (default), span()/start_span() return a shared no-op object and
+# traced() costs a single bool check, so call sites can stay in place.
+
+TRACE_ENABLED = config.TRACE_ENABLED
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def enable(flag=True):
+    global TRACE_ENABLED
+    TRACE_ENABLED = flag
+
+
+def _new_id():
+    return uuid.uuid4().hex[:16]
+
+
+def emit(record):
+    """Writes one finished span. Swap this out to ship spans elsewhere."""
+    print(json.dumps(record, default=str), flush=True)
+
+
+class Span:
+    def __init__(self, name, parent=None, attrs=None):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else _new_id()
+        self.span_id = _new_id()
+        self.attrs = attrs or {}
+        self.status = "ok"
+        self._start_wall = time.time()
+        self._t0 = time.perf_counter()
+        self._token = None
+        self._ended = False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def end(self, error=None):
+        if self._ended:
+            return
+        self._ended = True
+        if error is not None:
+            self.status = "error"
+            self.attrs["error"] = f"{type(error).__name__}: {error}"
+        emit({
+            "ts": self._start_wall,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "duration_ms": round((time.perf_counter() - self._t0) * 1000, 3),
+            "status": self.status,
+            "attrs": self.attrs,
+        })
+
+    # Context-manager use makes the span current for nested calls
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        self.end(exc)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+class _NoopSpan:
+    trace_id = None
+    span_id = None
+
+    def set(self, **attrs):
+        pass
+
+    def end(self, error=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name, **attrs):
+    """
+    Child of the current span (or a new root).
+    Usage: with tracing.span("fuzzy_match", candidates=40): ...
+    For sections that aren't a single block, call .end() when done instead.
+    """
+    if not TRACE_ENABLED:
+        return NOOP_SPAN
+    return Span(name, _current_span.get(), attrs)
+
+
+# Reads better at call sites that end the span themselves
+start_span = span
+
+
+def annotate(**attrs):
+    """Adds attributes to the current span (no-op when tracing is off)."""
+    if not TRACE_ENABLED:
+        return
+    s = _current_span.get()
+    if s is not None:
+        s.set(**attrs)
+
+
+def current_trace_id():
+    s = _current_span.get()
+    return s.trace_id if s else None
+
+
+def traced(name, **static_attrs):
+    """Decorator: runs the coroutine inside span(name)."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not TRACE_ENABLED:
+                return await func(*args, **kwargs)
+            with Span(name, _current_span.get(), dict(static_attrs)):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
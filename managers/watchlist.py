@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import asyncio
+from . import quote_bus
+from .config import WATCHLIST_FILE, WATCH_MAX_PER_USER, WATCH_MIN_MOVE, WATCH_COOLDOWN
+
+# --- Watchlists ---
+# Subscription index shared by every user: ticker -> set(user ids) and
+# user id -> set(tickers). A ticker is subscribed on the quote bus once, when
+# its first watcher arrives, and dropped when the last one leaves, so 30
+# watchers cost one upstream subscription. Each qualifying quote change is
+# rendered once and handed to `notify` with the whole watcher set (fan-out).
+#
+# Change detection and cooldowns are kept per ticker, not per user, so memory
+# grows by one int per (user, ticker) pair and nothing else.
+
+
+def _mid(bid, ask):
+    if bid is not None and ask is not None:
+        return (bid + ask) / 2
+    return bid if bid is not None else ask
+
+
+class WatchIndex:
+    def __init__(self, state_file=WATCHLIST_FILE, bus=None, notify=None,
+                 max_per_user=WATCH_MAX_PER_USER, min_move=WATCH_MIN_MOVE, cooldown=WATCH_COOLDOWN):
+        self.state_file = state_file
+        self.bus = bus or quote_bus.get_bus()
+        self.notify = notify # async fn(user_ids, update dict)
+        self.max_per_user = max_per_user
+        self.min_move = min_move
+        self.cooldown = cooldown
+        self.by_ticker = {}
+        self.by_user = {}
+        self._last_mid = {} # ticker -> mid last notified (or first seen)
+        self._last_sent = {} # ticker -> monotonic time
+        self._tasks = set()
+        self.notifications = 0
+        self._load()
+
+    # --- Persistence ---
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r") as f:
+                state = json.load(f)
+        except Exception as e:
+            print(f"Error reading watchlists: {e}")
+            return
+        for user_id, tickers in state.items():
+            for ticker in tickers:
+                self._add(int(user_id), ticker)
+
+    def save(self):
+        state = {str(u): sorted(ts) for u, ts in self.by_user.items()}
+        try:
+            tmp = f"{self.state_file}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp, self.state_file)
+        except Exception as e:
+            print(f"Error writing watchlists: {e}")
+
+    # --- Index ---
+
+    def _add(self, user_id, ticker):
+        users = self.by_ticker.get(ticker)
+        if users is None:
+            users = self.by_ticker[ticker] = set()
+            self.bus.subscribe(ticker, self.on_quote)
+        users.add(user_id)
+        self.by_user.setdefault(user_id, set()).add(ticker)
+
+    def _remove(self, user_id, ticker):
+        users = self.by_ticker.get(ticker)
+        if not users or user_id not in users:
+            return False
+        users.discard(user_id)
+        if not users:
+            del self.by_ticker[ticker]
+            self._last_mid.pop(ticker, None)
+            self._last_sent.pop(ticker, None)
+            self.bus.unsubscribe(ticker, self.on_quote)
+        tickers = self.by_user.get(user_id)
+        tickers.discard(ticker)
+        if not tickers:
+            del self.by_user[user_id]
+        return True
+
+    def watch(self, user_id, ticker):
+        """Returns "added", "exists" or "full"."""
+        current = self.by_user.get(user_id, ())
+        if ticker in current:
+            return "exists"
+        if len(current) >= self.max_per_user:
+            return "full"
+        self._add(user_id, ticker)
+        self.save()
+        return "added"
+
+    def unwatch(self, user_id, ticker=None):
+        """Removes one ticker (or all of the user's, when None). Returns the tickers removed."""
+        tickers = [ticker] if ticker else list(self.by_user.get(user_id, ()))
+        removed = [t for t in tickers if self._remove(user_id, t)]
+        if removed:
+            self.save()
+        return removed
+
+    def tickers_for(self, user_id):
+        return sorted(self.by_user.get(user_id, ()))
+
+    def watchers(self, ticker):
+        return self.by_ticker.get(ticker, set())
+
+    # --- Fan-out ---
+
+    def on_quote(self, ticker, bid, ask):
+        users = self.by_ticker.get(ticker)
+        mid = _mid(bid, ask)
+        if not users or mid is None:
+            return None
+        last = self._last_mid.get(ticker)
+        if last is None:
+            self._last_mid[ticker] = mid
+            return None
+        if abs(mid - last) < self.min_move:
+            return None
+        now = time.monotonic()
+        sent = self._last_sent.get(ticker)
+        if sent is not None and now - sent < self.cooldown:
+            return None
+
+        self._last_mid[ticker] = mid
+        self._last_sent[ticker] = now
+        self.notifications += 1
+        update = {"ticker": ticker, "bid": bid, "ask": ask, "from": last, "to": mid}
+        if self.notify is not None:
+            # The live set is handed over as a snapshot; one update object for every watcher
+            task = asyncio.get_running_loop().create_task(self.notify(frozenset(users), update))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return update
+
+
+_index = None
+
+def get_index():
+    global _index
+    if _index is None:
+        _index = WatchIndex()
+    return _index
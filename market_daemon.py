@@ -0,0 +1,40 @@
+import asyncio
+import argparse
+
+from managers import config
+from managers import metrics
+from managers import quote_store
+from managers.snapshot_service import SnapshotServer
+
+# --- Market Data Daemon ---
+# Standalone process that owns the Kalshi/Gamma clients, caches and Polymarket
+# matching, so heavy passes never run on the bot's Discord event loop and several
+# bot replicas can share one set of upstream requests.
+#
+# Run:   python3 market_daemon.py            (socket from MARKET_DAEMON_SOCKET)
+# Bots:  set MARKET_DAEMON_SOCKET to the same path and they fetch snapshots from here.
+
+DEFAULT_SOCKET = "/tmp/kalshi-market-data.sock"
+
+async def main(socket_path, metrics_port):
+    server = SnapshotServer(socket_path)
+    await server.start()
+    if metrics_port:
+        await metrics.start_http_server(metrics_port)
+    if config.QUOTE_HISTORY_DIR:
+        quote_store.enable(config.QUOTE_HISTORY_DIR)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
+        await quote_store.disable()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kalshi/Polymarket market data service")
+    parser.add_argument("--socket", default=config.MARKET_DAEMON_SOCKET or DEFAULT_SOCKET)
+    parser.add_argument("--metrics-port", type=int, default=0, help="Prometheus endpoint port (0 = off)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.socket, args.metrics_port))
+    except KeyboardInterrupt:
+        pass
@@ -1,7 +1,10 @@
 import discord
 from managers import series_manager
-from managers import market_manager
-from managers import polymarket_manager
+from managers import snapshot_service
+from managers import prefetch
+from managers import metrics
+from managers import tracing
+from managers.config import SERVE_LATE_WAIT
 from datetime import datetime
 import asyncio
 
@@ -15,27 +18,42 @@ class SportsCategoryView(discord.ui.View):
         for category_name in categories.keys():
             self.add_item(CategoryButton(category_name, categories[category_name]))
 
+def _menu_owner(interaction):
+    # The menu message is edited in place through every level, so it identifies
+    # one walk through the menu (falls back to the user).
+    message = getattr(interaction, "message", None)
+    return message.id if message is not None else interaction.user.id
+
 class CategoryButton(discord.ui.Button):
     def __init__(self, label, sub_map):
         super().__init__(label=label, style=discord.ButtonStyle.primary)
         self.sub_map = sub_map # The dictionary of series for this category
         
+    @metrics.instrument("ui:category")
     async def callback(self, interaction: discord.Interaction):
         # Transition to Series Selection
         await interaction.response.defer()
-        view = SeriesSelectionView(self.label, self.sub_map)
+        # Start warming the likely snapshots while the user picks a league
+        owner = _menu_owner(interaction)
+        prefetch.get_prefetcher().plan(owner, prefetch.category_targets(self.sub_map))
+        view = SeriesSelectionView(self.label, self.sub_map, owner)
         await interaction.edit_original_response(content=f"**{self.label}**: Select a League", view=view)
 
 # --- Level 1: Series Selection ---
 class SeriesSelectionView(discord.ui.View):
-    def __init__(self, category_name, sub_map):
+    def __init__(self, category_name, sub_map, owner=None):
         super().__init__(timeout=60)
         self.category_name = category_name
         self.sub_map = sub_map
+        self.owner = owner
         
         # sub_map is { "NBA": { "moneyline": "...", ... } }
         for series_name, tickers_dict in sub_map.items():
             self.add_item(SeriesButton(series_name, tickers_dict))
+
+    async def on_timeout(self):
+        if self.owner is not None:
+            prefetch.get_prefetcher().cancel(self.owner)
             
 
 class SeriesButton(discord.ui.Button):
@@ -43,18 +61,24 @@ class SeriesButton(discord.ui.Button):
         super().__init__(label=label, style=discord.ButtonStyle.secondary)
         self.tickers_dict = tickers_dict
         
+    @metrics.instrument("ui:series")
     async def callback(self, interaction: discord.Interaction):
         # Transition to Market Type
         await interaction.response.defer()
-        view = MarketTypeView(self.tickers_dict, self.label) 
+        # Narrow the prefetch to this league (drops the other leagues' pending warms)
+        owner = _menu_owner(interaction)
+        prefetch.get_prefetcher().plan(owner, prefetch.series_targets(self.tickers_dict, self.label))
+        self.view.stop() # replaced below; its timeout must not cancel the new plan
+        view = MarketTypeView(self.tickers_dict, self.label, owner)
         await interaction.edit_original_response(content=f"**{self.label}**: Select Market Type", view=view)
 
 # --- Level 2: Market Type Selection ---
 class MarketTypeView(discord.ui.View):
-    def __init__(self, tickers_dict, sport_name):
+    def __init__(self, tickers_dict, sport_name, owner=None):
         super().__init__(timeout=60)
         self.tickers_dict = tickers_dict
         self.sport_name = sport_name
+        self.owner = owner
         
         # Check available types to enable/disable buttons?
         # Or just show all standard ones.
@@ -62,13 +86,21 @@ class MarketTypeView(discord.ui.View):
         self.add_item(MarketTypeButton("Spreads", "spread", None))
         self.add_item(MarketTypeButton("Totals", "total", None))
 
+    async def on_timeout(self):
+        if self.owner is not None:
+            prefetch.get_prefetcher().cancel(self.owner)
+
 class MarketTypeButton(discord.ui.Button):
     def __init__(self, label, market_type, emoji):
         super().__init__(label=label, emoji=emoji, style=discord.ButtonStyle.success)
         self.market_type = market_type
         
+    @metrics.instrument("ui:market_type")
+    @tracing.traced("ui.market_type")
     async def callback(self, interaction: discord.Interaction):
         view = self.view
+        tracing.annotate(user_id=interaction.user.id, interaction_id=getattr(interaction, "id", None),
+                         sport=view.sport_name, market_type=self.market_type)
         
         # Get specific ticker
         ticker = view.tickers_dict.get(self.market_type)
@@ -77,244 +109,270 @@ class MarketTypeButton(discord.ui.Button):
              return
 
         await interaction.response.defer()
+        if view.owner is not None:
+            prefetch.get_prefetcher().consume(view.owner, (ticker, view.sport_name, self.market_type))
         await show_results(interaction, ticker, view.sport_name, self.market_type)
 
 # --- Level 3: Results Display ---
-async def show_results(interaction, ticker, sport_name, market_type):
-    games = await market_manager.get_games_with_odds(ticker)
-    
-    if isinstance(games, str):
-        await interaction.edit_original_response(content=f"Error: {games}", view=None)
-        return
-        
-    filtered_events = []
-    
-    # Pre-calculate Date limit (48 hours)
-    import re
-    from datetime import timedelta
-    now = datetime.now() 
-    # Note: Server time might differ from Game time (US/ET). 
-    # We'll be lenient, maybe 3-4 days to be safe given TZ diffs, but user asked for 48h.
-    # Ticker format: YYMMMDD -> 25DEC15.
-    
-    cutoff = now + timedelta(days=3) # Using 3 days to catch "next 48h" fully including today remainder
-    
-    processed_games = []
+def _bid_ask_str(summary):
+    """Top of book as "48/50¢" (bid/ask)."""
+    if not summary:
+        return "n/a"
+    fmt = lambda p: "-" if p is None else f"{p:g}"
+    return f"{fmt(summary['bid'])}/{fmt(summary['ask'])}¢"
 
-    for g in games:
-        # Check markets
-        markets = g["markets"].get(market_type, [])
-        if not markets:
-            continue
-            
-        # Parse Date from first market ticker to filter Event
-        # Ticker e.g. KXNBAGAME-25DEC15MEMLAC...
-        # We need to find the date part.
-        m_ticker = markets[0].get("ticker", "")
-        # Regex for '25DEC15' inside the string
-        match = re.search(r'(\d{2})([A-Z]{3})(\d{2})', m_ticker)
-        
-        game_date = datetime.max # Default to far future if no date found
-        date_str_display = ""
-        
-        if match:
-            yy, mmm, dd = match.groups()
-            try:
-                # Parse "25Dec15"
-                dt_str = f"{yy}{mmm}{dd}"
-                game_date = datetime.strptime(dt_str, "%y%b%d")
-                
-                # Format for display: Dec 15
-                date_str_display = f"{mmm.title()} {dd}"
-            except ValueError:
-                pass
-        
-        # Filter Logic (Next ~48h/72h)
-        # Check if game_date is within range. Allow Today/Yesterday (active)
-        # Ignoring past games? API status=open means incomplete.
-        # Strict "upcoming" filter:
-        if game_date > cutoff:
-            continue # Skip far future
-            
-        processed_games.append({
-            "game": g,
-            "markets": markets,
-            "sort_date": game_date,
-            "date_display": date_str_display
-        })
-        
-    # Sort by Date
-    processed_games.sort(key=lambda x: x["sort_date"])
-    
-    if not processed_games:
-        await interaction.edit_original_response(content=f"No active **{market_type}** markets found in the next 48h for {sport_name}.", view=None)
-        return
+def _fill_str(summary):
+    """Executable (VWAP) buy price for the target size, e.g. "52.4¢" or "53.0¢ (60 avail)"."""
+    if summary.get("vwap") is None:
+        return "no asks"
+    text = f"{summary['vwap']:.1f}¢"
+    if summary["fillable"] < summary["qty"]:
+        text += f" ({summary['fillable']} avail)"
+    return text
 
-    # --- Concurrent Polymarket Fetching Validation ---
+def render_game_field(item, market_type):
+    """(field name, value) for one snapshot game, or None when it has no markets to show."""
+    g = item["game"]
+    markets = item["markets"]
+    date_str = item["date_display"]
+    title = g.get("event_title")
+    poly_data = item.get("poly_data") # Pre-fetched
     
-    # helper for concurrent execution with semaphore
-    sem = asyncio.Semaphore(5) # Limit to 5 concurrent requests
+    # Deduplicate Markets for Display
+    # Group by Base ID only for Moneyline to avoid redundancy (showing both Team A and Team B sides)
+    # For Spreads/Totals, multiple markets exist (different lines), so we show them all (capped).
     
-    async def fetch_poly_data(item):
-        g = item["game"]
-        title = g.get("event_title")
-        async with sem:
-            # We add a small random sleep or just proceed? Semaphore is handled by async with.
-            p_data = await polymarket_manager.find_polymarket_match(title, sport=sport_name)
-            return p_data
-
-    # Gather all tasks
-    tasks = [fetch_poly_data(item) for item in processed_games[:5]] # Limit total items processed to 5 for now? Or process all filtered?
-    # Actually, let's process up to 5 games max as we only show up to 4-5 anyway.
-    # The previous loop broke at count >= 4.
+    displayed_base_ids = set()
     
-    # Let's cap processed games to 5 to avoid fetching data for games we won't show.
-    games_to_display = processed_games[:5]
+    market_lines_str = []
     
-    poly_results = await asyncio.gather(*tasks)
+    # Sort markets by useful value? E.g. spread value?
+    # For now, API order is usually fine.
     
-    # Store results back in items
-    for i, p_data in enumerate(poly_results):
-        games_to_display[i]["poly_data"] = p_data
-        
-    embed = discord.Embed(
-        title=f"{sport_name} - {market_type.title()} (Next 48h)",
-        color=discord.Color.brand_green()
-    )
+    limit_per_game = 5 if market_type != "moneyline" else 2
+    current_field_length = 0
     
-    count = 0
-    for item in processed_games:
-        if count >= 4: break # Safety Cap for Total Embed Size (6000 chars). 4-5 games max with 5 markets each.
+    for m in markets[:limit_per_game]: # Safety cap to avoid Embed Field limit (1024 chars)
+        raw_ticker = m.get("ticker", "")
         
-        g = item["game"]
-        markets = item["markets"]
-        date_str = item["date_display"]
-        title = g.get("event_title")
-        poly_data = item.get("poly_data") # Pre-fetched
+        # Extract Base ID (Remove suffix)
+        if "-" in raw_ticker:
+            base_id = raw_ticker.rsplit("-", 1)[0]
+        else:
+            base_id = raw_ticker
         
-        # Deduplicate Markets for Display
-        # Group by Base ID only for Moneyline to avoid redundancy (showing both Team A and Team B sides)
-        # For Spreads/Totals, multiple markets exist (different lines), so we show them all (capped).
+        # Only deduplicate strict Base ID for Moneyline
+        if market_type == "moneyline":
+            if base_id in displayed_base_ids:
+                continue # Skip duplicate side
+            displayed_base_ids.add(base_id)
         
-        displayed_base_ids = set()
+        # Format
+        header = m.get("title")
+        sub = m.get("subtitle", "")
+        if sub:
+            header = f"{header} ({sub})"
         
-        market_lines_str = []
+        # Add Date to Header only for Moneyline? No, we moved it to Field Name.
         
-        # Sort markets by useful value? E.g. spread value?
-        # For now, API order is usually fine.
+        yes_p = m.get("yes_bid")
+        no_p = m.get("no_bid")
         
-        limit_per_game = 5 if market_type != "moneyline" else 2
-        current_field_length = 0
+        # ID Display Logic
+        # Moneyline: Generic Event ID (Base ID)
+        # Spreads/Totals: Full Market ID (Specific Ticker)
+        display_id = base_id if market_type == "moneyline" else raw_ticker
         
-        for m in markets[:limit_per_game]: # Safety cap to avoid Embed Field limit (1024 chars)
-            raw_ticker = m.get("ticker", "")
-            
-            # Extract Base ID (Remove suffix)
-            if "-" in raw_ticker:
-                base_id = raw_ticker.rsplit("-", 1)[0]
-            else:
-                base_id = raw_ticker
-            
-            # Only deduplicate strict Base ID for Moneyline
-            if market_type == "moneyline":
-                if base_id in displayed_base_ids:
-                    continue # Skip duplicate side
-                displayed_base_ids.add(base_id)
-            
-            # Format
-            header = m.get("title")
-            sub = m.get("subtitle", "")
-            if sub:
-                header = f"{header} ({sub})"
-            
-            # Add Date to Header only for Moneyline? No, we moved it to Field Name.
-            
-            yes_p = m.get("yes_bid")
-            no_p = m.get("no_bid")
-            
-            # ID Display Logic
-            # Moneyline: Generic Event ID (Base ID)
-            # Spreads/Totals: Full Market ID (Specific Ticker)
-            display_id = base_id if market_type == "moneyline" else raw_ticker
-            
-            # Construct Market URL
-            # Format: https://kalshi.com/markets/{series_ticker}/{event_ticker}
-            # We need to access the game/event info from 'g'
-            s_ticker = g.get("series_ticker")
-            e_ticker = g.get("event_ticker")
-            
-            market_url = ""
-            if s_ticker and e_ticker:
-                 market_url = f"https://kalshi.com/markets/{s_ticker}/{e_ticker}"
+        # Construct Market URL
+        # Format: https://kalshi.com/markets/{series_ticker}/{event_ticker}
+        # We need to access the game/event info from 'g'
+        s_ticker = g.get("series_ticker")
+        e_ticker = g.get("event_ticker")
+        
+        market_url = ""
+        if s_ticker and e_ticker:
+             market_url = f"https://kalshi.com/markets/{s_ticker}/{e_ticker}"
 
-            line_str = f"**{header}**"
-            
-            # IDs Line
-            ids_line = f"**K_ID:** `{display_id}`"
-            
-            # Poly Match (ALREADY FETCHED)
-            # poly_data = await polymarket_manager.find_polymarket_match(...) -> REMOVED
-            
-            if poly_data:
-                if poly_data.get("yes_id"):
-                     ids_line += f"\n**Poly Yes ID:** `{poly_data['yes_id']}`"
-                if poly_data.get("no_id"):
-                     ids_line += f"\n**Poly No ID:** `{poly_data['no_id']}`"
-                
-            line_str += f"\n{ids_line}"
-            
-            # Odds Lines
-            # Kalshi Side
-            k_side = "Yes"
-            if "-" in raw_ticker:
-                 k_suffix = raw_ticker.split("-")[-1]
-                 # If suffix is 2-3 chars, use it.
-                 if len(k_suffix) <= 5: # e.g. POR, SAC, 49ERS
-                     k_side = k_suffix
-            
-            line_str += f"\n**Kalshi ({k_side}):** Yes {yes_p}¢ | No {no_p}¢"
+        line_str = f"**{header}**"
+        
+        # IDs Line
+        ids_line = f"**K_ID:** `{display_id}`"
+        
+        # Poly Match (ALREADY FETCHED)
+        # poly_data = await polymarket_manager.find_polymarket_match(...) -> REMOVED
+        
+        if poly_data:
+            if poly_data.get("yes_id"):
+                 ids_line += f"\n**Poly Yes ID:** `{poly_data['yes_id']}`"
+            if poly_data.get("no_id"):
+                 ids_line += f"\n**Poly No ID:** `{poly_data['no_id']}`"
             
-            if poly_data:
-                 p_yes = int(poly_data.get('yes', 0))
-                 p_no = int(poly_data.get('no', 0))
-                 
-                 # Poly Outcomes
-                 # outcome[0] corresponds to 'Yes' token
-                 outcomes = poly_data.get("outcomes", ["Yes", "No"])
-                 p_side = outcomes[0]
-                 
+        line_str += f"\n{ids_line}"
+        
+        # Odds Lines
+        # Kalshi Side
+        k_side = "Yes"
+        if "-" in raw_ticker:
+             k_suffix = raw_ticker.split("-")[-1]
+             # If suffix is 2-3 chars, use it.
+             if len(k_suffix) <= 5: # e.g. POR, SAC, 49ERS
+                 k_side = k_suffix
+        
+        line_str += f"\n**Kalshi ({k_side}):** Yes {yes_p}¢ | No {no_p}¢"
+        depth = m.get("depth")
+        if depth:
+            line_str += f"\n**Kalshi x{depth['yes']['qty']}:** Yes {_fill_str(depth['yes'])} | No {_fill_str(depth['no'])}"
+        
+        if poly_data:
+             p_yes = int(poly_data.get('yes', 0))
+             p_no = int(poly_data.get('no', 0))
+             
+             # Poly Outcomes
+             # outcome[0] corresponds to 'Yes' token
+             outcomes = poly_data.get("outcomes", ["Yes", "No"])
+             p_side = outcomes[0]
+             
+             p_depth = poly_data.get("depth") or {}
+             if p_depth:
+                 # Real CLOB book per outcome token (bid/ask), then executable price
+                 line_str += f"\n**Poly ({p_side}):** Yes {_bid_ask_str(p_depth.get('yes'))} | No {_bid_ask_str(p_depth.get('no'))}"
+                 if p_depth.get("yes") and p_depth.get("no"):
+                     line_str += f"\n**Poly x{p_depth['yes']['qty']}:** Yes {_fill_str(p_depth['yes'])} | No {_fill_str(p_depth['no'])}"
+             else:
                  line_str += f"\n**Poly ({p_side}):** Yes {p_yes}¢ | No {p_no}¢"
 
-            # Links
-            links_parts = []
-            if market_url:
-                links_parts.append(f"[Kalshi]({market_url})")
-            
-            if poly_data and poly_data.get("url"):
-                links_parts.append(f"[Polymarket]({poly_data['url']})")
-                
-            if links_parts:
-                line_str += "\n" + " | ".join(links_parts)
-            
-            # Character Limit Check
-            # Discord Limit: 1024. Safe Limit: ~1000.
-            new_len = len(line_str) + 2 # +2 for newline join
-            if current_field_length + new_len > 950:
-                 market_lines_str.append(f"... (Truncated {len(markets) - len(market_lines_str)} more)")
-                 break
-            
-            current_field_length += new_len
-            market_lines_str.append(line_str)
-            
-            
-        if market_lines_str:
-            # Add Date to Field Name
-            field_name = title
-            if date_str:
-                field_name = f"{title} | {date_str}"
+        # Links
+        links_parts = []
+        if market_url:
+            links_parts.append(f"[Kalshi]({market_url})")
+        
+        if poly_data and poly_data.get("url"):
+            links_parts.append(f"[Polymarket]({poly_data['url']})")
             
-            # Use double newline for readability as requested
-            embed.add_field(name=field_name, value="\n\n".join(market_lines_str), inline=False)
-            count += 1
+        if links_parts:
+            line_str += "\n" + " | ".join(links_parts)
         
+        # Character Limit Check
+        # Discord Limit: 1024. Safe Limit: ~1000.
+        new_len = len(line_str) + 2 # +2 for newline join
+        if current_field_length + new_len > 950:
+             market_lines_str.append(f"... (Truncated {len(markets) - len(market_lines_str)} more)")
+             break
+        
+        current_field_length += new_len
+        market_lines_str.append(line_str)
+        
+        
+    if market_lines_str:
+        # Add Date to Field Name
+        field_name = title
+        if date_str:
+            field_name = f"{title} | {date_str}"
+        
+        # Use double newline for readability as requested
+        return field_name, "\n\n".join(market_lines_str)
+    return None
+
+def _depth_key(depth):
+    return tuple((side, tuple(sorted(v.items()))) for side, v in sorted((depth or {}).items()) if v)
+
+def game_fingerprint(item, market_type):
+    """
+    Everything render_game_field() reads that can change between snapshots.
+    Equal fingerprints -> identical field, so live boards can skip re-rendering it.
+    """
+    limit_per_game = 5 if market_type != "moneyline" else 2
+    markets = tuple(
+        (m.get("ticker"), m.get("yes_bid"), m.get("no_bid"), _depth_key(m.get("depth")))
+        for m in item["markets"][:limit_per_game]
+    )
+    p = item.get("poly_data") or {}
+    return (
+        item["game"].get("event_title"), item["date_display"], markets,
+        p.get("yes"), p.get("no"), p.get("yes_id"), p.get("no_id"), p.get("url"), _depth_key(p.get("depth")),
+    )
+
+@tracing.traced("show_results")
+async def show_results(interaction, ticker, sport_name, market_type):
+    # Data comes as one snapshot (Kalshi games + Polymarket matches), either from
+    # the market data daemon or built in-process. The reply never waits past
+    # SERVE_DEADLINE: if fresh data is late, the last good snapshot is shown
+    # (marked stale) and replaced once the refresh lands.
+    served = await snapshot_service.serve(ticker, sport_name, market_type)
+    snapshot, pending = served["snapshot"], served["pending"]
+
+    if snapshot is None:
+        await interaction.edit_original_response(content=f"⏳ {sport_name} prices are slow to load, still fetching...", view=None)
+        snapshot = await _await_refresh(pending)
+        if snapshot is None:
+            await interaction.edit_original_response(content="⚠️ Prices are unavailable right now, try again shortly.", view=None)
+            return
+        await render_results(interaction, snapshot, sport_name, market_type)
+        return
+
+    await render_results(interaction, snapshot, sport_name, market_type, stale_age=served["stale_age"])
+    if pending is not None:
+        fresh = await _await_refresh(pending)
+        if fresh is not None and not fresh.get("error"):
+            await render_results(interaction, fresh, sport_name, market_type)
+
+async def _await_refresh(pending):
+    """The refresh's snapshot, or None if it fails or takes longer than SERVE_LATE_WAIT."""
+    try:
+        return await asyncio.wait_for(asyncio.shield(pending), SERVE_LATE_WAIT)
+    except Exception:
+        return None
+
+async def render_results(interaction, snapshot, sport_name, market_type, stale_age=None):
+    """Edits the reply to show a snapshot. stale_age (seconds) marks it as the last good one."""
+    if snapshot.get("error"):
+        await interaction.edit_original_response(content=f"Error: {snapshot['error']}", view=None)
+        return
+
+    processed_games = snapshot["games"]
+
+    if not processed_games:
+        await interaction.edit_original_response(content=f"No active **{market_type}** markets found in the next 48h for {sport_name}.", view=None)
+        return
+
+    # The span ends (with the error) even if building the embed raises
+    with metrics.timer("section_latency_ms", section="render_results"), \
+            tracing.span("render_embed", games=len(processed_games)):
+        embed = discord.Embed(
+            title=f"{sport_name} - {market_type.title()} (Next 48h)",
+            color=discord.Color.brand_green() if stale_age is None else discord.Color.light_grey()
+        )
+        if stale_age is not None:
+            embed.description = f"⚠️ **Stale:** prices from {_age_text(stale_age)} ago, live data is slow or unavailable."
+
+        count = 0
+        for item in processed_games:
+            if count >= 4: break # Safety Cap for Total Embed Size (6000 chars). 4-5 games max with 5 markets each.
+            field = render_game_field(item, market_type)
+            if field:
+                embed.add_field(name=field[0], value=field[1], inline=False)
+                count += 1
+
     await interaction.edit_original_response(content=None, embed=embed, view=None)
+
+def _age_text(seconds):
+    return f"{seconds:.0f}s" if seconds < 90 else f"{seconds / 60:.0f}m"
+
+# --- Live Boards ---
+BOARD_MAX_FIELDS = 4 # same embed size cap as show_results
+
+def board_embed(sport_name, market_type, fields, updated_at=None, note=None):
+    """Embed for a live board from already-rendered (name, value) fields."""
+    embed = discord.Embed(
+        title=f"{sport_name} - {market_type.title()} (Live)",
+        color=discord.Color.brand_green(),
+        timestamp=datetime.fromtimestamp(updated_at) if updated_at else None
+    )
+    for name, value in fields:
+        embed.add_field(name=name, value=value, inline=False)
+    if not fields:
+        embed.description = note or f"No active **{market_type}** markets found in the next 48h."
+    elif note:
+        embed.description = note
+    embed.set_footer(text="Updates in place • !board stop to end")
+    return embed